@@ -1,38 +1,32 @@
-import pandas as pd
-import pandas_ta as ta
+import sys
+
 import numpy as np
 
-def aplicar_estrategia(df):
+from MODULOS.grafo_indicadores import nodo, previa, aplicar_estrategias
+
+# ------------------------------------------------------------------------------
+# INDICADORES (nodos del grafo: Bollinger se comparte con mean_reversion)
+# ------------------------------------------------------------------------------
+BB = nodo('bbands', length=20, std=2)
+# Usamos 20 (Corto Plazo) porque el Breakout es un evento inmediato.
+# Queremos volumen anormal respecto a las últimas horas.
+KC = nodo('kc', length=20, scalar=1.5)
+VOL_SMA = nodo('sma', fuente='volume', length=20)
+
+INDICADORES = {
+    'BB_Lower': (BB, 'lower'), 'BB_Mid': (BB, 'mid'), 'BB_Upper': (BB, 'upper'),
+    'BB_Width': (BB, 'width'), 'BB_Pct': (BB, 'pct'),
+    'KC_Lower': (KC, 'lower'), 'KC_Mid': (KC, 'basis'), 'KC_Upper': (KC, 'upper'),
+    'Vol_SMA': (VOL_SMA, 'valor'),
+}
+SEÑALES = ('Real_Price_Breakout_Buy', 'Real_Price_Breakout_Sell')
+
+
+def señales(df):
     """
     Estrategia de Breakout / Explosión de Volatilidad (TTM Squeeze simplificado).
     Busca momentos donde la volatilidad se comprime y luego explota.
     """
-    
-    # --------------------------------------------------------------------------
-    # 1. BOLLINGER BANDS (20, 2)
-    # --------------------------------------------------------------------------
-    if 'BB_Lower' not in df.columns:
-        bb = ta.bbands(df['close'], length=20, std=2)
-        # pandas_ta devuelve: Lower, Mid, Upper, Bandwidth, Percent
-        bb.columns = ['BB_Lower', 'BB_Mid', 'BB_Upper', 'BB_Width', 'BB_Pct']
-        df = df.join(bb)
-    
-    # --------------------------------------------------------------------------
-    # 2. KELTNER CHANNELS (20, 1.5)
-    # --------------------------------------------------------------------------
-    if 'KC_Lower' not in df.columns:
-        kc = ta.kc(df['high'], df['low'], df['close'], length=20, scalar=1.5)
-        kc.columns = ['KC_Lower', 'KC_Mid', 'KC_Upper']
-        df = df.join(kc)
-    
-    # --------------------------------------------------------------------------
-    # 3. VOLUMEN SMA (20)
-    # --------------------------------------------------------------------------
-    # Usamos 20 (Corto Plazo) porque el Breakout es un evento inmediato.
-    # Queremos volumen anormal respecto a las últimas horas.
-    if 'Vol_SMA' not in df.columns:
-        df['Vol_SMA'] = ta.sma(df['volume'], length=20)
-
     # --------------------------------------------------------------------------
     # LÓGICA SQUEEZE
     # --------------------------------------------------------------------------
@@ -46,11 +40,11 @@ def aplicar_estrategia(df):
     # SEÑALES
     # --------------------------------------------------------------------------
     # LONG:
-    # 1. Veníamos de squeeze (shift 1 es True)
+    # 1. Veníamos de squeeze (la vela anterior estaba comprimida)
     # 2. El precio rompe la Banda Superior
     # 3. Hay explosión de volumen (> 1.5 veces el promedio local)
     long_cond = (
-        (squeeze_on.shift(1) == True) & 
+        previa(squeeze_on, False) & 
         (df['close'] > df['BB_Upper']) & 
         (df['volume'] > df['Vol_SMA'] * 1.5)
     )
@@ -60,7 +54,7 @@ def aplicar_estrategia(df):
     # 2. El precio rompe la Banda Inferior
     # 3. Hay explosión de volumen
     short_cond = (
-        (squeeze_on.shift(1) == True) & 
+        previa(squeeze_on, False) & 
         (df['close'] < df['BB_Lower']) & 
         (df['volume'] > df['Vol_SMA'] * 1.5)
     )
@@ -68,7 +62,12 @@ def aplicar_estrategia(df):
     # --------------------------------------------------------------------------
     # SALIDAS (LABELING)
     # --------------------------------------------------------------------------
-    df['Real_Price_Breakout_Buy'] = np.where(long_cond, df['close'], np.nan)
-    df['Real_Price_Breakout_Sell'] = np.where(short_cond, df['close'], np.nan)
-    
-    return df
\ No newline at end of file
+    return {
+        'Real_Price_Breakout_Buy': np.where(long_cond, df['close'], np.nan),
+        'Real_Price_Breakout_Sell': np.where(short_cond, df['close'], np.nan),
+    }
+
+
+def aplicar_estrategia(df):
+    """Indicadores + señales de esta estrategia sola (para varias: grafo_indicadores.aplicar_estrategias)."""
+    return aplicar_estrategias(df, [sys.modules[__name__]])
@@ -1,36 +1,32 @@
-import pandas as pd
-import pandas_ta as ta
+import sys
+
 import numpy as np
 
-def aplicar_estrategia(df):
+from MODULOS.grafo_indicadores import nodo, aplicar_estrategias
+
+# ------------------------------------------------------------------------------
+# INDICADORES (nodos del grafo: se calculan una vez aunque otra estrategia los pida)
+# ------------------------------------------------------------------------------
+BB = nodo('bbands', length=20, std=2)          # Bandas de Bollinger (20, 2)
+RSI = nodo('rsi', length=14)                   # RSI (14)
+ADX = nodo('adx', length=14)                   # ADX (14) - Filtro de Tendencia
+
+INDICADORES = {
+    'BB_Lower': (BB, 'lower'), 'BB_Mid': (BB, 'mid'), 'BB_Upper': (BB, 'upper'),
+    'BB_Width': (BB, 'width'), 'BB_Pct': (BB, 'pct'),
+    'RSI': (RSI, 'valor'),
+    'ADX': (ADX, 'valor'),
+}
+SEÑALES = ('Real_Price_Rango_Buy', 'Real_Price_Rango_Sell')
+
+
+def señales(df):
     """
     Estrategia de Rango / Reversión a la Media.
     Compra en soportes dinámicos (Bollinger) cuando el mercado está "tranquilo" (ADX bajo).
     """
-    
     # --------------------------------------------------------------------------
-    # 1. INDICADORES (Con validación de existencia)
-    # --------------------------------------------------------------------------
-    
-    # Bandas de Bollinger (20, 2)
-    if 'BB_Lower' not in df.columns:
-        bb = ta.bbands(df['close'], length=20, std=2)
-        
-        bb.columns = ['BB_Lower', 'BB_Mid', 'BB_Upper', 'BB_Width', 'BB_Pct']
-        df = df.join(bb)
-    
-    # RSI (14)
-    if 'RSI' not in df.columns:
-        df['RSI'] = ta.rsi(df['close'], length=14)
-    
-    # ADX (14) - Filtro de Tendencia
-    if 'ADX' not in df.columns:
-        adx = ta.adx(df['high'], df['low'], df['close'], length=14)
-        # ADX devuelve 3 columnas (ADX, DMP, DMN)
-        df['ADX'] = adx.iloc[:, 0]
-
-    # --------------------------------------------------------------------------
-    # 2. REGLAS DE ENTRADA
+    # REGLAS DE ENTRADA
     # --------------------------------------------------------------------------
     
     # LONG:
@@ -54,9 +50,14 @@ def aplicar_estrategia(df):
     )
     
     # --------------------------------------------------------------------------
-    # 3. SALIDAS (LABELING)
+    # SALIDAS (LABELING)
     # --------------------------------------------------------------------------
-    df['Real_Price_Rango_Buy'] = np.where(long_cond, df['close'], np.nan)
-    df['Real_Price_Rango_Sell'] = np.where(short_cond, df['close'], np.nan)
-    
-    return df
\ No newline at end of file
+    return {
+        'Real_Price_Rango_Buy': np.where(long_cond, df['close'], np.nan),
+        'Real_Price_Rango_Sell': np.where(short_cond, df['close'], np.nan),
+    }
+
+
+def aplicar_estrategia(df):
+    """Indicadores + señales de esta estrategia sola (para varias: grafo_indicadores.aplicar_estrategias)."""
+    return aplicar_estrategias(df, [sys.modules[__name__]])
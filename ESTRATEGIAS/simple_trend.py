@@ -1,47 +1,54 @@
-import pandas as pd
-import pandas_ta as ta
+import sys
+
 import numpy as np
 
-def aplicar_estrategia(df):
+from MODULOS.grafo_indicadores import nodo, previa, aplicar_estrategias
+
+# ------------------------------------------------------------------------------
+# INDICADORES (EMA 50 es el mismo nodo que la KAMA demo de frpv)
+# ------------------------------------------------------------------------------
+EMA_50 = nodo('ema', length=50)
+EMA_200 = nodo('ema', length=200)
+
+INDICADORES = {
+    'EMA_50': (EMA_50, 'valor'),
+    'EMA_200': (EMA_200, 'valor'),
+}
+SEÑALES = ('Real_Price_Trend_Buy', 'Real_Price_Trend_Sell')
+
+
+def señales(df):
     """
     Estrategia Trend Following Clásica (Golden Cross / Death Cross).
     Cruces de EMA 50 y EMA 200.
     """
-    
-    # --------------------------------------------------------------------------
-    # 1. INDICADORES
     # --------------------------------------------------------------------------
-    
-    if 'EMA_50' not in df.columns:
-        df['EMA_50'] = ta.ema(df['close'], length=50)
-        
-    if 'EMA_200' not in df.columns: 
-        
-        df['EMA_200'] = ta.ema(df['close'], length=200)
-
+    # SEÑALES (Lógica Vectorizada Manual)
     # --------------------------------------------------------------------------
-    # 2. SEÑALES (Lógica Vectorizada Manual)
-    # --------------------------------------------------------------------------
-    
     
     # LONG (Golden Cross): 
     # Hoy EMA50 está ARRIBA de EMA200 Y Ayer estaba ABAJO o IGUAL
     long_cond = (
         (df['EMA_50'] > df['EMA_200']) & 
-        (df['EMA_50'].shift(1) <= df['EMA_200'].shift(1))
+        (previa(df['EMA_50']) <= previa(df['EMA_200']))
     )
     
     # SHORT (Death Cross):
     # Hoy EMA50 está ABAJO de EMA200 Y Ayer estaba ARRIBA o IGUAL
     short_cond = (
         (df['EMA_50'] < df['EMA_200']) & 
-        (df['EMA_50'].shift(1) >= df['EMA_200'].shift(1))
+        (previa(df['EMA_50']) >= previa(df['EMA_200']))
     )
 
     # --------------------------------------------------------------------------
-    # 3. SALIDAS (LABELING)
+    # SALIDAS (LABELING)
     # --------------------------------------------------------------------------
-    df['Real_Price_Trend_Buy'] = np.where(long_cond, df['close'], np.nan)
-    df['Real_Price_Trend_Sell'] = np.where(short_cond, df['close'], np.nan)
-    
-    return df
\ No newline at end of file
+    return {
+        'Real_Price_Trend_Buy': np.where(long_cond, df['close'], np.nan),
+        'Real_Price_Trend_Sell': np.where(short_cond, df['close'], np.nan),
+    }
+
+
+def aplicar_estrategia(df):
+    """Indicadores + señales de esta estrategia sola (para varias: grafo_indicadores.aplicar_estrategias)."""
+    return aplicar_estrategias(df, [sys.modules[__name__]])
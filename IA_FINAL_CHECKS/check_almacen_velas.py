@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.almacen_velas import AlmacenVelas, DTYPE_VELA
+
+# ==============================================================================
+# CHECK DEL ALMACÉN DE VELAS EN DISCO
+# ==============================================================================
+# Escribe 300 días de velas 5m sintéticas, simula un crash a mitad de registro
+# y mide cuánto tarda un reinicio en volver a tener el historial en memoria.
+
+PASO = 300_000
+DIAS = 300
+
+
+def velas_sinteticas(t0, n, rng):
+    t = t0 + np.arange(n, dtype=np.int64) * PASO
+    c = 100 + np.cumsum(rng.normal(size=n))
+    return [[int(t[i]), c[i], c[i] + 1, c[i] - 1, c[i], 10.0] for i in range(n)]
+
+
+def check_almacen_velas():
+    print("🔬 CHECK ALMACÉN DE VELAS...")
+    rng = np.random.default_rng(3)
+    n = DIAS * 288
+    t0 = 1_700_000_100_000
+    velas = velas_sinteticas(t0, n, rng)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        alm = AlmacenVelas(carpeta, '5m')
+        escritas = alm.agregar('BTC/USDT', velas[:-10])
+        for v in velas[-10:]: alm.agregar('BTC/USDT', [v])           # Cierres del stream
+        repetidas = alm.agregar('BTC/USDT', velas[-50:])               # Solapamiento REST
+        bien = escritas == n - 10 and repetidas == 0 and alm.ultimo_timestamp('BTC/USDT') == velas[-1][0]
+        print(f"   {'✅' if bien else '❌'} Append-only: {escritas}+10 escritas, {repetidas} duplicadas")
+        ok &= bien
+
+        # Crash a mitad de escritura: registro parcial al final del último mes
+        ultimo_mes = sorted(os.listdir(alm._dir('BTC/USDT')))[-1]
+        with open(os.path.join(alm._dir('BTC/USDT'), ultimo_mes), 'ab') as f:
+            f.write(b'\x00' * (DTYPE_VELA.itemsize // 2))
+
+        # Reinicio
+        t = time.perf_counter()
+        alm2 = AlmacenVelas(carpeta, '5m')
+        df = alm2.cargar('BTC/USDT', desde_ms=velas[0][0])
+        seg = time.perf_counter() - t
+        bien = df is not None and len(df) == n and float(df['close'].iloc[-1]) == velas[-1][4]
+        print(f"   {'✅' if bien else '❌'} Reinicio: {len(df) if df is not None else 0} velas en {seg*1000:.0f} ms (registro parcial ignorado)")
+        ok &= bien
+
+        # Se puede seguir agregando tras el crash
+        extra = velas_sinteticas(velas[-1][0] + PASO, 3, rng)
+        alm2.agregar('BTC/USDT', extra)
+        df = alm2.cargar('BTC/USDT', desde_ms=extra[0][0])
+        bien = df is not None and len(df) == 3 and df.index[0] == pd.Timestamp(extra[0][0], unit='ms', tz='UTC')
+        print(f"   {'✅' if bien else '❌'} Append tras crash (cola truncada)")
+        ok &= bien
+
+        # Ventana parcial: solo los meses necesarios
+        desde = velas[-288][0]
+        bien = len(alm2.cargar('BTC/USDT', desde_ms=desde)) == 288 + 3
+        print(f"   {'✅' if bien else '❌'} Carga desde una fecha (último día)")
+        ok &= bien
+
+    print("\n✅ ALMACÉN OK." if ok else "\n❌ ALMACÉN CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_almacen_velas()
@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.backfill import MotorBackfill, DestinoCSV, LIMITE_PAGINA
+from MODULOS.limitador_peso import LimitadorPeso
+
+# ==============================================================================
+# CHECK DEL MOTOR DE BACKFILL (EXCHANGE FALSO, SIN RED)
+# ==============================================================================
+# El exchange falso responde klines deterministas con 50 ms de latencia y cuenta
+# el peso por minuto como Binance. Se verifica:
+#   1) que la descarga en paralelo respeta el peso del limitador,
+#   2) que una descarga cortada se reanuda sin huecos ni duplicados,
+#   3) que el CSV resultante es idéntico a una descarga serial.
+
+PASO = 300_000
+T_INICIO = 1_600_000_200_000
+N_VELAS = 12_000          # 12 páginas por par
+SIMBOLOS = [f"C{i}/USDT" for i in range(12)]
+LATENCIA = 0.05
+
+
+class ExchangeFalso:
+    peso_lock = threading.Lock()
+    peso_total = 0
+    cortar_despues_de = None   # Simula un crash tras N peticiones
+
+    def __init__(self):
+        self.markets = {}
+        self.currencies = {}
+        self.last_response_headers = {}
+
+    def load_markets(self):
+        self.markets = {s: {'symbol': s} for s in SIMBOLOS}
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+
+    def milliseconds(self):
+        return T_INICIO + (N_VELAS + 1) * PASO
+
+    def parse_timeframe(self, tf):
+        return 300
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        with ExchangeFalso.peso_lock:
+            if ExchangeFalso.cortar_despues_de is not None:
+                if ExchangeFalso.cortar_despues_de <= 0: raise KeyboardInterrupt("crash simulado")
+                ExchangeFalso.cortar_despues_de -= 1
+            ExchangeFalso.peso_total += 2
+            self.last_response_headers = {'X-MBX-USED-WEIGHT-1M': str(ExchangeFalso.peso_total)}
+        time.sleep(LATENCIA)
+        i0 = max(0, -(-(since - T_INICIO) // PASO))
+        semilla = sum(ord(c) for c in symbol)
+        return [[T_INICIO + i * PASO, 1.0 + semilla, 2.0, 0.5, 1.0 + i % 7, float(i)]
+                for i in range(i0, min(i0 + limit, N_VELAS + 1))]
+
+
+def check_backfill():
+    print("🔬 CHECK MOTOR DE BACKFILL...")
+    ok = True
+    with tempfile.TemporaryDirectory() as carpeta:
+        # 1. Paralelo con límite de peso holgado -> mide el speedup contra serial
+        paginas = len(SIMBOLOS) * (N_VELAS // LIMITE_PAGINA + 1)
+        motor = MotorBackfill(mercado='spot', limitador=LimitadorPeso(60_000), workers=12, crear_exchange=ExchangeFalso)
+        t = time.time()
+        motor.ejecutar(SIMBOLOS, DestinoCSV(os.path.join(carpeta, 'par')), T_INICIO, silent=True)
+        seg_par = time.time() - t
+        seg_serial = paginas * LATENCIA
+        bien = seg_par < seg_serial / 3
+        print(f"   {'✅' if bien else '❌'} {paginas} páginas: paralelo {seg_par:.2f}s | serial estimado {seg_serial:.2f}s (x{seg_serial / seg_par:.1f})")
+        ok &= bien
+
+        # 2. Con peso escaso el limitador manda: 600/min ≈ 10 peso/s -> 5 pág/s
+        lim = LimitadorPeso(600, margen=1.0); lim._tokens = 0
+        motor = MotorBackfill(mercado='spot', limitador=lim, workers=12, crear_exchange=ExchangeFalso)
+        t = time.time()
+        motor.ejecutar(SIMBOLOS[:2], DestinoCSV(os.path.join(carpeta, 'lim')), T_INICIO + (N_VELAS - 2000) * PASO, silent=True)
+        seg = time.time() - t
+        ritmo = lim.peso_consumido / seg * 60
+        bien = ritmo <= 600 * 1.1
+        print(f"   {'✅' if bien else '❌'} Respeta el peso: {ritmo:.0f}/min (límite 600)")
+        ok &= bien
+
+        # 3. Crash a mitad y reanudación
+        destino = DestinoCSV(os.path.join(carpeta, 'crash'))
+        ExchangeFalso.cortar_despues_de = 30
+        motor = MotorBackfill(mercado='spot', limitador=LimitadorPeso(60_000), workers=4, crear_exchange=ExchangeFalso)
+        try: motor.ejecutar(SIMBOLOS, destino, T_INICIO, silent=True)
+        except KeyboardInterrupt: pass
+        ExchangeFalso.cortar_despues_de = None
+        # Línea parcial como la que deja un kill -9
+        with open(destino.ruta(SIMBOLOS[0]), 'a') as f: f.write("1600000")
+        motor = MotorBackfill(mercado='spot', limitador=LimitadorPeso(60_000), workers=12, crear_exchange=ExchangeFalso)
+        motor.ejecutar(SIMBOLOS, destino, T_INICIO, silent=True)
+
+        bien = True
+        for s in SIMBOLOS:
+            a = pd.read_csv(destino.ruta(s)); b = pd.read_csv(DestinoCSV(os.path.join(carpeta, 'par')).ruta(s))
+            if not a.equals(b) or a['time'].duplicated().any() or len(a) != N_VELAS + 1:
+                bien = False; print(f"   ❌ {s}: {len(a)} filas")
+        print(f"   {'✅' if bien else '❌'} Reanudación tras crash: sin huecos ni duplicados")
+        ok &= bien
+
+    print("\n✅ BACKFILL OK." if ok else "\n❌ BACKFILL CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_backfill()
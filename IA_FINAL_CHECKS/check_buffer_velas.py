@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.buffer_velas import BufferVelas, COLUMNAS
+
+# ==============================================================================
+# CHECK DEL RING BUFFER CONTRA EL CACHE PANDAS ANTERIOR
+# ==============================================================================
+# Aplica la misma secuencia de updates (vela en curso, cierres, lotes REST con
+# solapamiento) al buffer y al método viejo (concat + duplicated + iloc[-N:]).
+# Hueco tras un corte: el stream empuja la vela actual antes del relleno REST;
+# las velas del hueco se insertan en orden (también con la ventana llena).
+
+CAPACIDAD = 500
+PASO = 300_000
+T0 = 1_700_000_100_000
+
+
+def metodo_viejo(df, velas, capacidad):
+    df_n = pd.DataFrame(velas, columns=['time'] + COLUMNAS)
+    df_n['time'] = pd.to_datetime(df_n['time'], unit='ms', utc=True)
+    df_n.set_index('time', inplace=True)
+    if df is None: return df_n
+    df = pd.concat([df, df_n])
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.iloc[-capacidad:]
+
+
+def vela(t, rng):
+    o = 100 + rng.normal()
+    return [t, o, o + abs(rng.normal()), o - abs(rng.normal()), o + rng.normal() * 0.5, abs(rng.normal()) * 10]
+
+
+def generar_updates(n_velas, rng):
+    """Stream: ~5 updates por vela (la última cerrada); cada 50 velas un lote REST solapado."""
+    updates = []
+    for i in range(n_velas):
+        t = T0 + i * PASO
+        for _ in range(5): updates.append([vela(t, rng)])
+        if i and i % 50 == 0:
+            updates.append([vela(T0 + j * PASO, rng) for j in range(i - 30, i + 1)])
+    return updates
+
+
+def check_hueco(rng):
+    ok = True
+    for n_previas in (100, CAPACIDAD):  # Ventana a medio llenar y llena (rota)
+        buf, df = BufferVelas(CAPACIDAD), None
+        previas = [vela(T0 + i * PASO, rng) for i in range(n_previas)]
+        actual = [vela(T0 + (n_previas + 10) * PASO, rng)]     # Primer push tras el corte
+        relleno = [vela(T0 + i * PASO, rng) for i in range(n_previas - 1, n_previas + 11)]  # REST desde el corte
+        for u in (previas, actual, relleno):
+            buf.agregar(u); df = metodo_viejo(df, u, CAPACIDAD)
+        f = buf.df()
+        bien = f.index.equals(df.index) and np.array_equal(f.values, df[COLUMNAS].values)
+        bien &= bool(np.all(np.diff(buf.tiempos()) == PASO)) and buf.ultimo_timestamp() == actual[0][0]
+        print(f"   {'✅' if bien else '❌'} Hueco de 10 velas detrás de la vela actual rellenado en orden "
+              f"({n_previas} previas, {len(buf)} filas contiguas)")
+        ok &= bien
+    return ok
+
+
+def check_buffer_velas():
+    print("🔬 CHECK RING BUFFER DE VELAS...")
+    rng = np.random.default_rng(7)
+    updates = generar_updates(3 * CAPACIDAD + 37, rng)  # Varias vueltas completas
+
+    buf, df = BufferVelas(CAPACIDAD), None
+    ok = True
+    for k, u in enumerate(updates):
+        buf.agregar(u)
+        df = metodo_viejo(df, u, CAPACIDAD)
+        if k % 97 == 0 or k == len(updates) - 1:
+            f = buf.df()
+            igual = f.index.equals(df.index) and np.array_equal(f.values, df[COLUMNAS].values)
+            if not igual:
+                print(f"   ❌ Diferencia en el update #{k}")
+                ok = False; break
+    print(f"   {'✅' if ok else '❌'} Paridad con concat/dedupe tras {len(updates)} updates ({len(buf)} filas)")
+
+    # Vistas sin copia
+    m = buf.matriz(); f = buf.df()
+    sin_copia = np.shares_memory(f['close'].values, m) and np.shares_memory(buf.columna('close'), m)
+    print(f"   {'✅' if sin_copia else '❌'} df()/columna() son vistas del buffer")
+    ok &= bool(sin_copia)
+
+    solo_lectura = not buf.columna('close').flags.writeable
+    print(f"   {'✅' if solo_lectura else '❌'} Vistas de solo lectura")
+    ok &= solo_lectura
+
+    ok &= check_hueco(rng)
+
+    # Micro-benchmark del update caliente (vela en curso)
+    n = 2000
+    grande, df_g = BufferVelas(86000), None
+    base = [vela(T0 + i * PASO, rng) for i in range(86000)]
+    grande.agregar(base); df_g = metodo_viejo(None, base, 86000)
+    t = time.perf_counter()
+    for i in range(n): grande.agregar([vela(T0 + (86000 + i // 5) * PASO, rng)])
+    t_buf = (time.perf_counter() - t) / n * 1e6
+    t = time.perf_counter()
+    for i in range(n // 10): df_g = metodo_viejo(df_g, [vela(T0 + (86000 + i // 5) * PASO, rng)], 86000)
+    t_df = (time.perf_counter() - t) / (n // 10) * 1e6
+    print(f"   ⏱️ Update por vela: buffer {t_buf:.1f} µs | pandas {t_df:.0f} µs (x{t_df / max(t_buf, 1e-9):.0f})")
+
+    print("\n✅ BUFFER OK." if ok else "\n❌ BUFFER CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_buffer_velas()
@@ -0,0 +1,145 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.cascada_senales import CascadaSenales, senales_crudas
+from MODULOS.memo_regimen import MemoRegimen
+from MODULOS.inferencia_lote import LoteInferencia
+
+# ==============================================================================
+# CASCADA SEÑAL CRUDA -> REGÍMENES -> LSTM DE ESTRATEGIA
+# ==============================================================================
+# Un día de ciclos de 5m para PARES pares con señales crudas escasas y modelos
+# de juguete (mismo predict() que Keras), como analizar_mercado con y sin cascada:
+# 1) Mismos candidatos en cada ciclo.
+# 2) Inferencias y ventanas armadas: cuántas se evitan.
+# 3) ai_views de todos los pares nunca más viejo que el refresco (+1 ciclo).
+# 4) Contadores: pares = con señal + refresco + sin señal.
+
+CONFIG_STRAT = {
+    'FRPV':     {'buy': 'Real Price Buy', 'sell': 'Real Price Sell'},
+    'RANGO':    {'buy': 'Real_Price_Rango_Buy', 'sell': 'Real_Price_Rango_Sell'},
+    'BREAKOUT': {'buy': 'Real_Price_Breakout_Buy', 'sell': 'Real_Price_Breakout_Sell'},
+    'TREND':    {'buy': 'Real_Price_Trend_Buy', 'sell': 'Real_Price_Trend_Sell'},
+}
+PARES = 40
+CICLOS = 288
+PASO_SEG = 300
+PROB_SENAL = 0.004        # Por columna y ciclo: ~3% de los pares con alguna señal
+REFRESCO_SEG = 180 * 60   # REFRESCO_VISTAS_IA_MIN de main.py
+
+
+class ModeloJuguete:
+    """predict(X) -> softmax lineal (sigmoide con una salida); cuenta filas inferidas."""
+
+    def __init__(self, semilla, clases=4):
+        self.w = np.random.default_rng(semilla).normal(size=clases)
+        self.filas = 0
+
+    def predict(self, X, batch_size=None, verbose=0):
+        X = X[0] if isinstance(X, list) else X
+        self.filas += len(X)
+        z = np.asarray(X, dtype=np.float64).reshape(len(X), -1).mean(axis=1)[:, None] * self.w
+        if len(self.w) == 1: return 1.0 / (1.0 + np.exp(-z))  # Estrategia: sigmoide como la LSTM
+        e = np.exp(z - z.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def modelos_juguete():
+    return {'CONTEXTO': ModeloJuguete(1), 'TACTICO': ModeloJuguete(2),
+            **{s: ModeloJuguete(10 + i, clases=1) for i, s in enumerate(CONFIG_STRAT)}}
+
+
+def filas_senal(rng):
+    """Fila -2 de cada par en cada ciclo: columnas de señal con precio o NaN."""
+    cols = [c for cfg in CONFIG_STRAT.values() for c in (cfg['buy'], cfg['sell'])]
+    hay = rng.random((CICLOS, PARES, len(cols))) < PROB_SENAL
+    return [[pd.Series(np.where(hay[t, p], 100.0, np.nan), index=cols) for p in range(PARES)] for t in range(CICLOS)]
+
+
+def ventanas(p, t):
+    """Ventanas del par: macro con valor del día, táctico con valor de la hora cerrada."""
+    hora, dia = t * PASO_SEG // 3600, t * PASO_SEG // 86_400
+    return (np.full((1, 14, 10), (p * 7 + dia) % 13 / 13, dtype=np.float32), dia,
+            np.full((1, 48, 5), (p * 3 + hora) % 11 / 11, dtype=np.float32), hora)
+
+
+def ciclo(t, filas, modelos, memo, cascada, vistas, contador):
+    """analizar_mercado en miniatura; cascada=None: todos los pares pasan por regímenes."""
+    ahora = t * PASO_SEG
+    if cascada is not None: cascada.nuevo_ciclo(); cascada.contar('pares', PARES)
+    lote, estados = LoteInferencia(), []
+    for p in range(PARES):
+        senales = senales_crudas(filas[t][p], CONFIG_STRAT)
+        if cascada is not None:
+            if senales: cascada.contar('con_senal')
+            elif cascada.pide_vista(p, ahora): cascada.contar('refresco_vistas')
+            else: cascada.contar('sin_senal'); continue
+        contador['ventanas'] += 1
+        w_mac, dia, X_tac, hora = ventanas(p, t)
+        p_mac, p_tac = memo.obtener('CONTEXTO', p, dia), memo.obtener('TACTICO', p, hora)
+        if p_mac is None: lote.agregar('CONTEXTO', p, w_mac)
+        if p_tac is None: lote.agregar('TACTICO', p, X_tac)
+        estados.append((p, senales, w_mac, dia, hora, p_mac, p_tac))
+    lote.correr(modelos)
+
+    pedidos = []
+    for p, senales, w_mac, dia, hora, p_mac, p_tac in estados:
+        if p_mac is None: p_mac = lote.salida('CONTEXTO', p); memo.guardar('CONTEXTO', p, dia, p_mac)
+        if p_tac is None: p_tac = lote.salida('TACTICO', p); memo.guardar('TACTICO', p, hora, p_tac)
+        vistas[p] = ahora
+        if cascada is not None: cascada.vista_al_dia(p, ahora)
+        # Regla de juguete: el táctico en CAOS bloquea; si no, cada señal pide su LSTM
+        if np.argmax(p_tac) == 3: continue
+        for strat, lado in senales:
+            lote.agregar(strat, (p, lado), np.full((1, 60, 7), 1.0 if lado == 'BUY' else -1.0), w_mac)
+            pedidos.append((p, strat, lado))
+    if cascada is not None: cascada.contar('estrategias', len(pedidos))
+    lote.correr(modelos)
+    candidatos = [(p, s, l) for p, s, l in pedidos if lote.salida(s, (p, l))[0] >= 0.5]
+    if cascada is not None: cascada.contar('candidatos', len(candidatos))
+    return candidatos
+
+
+def check_cascada_senales():
+    print("🔬 CHECK CASCADA SEÑAL -> REGÍMENES -> ESTRATEGIA...")
+    filas = filas_senal(np.random.default_rng(8))
+    base = {'modelos': modelos_juguete(), 'memo': MemoRegimen(), 'vistas': {}, 'contador': {'ventanas': 0}}
+    casc = {'modelos': modelos_juguete(), 'memo': MemoRegimen(), 'vistas': {}, 'contador': {'ventanas': 0}}
+    cascada = CascadaSenales(REFRESCO_SEG)
+
+    iguales, n_cand, peor_edad = True, 0, 0
+    for t in range(CICLOS):
+        ref = ciclo(t, filas, base['modelos'], base['memo'], None, base['vistas'], base['contador'])
+        nuevo = ciclo(t, filas, casc['modelos'], casc['memo'], cascada, casc['vistas'], casc['contador'])
+        iguales &= ref == nuevo
+        n_cand += len(ref)
+        peor_edad = max(peor_edad, max(t * PASO_SEG - v for v in casc['vistas'].values()))
+    print(f"   {'✅' if iguales else '❌'} {CICLOS} ciclos x {PARES} pares: mismos candidatos con y sin cascada ({n_cand})")
+
+    print("   📊 sin cascada -> con cascada")
+    print(f"      ventanas armadas : {base['contador']['ventanas']:>6} -> {casc['contador']['ventanas']:>6}")
+    for m in ('CONTEXTO', 'TACTICO'):
+        print(f"      filas {m:<10}: {base['modelos'][m].filas:>6} -> {casc['modelos'][m].filas:>6}")
+    lstm = [sum(d['modelos'][s].filas for s in CONFIG_STRAT) for d in (base, casc)]
+    print(f"      filas LSTM estr. : {lstm[0]:>6} -> {lstm[1]:>6}")
+    menos = casc['contador']['ventanas'] < base['contador']['ventanas'] and lstm[0] == lstm[1]
+
+    vistas_ok = len(casc['vistas']) == PARES and peor_edad <= REFRESCO_SEG + PASO_SEG
+    print(f"   {'✅' if vistas_ok else '❌'} ai_views: {len(casc['vistas'])}/{PARES} pares, "
+          f"edad máxima {peor_edad / 60:.0f} min (refresco {REFRESCO_SEG / 60:.0f} min)")
+
+    t = cascada.total
+    cuentas = t['pares'] == t['con_senal'] + t['refresco_vistas'] + t['sin_senal'] == CICLOS * PARES
+    print(f"   {'✅' if cuentas else '❌'} Contadores: pares = con señal + refresco + sin señal | último ciclo: {cascada.resumen()}")
+
+    ok = iguales and menos and vistas_ok and cuentas
+    print("\n✅ CASCADA OK." if ok else "\n❌ CASCADA CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_cascada_senales()
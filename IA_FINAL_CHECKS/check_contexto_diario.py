@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.market_context import agregar_indicadores_contexto, CacheContextoDiario
+
+# ==============================================================================
+# CHECK: CACHE DIARIA DEL CONTEXTO vs RECÁLCULO COMPLETO POR CICLO
+# ==============================================================================
+# 1) Ciclos de 5m a lo largo de dos cambios de día: mismo resultado que
+#    agregar_indicadores_contexto sobre el buffer completo.
+# 2) Un recálculo por par y por día UTC, el resto son aciertos.
+# 3) Costo por ciclo: recálculo completo vs difusión de la fila cacheada sobre la cola.
+
+N_DIAS = 260
+PARES = ['ETH/USDT', 'SOL/USDT', 'XRP/USDT']
+
+
+def serie_5m(n, semilla, inicio='2024-01-01'):
+    rng = np.random.default_rng(semilla)
+    idx = pd.date_range(inicio, periods=n, freq='5min', tz='UTC')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    df = pd.DataFrame({'open': np.r_[close[0], close[:-1]], 'close': close, 'volume': rng.lognormal(8, 1, n)}, index=idx)
+    df['high'] = df[['open', 'close']].max(axis=1) * 1.001
+    df['low'] = df[['open', 'close']].min(axis=1) * 0.999
+    return df[['open', 'high', 'low', 'close', 'volume']]
+
+
+def check_ciclos():
+    n = N_DIAS * 288
+    dfs = {p: serie_5m(n, i) for i, p in enumerate(PARES)}
+    mercado = serie_5m(n, 99)['close'].pct_change().fillna(0)
+    btc = serie_5m(n, 98)['close']
+    cache = CacheContextoDiario()
+
+    # Desde las 23:00 del penúltimo día hasta la 01:00 del último, pasando por dos 00:00
+    fines = list(range(n - 288 - 12, n - 288 + 12)) + list(range(n - 24, n - 12))
+    fines += [n - 288 * 2 + 1]  # y un salto atrás (reinicio de buffer)
+    ok = True
+    for fin in fines:
+        m, b = mercado.iloc[:fin], btc.iloc[:fin]
+        for par in PARES:
+            df = dfs[par].iloc[:fin]
+            esperado = agregar_indicadores_contexto(df, m, b)
+            obtenido = cache.agregar(par, df, m, b)
+            ok &= esperado.equals(obtenido)
+    claves = [dfs[PARES[0]].index[f - 1].floor('D') for f in fines]
+    dias = 1 + sum(a != b for a, b in zip(claves, claves[1:]))
+    bien = cache.recalculos == dias * len(PARES)
+    print(f"   {'✅' if ok else '❌'} {len(fines)} ciclos x {len(PARES)} pares: idéntico al recálculo completo")
+    print(f"   {'✅' if bien else '❌'} {cache.recalculos} recálculos ({dias} días en secuencia x {len(PARES)} pares), {cache.aciertos} aciertos")
+    return ok and bien
+
+
+def check_mercado_atrasado():
+    """Si el índice de mercado aún no tiene el día del par, no se fija el contexto viejo todo el día."""
+    n = N_DIAS * 288 + 2  # Dos velas del día nuevo
+    df = serie_5m(n, 1)
+    mercado = serie_5m(n, 2)['close'].pct_change().fillna(0)
+    cache = CacheContextoDiario()
+    cache.agregar('ETH/USDT', df, mercado.iloc[:-3], None)        # Mercado sin el día nuevo aún
+    r = cache.agregar('ETH/USDT', df, mercado, None)
+    ok = cache.recalculos == 2 and r.equals(agregar_indicadores_contexto(df, mercado, None))
+    print(f"   {'✅' if ok else '❌'} Mercado atrasado: se reintenta en el ciclo siguiente")
+    return ok
+
+
+def check_costo():
+    n = N_DIAS * 288
+    df = serie_5m(n, 5); m = serie_5m(n, 6)['close'].pct_change().fillna(0); b = serie_5m(n, 7)['close']
+    t = time.perf_counter()
+    for _ in range(20): agregar_indicadores_contexto(df, m, b)
+    seg_full = (time.perf_counter() - t) / 20
+    cache = CacheContextoDiario(); cache.agregar('X', df, m, b)
+    t = time.perf_counter()
+    for _ in range(20): cola = cache.agregar('X', df, m, b, filas=128)
+    seg_cache = (time.perf_counter() - t) / 20
+    ok = cola.equals(agregar_indicadores_contexto(df, m, b).iloc[-128:])
+    print(f"   {'✅' if ok else '❌'} Difusión sobre la cola de 128 filas = cola del recálculo completo")
+    print(f"   📊 Por par y ciclo ({n} velas): recálculo {seg_full*1000:.1f} ms | cache {seg_cache*1000:.2f} ms "
+          f"(x{seg_full/seg_cache:.0f})")
+    return ok
+
+
+def check_contexto_diario():
+    print("🔬 CHECK CACHE DE CONTEXTO DIARIO...")
+    ok = check_ciclos()
+    ok &= check_mercado_atrasado()
+    ok &= check_costo()
+    print("\n✅ CONTEXTO DIARIO OK." if ok else "\n❌ CONTEXTO DIARIO CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_contexto_diario()
@@ -0,0 +1,167 @@
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import RobustScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.filtro_hmm import FiltroHMM
+from training import entrenar_hmm as eh
+
+# ==============================================================================
+# ENTRENAMIENTO HMM EN PARALELO (training/entrenar_hmm.py)
+# ==============================================================================
+# CSV 5m sintéticos de PARES pares con regímenes horarios persistentes (bajista,
+# alcista, rango calmo, volatilidad: el orden de REGLAS_HMM):
+# 1) Features 1h: sin NaN, sin la hora en curso.
+# 2) Reinicios en el pool de procesos == los mismos reinicios en serie.
+# 3) Elegido = mejor LL de validación (o menor BIC); modelo y scaler_hmm.pkl
+#    escritos, legibles y usables por FiltroHMM.
+# 4) Orden heurístico: acuerdo de los clusters con el régimen real.
+# 5) Reentrenar con otras semillas sobre el modelo anterior: el orden de clusters
+#    que más coincide con el anterior en las horas de validación.
+# 6) permutar() no cambia la verosimilitud y reordena las columnas de predict_proba.
+
+PARES = 6
+DIAS = 90
+PERSISTENCIA = 0.99       # Por hora: ~100 h por régimen
+REINICIOS = 4
+WORKERS = 2
+# Régimen -> (deriva por vela 5m, volatilidad por vela 5m, escala de volumen)
+REGIMENES = {0: (-4e-4, 0.003, 1.0), 1: (4e-4, 0.003, 1.0), 2: (0.0, 0.0015, 0.6), 3: (0.0, 0.012, 3.0)}
+
+
+def csv_sintetico(rng, path):
+    """CSV 5m con columna 'time' como DATOS_PROCESADOS; devuelve el régimen real por hora."""
+    horas = DIAS * 24
+    reg = [int(rng.integers(4))]
+    for _ in range(horas - 1):
+        reg.append(reg[-1] if rng.random() < PERSISTENCIA else int(rng.integers(4)))
+    reg = np.array(reg)
+    deriva, vol, escala = (np.repeat(np.array([REGIMENES[r][i] for r in reg]), 12) for i in range(3))
+    close = 100 * np.exp(np.cumsum(deriva + vol * rng.normal(size=len(vol))))
+    abrir = np.r_[close[0], close[:-1]]
+    mecha = vol * close * np.abs(rng.normal(size=(2, len(close))))
+    df = pd.DataFrame({
+        'time': pd.date_range('2024-01-01', periods=len(close), freq='5min', tz='UTC'),
+        'open': abrir, 'high': np.maximum(abrir, close) + mecha[0], 'low': np.minimum(abrir, close) - mecha[1],
+        'close': close, 'volume': 1000 * escala * rng.lognormal(sigma=0.3, size=len(close)),
+    })
+    df.to_csv(path, index=False)
+    return pd.Series(reg, index=pd.date_range('2024-01-01', periods=horas, freq='h', tz='UTC'))
+
+
+def check_features(path):
+    df = pd.read_csv(path)
+    df['time'] = pd.to_datetime(df['time'], utc=True)
+    feats = eh.features_hmm(df.set_index('time'))
+    ok = not feats.isna().any().any() and list(feats.columns) == eh.COLS_HMM
+    ok &= feats.index[-1] < df['time'].iloc[-1].floor('h')
+    print(f"   {'✅' if ok else '❌'} Features 1h: {len(feats)} horas x {feats.shape[1]}, sin NaN, sin la hora en curso")
+    return ok
+
+
+def check_pool(partes):
+    tareas = [(tipo, s) for tipo in ('full', 'diag') for s in range(REINICIOS)]
+    t = time.perf_counter(); serie = eh.reiniciar_en_pool(partes, tareas, 1); seg_serie = time.perf_counter() - t
+    t = time.perf_counter(); pool = eh.reiniciar_en_pool(partes, tareas, WORKERS); seg_pool = time.perf_counter() - t
+    ok = all(a['tipo'] == b['tipo'] and a['semilla'] == b['semilla'] and np.isclose(a['ll_val'], b['ll_val'])
+             for a, b in zip(serie, pool))
+    print(f"   {'✅' if ok else '❌'} {len(tareas)} reinicios: pool de {WORKERS} procesos == en serie")
+    print(f"   📊 en serie {seg_serie:.1f}s | pool {seg_pool:.1f}s ({os.cpu_count()} núcleos en esta máquina)")
+    val = [r['ll_val'] for r in serie if r['modelo'] is not None]
+    print(f"   📊 LL val/h de los reinicios: peor {min(val):.3f} | mejor {max(val):.3f}")
+    return ok, serie
+
+
+def check_eleccion(resultados):
+    validos = [r for r in resultados if r['modelo'] is not None]
+    ok = eh.elegir(resultados, 'val')['ll_val'] == max(r['ll_val'] for r in validos)
+    ok &= eh.elegir(resultados, 'bic')['bic'] == min(r['bic'] for r in validos)
+    print(f"   {'✅' if ok else '❌'} Elección: mayor LL de validación | menor BIC")
+    return ok
+
+
+def check_escritos(dir_tmp, path_modelo, path_scaler, path_csv):
+    modelo, scaler = joblib.load(path_modelo), joblib.load(path_scaler)
+    df = pd.read_csv(path_csv)
+    df['time'] = pd.to_datetime(df['time'], utc=True)
+    X = scaler.transform(eh.features_hmm(df.set_index('time'))[eh.COLS_HMM].to_numpy())
+    post = FiltroHMM(modelo).filtrar(X[-200:])
+    ok = np.isclose(post.sum(), 1.0) and np.allclose(post, modelo.predict_proba(X[-200:])[-1], atol=1e-9)
+    ok &= not any(f.endswith('.tmp') for _, _, fs in os.walk(dir_tmp) for f in fs)
+    print(f"   {'✅' if ok else '❌'} Modelo y scaler_hmm.pkl escritos y legibles; FiltroHMM == predict_proba()")
+    return ok, modelo, scaler, X
+
+
+def acuerdo(modelo, scaler, path_csv, reales):
+    df = pd.read_csv(path_csv)
+    df['time'] = pd.to_datetime(df['time'], utc=True)
+    feats = eh.features_hmm(df.set_index('time'))
+    pred = modelo.predict(scaler.transform(feats[eh.COLS_HMM].to_numpy()))
+    return float(np.mean(pred == reales.reindex(feats.index).to_numpy()))
+
+
+def check_permutar(modelo, X):
+    orden = np.array([2, 0, 3, 1])
+    ll, proba = modelo.score(X), modelo.predict_proba(X)
+    eh.permutar(modelo, orden)
+    ok = np.isclose(modelo.score(X), ll) and np.allclose(modelo.predict_proba(X), proba[:, orden], atol=1e-9)
+    eh.permutar(modelo, np.argsort(orden))
+    print(f"   {'✅' if ok else '❌'} permutar(): misma verosimilitud, columnas de predict_proba reordenadas")
+    return ok
+
+
+def check_entrenar_hmm():
+    print("🔬 CHECK ENTRENAMIENTO HMM EN PARALELO...")
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as dir_tmp:
+        dir_csv = os.path.join(dir_tmp, 'DATOS_PROCESADOS'); os.makedirs(dir_csv)
+        path_modelo = os.path.join(dir_tmp, 'MODELOS_ENTRENADOS', 'model_hmm_unsupervised.pkl')
+        path_scaler = os.path.join(dir_tmp, 'DATOS_PARA_ENTRENAR_NPZ', 'scaler_hmm.pkl')
+        reales = {}
+        for p in range(PARES):
+            path = os.path.join(dir_csv, f'PAR{p}USDT.csv')
+            reales[path] = csv_sintetico(rng, path)
+        path_0 = os.path.join(dir_csv, 'PAR0USDT.csv')
+
+        ok = check_features(path_0)
+        matrices = [X for _, X in map(eh.leer_features, sorted(reales))]
+        X_tr, L_tr, X_val, L_val = eh.partir(matrices)
+        scaler = RobustScaler().fit(X_tr)
+        bien, resultados = check_pool((scaler.transform(X_tr), L_tr, scaler.transform(X_val), L_val))
+        ok &= bien
+        ok &= check_eleccion(resultados)
+
+        modelo, scaler, _ = eh.entrenar_hmm(dir_csv, path_modelo, path_scaler, tipos=('full',),
+                                            n_reinicios=REINICIOS, workers=WORKERS)
+        bien, modelo, scaler, X = check_escritos(dir_tmp, path_modelo, path_scaler, path_0)
+        ok &= bien
+        prim = np.mean([acuerdo(modelo, scaler, p, r) for p, r in reales.items()])
+        bien = prim > 0.5
+        print(f"   {'✅' if bien else '❌'} Orden heurístico: cluster == régimen real en {prim:.1%} de las horas (azar 25%)")
+        ok &= bien
+
+        # Otros reinicios (otras semillas) sobre el modelo anterior: el orden debe ser el mejor de los 24 posibles
+        modelo_2, scaler_2, _ = eh.entrenar_hmm(dir_csv, path_modelo, path_scaler, tipos=('full',),
+                                                n_reinicios=REINICIOS, workers=WORKERS, semilla_inicial=100)
+        pred, pred_2 = modelo.predict(scaler.transform(X_val), L_val), modelo_2.predict(scaler_2.transform(X_val), L_val)
+        iguales = np.mean(pred_2 == pred)
+        mejor = max(np.mean(np.array(o)[pred_2] == pred) for o in itertools.permutations(range(eh.N_CLUSTERS)))
+        bien = iguales >= mejor - 0.02   # La alineación usa posteriores (suaves), acá se compara predict()
+        print(f"   {'✅' if bien else '❌'} Reentrenado sobre el modelo anterior: mismo cluster en {iguales:.1%} de las horas de validación "
+              f"(mejor orden posible {mejor:.1%})")
+        ok &= bien
+        ok &= check_permutar(modelo, X)
+
+    print("\n✅ ENTRENAMIENTO HMM OK." if ok else "\n❌ ENTRENAMIENTO HMM CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_entrenar_hmm()
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.grafo_indicadores import (AlmacenIndicadores, aplicar_estrategias, evaluar_cola, calentamiento,
+                                       nodos_de, nodo, AGG_OHLCV)
+from MODULOS.indicadores_incrementales import EXTRA_MAIN
+from ESTRATEGIAS import frpv, mean_reversion, breakout, simple_trend
+from utilidades_checks import velas_sinteticas, error_relativo
+
+# ==============================================================================
+# MODO COLA: CALCULAR SOLO LAS FILAS QUE LA DECISIÓN LEE
+# ==============================================================================
+# 1) Calentamiento derivado de las memorias de cada nodo (SMA 200, z-score de
+#    volumen 200 + SMA 3, EMA 200...).
+# 2) 5m: evaluar_cola == historia completa en las FILAS_IA que lee la IA
+#    (ventanas finitas idénticas, EMA/RMA dentro de la tolerancia; señales iguales).
+# 3) 1h: nodos del táctico / HMM / seguridad sobre FILAS_1H == historia completa.
+# 4) Costo por par: historia completa vs cola.
+
+N_VELAS = 86000  # MAX_VELAS_CACHE del main
+FILAS_IA = 128
+FILAS_TACTICO = 48
+ESTRATEGIAS = [frpv, mean_reversion, breakout, simple_trend]
+NODOS_1H = [nodo('atr', '1h', length=14), nodo('rsi', '1h', length=14), nodo('adx', '1h', length=14),
+            nodo('sma', '1h', length=50), nodo('slope', '1h', length=5)]
+FILAS_1H = FILAS_TACTICO + 1 + calentamiento(NODOS_1H)
+RTOL = 1e-9
+
+
+def check_calentamiento():
+    for e in ESTRATEGIAS:
+        print(f"   📊 {e.__name__.split('.')[-1]:<15} calentamiento {calentamiento(nodos_de([e])):>5} velas 5m")
+    total = calentamiento(nodos_de(ESTRATEGIAS, EXTRA_MAIN))
+    print(f"   📊 {'motor 5m':<15} calentamiento {total:>5} velas 5m | 1h: {FILAS_1H} velas")
+    # frpv: z-score de volumen (200) + SMA 3 -> 199 + 2 filas; la EMA 50 pide más
+    ok = calentamiento([frpv.VOL_Z]) == 201
+    print(f"   {'✅' if ok else '❌'} Memorias encadenadas: SMA 3 sobre z-score 200 = 201 velas")
+    return ok
+
+
+def check_cola_5m(df):
+    completo = aplicar_estrategias(df, ESTRATEGIAS, EXTRA_MAIN).iloc[-FILAS_IA:]
+    cola = evaluar_cola(df, ESTRATEGIAS, FILAS_IA, EXTRA_MAIN)
+    ok = cola.index.equals(completo.index) and list(cola.columns) == list(completo.columns)
+    peor = max((error_relativo(completo[c], cola[c]), c) for c in completo.columns)
+    exactas = sum(np.array_equal(completo[c].to_numpy(np.float64), cola[c].to_numpy(np.float64), equal_nan=True)
+                  for c in completo.columns)
+    ok &= peor[0] < RTOL
+    print(f"   {'✅' if ok else '❌'} 5m: {len(completo.columns)} columnas x {FILAS_IA} filas, {exactas} idénticas "
+          f"(error máx {peor[0]:.1e} en {peor[1]})")
+    return ok
+
+
+def check_cola_1h(df):
+    velas = df.resample('1h').agg(AGG_OHLCV).dropna()
+    completo, cola = AlmacenIndicadores({'1h': velas}), AlmacenIndicadores({'1h': velas.iloc[-FILAS_1H:]})
+    ok = True
+    for n in NODOS_1H:
+        err = error_relativo(completo.valor(n).iloc[-FILAS_TACTICO:], cola.valor(n).iloc[-FILAS_TACTICO:])
+        bien = err < RTOL
+        print(f"   {'✅' if bien else '❌'} 1h {n.nombre:<5}: últimas {FILAS_TACTICO} filas (error máx {err:.1e})")
+        ok &= bien
+    return ok
+
+
+def check_costo(df):
+    def medir(fn, veces=3):
+        mejor = np.inf
+        for _ in range(veces):
+            t = time.perf_counter(); fn(); mejor = min(mejor, time.perf_counter() - t)
+        return mejor
+
+    seg_completo = medir(lambda: aplicar_estrategias(df, ESTRATEGIAS, EXTRA_MAIN))
+    seg_cola = medir(lambda: evaluar_cola(df, ESTRATEGIAS, FILAS_IA, EXTRA_MAIN))
+    print(f"   📊 5m ({len(df)} velas): completo {seg_completo*1000:.0f} ms | cola {seg_cola*1000:.1f} ms "
+          f"(x{seg_completo / seg_cola:.0f})")
+
+    velas = df.resample('1h').agg(AGG_OHLCV).dropna()
+    leer = lambda v: [AlmacenIndicadores({'1h': v}).valor(n) for n in NODOS_1H]
+    seg_completo = medir(lambda: leer(velas))
+    seg_cola = medir(lambda: leer(velas.iloc[-FILAS_1H:]))
+    print(f"   📊 1h ({len(velas)} velas): completo {seg_completo*1000:.1f} ms | cola {seg_cola*1000:.1f} ms "
+          f"(x{seg_completo / seg_cola:.1f})")
+    return True
+
+
+def check_evaluacion_cola():
+    print("🔬 CHECK MODO COLA...")
+    df = velas_sinteticas(N_VELAS, semilla=5)
+    ok = check_calentamiento()
+    ok &= check_cola_5m(df)
+    ok &= check_cola_1h(df)
+    check_costo(df)
+    print("\n✅ MODO COLA OK." if ok else "\n❌ MODO COLA CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_evaluacion_cola()
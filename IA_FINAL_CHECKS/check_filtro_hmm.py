@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+from sklearn.preprocessing import RobustScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.filtro_hmm import FiltroHMM, SeguidorHMM, pedido_hmm
+
+# ==============================================================================
+# FILTRO HMM EN LÍNEA (FORWARD) vs HMMLEARN
+# ==============================================================================
+# GaussianHMM de 4 clusters y 6 features (como model_hmm_unsupervised.pkl)
+# entrenado sobre datos con regímenes persistentes:
+# 1) Posterior del filtro == predict_proba() de hmmlearn en el último instante,
+#    con los cuatro covariance_type.
+# 2) SeguidorHMM con PARES pares por hora: pasos en lote, pares que se saltan
+#    horas (se ponen al día) y arranques; siempre == filtrar la secuencia entera.
+# 3) Cluster del filtro vs predict() de la última fila sola: cambios de cluster.
+# 4) Hora con volumen 0 (Vol_Chg = -inf) en la cola 1h: pedido_hmm() no rompe el
+#    scaler, el par tiene posterior en cada hora (no se traba) y esa hora es una
+#    observación faltante (solo transmat_).
+# 5) Costo por hora cerrada: paso en lote vs predict() por par.
+
+K, D = 4, 6
+PARES = 60
+HORAS = 200
+ATOL = 1e-9
+MEDIAS = np.random.default_rng(42).normal(scale=1.5, size=(K, D))   # Features medias de cada régimen
+
+
+def datos_regimenes(rng, n, persistencia=0.97):
+    """Secuencia con cadena de Markov persistente y medias separadas por régimen."""
+    estados = [int(rng.integers(K))]
+    for _ in range(n - 1):
+        estados.append(estados[-1] if rng.random() < persistencia else int(rng.integers(K)))
+    return MEDIAS[estados] + rng.normal(size=(n, D))
+
+
+def entrenar(rng, covariance_type='full'):
+    X, largos = np.concatenate([datos_regimenes(rng, 200) for _ in range(20)]), [200] * 20
+    modelos = [GaussianHMM(n_components=K, covariance_type=covariance_type, n_iter=50, random_state=r).fit(X, largos)
+               for r in range(4)]   # EM cae en óptimos locales: el mejor de 4 arranques
+    return max(modelos, key=lambda m: m.score(X, largos))
+
+
+def check_paridad(rng):
+    ok = True
+    for tipo in ('full', 'diag', 'spherical', 'tied'):
+        modelo = entrenar(rng, tipo)
+        filtro, X = FiltroHMM(modelo), datos_regimenes(rng, 80)
+        a, peor = filtro.inicio(X[:1]), 0.0
+        for t in range(len(X)):
+            if t: a = filtro.paso(a, X[t:t + 1])
+            peor = max(peor, np.abs(a[0] - modelo.predict_proba(X[:t + 1])[-1]).max())
+        bien = peor < ATOL
+        print(f"   {'✅' if bien else '❌'} {tipo:<9}: paso a paso == predict_proba() de hmmlearn (dif máx {peor:.1e})")
+        ok &= bien
+    return ok
+
+
+def check_seguidor(modelo, rng):
+    """Horas de PARES pares; cada hora ~30% de los pares no pide (cascada) y se pone al día después."""
+    horas = pd.date_range('2024-03-05', periods=HORAS, freq='h', tz='UTC')
+    series = {p: datos_regimenes(rng, HORAS) for p in range(PARES)}
+    seguidor, filtro = SeguidorHMM(modelo), FiltroHMM(modelo)
+    inicios = {}      # Hora desde la que filtra cada par (arranque)
+    ok, comparados, lotes, arranques = True, 0, 0, 0
+    for h in range(60, HORAS):
+        if h == 130:  # Modelo recargado: seguidor nuevo, todos arrancan de startprob_
+            lotes += seguidor.lotes; arranques += seguidor.reinicios
+            seguidor = SeguidorHMM(modelo)
+        marcas = horas[h - 48:h + 1]   # Cola 1h disponible: 49 horas cerradas
+        pedidos = []
+        for p in range(PARES):
+            if rng.random() < 0.3: continue
+            desde = seguidor.desde(p, marcas)
+            if desde is None: inicios[p] = h - 48
+            X = series[p][h - 48:h + 1][desde or 0:]
+            if len(X): pedidos.append((p, marcas[-1], X, desde is None))
+        salidas = seguidor.actualizar(pedidos)
+        for p, _, _, _ in pedidos:
+            ref = filtro.filtrar(series[p][inicios[p]:h + 1])
+            ok &= np.abs(salidas[p] - ref).max() < ATOL
+            ok &= np.array_equal(seguidor.posterior(p, marcas[-1]), salidas[p])
+            comparados += 1
+    lotes += seguidor.lotes; arranques += seguidor.reinicios
+    print(f"   {'✅' if ok else '❌'} Seguidor: {comparados} posteriores == filtrar la secuencia entera "
+          f"({lotes} pasos en lote, {arranques} arranques incluida una recarga)")
+    return ok
+
+
+def check_estabilidad(modelo, rng):
+    X = datos_regimenes(rng, 2000)
+    filtro = FiltroHMM(modelo)
+    a, filtrado = filtro.inicio(X[:1]), []
+    for t in range(len(X)):
+        if t: a = filtro.paso(a, X[t:t + 1])
+        filtrado.append(int(np.argmax(a[0])))
+    suelto = [int(modelo.predict(X[t:t + 1])[0]) for t in range(len(X))]
+    viterbi = modelo.predict(X)
+    cambios = lambda c: int(np.sum(np.diff(c) != 0))
+    print(f"   📊 {len(X)} horas: cambios de cluster | última fila sola {cambios(suelto)} | filtro {cambios(filtrado)} "
+          f"| Viterbi con toda la secuencia {cambios(viterbi)}")
+    print(f"      acuerdo con Viterbi: última fila sola {np.mean(np.array(suelto) == viterbi):.1%} | "
+          f"filtro {np.mean(np.array(filtrado) == viterbi):.1%}")
+
+
+def check_hora_invalida(modelo, rng):
+    """Cola 1h de 49 horas cerradas que avanza de a una; la hora MALA tiene Vol_Chg = -inf."""
+    cols = ['Log_Ret', 'ATR_Pct', 'RSI', 'ADX', 'Dist_SMA', 'Vol_Chg']
+    horas = pd.date_range('2024-03-05', periods=HORAS, freq='h', tz='UTC')
+    feats = pd.DataFrame(datos_regimenes(rng, HORAS), index=horas, columns=cols)
+    feats.iloc[:14] = np.nan                 # Calentamiento de los indicadores
+    mala = 100
+    feats.iloc[mala, cols.index('Vol_Chg')] = -np.inf
+    scaler = RobustScaler().fit(datos_regimenes(rng, 500))
+    X = scaler.transform(feats.fillna(0).replace(-np.inf, 0).values)   # Escaladas (la fila mala no se usa)
+
+    seguidor, filtro = SeguidorHMM(modelo), FiltroHMM(modelo)
+    ok, errores = True, 0
+    for h in range(60, HORAS):
+        try:
+            pedido = pedido_hmm(seguidor, 'PAR', feats.iloc[h - 48:h + 1], scaler)
+            seguidor.actualizar([pedido] if pedido is not None else [])
+        except ValueError:
+            errores += 1
+        ok &= seguidor.posterior('PAR', horas[h]) is not None
+    # Referencia: forward desde el arranque (h = 60 -> hora 12; las 14 de calentamiento se descartan)
+    a = filtro.inicio(X[14:15])
+    for t in range(15, HORAS):
+        a = a @ filtro.transmat if t == mala else filtro.paso(a, X[t:t + 1])
+        a = a / a.sum(axis=1, keepdims=True)
+    ok &= errores == 0 and np.abs(seguidor.posterior('PAR', horas[-1]) - a[0]).max() < ATOL
+    print(f"   {'✅' if ok else '❌'} Hora con volumen 0 (Vol_Chg = -inf): {errores} errores del scaler, posterior en "
+          f"cada hora, == forward con esa hora como observación faltante")
+    return ok
+
+
+def check_costo(modelo, rng):
+    filtro = FiltroHMM(modelo)
+    for n in (1, 60, 500):
+        X, alfa = rng.normal(size=(n, D)), np.full((n, K), 1.0 / K)
+        t = time.perf_counter()
+        for _ in range(20): filtro.paso(alfa, X)
+        ms_lote = (time.perf_counter() - t) / 20 * 1000
+        t = time.perf_counter()
+        for i in range(n): modelo.predict(X[i:i + 1])
+        ms_par = (time.perf_counter() - t) * 1000
+        print(f"   📊 {n:>3} pares por hora: paso en lote {ms_lote:6.3f} ms | predict() por par {ms_par:8.2f} ms")
+
+
+def check_filtro_hmm():
+    print("🔬 CHECK FILTRO HMM EN LÍNEA...")
+    rng = np.random.default_rng(0)
+    ok = check_paridad(rng)
+    modelo = entrenar(rng)
+    ok &= check_seguidor(modelo, rng)
+    ok &= check_hora_invalida(modelo, rng)
+    check_estabilidad(modelo, rng)
+    check_costo(modelo, rng)
+    print("\n✅ FILTRO HMM OK." if ok else "\n❌ FILTRO HMM CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_filtro_hmm()
@@ -0,0 +1,126 @@
+import os
+import sys
+
+import pandas_ta as ta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.grafo_indicadores import AlmacenIndicadores, aplicar_estrategias, nodos_de, nodo
+from ESTRATEGIAS import frpv, mean_reversion, breakout, simple_trend
+from estrategias_previas import ESTRATEGIAS_PREVIAS
+from utilidades_checks import velas_sinteticas, iguales, error_relativo, mejor_de
+
+# ==============================================================================
+# GRAFO DE INDICADORES: DEDUPLICACIÓN, ORDEN Y NODOS 1H COMPARTIDOS
+# ==============================================================================
+# 1) Cada nodo único se calcula una vez aunque varias estrategias lo pidan.
+# 2) El resultado no depende del orden de las estrategias (ni de columnas previas).
+# 3) Nodos 1h sobre velas CON la vela en curso == pandas_ta sobre las cerradas
+#    (lo que calculaban por separado seguridad / táctico / HMM en el main),
+#    dentro de RTOL (los nodos corren sobre los kernels NumPy).
+# 4) Mismo resultado que las estrategias anteriores al grafo (estrategias_previas:
+#    pandas_ta, encadenadas como en el main), dentro de RTOL.
+# 5) Costo: estrategias anteriores vs cada módulo por su cuenta (sin compartir
+#    nodos) vs un almacén compartido.
+
+N_VELAS = 30000
+RTOL = 1e-9
+ESTRATEGIAS = [frpv, mean_reversion, breakout, simple_trend]
+
+
+def check_deduplicacion(df):
+    almacen = AlmacenIndicadores(df)
+    aplicar_estrategias(df, ESTRATEGIAS, almacen=almacen)
+    pedidos = sum(len(e.INDICADORES) for e in ESTRATEGIAS)
+    unicos = len(nodos_de(ESTRATEGIAS))
+    ok = almacen.calculados == unicos
+    print(f"   {'✅' if ok else '❌'} {pedidos} columnas pedidas -> {unicos} nodos únicos, {almacen.calculados} calculados")
+
+    # Mismo nodo declarado en dos módulos (EMA 50 = KAMA, Bollinger 20/2)
+    compartidos = frpv.KAMA == simple_trend.EMA_50 and mean_reversion.BB == breakout.BB
+    print(f"   {'✅' if compartidos else '❌'} KAMA/EMA_50 y Bollinger de rango/breakout son el mismo nodo")
+    return ok and compartidos
+
+
+def check_orden(df):
+    a = aplicar_estrategias(df, ESTRATEGIAS)
+    b = aplicar_estrategias(df, ESTRATEGIAS[::-1])
+    # Encadenado (como antes en el main): cada módulo recibe la salida del anterior
+    c = df
+    for e in ESTRATEGIAS[::-1]: c = e.aplicar_estrategia(c)
+    ok = all(set(x.columns) == set(a.columns) and all(iguales(a[k], x[k]) for k in a.columns) for x in (b, c))
+    print(f"   {'✅' if ok else '❌'} Mismo resultado en cualquier orden y encadenando módulos ({len(a.columns)} columnas)")
+    return ok
+
+
+def check_nodos_1h(df):
+    """Causalidad: con la vela en curso, todo lo anterior coincide con pandas_ta sobre las cerradas."""
+    velas = df.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).dropna()
+    ind = AlmacenIndicadores({'1h': velas})
+    cerradas = velas.iloc[:-1]
+    h, l, c = cerradas['high'], cerradas['low'], cerradas['close']
+    esperado = {
+        'ATR': (nodo('atr', '1h', length=14), 'valor', ta.atr(h, l, c, length=14)),
+        'RSI': (nodo('rsi', '1h', length=14), 'valor', ta.rsi(c, length=14)),
+        'ADX': (nodo('adx', '1h', length=14), 'valor', ta.adx(h, l, c, length=14)['ADX_14']),
+        'SMA_50': (nodo('sma', '1h', length=50), 'valor', ta.sma(c, length=50)),
+        'Slope': (nodo('slope', '1h', length=5), 'valor', ta.slope(c, length=5)),
+    }
+    ok = True
+    for nombre, (n, salida, serie) in esperado.items():
+        err = error_relativo(serie, ind.valor(n, salida).iloc[:-1])
+        bien = err < RTOL
+        print(f"   {'✅' if bien else '❌'} {nombre} 1h: velas cerradas == pandas_ta ({len(serie)} filas, error máx {err:.1e})")
+        ok &= bien
+
+    # 5m -> 1h desde el propio almacén (sin base 1h explícita)
+    desde_5m = AlmacenIndicadores(df).valor(nodo('rsi', '1h', length=14))
+    bien = iguales(desde_5m, ind.valor(nodo('rsi', '1h', length=14)))
+    print(f"   {'✅' if bien else '❌'} Base 1h resampleada desde 5m cuando no se pasa")
+    return ok and bien
+
+
+def previas_encadenadas(df):
+    """Como el main antes del grafo: cada módulo (pandas_ta) recibe la salida del anterior."""
+    x = df.copy()
+    for f in ESTRATEGIAS_PREVIAS: x = f(x)
+    return x
+
+
+def check_previas(df):
+    a, b = aplicar_estrategias(df, ESTRATEGIAS), previas_encadenadas(df)
+    err = max(error_relativo(b[k], a[k]) for k in b.columns)
+    ok = set(a.columns) == set(b.columns) and err < RTOL
+    print(f"   {'✅' if ok else '❌'} Grafo == estrategias anteriores (pandas_ta, encadenadas): "
+          f"{len(b.columns)} columnas, error máx {err:.1e}")
+    return ok
+
+
+def check_costo(df):
+    def por_modulo():  # Cada módulo por su cuenta: sus nodos, sin compartir, y su frame
+        for e in ESTRATEGIAS: aplicar_estrategias(df, [e])
+    seg_previas = mejor_de(lambda: previas_encadenadas(df))
+    seg_modulo = mejor_de(por_modulo)
+    seg_grafo = mejor_de(lambda: aplicar_estrategias(df, ESTRATEGIAS))
+    nodos_modulo = sum(len(nodos_de([e])) for e in ESTRATEGIAS)
+    print(f"   📊 {len(df)} velas: estrategias anteriores {seg_previas*1000:.0f} ms | por módulo "
+          f"{seg_modulo*1000:.0f} ms ({nodos_modulo} nodos) | grafo compartido {seg_grafo*1000:.0f} ms "
+          f"({len(nodos_de(ESTRATEGIAS))} nodos)")
+    print(f"      x{seg_previas / seg_grafo:.1f} vs anteriores | x{seg_modulo / seg_grafo:.1f} vs por módulo")
+    return True
+
+
+def check_grafo_indicadores():
+    print("🔬 CHECK GRAFO DE INDICADORES...")
+    df = velas_sinteticas(N_VELAS, semilla=11)
+    ok = check_deduplicacion(df)
+    ok &= check_orden(df)
+    ok &= check_nodos_1h(df)
+    ok &= check_previas(df)
+    check_costo(df)
+    print("\n✅ GRAFO DE INDICADORES OK." if ok else "\n❌ GRAFO DE INDICADORES CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_grafo_indicadores()
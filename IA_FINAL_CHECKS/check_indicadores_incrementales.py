@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas_ta as ta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.indicadores_incrementales import (MotorIndicadores, COLUMNAS_MOTOR, CALENTAMIENTO_VELAS,
+                                                MaximoMovil, MinimoMovil)
+from MODULOS.grafo_indicadores import aplicar_estrategias
+from ESTRATEGIAS import frpv, mean_reversion, breakout, simple_trend
+from utilidades_checks import velas_sinteticas
+
+# ==============================================================================
+# PARIDAD: MOTOR INCREMENTAL vs PANDAS_TA EN LOTE
+# ==============================================================================
+# 1) Vela a vela desde el inicio: mismas columnas que las 4 estrategias + ATR/RSI del main.
+# 2) Arrancando con calentamiento (como en vivo): misma cola que la historia completa.
+# 3) Máximo / mínimo móvil contra rolling de pandas.
+# 4) Costo: recálculo en lote por ciclo vs una vela incremental.
+
+N_VELAS = 20000
+RTOL, ATOL = 1e-7, 1e-9
+
+
+def lote(df):
+    """Lo mismo que hacía el main por par y por ciclo."""
+    df = aplicar_estrategias(df, [frpv, mean_reversion, breakout, simple_trend])
+    df['ATR'] = ta.atr(df['high'], df['low'], df['close'], length=14)
+    df['ATR_Pct'] = df['ATR'] / df['close']
+    return df
+
+
+def comparar(esperado, obtenido, titulo):
+    ok = True
+    peor = (0.0, None)
+    for col in COLUMNAS_MOTOR:
+        a = esperado[col].to_numpy(dtype=np.float64)
+        b = obtenido[col].to_numpy(dtype=np.float64)
+        iguales = np.isclose(a, b, rtol=RTOL, atol=ATOL, equal_nan=True)
+        if not iguales.all():
+            i = int(np.argmin(iguales))
+            print(f"   ❌ {col}: {int((~iguales).sum())} filas distintas (fila {i}: {a[i]} vs {b[i]})")
+            ok = False
+        err = np.nanmax(np.abs(a - b)) if np.isfinite(a - b).any() else 0.0
+        if err > peor[0]: peor = (err, col)
+    print(f"   {'✅' if ok else '❌'} {titulo}: {len(COLUMNAS_MOTOR)} columnas x {len(esperado)} filas "
+          f"(error máx {peor[0]:.1e} en {peor[1]})")
+    return ok
+
+
+def check_paridad_completa(df, esperado):
+    motor = MotorIndicadores(historia=len(df))
+    for t, fila in zip(df.index.as_unit("ms").asi8, df.to_numpy().tolist()): motor.avanzar(t, *fila)
+    return comparar(esperado, motor.tabla(), "Vela a vela desde la primera")
+
+
+def check_calentamiento(df, esperado):
+    motor = MotorIndicadores()
+    tiempos = df.index.as_unit("ms").asi8
+    matriz = df[['open', 'high', 'low', 'close', 'volume']].to_numpy().T
+    # Como en vivo: la última fila es la vela en curso y no se procesa
+    ini = motor.inicio_pendiente(tiempos)
+    motor.sincronizar(tiempos[ini:-1], matriz[:, ini:-1])
+    cola = motor.tabla()
+    ok = comparar(esperado.loc[cola.index], cola, f"Calentamiento de {CALENTAMIENTO_VELAS} velas (últimas {len(cola)})")
+
+    # Una vela nueva: solo se procesa la que cerró
+    ini = motor.inicio_pendiente(tiempos)
+    bien = ini == len(tiempos) - 1 and motor.ultimo_t == tiempos[-2]
+    print(f"   {'✅' if bien else '❌'} Tras sincronizar solo queda pendiente la vela en curso")
+    return ok and bien
+
+
+def check_maximo_minimo(df):
+    ok = True
+    for clase, metodo in ((MaximoMovil, 'max'), (MinimoMovil, 'min')):
+        ind = clase(48)
+        serie = df['close'].copy()
+        serie.iloc[500] = np.nan  # Un hueco: la ventana que lo contiene da NaN, como pandas
+        obtenido = np.array([ind.actualizar(x) for x in serie.tolist()])
+        esperado = getattr(serie.rolling(48), metodo)().to_numpy()
+        bien = np.allclose(obtenido, esperado, equal_nan=True)
+        print(f"   {'✅' if bien else '❌'} Rolling {metodo} (48) con hueco")
+        ok &= bien
+    return ok
+
+
+def check_costo(df):
+    t = time.perf_counter(); lote(df.copy()); seg_lote = time.perf_counter() - t
+    motor = MotorIndicadores()
+    tiempos = df.index.as_unit("ms").asi8
+    matriz = df[['open', 'high', 'low', 'close', 'volume']].to_numpy().T
+    motor.sincronizar(tiempos[:-1], matriz[:, :-1])
+    ultima = df.iloc[-1]
+    t = time.perf_counter()
+    for _ in range(100): motor.avanzar(int(tiempos[-1]), *ultima.tolist())
+    seg_inc = (time.perf_counter() - t) / 100
+    t = time.perf_counter()
+    for _ in range(100): motor.tabla(128)
+    seg_tabla = (time.perf_counter() - t) / 100
+    print(f"   📊 Lote sobre {len(df)} filas: {seg_lote*1000:.0f} ms/ciclo | Incremental: {seg_inc*1e6:.0f} µs/vela "
+          f"+ {seg_tabla*1e3:.1f} ms de lectura con señales (x{seg_lote / (seg_inc + seg_tabla):.0f})")
+    return True
+
+
+def check_indicadores_incrementales():
+    print("🔬 CHECK MOTOR DE INDICADORES INCREMENTAL...")
+    df = velas_sinteticas(N_VELAS, semilla=7)
+    esperado = lote(df.copy())
+    ok = check_paridad_completa(df, esperado)
+    ok &= check_calentamiento(df, esperado)
+    ok &= check_maximo_minimo(df)
+    check_costo(df)
+    print("\n✅ INDICADORES INCREMENTALES OK." if ok else "\n❌ INDICADORES INCREMENTALES CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_indicadores_incrementales()
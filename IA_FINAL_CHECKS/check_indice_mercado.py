@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.buffer_velas import BufferVelas
+from MODULOS.indice_mercado import IndiceMercado
+from MODULOS.market_context import construir_indice_mercado
+
+# ==============================================================================
+# CHECK: ÍNDICE DE MERCADO INCREMENTAL vs DATAFRAMES COMPLETOS
+# ==============================================================================
+# 1) En vivo: velas en curso que se re-pisan, pares que llegan atrasados y un par
+#    que aparece tarde. Tras cada ciclo, igual a la fórmula vieja del main.
+# 2) Offline: construir_indice_mercado igual a la versión anterior (ffill limit=5).
+# 3) Costo por ciclo: DataFrames sobre 20 pares x 86k velas vs una vela nueva.
+
+PASO_MS = 300_000
+RTOL, ATOL = 1e-12, 1e-15
+
+
+def formula_main(buffers):
+    """Cálculo anterior del main_loop, tal cual."""
+    dr = {k: b.serie('close').pct_change() for k, b in buffers.items()}
+    dv = {k: b.serie('volume').copy() for k, b in buffers.items()}
+    return (pd.DataFrame(dr).ffill().fillna(0) * pd.DataFrame(dv).ffill().fillna(0)).sum(axis=1) / (pd.DataFrame(dv).ffill().fillna(0).sum(axis=1) + 1e-9)
+
+
+def formula_offline(closes, volumes):
+    """construir_indice_mercado anterior (retornos y volúmenes con ffill(limit=5))."""
+    df_rets = pd.DataFrame({k: c.pct_change() for k, c in closes.items()}).ffill(limit=5)
+    df_vols = pd.DataFrame(volumes).ffill(limit=5).fillna(0)
+    return (df_rets * df_vols).sum(axis=1) / (df_vols.sum(axis=1) + 1e-9)
+
+
+def igual(a, b):
+    return len(a) == len(b) and a.index.equals(b.index) and np.allclose(a.to_numpy(), b.to_numpy(), rtol=RTOL, atol=ATOL)
+
+
+def check_vivo():
+    rng = np.random.default_rng(3)
+    nombres = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT']
+    buffers = {k: BufferVelas(5000) for k in nombres}
+    precios = {k: 100.0 for k in nombres}
+    t0 = 1_700_000_000_000
+    for k in nombres[:-1]:  # Historia inicial (DOGE aparece más tarde)
+        filas = []
+        for i in range(500):
+            precios[k] *= np.exp(rng.normal(0, 0.003)); filas.append([t0 + i * PASO_MS, 1, 1, 1, precios[k], rng.lognormal(5, 1)])
+        buffers[k].agregar(filas)
+
+    indice = IndiceMercado(nombres, 5000)
+    cargas, ok = 0, True
+    for ciclo in range(1500):
+        t = t0 + (500 + ciclo // 3) * PASO_MS  # 3 ciclos por vela: la vela en curso se re-pisa
+        for k in nombres:
+            if k == 'DOGEUSDT' and ciclo < 600: continue
+            if k == 'SOLUSDT' and 300 <= ciclo < 330: continue  # Atrasado 10 velas, luego se pone al día
+            ult = buffers[k].ultimo_timestamp()
+            desde = t if ult is None else min(ult + PASO_MS, t)
+            velas = []
+            for tt in range(desde, t + 1, PASO_MS):
+                precios[k] *= np.exp(rng.normal(0, 0.003)); velas.append([tt, 1, 1, 1, precios[k], rng.lognormal(5, 1)])
+            buffers[k].agregar(velas)
+        presentes = {k: b for k, b in buffers.items() if not b.vacio}
+        if not indice.sincronizar(presentes):
+            indice.cargar({k: b.serie('close') for k, b in presentes.items()}, {k: b.serie('volume') for k, b in presentes.items()})
+            cargas += 1
+        ok &= igual(indice.serie(), formula_main(presentes))
+    precio_ok = np.allclose(indice.precio().to_numpy(), np.cumprod(1 + indice.serie().to_numpy()), rtol=1e-9)
+    print(f"   {'✅' if ok else '❌'} 1500 ciclos (vela en curso, par atrasado, par nuevo): igual a la fórmula del main "
+          f"({cargas} carga en lote, la inicial)")
+    print(f"   {'✅' if precio_ok else '❌'} precio() = (1 + serie()).cumprod()")
+    return ok and precio_ok and cargas == 1
+
+
+def check_offline():
+    rng = np.random.default_rng(5)
+    idx = pd.date_range('2024-01-01', periods=4000, freq='5min', tz='UTC')
+    closes, volumes = {}, {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        for k in ['BTCUSDT', 'ETHUSDT', 'ADAUSDT', 'LINKUSDT']:
+            df = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.003, len(idx)))),
+                               'volume': rng.lognormal(5, 1, len(idx))}, index=idx)
+            if k == 'ADAUSDT': df = df.drop(df.index[1000:1012])   # Hueco de 12 velas (> limit 5)
+            if k == 'LINKUSDT': df = df.iloc[700:]                  # Empieza tarde
+            df.index.name = 'time'
+            df.assign(time=df.index.as_unit('ms').asi8).to_csv(os.path.join(carpeta, f"{k}.csv"), index=False)
+            closes[f"{k}.csv"], volumes[f"{k}.csv"] = df['close'], df['volume']
+        market_index, btc = construir_indice_mercado(carpeta)
+    ok = igual(market_index, formula_offline(closes, volumes)) and btc is not None
+    print(f"   {'✅' if ok else '❌'} construir_indice_mercado igual a la versión anterior (hueco > 5 velas, par tardío)")
+    return ok
+
+
+def check_costo():
+    rng = np.random.default_rng(9)
+    n, t0 = 86000, 1_600_000_000_000
+    buffers = {}
+    for i in range(20):
+        buf = BufferVelas(n)
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+        buf.agregar(np.column_stack([t0 + np.arange(n) * PASO_MS, c, c, c, c, rng.lognormal(5, 1, n)]).tolist())
+        buffers[f"P{i}"] = buf
+    t = time.perf_counter(); formula_main(buffers); seg_df = time.perf_counter() - t
+
+    indice = IndiceMercado(list(buffers), n)
+    t = time.perf_counter()
+    indice.cargar({k: b.serie('close') for k, b in buffers.items()}, {k: b.serie('volume') for k, b in buffers.items()})
+    seg_carga = time.perf_counter() - t
+    tiempos = []
+    for j in range(20):
+        for b in buffers.values(): b.agregar([[t0 + (n + j) * PASO_MS, 1, 1, 1, 100 + j, 10.0]])
+        t = time.perf_counter(); indice.sincronizar(buffers); tiempos.append(time.perf_counter() - t)
+    seg_inc = float(np.median(tiempos))
+    # Con el ring lleno la fila más vieja ya no tiene cierre previo en el buffer (pandas da 0): se omite
+    ok = igual(indice.serie().iloc[1:], formula_main(buffers).iloc[1:])
+    print(f"   {'✅' if ok else '❌'} 20 pares x {n} velas con ring lleno: igual tras 20 velas nuevas")
+    print(f"   📊 DataFrames por ciclo: {seg_df*1000:.0f} ms | carga inicial: {seg_carga*1000:.0f} ms | "
+          f"vela nueva: {seg_inc*1000:.2f} ms (x{seg_df/seg_inc:.0f})")
+    return ok
+
+
+def check_indice_mercado():
+    print("🔬 CHECK ÍNDICE DE MERCADO INCREMENTAL...")
+    ok = check_vivo()
+    ok &= check_offline()
+    ok &= check_costo()
+    print("\n✅ ÍNDICE DE MERCADO OK." if ok else "\n❌ ÍNDICE DE MERCADO CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_indice_mercado()
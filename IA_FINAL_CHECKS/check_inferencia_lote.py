@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.inferencia_lote import LoteInferencia
+from utilidades_checks import construir_modelos, SHAPE_MACRO, SHAPE_TACTICO
+
+# ==============================================================================
+# INFERENCIA EN LOTE: UNA PASADA POR MODELO PARA TODOS LOS PARES DEL CICLO
+# ==============================================================================
+# Modelos con la arquitectura real (sin entrenar) y ventanas al azar:
+# 1) Cada par recibe la misma salida que con su predict() de batch 1.
+# 2) Un ciclo de PARES pares con CONTEXTO, TACTICO y (estrategia, lado) por par
+#    hace una pasada por modelo usado (antes: una por par y por modelo).
+# 3) Costo del ciclo: predict por par vs lote.
+
+PARES = 30
+ESTRATEGIAS = ['FRPV', 'RANGO', 'BREAKOUT', 'TREND']
+ATOL = 1e-5  # float32: el orden de las sumas del batch puede cambiar el último bit
+
+
+def ventanas_ciclo(semilla=7):
+    """Por par: macro, táctico (algunos sin datos) y los (estrategia, lado) que pasan los filtros."""
+    rng = np.random.default_rng(semilla)
+    pares = []
+    for i in range(PARES):
+        pedidos = [(e, lado) for e in ESTRATEGIAS for lado in (1.0, -1.0) if rng.random() < 0.2]
+        pares.append({
+            'symbol': f"PAR{i}/USDT",
+            'w_mac_s': rng.normal(size=(1,) + SHAPE_MACRO).astype(np.float32),
+            'X_tac': rng.normal(size=(1,) + SHAPE_TACTICO).astype(np.float32) if rng.random() < 0.9 else None,
+            'w_mic_s': rng.normal(size=(1, 60, 6)).astype(np.float32),
+            'pedidos': pedidos,
+        })
+    return pares
+
+
+def x_micro(par, lado):
+    return np.concatenate([par['w_mic_s'], np.full((1, 60, 1), lado, dtype=np.float32)], axis=2)
+
+
+def ciclo_por_par(modelos, pares):
+    """Como antes: un predict de batch 1 por par y por modelo."""
+    salidas, llamadas = {}, 0
+    for p in pares:
+        salidas[('CONTEXTO', p['symbol'])] = modelos['CONTEXTO'].predict(p['w_mac_s'], verbose=0)[0]; llamadas += 1
+        if p['X_tac'] is not None:
+            salidas[('TACTICO', p['symbol'])] = modelos['TACTICO'].predict(p['X_tac'], verbose=0)[0]; llamadas += 1
+        for e, lado in p['pedidos']:
+            salidas[(e, (p['symbol'], lado))] = modelos[e].predict([x_micro(p, lado), p['w_mac_s']], verbose=0)[0]
+            llamadas += 1
+    return salidas, llamadas
+
+
+def ciclo_en_lote(modelos, pares):
+    """Como ahora: macro + táctico en un lote, luego un lote con las estrategias."""
+    lote = LoteInferencia()
+    for p in pares:
+        lote.agregar('CONTEXTO', p['symbol'], p['w_mac_s'])
+        if p['X_tac'] is not None: lote.agregar('TACTICO', p['symbol'], p['X_tac'])
+    lote.correr(modelos)
+    for p in pares:
+        for e, lado in p['pedidos']: lote.agregar(e, (p['symbol'], lado), x_micro(p, lado), p['w_mac_s'])
+    lote.correr(modelos)
+    return lote
+
+
+def check_paridad(modelos, pares):
+    esperado, llamadas = ciclo_por_par(modelos, pares)
+    lote = ciclo_en_lote(modelos, pares)
+    peor = max(float(np.max(np.abs(lote.salida(m, clave) - fila))) for (m, clave), fila in esperado.items())
+    ok = peor < ATOL and lote.filas == len(esperado)
+    print(f"   {'✅' if ok else '❌'} {len(esperado)} salidas por par == lote (dif máx {peor:.1e})")
+    usados = 2 + len({e for p in pares for e, _ in p['pedidos']})
+    bien = lote.pasadas == usados
+    print(f"   {'✅' if bien else '❌'} {PARES} pares: {llamadas} predict() por par -> {lote.pasadas} pasadas en lote")
+    return ok and bien
+
+
+def check_fallo_modelo(modelos, pares):
+    """Si un modelo falla, solo sus claves quedan sin salida (el par se salta, como antes)."""
+    lote = LoteInferencia()
+    for p in pares:
+        lote.agregar('CONTEXTO', p['symbol'], p['w_mac_s'])
+        lote.agregar('ROTO', p['symbol'], p['w_mac_s'][:, :, :3])  # Features de menos: el modelo falla
+    lote.correr({**modelos, 'ROTO': modelos['CONTEXTO']})
+    ok = lote.salida('ROTO', pares[0]['symbol']) is None and lote.salida('CONTEXTO', pares[0]['symbol']) is not None
+    print(f"   {'✅' if ok else '❌'} Un modelo que falla no tira el resto del lote")
+    return ok
+
+
+def check_costo(modelos, pares):
+    def mejor_de(fn, veces=3):
+        mejor = np.inf
+        for _ in range(veces):
+            t = time.perf_counter(); fn(); mejor = min(mejor, time.perf_counter() - t)
+        return mejor
+
+    seg_par = mejor_de(lambda: ciclo_por_par(modelos, pares))
+    seg_lote = mejor_de(lambda: ciclo_en_lote(modelos, pares))
+    print(f"   📊 Ciclo de {PARES} pares: predict por par {seg_par*1000:.0f} ms | lote {seg_lote*1000:.0f} ms "
+          f"(x{seg_par / seg_lote:.1f})")
+    return True
+
+
+def check_inferencia_lote():
+    print("🔬 CHECK INFERENCIA EN LOTE...")
+    modelos = construir_modelos(['CONTEXTO', 'TACTICO'] + ESTRATEGIAS)
+    pares = ventanas_ciclo()
+    ok = check_paridad(modelos, pares)
+    ok &= check_fallo_modelo(modelos, pares)
+    check_costo(modelos, pares)
+    print("\n✅ INFERENCIA EN LOTE OK." if ok else "\n❌ INFERENCIA EN LOTE CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_inferencia_lote()
@@ -0,0 +1,178 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS import kernels_indicadores as kernels
+from utilidades_checks import velas_sinteticas, error_relativo, mejor_de
+
+# ==============================================================================
+# KERNELS NUMPY DE INDICADORES vs PANDAS_TA
+# ==============================================================================
+# 1) Paridad 1 par: cada kernel == pandas_ta (rarezas incluidas: tramo plano,
+#    non_zero_range, semilla SMA, prenan del ATR). %B en ventanas planas queda
+#    fuera: pandas_ta divide su ruido de redondeo por eps (el kernel da 1).
+# 2) Lote 2D: k pares en una pasada == k llamadas 1D (bit a bit), con NaN
+#    iniciales distintos por par (listados a distinta fecha).
+# 3) Desvío móvil: pandas lo acumula en línea (error ~1e-7 relativo al desvío);
+#    se mide además contra el cálculo exacto por ventana.
+# 4) Micro-benchmark por indicador sobre 5 años de velas de 5m, y el lote 2D
+#    contra un pandas_ta por par sobre la cola que lee el bot en vivo.
+
+N_PARIDAD = 60000
+N_BENCH = 5 * 365 * 288          # 5 años de velas de 5m
+PARES_LOTE = 100
+FILAS_COLA = 3500                # ~ calentamiento del motor 5m + filas de la IA
+RTOL = 1e-9
+TRAMO_PLANO = 40                 # Velas sin operaciones a mitad de serie: varianza 0 y rangos 0
+RTOL_DESVIO = 1e-6               # Desvío / Bollinger: la referencia (pandas) es la imprecisa
+
+
+def casos(df):
+    """{nombre: (pandas_ta(df), kernel(df), tolerancia)} para un par."""
+    h, l, c, v = df['high'], df['low'], df['close'], df['volume']
+    bb, kc = ta.bbands(c, length=20, std=2), ta.kc(h, l, c, length=20, scalar=1.5)
+    kbb, kkc = kernels.bbands(c, 20, 2), kernels.kc(h, l, c, 20, 1.5)
+    plano = (c.rolling(20).max() == c.rolling(20).min()).to_numpy()
+    sin_plano = lambda x: np.where(plano, np.nan, x)
+    return {
+        'sma 200': (ta.sma(c, length=200), kernels.sma(c, 200), RTOL),
+        'sma vol 20': (ta.sma(v, length=20), kernels.sma(v, 20), RTOL),
+        'ema 50': (ta.ema(c, length=50), kernels.ema(c, 50), RTOL),
+        'ema 200': (ta.ema(c, length=200), kernels.ema(c, 200), RTOL),
+        'rma 14': (ta.rma(c, length=14), kernels.rma(c, 14), RTOL),
+        'true_range': (ta.true_range(h, l, c), kernels.rango_verdadero(h, l, c), RTOL),
+        'atr 14': (ta.atr(h, l, c, length=14), kernels.atr(h, l, c, 14), RTOL),
+        'atr 14 prenan': (ta.atr(h, l, c, length=14, prenan=True), kernels.atr(h, l, c, 14, prenan=True), RTOL),
+        'rsi 14': (ta.rsi(c, length=14), kernels.rsi(c, 14), RTOL),
+        'adx 14': (ta.adx(h, l, c, length=14)['ADX_14'], kernels.adx(h, l, c, 14), RTOL),
+        'stdev 20': (ta.stdev(c, length=20), kernels.desvio(c, 20), RTOL_DESVIO),
+        'vol std 200': (v.rolling(200).std(), kernels.media_desvio(v, 200)[1], RTOL_DESVIO),
+        'bb lower': (bb.iloc[:, 0], kbb[0], RTOL_DESVIO),
+        'bb mid': (bb.iloc[:, 1], kbb[1], RTOL),
+        'bb upper': (bb.iloc[:, 2], kbb[2], RTOL_DESVIO),
+        'bb width': (bb.iloc[:, 3], kbb[3], RTOL_DESVIO),
+        'bb pct': (sin_plano(bb.iloc[:, 4]), sin_plano(kbb[4]), RTOL_DESVIO),
+        'kc lower': (kc.iloc[:, 0], kkc[0], RTOL),
+        'kc basis': (kc.iloc[:, 1], kkc[1], RTOL),
+        'kc upper': (kc.iloc[:, 2], kkc[2], RTOL),
+        'slope 5': (ta.slope(c, length=5), kernels.slope(c, 5), RTOL),
+    }
+
+
+def check_paridad(df):
+    ok = True
+    for nombre, (esperado, obtenido, tol) in casos(df).items():
+        err = error_relativo(esperado, obtenido)
+        bien = err < tol
+        print(f"   {'✅' if bien else '❌'} {nombre:<14} == pandas_ta (error máx {err:.1e}, tol {tol:.0e})")
+        ok &= bien
+    return ok
+
+
+def check_desvio_exacto(df):
+    """El desvío de los kernels contra el cálculo directo ventana por ventana."""
+    c = df['close'].to_numpy()
+    ventanas = np.lib.stride_tricks.sliding_window_view(c, 20)
+    exacto = np.r_[np.full(19, np.nan), ventanas.std(axis=1, ddof=1)]
+    err_k = error_relativo(exacto, kernels.desvio(c, 20))
+    err_pd = error_relativo(exacto, ta.stdev(df['close'], length=20))
+    ok = err_k < RTOL
+    print(f"   {'✅' if ok else '❌'} stdev 20 vs ventana exacta: kernel {err_k:.1e} | pandas_ta {err_pd:.1e}")
+    plano = len(c) // 2 + TRAMO_PLANO
+    ok_plano = kernels.desvio(c, 20)[plano - 1] == 0.0
+    print(f"   {'✅' if ok_plano else '❌'} Ventana constante: desvío 0 exacto (como pandas)")
+    return ok and ok_plano
+
+
+def check_lote(df):
+    """k pares (n, k) en una pasada == una llamada por par, con NaN iniciales distintos."""
+    k = 4
+    rng = np.random.default_rng(9)
+    inicios = rng.integers(1, 5000, k)  # Cada par listado a distinta fecha
+    h, l, c = (np.column_stack([df[col].to_numpy() * (1 + 0.1 * j) for j in range(k)]) for col in ('high', 'low', 'close'))
+    for j, ini in enumerate(inicios):
+        h[:ini, j] = l[:ini, j] = c[:ini, j] = np.nan
+    lotes = {
+        'sma 200': (kernels.sma(c, 200), lambda j: kernels.sma(c[:, j], 200)),
+        'ema 200': (kernels.ema(c, 200), lambda j: kernels.ema(c[:, j], 200)),
+        'atr 14': (kernels.atr(h, l, c, 14), lambda j: kernels.atr(h[:, j], l[:, j], c[:, j], 14)),
+        'rsi 14': (kernels.rsi(c, 14), lambda j: kernels.rsi(c[:, j], 14)),
+        'adx 14': (kernels.adx(h, l, c, 14), lambda j: kernels.adx(h[:, j], l[:, j], c[:, j], 14)),
+        'bb pct': (kernels.bbands(c, 20, 2)[4], lambda j: kernels.bbands(c[:, j], 20, 2)[4]),
+        'kc upper': (kernels.kc(h, l, c, 20, 1.5)[2], lambda j: kernels.kc(h[:, j], l[:, j], c[:, j], 20, 1.5)[2]),
+    }
+    ok = True
+    for nombre, (lote, por_par) in lotes.items():
+        bien = all(np.array_equal(lote[:, j], por_par(j), equal_nan=True) for j in range(k))
+        ok &= bien
+    print(f"   {'✅' if ok else '❌'} Lote 2D ({k} pares, NaN iniciales distintos) == por par, bit a bit "
+          f"({len(lotes)} indicadores)")
+
+    # El par listado más tarde contra pandas_ta sobre su tramo válido
+    j = int(np.argmax(inicios))
+    ini = inicios[j]
+    err = error_relativo(ta.rsi(pd.Series(c[ini:, j]), length=14), kernels.rsi(c, 14)[ini:, j])
+    bien = err < RTOL
+    print(f"   {'✅' if bien else '❌'} Par listado en la fila {ini}: rsi del lote == pandas_ta (error máx {err:.1e})")
+    return ok and bien
+
+
+def check_benchmark():
+    df = velas_sinteticas(N_BENCH, semilla=21, tramo_plano=TRAMO_PLANO)
+    h, l, c, v = df['high'], df['low'], df['close'], df['volume']
+    hn, ln, cn = h.to_numpy(), l.to_numpy(), c.to_numpy()
+    pruebas = {
+        'sma 200': (lambda: ta.sma(c, length=200), lambda: kernels.sma(cn, 200)),
+        'ema 200': (lambda: ta.ema(c, length=200), lambda: kernels.ema(cn, 200)),
+        'rma 14': (lambda: ta.rma(c, length=14), lambda: kernels.rma(cn, 14)),
+        'stdev 20': (lambda: ta.stdev(c, length=20), lambda: kernels.desvio(cn, 20)),
+        'atr 14': (lambda: ta.atr(h, l, c, length=14), lambda: kernels.atr(hn, ln, cn, 14)),
+        'rsi 14': (lambda: ta.rsi(c, length=14), lambda: kernels.rsi(cn, 14)),
+        'adx 14': (lambda: ta.adx(h, l, c, length=14), lambda: kernels.adx(hn, ln, cn, 14)),
+        'bbands 20': (lambda: ta.bbands(c, length=20, std=2), lambda: kernels.bbands(cn, 20, 2)),
+        'kc 20': (lambda: ta.kc(h, l, c, length=20, scalar=1.5), lambda: kernels.kc(hn, ln, cn, 20, 1.5)),
+        'slope 5': (lambda: ta.slope(c, length=5), lambda: kernels.slope(cn, 5)),
+        'vol z 200': (lambda: (v.rolling(200).mean(), v.rolling(200).std()),
+                      lambda: kernels.media_desvio(v.to_numpy(), 200)),
+    }
+    print(f"\n   📊 Micro-benchmark: {N_BENCH} velas de 5m (5 años), mejor de 3")
+    for nombre, (con_ta, con_kernel) in pruebas.items():
+        seg_ta, seg_k = mejor_de(con_ta), mejor_de(con_kernel)
+        print(f"   📊 {nombre:<10} pandas_ta {seg_ta*1000:7.1f} ms | kernel {seg_k*1000:7.1f} ms (x{seg_ta / seg_k:.1f})")
+
+    # Lote: PARES_LOTE colas en una matriz (n, k) vs un pandas_ta por par
+    cola = slice(-FILAS_COLA, None)
+    H, L, C = (np.column_stack([x[cola] * (1 + 0.01 * j) for j in range(PARES_LOTE)]) for x in (hn, ln, cn))
+    series = [(pd.Series(H[:, j]), pd.Series(L[:, j]), pd.Series(C[:, j])) for j in range(PARES_LOTE)]
+    lotes = {
+        'rsi 14': (lambda: [ta.rsi(c_, length=14) for _, _, c_ in series], lambda: kernels.rsi(C, 14)),
+        'atr 14': (lambda: [ta.atr(h_, l_, c_, length=14) for h_, l_, c_ in series], lambda: kernels.atr(H, L, C, 14)),
+        'bbands 20': (lambda: [ta.bbands(c_, length=20, std=2) for _, _, c_ in series], lambda: kernels.bbands(C, 20, 2)),
+        'ema 200': (lambda: [ta.ema(c_, length=200) for _, _, c_ in series], lambda: kernels.ema(C, 200)),
+    }
+    print(f"\n   📊 Lote 2D: {PARES_LOTE} pares x {FILAS_COLA} velas (cola en vivo), mejor de 3")
+    for nombre, (con_ta, con_kernel) in lotes.items():
+        seg_ta, seg_k = mejor_de(con_ta), mejor_de(con_kernel)
+        print(f"   📊 {nombre:<10} pandas_ta por par {seg_ta*1000:7.1f} ms | lote {seg_k*1000:6.1f} ms "
+              f"(x{seg_ta / seg_k:.1f})")
+    return True
+
+
+def check_kernels_indicadores():
+    print("🔬 CHECK KERNELS DE INDICADORES...")
+    df = velas_sinteticas(N_PARIDAD, semilla=3, tramo_plano=TRAMO_PLANO)
+    ok = check_paridad(df)
+    ok &= check_desvio_exacto(df)
+    ok &= check_lote(df)
+    check_benchmark()
+    print("\n✅ KERNELS DE INDICADORES OK." if ok else "\n❌ KERNELS DE INDICADORES CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_kernels_indicadores()
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.lstm_numpy import cargar_numpy
+from MODULOS.modelo_compilado import ModeloCompilado
+from utilidades_checks import construir_modelos, entradas
+
+# ==============================================================================
+# FORWARD NUMPY DE LAS LSTM vs KERAS
+# ==============================================================================
+# Redes con la arquitectura real (pesos al azar, BatchNorm con medias/varianzas
+# no triviales) guardadas en .keras y cargadas con MODULOS/lstm_numpy.py:
+# 1) Misma salida que Keras (lotes 1 / 7 / 600) y BatchNorm plegadas al cargar.
+# 2) Importar lstm_numpy no trae TensorFlow.
+# 3) Latencia por llamada, batch 1..4096: predict, tf.function y NumPy.
+
+LOTES_PARIDAD = (1, 7, 600)
+LOTES_BENCH = (1, 8, 64, 512, 4096)
+ATOL = 1e-5
+
+
+def check_paridad(modelos, directorio):
+    rng = np.random.default_rng(11)
+    ok, redes = True, {}
+    for nombre, modelo in modelos.items():
+        path = os.path.join(directorio, f"model_{nombre}.keras")
+        modelo.save(path)
+        red = redes[nombre] = cargar_numpy(path, nombre)
+        peor = max(float(np.max(np.abs(modelo.predict(X, verbose=0) - red.predict(X))))
+                   for X in (entradas(modelo, n, rng) for n in LOTES_PARIDAD))
+        bien = peor < ATOL and red.plegadas == 2
+        print(f"   {'✅' if bien else '❌'} {nombre:<10}: == Keras (dif máx {peor:.1e}), {red.plegadas} BatchNorm plegadas")
+        ok &= bien
+    return ok, redes
+
+
+def check_sin_tensorflow():
+    codigo = "import sys; sys.path.append(%r); import MODULOS.lstm_numpy; print('tensorflow' in sys.modules)" % RAIZ
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True)
+    ok = salida.stdout.strip() == 'False'
+    print(f"   {'✅' if ok else '❌'} Importar lstm_numpy no importa TensorFlow")
+    return ok
+
+
+def mejor_ms(fn, veces):
+    fn()
+    mejor = np.inf
+    for _ in range(veces):
+        t = time.perf_counter(); fn(); mejor = min(mejor, time.perf_counter() - t)
+    return mejor * 1000
+
+
+def check_latencia(modelos, redes):
+    rng = np.random.default_rng(3)
+    for nombre in ('ESTRATEGIA', 'TACTICO'):
+        modelo, red = modelos[nombre], redes[nombre]
+        compilado = ModeloCompilado(modelo, nombre).calentar()
+        print(f"   📊 {nombre}: ms por llamada (mejor de N) | predict | tf.function | NumPy")
+        for n in LOTES_BENCH:
+            X = entradas(modelo, n, rng)
+            veces = 20 if n <= 64 else 3
+            ms_k = mejor_ms(lambda: modelo.predict(X, batch_size=n, verbose=0), veces)
+            ms_c = mejor_ms(lambda: compilado.predict(X), veces)
+            ms_n = mejor_ms(lambda: red.predict(X), veces)
+            print(f"      batch {n:>4}: {ms_k:9.2f} | {ms_c:9.2f} | {ms_n:9.2f}  "
+                  f"(NumPy x{ms_k / ms_n:.1f} vs predict, x{ms_c / ms_n:.2f} vs tf.function)")
+
+
+def check_lstm_numpy():
+    print("🔬 CHECK LSTM NUMPY...")
+    directorio = tempfile.mkdtemp(prefix='lstm_numpy_')
+    try:
+        modelos = construir_modelos(['ESTRATEGIA', 'CONTEXTO', 'TACTICO'], bn='completa')
+        ok, redes = check_paridad(modelos, directorio)
+        ok &= check_sin_tensorflow()
+        check_latencia(modelos, redes)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+    print("\n✅ LSTM NUMPY OK." if ok else "\n❌ LSTM NUMPY CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_lstm_numpy()
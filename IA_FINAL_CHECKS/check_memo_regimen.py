@@ -0,0 +1,160 @@
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.memo_regimen import MemoRegimen, marca_ventana_diaria
+from MODULOS.inferencia_lote import LoteInferencia
+
+# ==============================================================================
+# MEMO DE REGÍMENES (CONTEXTO DIARIO / TACTICO Y HMM POR HORA CERRADA)
+# ==============================================================================
+# Dos días de ciclos de 5m para PARES pares, con modelos de juguete (mismo
+# predict() que Keras / hmmlearn) sobre ventanas que dependen solo de sus barras:
+# 1) En cada ciclo la salida (memo o lote) == inferir de cero.
+# 2) Inferencias: CONTEXTO una por día (+ ventanas que cruzan medianoche),
+#    TACTICO y HMM una por hora cerrada; contadores de aciertos/fallos.
+# 3) Modelo recargado: sin invalidar la memo devuelve lo viejo, con invalidar no.
+
+PARES = 30
+DIAS = 2
+PASO = pd.Timedelta('5min')
+NS = {'D': 86_400 * 10**9, 'h': 3_600 * 10**9}
+
+
+class ModeloJuguete:
+    """predict(X) -> softmax lineal; cuenta filas inferidas."""
+
+    def __init__(self, semilla, clases=4):
+        self.w = np.random.default_rng(semilla).normal(size=clases)
+        self.filas = 0
+
+    def predict(self, X, batch_size=None, verbose=0):
+        self.filas += len(X)
+        z = np.asarray(X, dtype=np.float64).reshape(len(X), -1).mean(axis=1)[:, None] * self.w
+        e = np.exp(z - z.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+class HMMJuguete(ModeloJuguete):
+    def predict(self, X, batch_size=None, verbose=0):
+        return super().predict(X).argmax(axis=1)
+
+
+def valor(symbol, ns, nivel):
+    """Feature determinística del par en la barra (día o hora) que contiene el instante ns."""
+    return (hash((symbol, ns - ns % NS[nivel])) % 10_000) / 10_000.0
+
+
+@lru_cache(maxsize=None)
+def ventanas(symbol, t):
+    """Ciclo en t (vela en curso): fila -2 = t - 5m. Macro: 14 filas 5m con el valor diario."""
+    filas = pd.date_range(end=t - PASO, periods=14, freq=PASO)
+    w_mac = np.array([[valor(symbol, f, 'D')] * 10 for f in filas.asi8], dtype=np.float32)[None]
+    cerrada = t.floor('h') - pd.Timedelta('1h')
+    horas = cerrada.value - NS['h'] * np.arange(47, -1, -1)
+    X_tac = np.array([[valor(symbol, int(h), 'h')] * 5 for h in horas], dtype=np.float32)[None]
+    X_hmm = X_tac[:, -1, :]
+    return filas, w_mac, cerrada, X_tac, X_hmm
+
+
+def ciclo(memo, modelos, pares, t):
+    """Como analizar_mercado: memo primero, lote solo con los pares cuya barra avanzó."""
+    lote, salidas, pendientes = LoteInferencia(), {}, []
+    for s in pares:
+        filas, w_mac, cerrada, X_tac, X_hmm = ventanas(s, t)
+        marca_mac = marca_ventana_diaria(filas)
+        p_mac = memo.obtener('CONTEXTO', s, marca_mac)
+        p_tac = memo.obtener('TACTICO', s, cerrada)
+        clust = memo.obtener('HMM', s, cerrada)
+        if clust is None:
+            clust = modelos['HMM'].predict(X_hmm)[0]
+            memo.guardar('HMM', s, cerrada, clust)
+        if p_mac is None: lote.agregar('CONTEXTO', s, w_mac)
+        if p_tac is None: lote.agregar('TACTICO', s, X_tac)
+        pendientes.append((s, marca_mac, cerrada, p_mac, p_tac, clust))
+    lote.correr(modelos)
+    for s, marca_mac, cerrada, p_mac, p_tac, clust in pendientes:
+        if p_mac is None: p_mac = lote.salida('CONTEXTO', s); memo.guardar('CONTEXTO', s, marca_mac, p_mac)
+        if p_tac is None: p_tac = lote.salida('TACTICO', s); memo.guardar('TACTICO', s, cerrada, p_tac)
+        salidas[s] = (p_mac, p_tac, clust)
+    return salidas
+
+
+def de_cero(modelos, pares, t):
+    salidas = {}
+    for s in pares:
+        _, w_mac, _, X_tac, X_hmm = ventanas(s, t)
+        salidas[s] = (modelos['CONTEXTO'].predict(w_mac)[0], modelos['TACTICO'].predict(X_tac)[0],
+                      modelos['HMM'].predict(X_hmm)[0])
+    return salidas
+
+
+def iguales(a, b):
+    return all(np.array_equal(a[s][0], b[s][0]) and np.array_equal(a[s][1], b[s][1]) and a[s][2] == b[s][2] for s in a)
+
+
+def check_marca():
+    dia = pd.date_range('2024-03-05 12:00', periods=14, freq=PASO, tz='UTC')
+    cruza = pd.date_range('2024-03-05 23:30', periods=14, freq=PASO, tz='UTC')
+    hasta_00 = pd.date_range(end='2024-03-06 00:00', periods=14, freq=PASO, tz='UTC')
+    ok = (marca_ventana_diaria(dia) == pd.Timestamp('2024-03-05', tz='UTC')
+          and marca_ventana_diaria(cruza) != marca_ventana_diaria(cruza[1:].append(cruza[-1:] + PASO))
+          and marca_ventana_diaria(hasta_00) != pd.Timestamp('2024-03-06', tz='UTC'))
+    print(f"   {'✅' if ok else '❌'} Marca diaria: día UTC dentro del día; por vela si cruza medianoche (sin chocar a las 00:00)")
+    return ok
+
+
+def check_simulacion():
+    pares = [f"PAR{i}/USDT" for i in range(PARES)]
+    modelos = {'CONTEXTO': ModeloJuguete(1), 'TACTICO': ModeloJuguete(2), 'HMM': HMMJuguete(3)}
+    referencia = {'CONTEXTO': ModeloJuguete(1), 'TACTICO': ModeloJuguete(2), 'HMM': HMMJuguete(3)}
+    memo = MemoRegimen()
+    tiempos = pd.date_range('2024-03-05 00:05', periods=DIAS * 288, freq=PASO, tz='UTC')
+
+    ok = True
+    for t in tiempos: ok &= iguales(ciclo(memo, modelos, pares, t), de_cero(referencia, pares, t))
+    print(f"   {'✅' if ok else '❌'} {len(tiempos)} ciclos x {PARES} pares: memo == inferir de cero en cada ciclo")
+
+    horas = len(set(t.floor('h') for t in tiempos))
+    mezcla = sum((t - 14 * PASO).floor('D') != (t - PASO).floor('D') for t in tiempos)
+    esperado_mac = (DIAS + mezcla) * PARES
+    bien = (modelos['CONTEXTO'].filas == esperado_mac and modelos['TACTICO'].filas == horas * PARES
+            and modelos['HMM'].filas == horas * PARES)
+    total = len(tiempos) * PARES
+    print(f"   {'✅' if bien else '❌'} Inferencias: CONTEXTO {modelos['CONTEXTO'].filas} (de {total}; {DIAS} días + "
+          f"{mezcla} ventanas cruzando medianoche por par), TACTICO {modelos['TACTICO'].filas}, "
+          f"HMM {modelos['HMM'].filas} ({horas} horas por par)")
+    contadores = memo.aciertos + memo.fallos == 3 * total and memo.fallos == (esperado_mac + 2 * horas * PARES)
+    print(f"   {'✅' if contadores else '❌'} Contadores: {memo.resumen()} "
+          f"-> {total * 3 - memo.fallos} de {total * 3} inferencias evitadas")
+    return ok and bien and contadores, memo, pares, tiempos[-1]
+
+
+def check_invalidacion(memo, pares, t):
+    nuevos = {'CONTEXTO': ModeloJuguete(11), 'TACTICO': ModeloJuguete(12), 'HMM': HMMJuguete(13)}
+    esperado = de_cero({k: ModeloJuguete(s) if k != 'HMM' else HMMJuguete(s)
+                        for k, s in (('CONTEXTO', 11), ('TACTICO', 12), ('HMM', 13))}, pares, t)
+    viejo = ciclo(memo, nuevos, pares, t)
+    memo.invalidar()
+    nuevo = ciclo(memo, nuevos, pares, t)
+    ok = not iguales(viejo, esperado) and iguales(nuevo, esperado)
+    print(f"   {'✅' if ok else '❌'} Recarga de modelos: sin invalidar sale lo del modelo viejo; invalidando, lo del nuevo")
+    return ok
+
+
+def check_memo_regimen():
+    print("🔬 CHECK MEMO DE REGÍMENES...")
+    ok = check_marca()
+    bien, memo, pares, t = check_simulacion()
+    ok &= bien
+    ok &= check_invalidacion(memo, pares, t)
+    print("\n✅ MEMO DE REGÍMENES OK." if ok else "\n❌ MEMO DE REGÍMENES CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_memo_regimen()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.modelo_compilado import ModeloCompilado
+from utilidades_checks import construir_modelos, entradas
+
+# ==============================================================================
+# INFERENCIA COMPILADA (tf.function CON FIRMA FIJA) vs model.predict
+# ==============================================================================
+# Modelos con la arquitectura real (sin entrenar):
+# 1) Misma salida que predict() para batch 1 y para el lote de un ciclo.
+# 2) Una sola traza: cambiar el tamaño del lote no retraza.
+# 3) Latencia p50 / p99 por llamada: predict vs compilado, batch 1 y lote.
+
+LOTES = (1, 30)          # Un par / un ciclo de pares
+REPETICIONES = 200
+ATOL = 1e-5
+
+
+def percentiles(fn, veces=REPETICIONES):
+    fn()  # Fuera de la medición (primera llamada de predict arma su función)
+    tiempos = []
+    for _ in range(veces):
+        t = time.perf_counter(); fn(); tiempos.append(time.perf_counter() - t)
+    return np.percentile(tiempos, 50) * 1000, np.percentile(tiempos, 99) * 1000
+
+
+def check_modelo_compilado():
+    print("🔬 CHECK MODELOS COMPILADOS...")
+    rng = np.random.default_rng(3)
+    ok = True
+    for nombre, modelo in construir_modelos(['CONTEXTO', 'TACTICO', 'ESTRATEGIA']).items():
+        compilado = ModeloCompilado(modelo, nombre).calentar()
+        peor = 0.0
+        for n in LOTES + (7, 64):
+            X = entradas(modelo, n, rng)
+            peor = max(peor, float(np.max(np.abs(modelo.predict(X, verbose=0) - compilado.predict(X)))))
+        trazas = compilado.trazas
+        bien = peor < ATOL and trazas == 1
+        print(f"   {'✅' if bien else '❌'} {nombre:<10}: == predict (dif máx {peor:.1e}), {trazas} traza para lotes 1/7/30/64")
+        ok &= bien
+
+        for n in LOTES:
+            X = entradas(modelo, n, rng)
+            p50_k, p99_k = percentiles(lambda: modelo.predict(X, verbose=0))
+            p50_c, p99_c = percentiles(lambda: compilado.predict(X))
+            print(f"   📊 {nombre:<10} batch {n:>2}: predict p50 {p50_k:6.2f} / p99 {p99_k:6.2f} ms | "
+                  f"compilado p50 {p50_c:6.2f} / p99 {p99_c:6.2f} ms (x{p50_k / p50_c:.1f} en p50)")
+    print("\n✅ MODELOS COMPILADOS OK." if ok else "\n❌ MODELOS COMPILADOS CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_modelo_compilado()
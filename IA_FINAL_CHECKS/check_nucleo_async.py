@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.limitador_peso import LimitadorPeso
+from MODULOS.nucleo_async import NucleoAsync
+from MODULOS.planificador_exchange import (PlanificadorExchange, ExchangeProgramadoAsync, PRIORIDAD_SALIDA,
+                                           PRIORIDAD_TELEGRAM)
+from MODULOS.snapshot_mercado import SnapshotPuntas, SnapshotPosiciones
+
+# ==============================================================================
+# CHECK DEL NÚCLEO ASYNC (EXCHANGE ASYNC FALSO, SIN RED)
+# ==============================================================================
+# 1) Las lecturas del ciclo en paralelo tardan lo que la más lenta, no la suma.
+# 2) Lecturas async idénticas se unen; la prioridad viaja con cada corrutina.
+# 3) Cientos de tareas de fondo no crean cientos de hilos.
+# 4) en_paralelo devuelve en orden y un fallo no tumba al resto.
+
+LATENCIA = 0.1
+N_PARES = 20
+
+
+class ExchangeAsyncFalso:
+
+    def __init__(self):
+        self.llamadas = []
+        self.last_response_headers = {}
+
+    async def fetch_bids_asks(self, symbols=None, params={}):
+        await asyncio.sleep(LATENCIA)
+        self.llamadas.append('fetch_bids_asks')
+        return {'BTC/USDT:USDT': {'symbol': 'BTC/USDT:USDT', 'bid': 99.0, 'ask': 101.0}}
+
+    async def fetch_positions(self, symbols=None, params={}):
+        await asyncio.sleep(LATENCIA)
+        self.llamadas.append('fetch_positions')
+        return [{'symbol': 'BTC/USDT:USDT', 'contracts': 2}]
+
+    async def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None, params={}):
+        await asyncio.sleep(LATENCIA)
+        self.llamadas.append(('fetch_ohlcv', symbol))
+        return [[since or 0, 1, 1, 1, 1, 1]]
+
+    async def close(self):
+        pass
+
+
+def check_fan_out(nucleo):
+    falso = ExchangeAsyncFalso()
+    ex = ExchangeProgramadoAsync(falso, PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=32))
+    puntas, posiciones = SnapshotPuntas(), SnapshotPosiciones()
+
+    async def ciclo():
+        tareas = [puntas.refrescar_async(ex), posiciones.refrescar_async(ex)]
+        tareas += [ex.fetch_ohlcv(f"P{i}/USDT", '5m', since=i) for i in range(N_PARES)]
+        return await asyncio.gather(*tareas)
+
+    t = time.monotonic()
+    nucleo.ejecutar(ciclo())
+    seg = time.monotonic() - t
+    secuencial = (N_PARES + 2) * LATENCIA
+    ok = seg < secuencial / 4 and puntas.spread('BTC/USDT') is not None and posiciones.contratos('BTC/USDT') == 2
+    print(f"   {'✅' if ok else '❌'} {N_PARES + 2} lecturas en {seg*1000:.0f} ms (secuencial ~{secuencial*1000:.0f} ms)")
+    return ok
+
+
+def check_union_y_prioridad(nucleo):
+    falso = ExchangeAsyncFalso()
+    plan = PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=8)
+    ex = ExchangeProgramadoAsync(falso, plan)
+
+    @plan.con_prioridad(PRIORIDAD_SALIDA)
+    async def salida():
+        await asyncio.sleep(0)
+        return plan.prioridad_actual()
+
+    @plan.con_prioridad(PRIORIDAD_TELEGRAM)
+    async def comando():
+        await asyncio.sleep(0)
+        return plan.prioridad_actual()
+
+    async def todo():
+        lecturas = await asyncio.gather(*[ex.fetch_bids_asks() for _ in range(10)])
+        prioridades = await asyncio.gather(salida(), comando(), salida())
+        return lecturas, prioridades
+
+    lecturas, prioridades = nucleo.ejecutar(todo())
+    reales = falso.llamadas.count('fetch_bids_asks')
+    ok = reales == 1 and len(lecturas) == 10
+    print(f"   {'✅' if ok else '❌'} 10 fetch_bids_asks async simultáneos -> {reales} llamada real")
+    bien = list(prioridades) == [PRIORIDAD_SALIDA, PRIORIDAD_TELEGRAM, PRIORIDAD_SALIDA]
+    print(f"   {'✅' if bien else '❌'} Cada corrutina conserva su prioridad en el mismo hilo {prioridades}")
+    return ok and bien
+
+
+def check_hilos_acotados(nucleo):
+    antes = threading.active_count()
+    futuros = [nucleo.lanzar(time.sleep, 0.01) for _ in range(200)]
+    futuros += [nucleo.lanzar_vigilante(time.sleep, 0.05) for _ in range(8)]
+    orden = []
+    futuros += [nucleo.lanzar_telegram(orden.append, i) for i in range(50)]
+    pico = threading.active_count()
+    for f in futuros: f.result()
+    tope = nucleo.pool_io._max_workers + nucleo.pool_vigilantes._max_workers + nucleo.pool_telegram._max_workers
+    ok = pico - antes <= tope and orden == list(range(50))
+    print(f"   {'✅' if ok else '❌'} 258 tareas de fondo -> +{pico - antes} hilos (tope {tope}); Telegram en orden")
+    return ok
+
+
+def check_en_paralelo(nucleo):
+    def trabajo(i):
+        time.sleep(LATENCIA)
+        if i == 3: raise ValueError("fallo simulado")
+        return i * i
+
+    t = time.monotonic()
+    r = nucleo.en_paralelo(trabajo, [(i,) for i in range(8)])
+    seg = time.monotonic() - t
+    ok = r == [0, 1, 4, None, 16, 25, 36, 49] and seg < 8 * LATENCIA / 2
+    print(f"   {'✅' if ok else '❌'} en_paralelo: 8 tareas en {seg*1000:.0f} ms, orden conservado y fallo aislado")
+    return ok
+
+
+def check_nucleo_async():
+    print("🔬 CHECK NÚCLEO ASYNC...")
+    nucleo = NucleoAsync()
+    nucleo.iniciar()
+    try:
+        ok = check_fan_out(nucleo)
+        ok &= check_union_y_prioridad(nucleo)
+        ok &= check_hilos_acotados(nucleo)
+        ok &= check_en_paralelo(nucleo)
+    finally:
+        nucleo.detener()
+    print("\n✅ NÚCLEO ASYNC OK." if ok else "\n❌ NÚCLEO ASYNC CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_nucleo_async()
@@ -0,0 +1,198 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.limitador_peso import LimitadorPeso
+from MODULOS.planificador_exchange import (PlanificadorExchange, ExchangeProgramado, PRIORIDAD_SALIDA,
+                                           PRIORIDAD_ENTRADA, PRIORIDAD_TELEGRAM)
+
+# ==============================================================================
+# CHECK DEL PLANIFICADOR DE PETICIONES (EXCHANGE FALSO, SIN RED)
+# ==============================================================================
+# 1) Una ráfaga de comandos de Telegram no debe hacer esperar a una salida.
+# 2) Lecturas idénticas en vuelo se unen en una sola llamada real.
+# 3) El peso informado por el exchange corrige el presupuesto.
+# 4) Una salida no se une a una lectura igual encolada como TELEGRAM.
+# 5) Una lectura tras create/cancel no recibe un resultado pedido antes de la escritura.
+# 6) Con varias peticiones en vuelo, cada una sincroniza el peso con SUS cabeceras.
+
+LATENCIA = 0.05
+
+
+class ExchangeFalso:
+    """Como ccxt: on_rest_response() con las cabeceras de cada respuesta y last_response_headers compartido."""
+
+    def __init__(self):
+        self.llamadas = []
+        self.last_response_headers = {}
+        self.markets = {'BTC/USDT': {}}
+        self.peso_reportado = None
+        self.ordenes = []
+        self._lock = threading.Lock()
+
+    def on_rest_response(self, code, reason, url, method, response_headers, response_body, request_headers, request_body):
+        return response_body
+
+    def _responder(self, peso):
+        cabeceras = {'x-mbx-used-weight-1m': str(peso)}
+        self.on_rest_response(200, 'OK', 'https://fapi', 'GET', cabeceras, '{}', {}, None)
+        self.last_response_headers = cabeceras
+
+    def fetch_ticker(self, symbol, latencia=LATENCIA, peso=None):
+        with self._lock:
+            self.llamadas.append(('fetch_ticker', symbol, threading.current_thread().name))
+            self._responder(peso or self.peso_reportado or len(self.llamadas))
+        time.sleep(latencia)  # Parseo / red: mientras tanto responden otras peticiones
+        return {'symbol': symbol, 'last': 100.0}
+
+    def fetch_open_orders(self, symbol=None):
+        with self._lock: ordenes = list(self.ordenes)  # Lo que había al llegar al exchange
+        time.sleep(LATENCIA * 2)
+        return ordenes
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        time.sleep(LATENCIA)
+        with self._lock:
+            self.llamadas.append(('create_order', symbol, threading.current_thread().name))
+            self.ordenes.append({'id': str(len(self.ordenes) + 1), 'symbol': symbol})
+        return self.ordenes[-1]
+
+    def amount_to_precision(self, symbol, amount):
+        return f"{amount:.3f}"
+
+
+def check_prioridades():
+    falso = ExchangeFalso()
+    plan = PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=1)
+    ex = ExchangeProgramado(falso, plan)
+
+    @plan.con_prioridad(PRIORIDAD_TELEGRAM)
+    def comando(i): ex.fetch_ticker(f"T{i}/USDT")
+
+    @plan.con_prioridad(PRIORIDAD_SALIDA)
+    def salida(): ex.create_order('BTC/USDT', 'market', 'sell', 1)
+
+    hilos = [threading.Thread(target=comando, args=(i,), name=f"tg{i}") for i in range(20)]
+    for h in hilos: h.start()
+    time.sleep(LATENCIA * 2.5)   # La ráfaga ya está en cola
+    t = time.monotonic()
+    h_salida = threading.Thread(target=salida, name="salida"); h_salida.start(); h_salida.join()
+    espera_salida = time.monotonic() - t
+    for h in hilos: h.join()
+
+    orden = [c[2] for c in falso.llamadas]
+    pos = orden.index('salida')
+    ok = pos <= 4 and espera_salida < LATENCIA * 4
+    print(f"   {'✅' if ok else '❌'} Salida atendida en el puesto {pos + 1}/21 ({espera_salida*1000:.0f} ms) pese a 20 comandos en cola")
+    m = plan.metricas()['prioridades']
+    print(f"   📊 Espera TELEGRAM media {m['TELEGRAM']['espera_media']*1000:.0f} ms | SALIDA {m['SALIDA']['espera_media']*1000:.0f} ms")
+    return ok
+
+
+def check_union_lecturas():
+    falso = ExchangeFalso()
+    plan = PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=4)
+    ex = ExchangeProgramado(falso, plan)
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(ex.fetch_ticker('BTC/USDT'))) for _ in range(10)]
+    for h in hilos: h.start()
+    for h in hilos: h.join()
+    reales = sum(1 for c in falso.llamadas if c[0] == 'fetch_ticker')
+    unidas = plan.metricas()['prioridades']['ENTRADA']['unidas']
+    ok = reales < 10 and len(resultados) == 10 and reales + unidas == 10
+    print(f"   {'✅' if ok else '❌'} 10 fetch_ticker iguales y simultáneos -> {reales} llamada(s) real(es), {unidas} unidas")
+
+    # Lo que no es de red pasa directo (sin cola)
+    bien = ex.amount_to_precision('BTC/USDT', 1.23456) == "1.235" and ex.markets is falso.markets
+    print(f"   {'✅' if bien else '❌'} Métodos locales y atributos pasan directo al exchange")
+    return ok and bien
+
+
+def check_peso_exchange():
+    falso = ExchangeFalso()
+    lim = LimitadorPeso(100, margen=1.0)
+    plan = PlanificadorExchange(lim)
+    ex = ExchangeProgramado(falso, plan)
+    falso.peso_reportado = 95   # Otro proceso en la misma IP ya gastó casi todo
+    ex.fetch_ticker('BTC/USDT')
+    ok = lim.disponible() <= 5.5 and lim.ultimo_peso_exchange == 95
+    print(f"   {'✅' if ok else '❌'} Cabecera X-MBX-USED-WEIGHT-1M ajusta el presupuesto ({lim.disponible():.1f} disponible)")
+    return ok
+
+
+def check_union_prioridad():
+    falso = ExchangeFalso()
+    plan = PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=1)
+    ex = ExchangeProgramado(falso, plan)
+    esperas = {}
+
+    def pedir(nombre, prioridad, symbol, latencia=LATENCIA * 2):
+        plan.fijar_prioridad_hilo(prioridad)
+        t = time.monotonic(); ex.fetch_ticker(symbol, latencia=latencia); esperas[nombre] = time.monotonic() - t
+
+    ocupa = threading.Thread(target=pedir, args=('ocupa', PRIORIDAD_ENTRADA, 'ETH/USDT', LATENCIA * 4), name='ocupa')
+    ocupa.start(); time.sleep(LATENCIA / 2)   # El único hueco queda ocupado
+    tg = threading.Thread(target=pedir, args=('tg', PRIORIDAD_TELEGRAM, 'BTC/USDT'), name='tg')
+    tg.start(); time.sleep(LATENCIA / 2)      # Lectura de BTC encolada como TELEGRAM
+    salida = threading.Thread(target=pedir, args=('salida', PRIORIDAD_SALIDA, 'BTC/USDT'), name='salida')
+    salida.start()               # Misma lectura (misma clave) con prioridad SALIDA
+    for h in (ocupa, tg, salida): h.join()
+
+    orden = [c[2] for c in falso.llamadas]
+    ok = orden == ['ocupa', 'salida', 'tg'] and esperas['salida'] < esperas['tg']
+    print(f"   {'✅' if ok else '❌'} Salida no se une a la misma lectura encolada como TELEGRAM: orden {orden}, "
+          f"salida {esperas['salida']*1000:.0f} ms | telegram {esperas['tg']*1000:.0f} ms")
+    return ok
+
+
+def check_lectura_tras_escritura():
+    falso = ExchangeFalso()
+    plan = PlanificadorExchange(LimitadorPeso(6000), max_en_vuelo=4)
+    ex = ExchangeProgramado(falso, plan)
+    vieja = []
+    h = threading.Thread(target=lambda: vieja.append(ex.fetch_open_orders('BTC/USDT')))
+    h.start(); time.sleep(LATENCIA / 2)   # Lectura en vuelo, anterior a la orden
+    orden = ex.create_order('BTC/USDT', 'limit', 'buy', 1, 100.0)
+    despues = ex.fetch_open_orders('BTC/USDT')
+    h.join()
+    ok = vieja == [[]] and orden in despues
+    print(f"   {'✅' if ok else '❌'} fetch_open_orders tras create_order ve la orden (la lectura en vuelo previa: "
+          f"{len(vieja[0]) if vieja else '?'} órdenes)")
+    return ok
+
+
+def check_cabeceras_propias():
+    falso = ExchangeFalso()
+    lim = LimitadorPeso(6000)
+    plan = PlanificadorExchange(lim, max_en_vuelo=4)
+    ex = ExchangeProgramado(falso, plan)
+    vistos = []
+    sincronizar = lim.sincronizar
+    lim.sincronizar = lambda peso: (vistos.append(peso), sincronizar(peso))
+    # A responde primero pero termina después de que responda B (last_response_headers ya es de B)
+    a = threading.Thread(target=lambda: ex.fetch_ticker('A/USDT', latencia=LATENCIA * 2, peso=900))
+    b = threading.Thread(target=lambda: ex.fetch_ticker('B/USDT', latencia=LATENCIA * 3, peso=300))
+    a.start(); time.sleep(LATENCIA / 2); b.start()
+    a.join(); b.join()
+    ok = vistos == [900, 300]
+    print(f"   {'✅' if ok else '❌'} Peso sincronizado con las cabeceras de cada respuesta: {vistos} "
+          f"(last_response_headers al terminar A: 300)")
+    return ok
+
+
+def check_planificador():
+    print("🔬 CHECK PLANIFICADOR DE PETICIONES...")
+    ok = check_prioridades()
+    ok &= check_union_lecturas()
+    ok &= check_peso_exchange()
+    ok &= check_union_prioridad()
+    ok &= check_lectura_tras_escritura()
+    ok &= check_cabeceras_propias()
+    print("\n✅ PLANIFICADOR OK." if ok else "\n❌ PLANIFICADOR CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_planificador()
@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.buffer_velas import BufferVelas
+from MODULOS.resample_velas import ResampleVelas, TEMPORALIDADES
+
+# ==============================================================================
+# CHECK: RESAMPLE INCREMENTAL 1h / 4h / 1D vs df.resample() COMPLETO
+# ==============================================================================
+# 1) Simulación del stream (vela 5m en curso re-pisada, velas nuevas, cruce de
+#    hora / 4h / día): tras cada ciclo, igual a resample().agg().dropna().
+# 2) en_curso=False = sin la última vela; en_curso() = vela que contiene la 5m nueva.
+# 3) Ring lleno (la vela más vieja de pandas queda parcial y se omite) y recarga
+#    del buffer (el tiempo retrocede) -> se rearma solo.
+# 4) Costo por ciclo: 4 resamples de 86k filas vs sincronizar.
+
+PASO_MS = 300_000
+AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def sincronizar(rs, buf):
+    tiempos = buf.tiempos()
+    ini = rs.inicio_pendiente(tiempos)
+    rs.sincronizar(tiempos[ini:].copy(), buf.matriz()[:, ini:].copy())
+
+
+def igual(rs, buf):
+    ok = True
+    df = buf.df()
+    for tf in TEMPORALIDADES:
+        esperado = df.resample(tf).agg(AGG).dropna()
+        obtenido = rs.velas(tf)
+        if buf.capacidad == len(buf):  # Ring lleno: la vela más vieja de pandas es parcial, se omite
+            esperado = esperado.iloc[1:]; obtenido = obtenido.iloc[-len(esperado):]
+        ok &= esperado.index.equals(obtenido.index) and np.allclose(esperado.to_numpy(), obtenido.to_numpy(), rtol=1e-12)
+        ok &= rs.velas(tf, en_curso=False).index[-len(esperado) + 1:].equals(esperado.index[:-1])
+        ok &= rs.en_curso(tf).name == esperado.index[-1]
+    return ok
+
+
+def vela(rng, t, precio):
+    c = precio * np.exp(rng.normal(0, 0.002))
+    return [t, precio, max(precio, c) * 1.001, min(precio, c) * 0.999, c, rng.lognormal(5, 1)]
+
+
+def check_stream():
+    rng = np.random.default_rng(11)
+    t0 = 1_704_067_200_000 - 50 * PASO_MS  # Arranca 50 velas antes de un cambio de día
+    buf = BufferVelas(2500)
+    filas, precio = [], 100.0
+    for i in range(2000):
+        filas.append(vela(rng, t0 + i * PASO_MS, precio)); precio = filas[-1][4]
+    buf.agregar(filas)
+    rs = ResampleVelas(2500)
+    sincronizar(rs, buf)
+    ok, t = igual(rs, buf), t0 + 2000 * PASO_MS
+    for ciclo in range(2400):  # 3 ciclos por vela; cruza el ring lleno
+        if ciclo % 3 == 0: t += PASO_MS
+        buf.agregar([vela(rng, t, precio)])
+        if ciclo % 97 == 0: buf.agregar([vela(rng, t + PASO_MS, precio)]); t += PASO_MS  # 2 velas de golpe
+        sincronizar(rs, buf)
+        ok &= igual(rs, buf)
+    print(f"   {'✅' if ok else '❌'} 2400 ciclos de stream (vela en curso, cruces 1h/4h/1D, ring lleno): "
+          f"igual a resample() completo")
+
+    # Recarga del buffer: el tiempo retrocede
+    buf2 = BufferVelas(2500); buf2.agregar(filas[:1500])
+    sincronizar(rs, buf2)
+    bien = igual(rs, buf2)
+    print(f"   {'✅' if bien else '❌'} Buffer recargado hacia atrás: el resample se rearma")
+    return ok and bien
+
+
+def check_costo():
+    rng = np.random.default_rng(2)
+    n, t0 = 86000, 1_600_000_000_000
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    buf = BufferVelas(n)
+    buf.agregar(np.column_stack([t0 + np.arange(n) * PASO_MS, c, c * 1.001, c * 0.999, c, rng.lognormal(5, 1, n)]).tolist())
+    df = buf.df()
+    t = time.perf_counter()
+    for tf in ['1h', '1h', '1h', 'D']: df.resample(tf).agg(AGG).dropna()  # Seguridad, táctico, HMM, contexto
+    seg_antes = time.perf_counter() - t
+
+    rs = ResampleVelas(n)
+    t = time.perf_counter(); sincronizar(rs, buf); seg_carga = time.perf_counter() - t
+    tiempos = []
+    for j in range(30):
+        buf.agregar([[t0 + (n + j // 3) * PASO_MS, 100, 101, 99, 100, 10.0]])
+        t = time.perf_counter(); sincronizar(rs, buf); tiempos.append(time.perf_counter() - t)
+    seg = float(np.median(tiempos))
+    print(f"   📊 86k velas: 4 resamples por ciclo {seg_antes*1000:.0f} ms | carga inicial {seg_carga*1000:.0f} ms | "
+          f"sincronizar {seg*1000:.2f} ms (x{seg_antes/seg:.0f})")
+    return igual(rs, buf)
+
+
+def check_resample_velas():
+    print("🔬 CHECK RESAMPLE MULTI-TEMPORALIDAD...")
+    ok = check_stream()
+    ok &= check_costo()
+    print("\n✅ RESAMPLE VELAS OK." if ok else "\n❌ RESAMPLE VELAS CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_resample_velas()
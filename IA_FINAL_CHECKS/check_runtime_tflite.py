@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from MODULOS.runtime_tflite import ModeloTFLite, MOTOR
+from training import exportar_tflite
+from training.exportar_tflite import exportar_modelo, muestras_validacion, ATOL_PARIDAD
+from utilidades_checks import construir_modelos, entradas
+
+# ==============================================================================
+# RUNTIME TFLITE (SIN TENSORFLOW) vs KERAS
+# ==============================================================================
+# Los seis modelos del bot con la arquitectura real (pesos sin entrenar) se
+# guardan en .keras y se exportan con training/exportar_tflite.py:
+# 1) Paridad con Keras en las muestras de validación del .npz (ventanas al azar
+#    si no hay datasets) y para lotes de 1/7/30 pares.
+# 2) Reexportación fallida (sin paridad o con error): no queda el .tflite
+#    anterior, que sería de otro entrenamiento.
+# 3) Arranque en un proceso limpio: import + carga + calentamiento de los seis
+#    modelos, tiempo y RSS, Keras (tf.function) vs TFLite.
+
+LOTES = (1, 7, 30)
+
+ARRANQUE_KERAS = """
+import json, os, sys, time; t = time.perf_counter()
+import psutil, tensorflow as tf
+sys.path.append({raiz!r})
+from MODULOS.modelo_compilado import compilar_modelos
+modelos = {{n: tf.keras.models.load_model(os.path.join({dir!r}, f'model_{{n}}.keras'), compile=False) for n in {nombres!r}}}
+compilar_modelos(modelos)
+print(json.dumps({{'seg': time.perf_counter() - t, 'rss': psutil.Process().memory_info().rss, 'tf': 'tensorflow' in sys.modules}}))
+"""
+
+ARRANQUE_TFLITE = """
+import json, os, sys, time; t = time.perf_counter()
+import psutil
+sys.path.append({raiz!r})
+from MODULOS.runtime_tflite import cargar_tflite
+modelos = {{n: cargar_tflite(os.path.join({dir!r}, f'model_{{n}}.tflite'), n) for n in {nombres!r}}}
+print(json.dumps({{'seg': time.perf_counter() - t, 'rss': psutil.Process().memory_info().rss, 'tf': 'tensorflow' in sys.modules}}))
+"""
+
+
+def check_paridad(modelos, directorio):
+    rng = np.random.default_rng(11)
+    ok = True
+    for nombre, modelo in modelos.items():
+        path_keras = os.path.join(directorio, f"model_{nombre}.keras")
+        modelo.save(path_keras)
+        X_val = muestras_validacion(nombre)
+        path_tflite, dif = exportar_modelo(path_keras, X_val)
+        origen = "validación .npz" if X_val is not None else "ventanas al azar"
+        peor_lote = 0.0
+        if path_tflite:
+            tfl = ModeloTFLite(path_tflite, nombre)
+            for n in LOTES:
+                X = entradas(modelo, n, rng)
+                peor_lote = max(peor_lote, float(np.max(np.abs(modelo.predict(X, verbose=0) - tfl.predict(X)))))
+        bien = path_tflite is not None and peor_lote < ATOL_PARIDAD
+        kb = os.path.getsize(path_tflite) / 1024 if path_tflite else 0
+        print(f"   {'✅' if bien else '❌'} {nombre:<14}: dif máx {dif:.1e} ({origen}), {peor_lote:.1e} en lotes 1/7/30 "
+              f"| {kb:.0f} KB")
+        ok &= bien
+    return ok
+
+
+def check_exportacion_fallida(modelos, directorio):
+    nombre = 'IA_CONTEXTO'
+    path_keras = os.path.join(directorio, f"model_{nombre}.keras")
+    path_tflite = path_keras.replace('.keras', '.tflite')
+    ok = os.path.exists(path_tflite)
+    # a) Sin paridad: umbral imposible
+    exportar_tflite.ATOL_PARIDAD = -1.0
+    try: resultado, _ = exportar_modelo(path_keras)
+    finally: exportar_tflite.ATOL_PARIDAD = ATOL_PARIDAD
+    ok &= resultado is None and not os.path.exists(path_tflite) and not os.path.exists(path_tflite + '.tmp')
+    # b) Error: .keras ilegible con un .tflite viejo al lado
+    exportar_modelo(path_keras)
+    path_roto = os.path.join(directorio, "model_ROTO.keras")
+    with open(path_roto, 'wb') as f: f.write(b'no es un keras')
+    shutil.copy(path_tflite, path_roto.replace('.keras', '.tflite'))
+    try: exportar_modelo(path_roto); ok = False
+    except Exception: ok &= not os.path.exists(path_roto.replace('.keras', '.tflite'))
+    print(f"   {'✅' if ok else '❌'} Exportación fallida (sin paridad / con error): se borra el .tflite anterior")
+    return ok
+
+
+def arrancar(plantilla, directorio, nombres):
+    codigo = plantilla.format(raiz=RAIZ, dir=directorio, nombres=nombres)
+    env = {**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, env=env, cwd=RAIZ)
+    ultima = [l for l in salida.stdout.splitlines() if l.startswith('{')]
+    if not ultima: raise RuntimeError(salida.stderr[-500:])
+    return json.loads(ultima[-1])
+
+
+def check_arranque(directorio, nombres):
+    keras_ = arrancar(ARRANQUE_KERAS, directorio, nombres)
+    lite = arrancar(ARRANQUE_TFLITE, directorio, nombres)
+    print(f"   📊 Arranque Keras : {keras_['seg']:5.1f} s | RSS {keras_['rss'] / 2**20:6.0f} MB")
+    print(f"   📊 Arranque TFLite: {lite['seg']:5.1f} s | RSS {lite['rss'] / 2**20:6.0f} MB "
+          f"(x{keras_['seg'] / lite['seg']:.1f} más rápido, {(keras_['rss'] - lite['rss']) / 2**20:.0f} MB menos)")
+    sin_tf = not lite['tf']
+    if MOTOR == 'tensorflow':
+        print("   ⚠️ Sin ai-edge-litert ni tflite_runtime: el runtime cae al intérprete de TensorFlow")
+        return True
+    print(f"   {'✅' if sin_tf else '❌'} El runtime ({MOTOR}) no importa TensorFlow")
+    return sin_tf
+
+
+def check_runtime_tflite():
+    print("🔬 CHECK RUNTIME TFLITE...")
+    directorio = tempfile.mkdtemp(prefix='tflite_')
+    try:
+        modelos = construir_modelos([f'IA_{e}' for e in ['FRPV', 'RANGO', 'BREAKOUT', 'TREND']] +
+                                    ['IA_CONTEXTO', 'IA_TACTICO_1H'], bn='estadisticas')
+        ok = check_paridad(modelos, directorio)
+        ok &= check_exportacion_fallida(modelos, directorio)
+        ok &= check_arranque(directorio, list(modelos))
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+    print("\n✅ RUNTIME TFLITE OK." if ok else "\n❌ RUNTIME TFLITE CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_runtime_tflite()
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.seleccion_gerente import (puntuar_candidatos, seleccionar_candidatos, COLUMNAS_GERENTE,
+                                       UMBRALES_DEFECTO, LEV_DEFENSA, LEV_SNIPER)
+
+# ==============================================================================
+# SELECCIÓN FINAL: GERENTE EN LOTE vs BUCLE POR CANDIDATO
+# ==============================================================================
+# Gerente XGBoost de juguete (mismos hiperparámetros y 13 features que
+# training/entrenar_gerente.py), candidatos y posiciones abiertas al azar:
+# 1) Mismos candidatos aceptados y mismo apalancamiento sugerido que el bucle
+#    anterior (1x13 + predict_proba por candidato), en muchos escenarios.
+# 2) Tiempo de la etapa con cientos de candidatos (cupos del bot) y de puntuar
+#    a todos: una llamada por fila vs una matriz y una llamada al booster.
+
+ESTRATEGIAS = ('FRPV', 'RANGO', 'BREAKOUT', 'TREND')
+CUPOS = (8, 3, 5)  # MAX_TRADES_GLOBAL, MAX_TRADES_STRAT, MAX_TRADES_SIDE de main.py
+ESCENARIOS = 200
+CANDIDATOS_BENCH = (10, 100, 400, 1000)
+
+
+def entrenar_gerente(rng):
+    cols = ['strategy_id', 'side_id'] + list(COLUMNAS_GERENTE)
+    X = pd.DataFrame(rng.normal(size=(4000, len(cols))), columns=cols)
+    y = ((X['prob_ia'] + 0.5 * X['rsi'] + rng.normal(size=len(X))) > 0).astype(int)
+    modelo = XGBClassifier(n_estimators=600, learning_rate=0.015, max_depth=7,
+                           subsample=0.75, colsample_bytree=0.75, eval_metric='logloss')
+    return modelo.fit(X, y)
+
+
+def candidatos_azar(rng, n, pares):
+    cands = [{'symbol': f"PAR{rng.integers(pares)}/USDT", 'strat': ESTRATEGIAS[rng.integers(4)],
+              'side': 'BUY' if rng.random() < 0.5 else 'SELL', 'prob': float(rng.random()), 'meta': '',
+              'prob_ia': float(rng.random()), 'raw_hmm': int(rng.integers(4)), 'raw_ctx': int(rng.integers(4)),
+              'raw_ctx_prob': float(rng.random()), 'raw_tac': int(rng.integers(4)), 'raw_tac_prob': float(rng.random()),
+              'atr_pct': float(rng.random() * 3), 'rsi': float(rng.normal()), 'btc_trend': float(rng.normal()),
+              'hour': int(rng.integers(24)), 'day': int(rng.integers(7))} for _ in range(n)]
+    cands.sort(key=lambda x: x['prob'], reverse=True)
+    return cands
+
+
+def activos_azar(rng, pares):
+    activos = {}
+    for _ in range(rng.integers(0, 9)):
+        s, strat = f"PAR{rng.integers(pares)}/USDT", ESTRATEGIAS[rng.integers(4)]
+        activos[f"{s}_{strat}"] = {'symbol': s, 'side': 'BUY' if rng.random() < 0.5 else 'SELL'}
+    return activos
+
+
+def bucle_anterior(gerente, candidatos, activos, strat_map_inv, umbrales_pro, cupos=CUPOS):
+    """El bucle de main_loop antes del cambio (sin prints): [(índice, lev_sugerido)]."""
+    max_global, max_strat, max_side = cupos
+    seen, final, espacio = set(), [], max_global - len(activos)
+    for i, c in enumerate(candidatos):
+        if c['symbol'] in seen or espacio <= 0: continue
+        direccion = next((v['side'] for v in activos.values() if v['symbol'] == c['symbol']), None)
+        if direccion is not None and direccion != c['side']: continue
+        if sum(1 for k in activos if c['strat'] in k) + sum(1 for j, _ in final if candidatos[j]['strat'] == c['strat']) >= max_strat: continue
+        if sum(1 for v in activos.values() if v['side'] == c['side']) + sum(1 for j, _ in final if candidatos[j]['side'] == c['side']) >= max_side: continue
+        f = np.array([[strat_map_inv.get(c['strat'], -1), 1 if c['side'] == 'BUY' else 0] + [c[k] for k in COLUMNAS_GERENTE]])
+        p = gerente.predict_proba(f)[:, 1][0]
+        cfg = umbrales_pro.get(c['strat'], {}).get(c['side'], UMBRALES_DEFECTO)
+        lev = 1 if p < cfg['veto'] else 12 if p >= cfg['agresivo'] else None
+        final.append((i, lev))
+        seen.add(c['symbol'])
+        espacio -= 1
+    return final
+
+
+def etapa_lote(gerente, candidatos, activos, strat_map_inv, umbrales_pro, cupos=CUPOS):
+    """Como main_loop: selección con contadores y Gerente en lote sobre los elegidos."""
+    elegidos, _ = seleccionar_candidatos(candidatos, activos, *cupos)
+    if not elegidos: return []
+    _, lev = puntuar_candidatos(gerente, [candidatos[i] for i in elegidos], strat_map_inv, umbrales_pro)
+    return [(i, int(l) if l in (LEV_DEFENSA, LEV_SNIPER) else None) for i, l in zip(elegidos, lev)]
+
+
+def puntuar_uno_a_uno(gerente, candidatos, strat_map_inv):
+    return [gerente.predict_proba(np.array([[strat_map_inv.get(c['strat'], -1), 1 if c['side'] == 'BUY' else 0]
+                                            + [c[k] for k in COLUMNAS_GERENTE]]))[:, 1][0] for c in candidatos]
+
+
+def check_paridad(gerente, strat_map_inv, umbrales_pro):
+    rng = np.random.default_rng(21)
+    ok, aceptados, sugeridos = True, 0, 0
+    for _ in range(ESCENARIOS):
+        pares = int(rng.integers(3, 60))
+        cands, activos = candidatos_azar(rng, int(rng.integers(0, 60)), pares), activos_azar(rng, pares)
+        ref = bucle_anterior(gerente, cands, activos, strat_map_inv, umbrales_pro)
+        ok &= etapa_lote(gerente, cands, activos, strat_map_inv, umbrales_pro) == ref
+        aceptados += len(ref)
+        sugeridos += sum(lev is not None for _, lev in ref)
+    print(f"   {'✅' if ok else '❌'} {ESCENARIOS} escenarios: mismos aceptados ({aceptados}) y apalancamiento "
+          f"({sugeridos} con x1/x12) que el bucle por candidato")
+    return ok
+
+
+def mejor_ms(fn, veces=5):
+    mejor = np.inf
+    for _ in range(veces):
+        t = time.perf_counter(); fn(); mejor = min(mejor, time.perf_counter() - t)
+    return mejor * 1000
+
+
+def check_latencia(gerente, strat_map_inv, umbrales_pro):
+    rng = np.random.default_rng(4)
+    print("   📊 ms por ciclo (mejor de N) | etapa: bucle anterior | contadores + lote "
+          "|| Gerente en todos: uno a uno | lote")
+    for n in CANDIDATOS_BENCH:
+        cands, activos = candidatos_azar(rng, n, n), activos_azar(rng, n)
+        ms_bucle = mejor_ms(lambda: bucle_anterior(gerente, cands, activos, strat_map_inv, umbrales_pro))
+        ms_etapa = mejor_ms(lambda: etapa_lote(gerente, cands, activos, strat_map_inv, umbrales_pro))
+        ms_uno = mejor_ms(lambda: puntuar_uno_a_uno(gerente, cands, strat_map_inv), 2)
+        ms_lote = mejor_ms(lambda: puntuar_candidatos(gerente, cands, strat_map_inv, umbrales_pro))
+        print(f"      {n:>5} candidatos: {ms_bucle:7.2f} | {ms_etapa:6.2f} (x{ms_bucle / ms_etapa:.1f}) "
+              f"|| {ms_uno:8.2f} | {ms_lote:6.2f} (x{ms_uno / ms_lote:.0f})")
+
+
+def check_seleccion_gerente():
+    print("🔬 CHECK SELECCIÓN GERENTE EN LOTE...")
+    rng = np.random.default_rng(0)
+    gerente = entrenar_gerente(rng)
+    strat_map_inv = {s: i for i, s in enumerate(sorted(ESTRATEGIAS))}
+    # Umbrales como config_umbrales_pro.json (TREND/SELL sin entrada: usa los de defecto)
+    umbrales_pro = {s: {lado: {"veto": 0.35, "agresivo": 0.65} for lado in ('BUY', 'SELL')} for s in ESTRATEGIAS}
+    del umbrales_pro['TREND']['SELL']
+    ok = check_paridad(gerente, strat_map_inv, umbrales_pro)
+    check_latencia(gerente, strat_map_inv, umbrales_pro)
+    print("\n✅ SELECCIÓN GERENTE OK." if ok else "\n❌ SELECCIÓN GERENTE CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_seleccion_gerente()
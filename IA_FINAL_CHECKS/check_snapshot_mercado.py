@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.snapshot_mercado import SnapshotPuntas, SnapshotPosiciones, ESPERA_REINTENTO_SEG
+
+# ==============================================================================
+# CHECK DE LOS SNAPSHOTS POR CICLO (EXCHANGE FALSO, SIN RED)
+# ==============================================================================
+# Cuenta las llamadas al exchange para verificar que un ciclo completo hace una
+# sola petición masiva, y que una foto vieja nunca se usa.
+
+PARES = [f"C{i}/USDT" for i in range(23)]
+
+
+class ExchangeFalso:
+
+    def __init__(self):
+        self.llamadas = {}
+        self.caido = False
+
+    def _contar(self, metodo):
+        self.llamadas[metodo] = self.llamadas.get(metodo, 0) + 1
+        if self.caido: raise ConnectionError("exchange caído")
+
+    def fetch_bids_asks(self, symbols=None):
+        self._contar('fetch_bids_asks')
+        return {f"{p}:USDT": {'symbol': f"{p}:USDT", 'bid': 99.0 + i, 'ask': 100.0 + i} for i, p in enumerate(PARES)}
+
+    def fetch_positions(self, symbols=None):
+        self._contar('fetch_positions')
+        # Binance devuelve también las posiciones en cero
+        return [{'symbol': f"{p}:USDT", 'contracts': 5.0 if i < 8 else 0.0, 'side': 'long'} for i, p in enumerate(PARES)]
+
+
+def check_puntas():
+    ex = ExchangeFalso()
+    puntas = SnapshotPuntas(max_edad_seg=0.3)
+    puntas.refrescar(ex)
+
+    # Ciclo: spread de los 23 pares + PnL del dashboard
+    spreads = [puntas.spread(p, ex) for p in PARES]
+    salida_buy = puntas.precio_salida('C0/USDT', 'BUY')
+    salida_sell = puntas.precio_salida('C0/USDT', 'SELL')
+    ok = ex.llamadas == {'fetch_bids_asks': 1} and None not in spreads
+    print(f"   {'✅' if ok else '❌'} 23 spreads + dashboard con {ex.llamadas.get('fetch_bids_asks', 0)} llamada(s)")
+    bien = (salida_buy, salida_sell) == (99.0, 100.0) and abs(spreads[0] - 0.01) < 1e-12
+    print(f"   {'✅' if bien else '❌'} BUY sale al bid, SELL al ask ('C0/USDT:USDT' -> 'C0/USDT')")
+    ok &= bien
+
+    # Foto vieja: sin exchange -> None; con exchange -> se re-pide una vez
+    time.sleep(ESPERA_REINTENTO_SEG + 0.1)
+    bien = puntas.spread('C0/USDT') is None and puntas.spread('C0/USDT', ex) is not None and ex.llamadas['fetch_bids_asks'] == 2
+    print(f"   {'✅' if bien else '❌'} Límite de antigüedad (None si está vieja, un solo re-pedido)")
+    ok &= bien
+
+    # Exchange caído: nunca se devuelve un precio viejo, y no se re-pide par por par
+    time.sleep(ESPERA_REINTENTO_SEG + 0.1); ex.caido = True
+    bien = all(puntas.spread(p, ex) is None for p in PARES) and ex.llamadas['fetch_bids_asks'] == 3
+    print(f"   {'✅' if bien else '❌'} Exchange caído -> sin dato y un solo intento para 23 pares")
+    return ok and bien
+
+
+def check_posiciones():
+    ex = ExchangeFalso()
+    pos = SnapshotPosiciones(max_edad_seg=5)
+    antes = datetime.now()
+    pos.refrescar(ex)
+
+    # Ciclo con 8 trades reales + auditoría
+    tamaños = [pos.contratos(p, ex) for p in PARES[:8]]
+    cerrado = pos.contratos(PARES[10], ex)
+    crudas = pos.posiciones(ex)
+    ok = ex.llamadas == {'fetch_positions': 1} and tamaños == [5.0] * 8 and cerrado == 0.0 and len(crudas) == len(PARES)
+    print(f"   {'✅' if ok else '❌'} 8 trades + auditoría con {ex.llamadas.get('fetch_positions', 0)} llamada(s)")
+
+    # Trade abierto después de la foto: no se puede dar por cerrado
+    bien = pos.contratos(PARES[12], desde=datetime.now()) is None and pos.contratos(PARES[12], desde=antes) == 0.0
+    print(f"   {'✅' if bien else '❌'} Trade posterior a la foto -> 'no se sabe' (no cierre externo)")
+    return ok and bien
+
+
+def check_snapshot_mercado():
+    print("🔬 CHECK SNAPSHOTS DE MERCADO...")
+    ok = check_puntas()
+    ok &= check_posiciones()
+    print("\n✅ SNAPSHOTS OK." if ok else "\n❌ SNAPSHOTS CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_snapshot_mercado()
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from websockets.sync.server import serve
+
+# Este script va en la carpeta raíz del proyecto (o se lanza desde ella)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.stream_velas import StreamVelas, nombre_stream
+from MODULOS.buffer_velas import BufferVelas
+
+# ==============================================================================
+# CHECK DEL STREAM DE VELAS CONTRA UN SERVIDOR FALSO LOCAL
+# ==============================================================================
+# No toca Binance: levanta un websocket en localhost que imita el stream
+# combinado de futuros (vela en curso -> vela cerrada -> vela nueva),
+# corta la conexión y comprueba que el cliente reconecta y pide relleno REST.
+# Tras el corte el servidor empuja una vela varias posiciones adelante (como
+# Binance tras una caída larga): el relleno debe salir de la marca previa al
+# corte, no de la última vela del buffer, y la serie queda contigua.
+
+SIMBOLOS = ["BTC/USDT", "ETH/USDT"]
+TF = "5m"
+T0 = 1_700_000_100_000  # ms, múltiplo de 5m
+PASO = 300_000
+SALTO = 4  # Velas que avanza el mercado durante el corte
+
+
+def kline(symbol, t, close, cerrada):
+    par = symbol.replace('/', '')
+    return json.dumps({
+        "stream": nombre_stream(symbol, TF),
+        "data": {
+            "e": "kline", "E": t + 1000, "s": par,
+            "k": {"t": t, "T": t + PASO - 1, "s": par, "i": TF,
+                  "o": "100.0", "h": str(max(100.0, close)), "l": str(min(100.0, close)),
+                  "c": str(close), "v": "12.5", "x": cerrada}
+        }
+    })
+
+
+def servidor_falso(conexiones):
+    def handler(ws):
+        conexiones.append(ws.request.path)
+        n = len(conexiones)
+        if n == 1:
+            for s in SIMBOLOS:
+                ws.send(kline(s, T0, 101.0, False))      # En curso
+            time.sleep(0.2)
+            for s in SIMBOLOS:
+                ws.send(kline(s, T0, 102.0, True))       # Cerrada
+            time.sleep(0.2)
+            for s in SIMBOLOS:
+                ws.send(kline(s, T0 + PASO, 102.5, False))  # Vela nueva -> cierre
+            time.sleep(0.5)
+            return  # Cortamos: el cliente debe reconectar
+        # Segunda conexión: el mercado siguió, primero llega la vela actual
+        for s in SIMBOLOS:
+            ws.send(kline(s, T0 + SALTO * PASO, 103.0, False))
+        time.sleep(3)
+
+    server = serve(handler, "localhost", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rest_falso(since):
+    """fetch_ohlcv: velas desde 'since' hasta la actual."""
+    return [[t, 100.0, 101.0, 99.0, 100.5, 1.0] for t in range(since, T0 + SALTO * PASO + 1, PASO)]
+
+
+def check_stream_velas():
+    print("🔬 CHECK STREAM DE VELAS (servidor falso local)...")
+    conexiones, recibidas = [], []
+    server = servidor_falso(conexiones)
+    puerto = server.socket.getsockname()[1]
+    buffers = {s: BufferVelas(100) for s in SIMBOLOS}
+
+    def al_recibir(sym, vela, cerrada):
+        recibidas.append((sym, vela, cerrada))
+        buffers[sym].agregar([vela])
+
+    # Como el main: la última vela cargada antes de arrancar el stream
+    stream = StreamVelas(SIMBOLOS, TF, al_recibir=al_recibir, url_base=f"ws://localhost:{puerto}/stream",
+                         aperturas={s: T0 - PASO for s in SIMBOLOS})
+    ok = True
+    try:
+        stream.iniciar()
+
+        # 1. Cierre de vela detectado
+        cierre = stream.esperar_cierre(10)
+        print(f"   {'✅' if cierre else '❌'} esperar_cierre() detecta la vela nueva")
+        ok &= cierre
+
+        # 2. Primera conexión -> relleno REST pendiente (una sola vez)
+        primera = stream.consumir_reconexion() == {s: T0 - PASO for s in SIMBOLOS} and stream.consumir_reconexion() is None
+        print(f"   {'✅' if primera else '❌'} Arranque marca relleno REST una sola vez, desde la última vela cargada")
+        ok &= primera
+
+        # 3. Payload parseado en formato ccxt
+        cerradas = [r for r in recibidas if r[2]]
+        bien = (len(cerradas) == len(SIMBOLOS) and
+                cerradas[0][1] == [T0, 100.0, 102.0, 100.0, 102.0, 12.5] and
+                {r[0] for r in cerradas} == set(SIMBOLOS))
+        print(f"   {'✅' if bien else '❌'} Velas cerradas recibidas: {len(cerradas)}")
+        ok &= bien
+
+        # 4. Reconexión tras el corte del servidor
+        limite = time.time() + 10
+        while stream.conexiones < 2 and time.time() < limite:
+            time.sleep(0.1)
+        while any(b.ultimo_timestamp() != T0 + SALTO * PASO for b in buffers.values()) and time.time() < limite:
+            time.sleep(0.1)
+        desde = stream.consumir_reconexion()
+        reconecta = stream.conexiones >= 2 and desde == {s: T0 + PASO for s in SIMBOLOS}
+        print(f"   {'✅' if reconecta else '❌'} Reconexión -> relleno REST pendiente desde la vela en curso al cortar")
+        ok &= reconecta
+
+        # 5. Relleno (como rellenar_huecos del main) con la vela actual ya empujada
+        ultimas = {s: b.ultimo_timestamp() for s, b in buffers.items()}
+        for s, b in buffers.items(): b.agregar(rest_falso((desde or {}).get(s, ultimas[s])))
+        esperado = list(range(T0, T0 + SALTO * PASO + 1, PASO))
+        contigua = all(b.tiempos().tolist() == esperado for b in buffers.values())
+        print(f"   {'✅' if contigua else '❌'} Vela actual empujada antes del relleno (buffer en "
+              f"+{(ultimas[SIMBOLOS[0]] - T0) // PASO}): serie contigua de {len(esperado)} velas tras rellenar")
+        ok &= contigua
+
+        # 6. URL multiplexada
+        url_ok = conexiones and conexiones[0] == "/stream?streams=btcusdt@kline_5m/ethusdt@kline_5m"
+        print(f"   {'✅' if url_ok else '❌'} Suscripción combinada: {conexiones[0] if conexiones else '-'}")
+        ok &= bool(url_ok)
+
+    finally:
+        stream.detener()
+        server.shutdown()
+
+    print("\n✅ STREAM OK." if ok else "\n❌ STREAM CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_stream_velas()
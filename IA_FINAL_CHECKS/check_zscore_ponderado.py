@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.market_context import zscore_ponderado_movil
+
+# ==============================================================================
+# CHECK: Z-SCORE SESGO PONDERADO (FORMA CERRADA vs ROLLING.APPLY ORIGINAL)
+# ==============================================================================
+# 1) Misma salida que el rolling(50).apply con np.average ponderado (1 x30 + 2 x20).
+# 2) NaN iniciales y huecos: ventanas con NaN dan NaN, como rolling.
+# 3) Escala: miles de pares x años de filas diarias de una vez.
+
+BIAS_LEN = 50
+BIAS_WEIGHT_START = 20
+WEIGHTS = np.concatenate([np.ones(BIAS_LEN - BIAS_WEIGHT_START), np.full(BIAS_WEIGHT_START, 2.0)])
+
+
+def weighted_zscore_calc(x):
+    """Implementación original de market_context (referencia)."""
+    if len(x) != BIAS_LEN: return np.nan
+    w_mean = np.average(x, weights=WEIGHTS)
+    variance = np.average((x - w_mean)**2, weights=WEIGHTS)
+    w_std = np.sqrt(variance)
+    if w_std < 1e-12: w_std = 1e-12
+    return (x[-1] - w_mean) / w_std
+
+
+def original(serie):
+    return serie.rolling(window=BIAS_LEN).apply(weighted_zscore_calc, raw=True)
+
+
+def sesgo_sintetico(n_dias, semilla):
+    """Como 'Promedio Últimos N': SMA 50 de la diferencia de retornos suavizados (muy autocorrelada)."""
+    rng = np.random.default_rng(semilla)
+    activo = pd.Series(rng.normal(0.001, 0.04, n_dias)).rolling(5).mean()
+    mercado = pd.Series(rng.normal(0.0005, 0.03, n_dias)).rolling(5).mean()
+    return (activo - mercado).rolling(50).mean()
+
+
+def check_paridad():
+    ok = True
+    peor = 0.0
+    for semilla in range(5):
+        s = sesgo_sintetico(3000, semilla)
+        if semilla == 3: s.iloc[1500] = np.nan          # Hueco en el medio
+        if semilla == 4: s.iloc[2000:2060] = 0.0007     # Tramo plano (desvío ~0)
+        a = original(s).to_numpy()
+        b = zscore_ponderado_movil(s, BIAS_LEN, BIAS_WEIGHT_START, 2.0).to_numpy()
+        mismos_nan = np.array_equal(np.isnan(a), np.isnan(b))
+        m = ~np.isnan(a)
+        # El tramo plano da ruido / 1e-12: comparamos solo donde el desvío es real
+        err = np.abs(a[m] - b[m]) / np.maximum(1.0, np.abs(a[m]))
+        err = err[np.abs(a[m]) < 1e6] if semilla == 4 else err
+        peor = max(peor, float(err.max()))
+        ok &= mismos_nan and err.max() < 1e-6
+    print(f"   {'✅' if ok else '❌'} 5 series x 3000 días (con hueco y tramo plano): error relativo máx {peor:.1e}")
+    return ok
+
+
+def check_escala():
+    n_dias, n_pares = 2000, 2000
+    rng = np.random.default_rng(0)
+    matriz = pd.DataFrame(rng.normal(0, 1e-3, (n_dias, n_pares))).rolling(50).mean().to_numpy()
+
+    t = time.perf_counter()
+    z = zscore_ponderado_movil(matriz, BIAS_LEN, BIAS_WEIGHT_START, 2.0)
+    seg = time.perf_counter() - t
+
+    col = pd.Series(matriz[:, 17])
+    t = time.perf_counter(); ref = original(col); seg_ref = time.perf_counter() - t
+    bien = np.allclose(z[:, 17], ref.to_numpy(), rtol=1e-6, atol=1e-8, equal_nan=True)
+    print(f"   {'✅' if bien else '❌'} {n_pares} pares x {n_dias} días en {seg*1000:.0f} ms "
+          f"(rolling.apply: {seg_ref*1000:.0f} ms por par -> ~{seg_ref*n_pares:.0f} s)")
+    return bien
+
+
+def check_zscore_ponderado():
+    print("🔬 CHECK Z-SCORE SESGO PONDERADO...")
+    ok = check_paridad()
+    ok &= check_escala()
+    print("\n✅ Z-SCORE PONDERADO OK." if ok else "\n❌ Z-SCORE PONDERADO CON FALLOS.")
+    return ok
+
+
+if __name__ == "__main__":
+    check_zscore_ponderado()
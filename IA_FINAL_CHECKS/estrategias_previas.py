@@ -0,0 +1,269 @@
+import numpy as np
+import pandas_ta as ta
+
+# ==============================================================================
+# ESTRATEGIAS ANTERIORES AL GRAFO DE INDICADORES (COPIA CONGELADA)
+# ==============================================================================
+# aplicar_estrategia() de cada módulo de ESTRATEGIAS tal como estaba antes de
+# MODULOS/grafo_indicadores.py (pandas_ta, cada módulo calcula lo suyo y el main
+# los encadena). Solo para comparar costo y resultados en IA_FINAL_CHECKS.
+
+
+def frpv(df):
+    """
+    [ESTRATEGIA PRIVADA - VERSIÓN DEMO]
+    
+    NOTA PARA RECLUTADORES / NOTE TO REVIEWERS:
+    La lógica propietaria exacta (KAMA/LRC/MTF Logic) ha sido ocultada 
+    en este repositorio público por protección de Propiedad Intelectual.
+    
+    Este archivo contiene una implementación genérica de 'Mean Reversion' 
+    para demostrar la estructura del código y el flujo de datos sin revelar 
+    el Alpha real.
+    
+    ---------------------------------------------------------------------
+    1. Calcula Señales de Entrada (Genéricas para Demo).
+    2. Calcula Features MICRO (5m) para que el pipeline de IA no se rompa.
+    """
+    
+    # ==============================================================================
+    # A. INDICADORES TÉCNICOS
+    # ==============================================================================
+
+    df['KAMA'] = ta.ema(df['close'], length=50) 
+    df['SMA_200'] = ta.sma(df['close'], length=200)
+    df['LRC'] = ta.sma(df['close'], length=100) 
+    
+    # --------------------------------------------------------------------------
+    # B. FEATURES MICRO
+    # --------------------------------------------------------------------------
+    epsilon = 1e-9
+    
+    # 1. Retorno 5m
+    df['f_5m_ret'] = df['close'].pct_change()
+    
+    # 2. Z-Score Volumen (Estándar)
+    VOL_LEN_MICRO = 200
+    vol_mean = df['volume'].rolling(VOL_LEN_MICRO).mean()
+    vol_std = df['volume'].rolling(VOL_LEN_MICRO).std()
+    z_score_raw = (df['volume'] - vol_mean) / (vol_std + epsilon)
+    df['f_5m_vol_z'] = ta.sma(z_score_raw, length=3)
+    
+    # 3. Distancias
+    df['f_dist_kama'] = (df['close'] - df['KAMA']) / (df['KAMA'] + epsilon)
+    df['f_dist_lrc']  = (df['close'] - df['LRC'])  / (df['LRC'] + epsilon)
+    df['f_dist_sma']  = (df['close'] - df['SMA_200']) / (df['SMA_200'] + epsilon)
+    
+    # 4. Overextension
+    dist_sma = df['close'] - df['SMA_200']
+    mean_dist = dist_sma.abs().rolling(100).mean()
+    df['f_5m_overext'] = 0
+    df.loc[df['close'] > (df['SMA_200'] + mean_dist), 'f_5m_overext'] = 1  
+    df.loc[df['close'] < (df['SMA_200'] - mean_dist), 'f_5m_overext'] = -1 
+
+    # ==============================================================================
+    # C. LÓGICA DE SEÑALES
+    # ==============================================================================
+    
+    df_1h = df.resample('1h').agg({'close': 'last'}).dropna()
+    df_1h['sma_1h'] = ta.sma(df_1h['close'], length=50)
+    
+    
+    df = df.join(df_1h['sma_1h'].reindex(df.index, method='ffill'))
+
+    # ==============================================================================
+    # D. SEÑALES FINALES
+    # ==============================================================================
+    
+    
+    buy_cond = (df['close'] > df['KAMA']) & (df['f_5m_vol_z'] > 1)
+    sell_cond = (df['close'] < df['KAMA']) & (df['f_5m_vol_z'] > 1)
+
+    
+    df['Real Price Buy'] = np.where(buy_cond, df['close'], np.nan)
+    df['Real Price Sell'] = np.where(sell_cond, df['close'], np.nan)
+    
+    # Limpieza de columnas temporales
+    df.drop(columns=['sma_1h'], inplace=True, errors='ignore')
+
+    return df
+
+
+def mean_reversion(df):
+    """
+    Estrategia de Rango / Reversión a la Media.
+    Compra en soportes dinámicos (Bollinger) cuando el mercado está "tranquilo" (ADX bajo).
+    """
+    
+    # --------------------------------------------------------------------------
+    # 1. INDICADORES (Con validación de existencia)
+    # --------------------------------------------------------------------------
+    
+    # Bandas de Bollinger (20, 2)
+    if 'BB_Lower' not in df.columns:
+        bb = ta.bbands(df['close'], length=20, std=2)
+        
+        bb.columns = ['BB_Lower', 'BB_Mid', 'BB_Upper', 'BB_Width', 'BB_Pct']
+        df = df.join(bb)
+    
+    # RSI (14)
+    if 'RSI' not in df.columns:
+        df['RSI'] = ta.rsi(df['close'], length=14)
+    
+    # ADX (14) - Filtro de Tendencia
+    if 'ADX' not in df.columns:
+        adx = ta.adx(df['high'], df['low'], df['close'], length=14)
+        # ADX devuelve 3 columnas (ADX, DMP, DMN)
+        df['ADX'] = adx.iloc[:, 0]
+
+    # --------------------------------------------------------------------------
+    # 2. REGLAS DE ENTRADA
+    # --------------------------------------------------------------------------
+    
+    # LONG:
+    # 1. Precio cierra por debajo o tocando la Banda Inferior (Sobreventa estadística)
+    # 2. RSI < 35 (Sobreventa de momentum)
+    # 3. ADX < 25 (Ausencia de tendencia fuerte -> El precio tiende a volver al centro)
+    long_cond = (
+        (df['close'] <= df['BB_Lower']) & 
+        (df['RSI'] < 35) & 
+        (df['ADX'] < 25)
+    )
+    
+    # SHORT:
+    # 1. Precio cierra por encima o tocando la Banda Superior
+    # 2. RSI > 65
+    # 3. ADX < 25
+    short_cond = (
+        (df['close'] >= df['BB_Upper']) & 
+        (df['RSI'] > 65) & 
+        (df['ADX'] < 25)
+    )
+    
+    # --------------------------------------------------------------------------
+    # 3. SALIDAS (LABELING)
+    # --------------------------------------------------------------------------
+    df['Real_Price_Rango_Buy'] = np.where(long_cond, df['close'], np.nan)
+    df['Real_Price_Rango_Sell'] = np.where(short_cond, df['close'], np.nan)
+    
+    return df
+
+
+def breakout(df):
+    """
+    Estrategia de Breakout / Explosión de Volatilidad (TTM Squeeze simplificado).
+    Busca momentos donde la volatilidad se comprime y luego explota.
+    """
+    
+    # --------------------------------------------------------------------------
+    # 1. BOLLINGER BANDS (20, 2)
+    # --------------------------------------------------------------------------
+    if 'BB_Lower' not in df.columns:
+        bb = ta.bbands(df['close'], length=20, std=2)
+        # pandas_ta devuelve: Lower, Mid, Upper, Bandwidth, Percent
+        bb.columns = ['BB_Lower', 'BB_Mid', 'BB_Upper', 'BB_Width', 'BB_Pct']
+        df = df.join(bb)
+    
+    # --------------------------------------------------------------------------
+    # 2. KELTNER CHANNELS (20, 1.5)
+    # --------------------------------------------------------------------------
+    if 'KC_Lower' not in df.columns:
+        kc = ta.kc(df['high'], df['low'], df['close'], length=20, scalar=1.5)
+        kc.columns = ['KC_Lower', 'KC_Mid', 'KC_Upper']
+        df = df.join(kc)
+    
+    # --------------------------------------------------------------------------
+    # 3. VOLUMEN SMA (20)
+    # --------------------------------------------------------------------------
+    # Usamos 20 (Corto Plazo) porque el Breakout es un evento inmediato.
+    # Queremos volumen anormal respecto a las últimas horas.
+    if 'Vol_SMA' not in df.columns:
+        df['Vol_SMA'] = ta.sma(df['volume'], length=20)
+
+    # --------------------------------------------------------------------------
+    # LÓGICA SQUEEZE
+    # --------------------------------------------------------------------------
+    # Bollinger DENTRO de Keltner = Posible volatilidad comprimida
+    squeeze_on = (
+        (df['BB_Lower'] > df['KC_Lower']) & 
+        (df['BB_Upper'] < df['KC_Upper'])
+    )
+    
+    # --------------------------------------------------------------------------
+    # SEÑALES
+    # --------------------------------------------------------------------------
+    # LONG:
+    # 1. Veníamos de squeeze (shift 1 es True)
+    # 2. El precio rompe la Banda Superior
+    # 3. Hay explosión de volumen (> 1.5 veces el promedio local)
+    long_cond = (
+        (squeeze_on.shift(1) == True) & 
+        (df['close'] > df['BB_Upper']) & 
+        (df['volume'] > df['Vol_SMA'] * 1.5)
+    )
+    
+    # SHORT:
+    # 1. Veníamos de squeeze
+    # 2. El precio rompe la Banda Inferior
+    # 3. Hay explosión de volumen
+    short_cond = (
+        (squeeze_on.shift(1) == True) & 
+        (df['close'] < df['BB_Lower']) & 
+        (df['volume'] > df['Vol_SMA'] * 1.5)
+    )
+
+    # --------------------------------------------------------------------------
+    # SALIDAS (LABELING)
+    # --------------------------------------------------------------------------
+    df['Real_Price_Breakout_Buy'] = np.where(long_cond, df['close'], np.nan)
+    df['Real_Price_Breakout_Sell'] = np.where(short_cond, df['close'], np.nan)
+    
+    return df
+
+
+def simple_trend(df):
+    """
+    Estrategia Trend Following Clásica (Golden Cross / Death Cross).
+    Cruces de EMA 50 y EMA 200.
+    """
+    
+    # --------------------------------------------------------------------------
+    # 1. INDICADORES
+    # --------------------------------------------------------------------------
+    
+    if 'EMA_50' not in df.columns:
+        df['EMA_50'] = ta.ema(df['close'], length=50)
+        
+    if 'EMA_200' not in df.columns: 
+        
+        df['EMA_200'] = ta.ema(df['close'], length=200)
+
+    # --------------------------------------------------------------------------
+    # 2. SEÑALES (Lógica Vectorizada Manual)
+    # --------------------------------------------------------------------------
+    
+    
+    # LONG (Golden Cross): 
+    # Hoy EMA50 está ARRIBA de EMA200 Y Ayer estaba ABAJO o IGUAL
+    long_cond = (
+        (df['EMA_50'] > df['EMA_200']) & 
+        (df['EMA_50'].shift(1) <= df['EMA_200'].shift(1))
+    )
+    
+    # SHORT (Death Cross):
+    # Hoy EMA50 está ABAJO de EMA200 Y Ayer estaba ARRIBA o IGUAL
+    short_cond = (
+        (df['EMA_50'] < df['EMA_200']) & 
+        (df['EMA_50'].shift(1) >= df['EMA_200'].shift(1))
+    )
+
+    # --------------------------------------------------------------------------
+    # 3. SALIDAS (LABELING)
+    # --------------------------------------------------------------------------
+    df['Real_Price_Trend_Buy'] = np.where(long_cond, df['close'], np.nan)
+    df['Real_Price_Trend_Sell'] = np.where(short_cond, df['close'], np.nan)
+    
+    return df
+
+
+ESTRATEGIAS_PREVIAS = [frpv, mean_reversion, breakout, simple_trend]
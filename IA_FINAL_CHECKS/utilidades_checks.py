@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# UTILIDADES COMPARTIDAS POR LOS CHECKS
+# ==============================================================================
+# Velas 5m sintéticas, comparaciones con NaN y cronómetro "mejor de N" que usan
+# check_grafo_indicadores, check_evaluacion_cola, check_indicadores_incrementales
+# y check_kernels_indicadores. Modelos Keras con la arquitectura real y sus
+# entradas para check_lstm_numpy, check_inferencia_lote, check_modelo_compilado
+# y check_runtime_tflite (TensorFlow se importa solo al construirlos).
+
+SHAPE_MACRO, SHAPE_TACTICO, SHAPE_MICRO = (14, 10), (48, 5), (60, 7)
+
+
+def velas_sinteticas(n, semilla, tramo_plano=0):
+    """Velas 5m (UTC) de un paseo aleatorio. tramo_plano > 0: esas velas a mitad de
+    serie quedan sin operaciones (high == low == close: varianza 0 y rangos 0)."""
+    rng = np.random.default_rng(semilla)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.002, n)) * close + 1e-6
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(8, 1, n)
+    if tramo_plano:
+        plano = slice(n // 2, n // 2 + tramo_plano)
+        high[plano] = low[plano] = close[plano] = close[n // 2]
+    idx = pd.date_range('2024-01-01', periods=n, freq='5min', tz='UTC')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=idx)
+
+
+def iguales(a, b):
+    """Bit a bit, NaN en las mismas posiciones."""
+    return np.array_equal(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), equal_nan=True)
+
+
+def error_relativo(a, b):
+    """Error máximo relativo a a (absoluto cerca de 0); inf si los NaN no coinciden."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if not np.array_equal(np.isnan(a), np.isnan(b)): return np.inf
+    m = ~np.isnan(a)
+    return float(np.max(np.abs(a[m] - b[m]) / (1.0 + np.abs(a[m])), initial=0.0))
+
+
+def mejor_de(fn, veces=3):
+    """Segundos de la corrida más rápida de fn() entre `veces`."""
+    mejor = np.inf
+    for _ in range(veces):
+        t = time.perf_counter(); fn(); mejor = min(mejor, time.perf_counter() - t)
+    return mejor
+
+
+def construir_modelos(nombres, bn=None, semilla=5):
+    """
+    {nombre: modelo Keras} con la arquitectura real, sin entrenar. Por nombre: '..CONTEXTO..'
+    -> contexto, '..TACTICO..' -> táctico, el resto -> estrategia (micro + macro).
+    bn: None (como salen de construir), 'estadisticas' (medias/varianzas no triviales, como
+    tras entrenar) o 'completa' (además gamma/beta al azar): el plegado tiene que importar.
+    """
+    from training.train_ensemble import construir_modelo_estrategia, construir_modelo_contexto, construir_modelo_tactico
+    modelos = {}
+    for n in nombres:
+        if 'CONTEXTO' in n: modelos[n] = construir_modelo_contexto(SHAPE_MACRO, 4)[0]
+        elif 'TACTICO' in n: modelos[n] = construir_modelo_tactico(SHAPE_TACTICO, 4)[0]
+        else: modelos[n] = construir_modelo_estrategia(SHAPE_MICRO, SHAPE_MACRO)[0]
+    if bn is None: return modelos
+
+    rng = np.random.default_rng(semilla)
+    for m in modelos.values():
+        for capa in m.layers:
+            if capa.__class__.__name__ == 'BatchNormalization':
+                g, b, media, var = capa.get_weights()
+                if bn == 'completa': g, b = rng.normal(1, 0.3, g.shape), rng.normal(0, 0.3, b.shape)
+                capa.set_weights([g, b, rng.normal(0, 0.5, media.shape), rng.uniform(0.5, 2.0, var.shape)])
+    return modelos
+
+
+def entradas(modelo, n, rng):
+    """Lote de n ventanas al azar con las formas de entrada del modelo (lista si son varias)."""
+    X = [rng.normal(size=(n,) + tuple(t.shape[1:])).astype(np.float32) for t in modelo.inputs]
+    return X if len(X) > 1 else X[0]
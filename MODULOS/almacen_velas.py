@@ -0,0 +1,121 @@
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# ALMACÉN DE VELAS EN DISCO (APPEND-ONLY, POR PAR Y MES)
+# ==============================================================================
+# <carpeta>/<PAR>_<tf>/<AAAA-MM>.bin -> registros binarios fijos (time + OHLCV).
+# - Solo se agregan velas CERRADAS y posteriores a la última guardada.
+# - La lectura usa np.memmap (sin parseo) y solo abre los meses pedidos.
+# - Si el proceso muere a mitad de escritura, el registro parcial se descarta.
+
+DTYPE_VELA = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'),
+                       ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')])
+
+COLUMNAS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _mes(ts_ms):
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime('%Y-%m')
+
+
+class AlmacenVelas:
+
+    def __init__(self, carpeta, timeframe='5m'):
+        self.carpeta = carpeta
+        self.timeframe = timeframe
+        self._lock = threading.Lock()
+        self._ultimo = {}  # symbol -> último time (ms) en disco
+        os.makedirs(carpeta, exist_ok=True)
+
+    def _dir(self, symbol):
+        return os.path.join(self.carpeta, f"{symbol.split(':')[0].replace('/', '')}_{self.timeframe}")
+
+    def _archivos(self, symbol):
+        d = self._dir(symbol)
+        if not os.path.isdir(d): return []
+        return sorted(os.path.join(d, f) for f in os.listdir(d) if f.endswith('.bin'))
+
+    def _leer(self, ruta):
+        """memmap del archivo, ignorando un registro parcial al final."""
+        n = os.path.getsize(ruta) // DTYPE_VELA.itemsize
+        if n == 0: return np.empty(0, dtype=DTYPE_VELA)
+        return np.memmap(ruta, dtype=DTYPE_VELA, mode='r', shape=(n,))
+
+    def _reparar(self, ruta):
+        """Trunca la cola corrupta (escritura interrumpida) antes de volver a agregar."""
+        tam = os.path.getsize(ruta)
+        sobra = tam % DTYPE_VELA.itemsize
+        if sobra:
+            with open(ruta, 'r+b') as f: f.truncate(tam - sobra)
+
+    # --------------------------------------------------------------------------
+    # LECTURA
+    # --------------------------------------------------------------------------
+    def ultimo_timestamp(self, symbol):
+        with self._lock:
+            if symbol not in self._ultimo:
+                ultimo = None
+                for ruta in reversed(self._archivos(symbol)):
+                    datos = self._leer(ruta)
+                    if len(datos):
+                        ultimo = int(datos['time'][-1]); break
+                self._ultimo[symbol] = ultimo
+            return self._ultimo[symbol]
+
+    def cargar(self, symbol, desde_ms=None):
+        """DataFrame OHLCV (índice UTC) desde 'desde_ms' (o todo). None si no hay datos."""
+        mes_desde = _mes(desde_ms) if desde_ms is not None else None
+        partes = []
+        for ruta in self._archivos(symbol):
+            if mes_desde and os.path.basename(ruta)[:7] < mes_desde: continue
+            datos = self._leer(ruta)
+            if desde_ms is not None: datos = datos[datos['time'] >= desde_ms]
+            if len(datos): partes.append(np.array(datos))
+        if not partes: return None
+
+        datos = np.concatenate(partes)
+        df = pd.DataFrame({c: datos[c] for c in COLUMNAS},
+                          index=pd.to_datetime(datos['time'], unit='ms', utc=True))
+        df.index.name = 'time'
+        return df
+
+    # --------------------------------------------------------------------------
+    # ESCRITURA
+    # --------------------------------------------------------------------------
+    def agregar(self, symbol, velas):
+        """
+        Agrega velas cerradas [time_ms, o, h, l, c, v] (o DataFrame OHLCV con índice de tiempo).
+        Lo que no sea posterior a la última vela guardada se ignora. Devuelve cuántas escribió.
+        """
+        if isinstance(velas, pd.DataFrame):
+            if velas.empty: return 0
+            registros = np.empty(len(velas), dtype=DTYPE_VELA)
+            registros['time'] = velas.index.as_unit('ms').asi8
+            for c in COLUMNAS: registros[c] = velas[c].to_numpy(dtype=np.float64)
+        else:
+            if not velas: return 0
+            registros = np.array([tuple(v[:6]) for v in velas], dtype=DTYPE_VELA)
+
+        self.ultimo_timestamp(symbol)  # Asegura la marca en memoria
+        with self._lock:
+            ultimo = self._ultimo[symbol]
+            if ultimo is not None: registros = registros[registros['time'] > ultimo]
+            if len(registros) == 0: return 0
+            registros = registros[np.argsort(registros['time'], kind='stable')]
+
+            os.makedirs(self._dir(symbol), exist_ok=True)
+            meses = np.datetime_as_string(registros['time'].astype('datetime64[ms]').astype('datetime64[M]'))
+            for mes in dict.fromkeys(meses):
+                ruta = os.path.join(self._dir(symbol), f"{mes}.bin")
+                if os.path.exists(ruta): self._reparar(ruta)
+                with open(ruta, 'ab') as f:
+                    f.write(registros[meses == mes].tobytes())
+                    f.flush()
+
+            self._ultimo[symbol] = int(registros['time'][-1])
+            return len(registros)
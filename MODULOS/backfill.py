@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ccxt
+
+from MODULOS.limitador_peso import LimitadorPeso, peso_klines, peso_usado_de_headers, PESO_MINUTO_FUTUROS, PESO_MINUTO_SPOT
+
+# ==============================================================================
+# MOTOR DE BACKFILL (DESCARGA HISTÓRICA PARALELA CON LÍMITE DE PESO)
+# ==============================================================================
+# - Muchos pares a la vez (un hilo por par, páginas secuenciales dentro del par).
+# - Todas las peticiones pasan por el mismo LimitadorPeso: el techo es el peso
+#   que permite Binance, no nuestro bucle.
+# - Cada página se escribe al destino apenas llega (no se acumula todo en RAM).
+# - Reanuda desde el último timestamp del destino (checkpoint = el propio archivo).
+#
+# Un destino es cualquier objeto con:
+#   ultimo_timestamp(symbol) -> int ms | None
+#   agregar(symbol, velas)   -> velas [time_ms, o, h, l, c, v] ordenadas
+# (AlmacenVelas del bot en vivo y DestinoCSV de los descargadores lo cumplen).
+
+LIMITE_PAGINA = 1000
+REINTENTOS_MAX = 5
+
+
+def crear_exchange_publico(mercado='future'):
+    """Instancia sin claves y sin el rate-limit interno de ccxt (lo maneja el limitador)."""
+    return ccxt.binance({
+        'enableRateLimit': False,
+        'options': {'defaultType': mercado, 'adjustForTimeDifference': True}
+    })
+
+
+class DestinoCSV:
+    """
+    Un CSV por par (<carpeta>/<PAR>.csv) con columnas time,open,high,low,close,volume
+    (time en ms, igual que los descargadores originales). Append por página.
+    """
+    CABECERA = "time,open,high,low,close,volume\n"
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        os.makedirs(carpeta, exist_ok=True)
+
+    def ruta(self, symbol):
+        return os.path.join(self.carpeta, f"{symbol.split(':')[0].replace('/', '')}.csv")
+
+    def ultimo_timestamp(self, symbol):
+        ruta = self.ruta(symbol)
+        if not os.path.exists(ruta): return None
+        with open(ruta, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            cola = f.read().decode('utf-8', errors='ignore')
+        # La última línea puede estar cortada por un crash: solo cuentan las completas
+        lineas = cola[:cola.rfind('\n') + 1].splitlines()
+        for linea in reversed(lineas):
+            try: return int(float(linea.split(',')[0]))
+            except ValueError: continue  # Cabecera o basura
+        return None
+
+    def _termina_en_salto(self, ruta):
+        with open(ruta, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def agregar(self, symbol, velas):
+        if not velas: return 0
+        ruta = self.ruta(symbol)
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        if not nuevo and not self._termina_en_salto(ruta):
+            # Cortamos la línea parcial que dejó un crash
+            with open(ruta, 'rb+') as f:
+                datos = f.read()
+                f.truncate(datos.rfind(b'\n') + 1)
+        with open(ruta, 'a') as f:
+            if nuevo: f.write(self.CABECERA)
+            f.writelines(f"{int(v[0])},{v[1]},{v[2]},{v[3]},{v[4]},{v[5]}\n" for v in velas)
+        return len(velas)
+
+
+class MotorBackfill:
+
+    def __init__(self, mercado='future', timeframe='5m', limitador=None, workers=16,
+                 crear_exchange=None):
+        self.mercado = mercado
+        self.timeframe = timeframe
+        self.workers = workers
+        self.limitador = limitador or LimitadorPeso(PESO_MINUTO_FUTUROS if mercado == 'future' else PESO_MINUTO_SPOT)
+        self.crear_exchange = crear_exchange or (lambda: crear_exchange_publico(mercado))
+        self.peso_pagina = peso_klines(LIMITE_PAGINA, mercado)
+
+        self._local = threading.local()
+        self._base = None
+        self._print_lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # EXCHANGE POR HILO (ccxt sync no es thread-safe; los mercados se cargan una vez)
+    # --------------------------------------------------------------------------
+    def _exchange(self):
+        ex = getattr(self._local, 'exchange', None)
+        if ex is None:
+            ex = self.crear_exchange()
+            ex.set_markets(self._base.markets, self._base.currencies)
+            self._local.exchange = ex
+        return ex
+
+    def _pedir(self, ex, symbol, since):
+        self.limitador.consumir(self.peso_pagina)
+        try:
+            return ex.fetch_ohlcv(symbol, timeframe=self.timeframe, since=since, limit=LIMITE_PAGINA)
+        finally:
+            self.limitador.sincronizar(peso_usado_de_headers(getattr(ex, 'last_response_headers', None)))
+
+    def _log(self, msg):
+        with self._print_lock: print(msg, flush=True)
+
+    # --------------------------------------------------------------------------
+    # DESCARGA DE UN PAR
+    # --------------------------------------------------------------------------
+    def _descargar_par(self, symbol, destino, desde_ms, hasta_ms):
+        ex = self._exchange()
+        ultimo = destino.ultimo_timestamp(symbol)
+        since = max(desde_ms, ultimo + 1) if ultimo is not None else desde_ms
+        total, fallos = 0, 0
+
+        while since <= hasta_ms:
+            try:
+                velas = self._pedir(ex, symbol, since)
+                fallos = 0
+            except ccxt.BadSymbol:
+                return symbol, total, "par inexistente"
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+                espera = 60
+                retry = (getattr(ex, 'last_response_headers', None) or {}).get('Retry-After')
+                if retry: espera = int(retry)
+                self._log(f"   🚦 {symbol}: límite de peso ({e.__class__.__name__}). Pausa global {espera}s.")
+                self.limitador.pausar(espera)
+                continue
+            except Exception as e:
+                fallos += 1
+                if fallos > REINTENTOS_MAX: return symbol, total, f"error: {e}"
+                time.sleep(min(2 ** fallos, 30))
+                continue
+
+            if not velas: break
+            pagina_completa = len(velas) >= LIMITE_PAGINA
+            velas = [v for v in velas if since <= v[0] <= hasta_ms]
+            if not velas: break
+
+            destino.agregar(symbol, velas)
+            total += len(velas)
+            since = velas[-1][0] + 1
+            if not pagina_completa: break  # Llegamos al presente
+
+        return symbol, total, None
+
+    # --------------------------------------------------------------------------
+    # API
+    # --------------------------------------------------------------------------
+    def ejecutar(self, simbolos, destino, desde_ms, hasta_ms=None, silent=False):
+        """
+        Descarga [desde_ms, hasta_ms] para todos los pares en paralelo, reanudando
+        desde lo que ya tenga el destino. Por defecto hasta la última vela cerrada.
+        Devuelve {symbol: velas nuevas}.
+        """
+        if self._base is None:
+            self._base = self.crear_exchange()
+            self._base.load_markets()
+        if hasta_ms is None:
+            # Solo velas cerradas: la vela en curso no se escribe (el checkpoint la saltaría)
+            hasta_ms = self._base.milliseconds() - self._base.parse_timeframe(self.timeframe) * 1000
+
+        t0 = time.time(); peso0 = self.limitador.peso_consumido
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futuros = [executor.submit(self._descargar_par, s, destino, desde_ms, hasta_ms) for s in simbolos]
+            for fut in as_completed(futuros):
+                symbol, n, error = fut.result()
+                resultados[symbol] = n
+                if silent: continue
+                if error: self._log(f"   ⚠️ {symbol}: {error} ({n} velas)")
+                else: self._log(f"   ✅ {symbol}: {n} velas nuevas")
+
+        seg = time.time() - t0
+        if not silent:
+            peso = self.limitador.peso_consumido - peso0
+            print(f"📦 Backfill: {sum(resultados.values())} velas, {len(simbolos)} pares en {seg:.1f}s "
+                  f"| peso {peso} ({peso / max(seg, 1e-9) * 60:.0f}/min de {self.limitador.limite})")
+        return resultados
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# BUFFER DE VELAS (RING BUFFER COLUMNAR PREASIGNADO)
+# ==============================================================================
+# Un buffer por par con capacidad fija: time (ms) + open/high/low/close/volume.
+# Cada fila se escribe dos veces (posición p y p + capacidad). Así la ventana
+# completa siempre es un tramo contiguo del array y se puede exponer como vista
+# sin copiar, con escritura O(1) y sin compactaciones.
+#
+# NOTA: Las vistas apuntan a la memoria del buffer. Son válidas hasta la próxima
+# escritura; quien las use mientras escribe el stream debe leer bajo el lock.
+
+COLUMNAS = ['open', 'high', 'low', 'close', 'volume']
+_IDX = {c: i for i, c in enumerate(COLUMNAS)}
+
+
+class BufferVelas:
+
+    def __init__(self, capacidad):
+        self.capacidad = int(capacidad)
+        self._t = np.zeros(2 * self.capacidad, dtype=np.int64)
+        self._v = np.zeros((len(COLUMNAS), 2 * self.capacidad), dtype=np.float64)
+        self._n = 0       # Filas válidas (<= capacidad)
+        self._total = 0   # Filas escritas desde el inicio (define la posición de escritura)
+        self._indice = None  # Cache del DatetimeIndex (solo cambia con vela nueva)
+
+    @classmethod
+    def desde_dataframe(cls, df, capacidad):
+        buf = cls(capacidad)
+        buf.cargar(df)
+        return buf
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def vacio(self):
+        return self._n == 0
+
+    # --------------------------------------------------------------------------
+    # ESCRITURA
+    # --------------------------------------------------------------------------
+    def _inicio(self):
+        return (self._total - self._n) % self.capacidad
+
+    def _escribir(self, t, fila):
+        p = self._total % self.capacidad
+        self._t[p] = self._t[p + self.capacidad] = t
+        self._v[:, p] = self._v[:, p + self.capacidad] = fila
+        self._total += 1
+        if self._n < self.capacidad: self._n += 1
+        self._indice = None
+
+    def _pisar(self, i, fila):
+        """Sobrescribe la fila i de la ventana (0 = más vieja) en ambas copias."""
+        p = (self._inicio() + i) % self.capacidad
+        self._v[:, p] = self._v[:, p + self.capacidad] = fila
+
+    def _reescribir(self, t, valores):
+        """Reemplaza la ventana por (t, valores (5, n)) ordenados; quedan las últimas 'capacidad'."""
+        t, valores = t[-self.capacidad:], valores[:, -self.capacidad:]
+        n = len(t)
+        self._t[:n] = self._t[self.capacidad:self.capacidad + n] = t
+        self._v[:, :n] = self._v[:, self.capacidad:self.capacidad + n] = valores
+        self._n = self._total = n
+        self._indice = None
+
+    def _insertar(self, velas):
+        """Inserta en orden velas {t: fila} anteriores a la última (relleno de un hueco). O(n)."""
+        t = np.concatenate([self.tiempos(), np.fromiter(velas, dtype=np.int64, count=len(velas))])
+        valores = np.concatenate([self.matriz(), np.array(list(velas.values()), dtype=np.float64).T], axis=1)
+        orden = np.argsort(t, kind='stable')
+        self._reescribir(t[orden], valores[:, orden])
+
+    def cargar(self, df):
+        """Carga inicial desde un DataFrame OHLCV con índice de tiempo."""
+        if df is None or df.empty: return
+        df = df.iloc[-self.capacidad:]
+        t = df.index.as_unit('ms').asi8 if isinstance(df.index, pd.DatetimeIndex) else np.asarray(df.index, dtype=np.int64)
+        self._reescribir(t, df[COLUMNAS].to_numpy(dtype=np.float64).T)
+
+    def agregar(self, velas):
+        """
+        Upsert de velas [time_ms, o, h, l, c, v] (formato ccxt), en orden de tiempo.
+        - Misma marca que una vela existente -> se pisa en el lugar (vela en curso).
+        - Marca posterior a la última -> se agrega al final.
+        - Marca anterior sin coincidencia (hueco rellenado por REST tras un corte, cuando el
+          stream ya empujó la vela actual) -> se inserta en su lugar, una sola reescritura
+          por llamada. Si la ventana está llena y es más vieja que toda ella, queda fuera.
+        """
+        huecos = {}
+        for vela in velas:
+            t = int(vela[0]); fila = vela[1:6]
+            if any(x is None for x in fila): continue
+
+            if self._n == 0 or t > self.ultimo_timestamp():
+                self._escribir(t, fila)
+                continue
+
+            if t == self.ultimo_timestamp():
+                self._pisar(self._n - 1, fila)
+                continue
+
+            tiempos = self.tiempos()
+            i = int(np.searchsorted(tiempos, t))
+            if i < self._n and tiempos[i] == t: self._pisar(i, fila)
+            else: huecos[t] = fila
+
+        if huecos: self._insertar(huecos)
+
+    # --------------------------------------------------------------------------
+    # LECTURA (VISTAS SIN COPIA)
+    # --------------------------------------------------------------------------
+    def _vista(self, arr):
+        ini = self._inicio()
+        v = arr[..., ini:ini + self._n]
+        v.flags.writeable = False
+        return v
+
+    def tiempos(self):
+        """Vista int64 (ms) de las marcas de apertura."""
+        return self._vista(self._t)
+
+    def columna(self, nombre):
+        """Vista float64 de una columna ('open', 'high', 'low', 'close', 'volume')."""
+        return self._vista(self._v[_IDX[nombre]])
+
+    def matriz(self):
+        """Vista (5, n) con todas las columnas en orden COLUMNAS."""
+        return self._vista(self._v)
+
+    def ultimo_timestamp(self):
+        return int(self._t[(self._total - 1) % self.capacidad]) if self._n else None
+
+    def ultima(self, nombre='close'):
+        return float(self._v[_IDX[nombre], (self._total - 1) % self.capacidad]) if self._n else None
+
+    def indice(self):
+        """DatetimeIndex UTC de la ventana. Se cachea: solo se reconstruye con vela nueva."""
+        if self._indice is None:
+            self._indice = pd.DatetimeIndex(self.tiempos().view('M8[ms]'), name='time').tz_localize('UTC')
+        return self._indice
+
+    def df(self):
+        """
+        Fachada pandas barata: los datos OHLCV son la vista del buffer (sin copia).
+        Es de solo lectura; agregar columnas o modificar produce copia (copy-on-write).
+        """
+        return pd.DataFrame(self.matriz().T, index=self.indice(), columns=COLUMNAS, copy=False)
+
+    def serie(self, nombre):
+        """pd.Series sin copia de una columna, con el índice temporal."""
+        return pd.Series(self.columna(nombre), index=self.indice(), name=nombre, copy=False)
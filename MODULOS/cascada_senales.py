@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pandas as pd
+
+# ==============================================================================
+# CASCADA SEÑAL CRUDA -> REGÍMENES -> LSTM DE ESTRATEGIA
+# ==============================================================================
+# Una estrategia solo puede dar candidato si su columna de señal (buy / sell)
+# está en la fila -2; la mayoría de los ciclos casi ningún par tiene señal. El
+# análisis se ordena de barato a caro y cada etapa corta a la siguiente:
+#   1) señal cruda (columnas de ESTRATEGIAS, ya calculadas por el motor incremental);
+#   2) ventanas + CONTEXTO / TACTICO / HMM solo para pares con señal;
+#   3) LSTM de estrategia solo para (estrategia, lado) con señal y permiso.
+# Los pares sin señal igual pasan por regímenes cada 'refresco_vistas_seg' para
+# mantener al día bot_state["ai_views"] (lo que muestra /info).
+#
+# Contadores por etapa del ciclo y acumulados: cuántos pares llegaron a cada
+# etapa y cuántos se ahorraron los regímenes.
+
+ETAPAS = ('pares', 'con_senal', 'refresco_vistas', 'sin_senal', 'estrategias', 'candidatos')
+
+
+def senales_crudas(row, config_strat):
+    """(estrategia, lado) con señal en la fila: columna 'buy' / 'sell' de CONFIG_STRAT no nula."""
+    return [(strat, lado) for strat, cfg in config_strat.items()
+            for lado, col in (('BUY', cfg['buy']), ('SELL', cfg['sell'])) if not pd.isna(row.get(col))]
+
+
+class CascadaSenales:
+    """Agenda de refresco de ai_views para pares sin señal + contadores por etapa (thread-safe)."""
+
+    def __init__(self, refresco_vistas_seg):
+        self.refresco_vistas_seg = refresco_vistas_seg
+        self._vistas = {}     # symbol -> time.monotonic() del último ai_views escrito
+        self._lock = threading.Lock()
+        self.ciclo = dict.fromkeys(ETAPAS, 0)
+        self.total = dict.fromkeys(ETAPAS, 0)
+
+    def pide_vista(self, symbol, ahora=None):
+        """True si el ai_views del par nunca se escribió o tiene más de refresco_vistas_seg."""
+        ahora = time.monotonic() if ahora is None else ahora
+        with self._lock: ultima = self._vistas.get(symbol)
+        return ultima is None or ahora - ultima >= self.refresco_vistas_seg
+
+    def vista_al_dia(self, symbol, ahora=None):
+        with self._lock: self._vistas[symbol] = time.monotonic() if ahora is None else ahora
+
+    def nuevo_ciclo(self):
+        with self._lock: self.ciclo = dict.fromkeys(ETAPAS, 0)
+
+    def contar(self, etapa, n=1):
+        with self._lock:
+            self.ciclo[etapa] += n
+            self.total[etapa] += n
+
+    def resumen(self):
+        c, t = self.ciclo, self.total
+        ahorro = f"{t['sin_senal'] / t['pares']:.0%}" if t['pares'] else "-"
+        return (f"{c['pares']} pares -> {c['con_senal']} con señal (+{c['refresco_vistas']} refresco /info) -> "
+                f"{c['estrategias']} LSTM estrategia -> {c['candidatos']} candidatos | "
+                f"sin regímenes: {c['sin_senal']} (acumulado {ahorro})")
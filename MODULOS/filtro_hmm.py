@@ -0,0 +1,154 @@
+import threading
+
+import numpy as np
+
+# ==============================================================================
+# FILTRO HMM EN LÍNEA (FORWARD) POR PAR
+# ==============================================================================
+# predict() sobre la última fila escalada es Viterbi de UNA observación: elige
+# argmax(startprob_ * b(x)) y descarta transmat_ (la persistencia del régimen).
+# Acá se guarda por par el vector forward normalizado
+#     α_t = P(cluster | x_1..x_t)
+# y con cada hora 1h cerrada nueva:
+#     α_t ∝ (α_{t-1} @ transmat_) * b(x_t)
+# O(K²) + K densidades gaussianas (Cholesky de covars_ precalculada al cargar).
+# Todos los pares que avanzaron una hora van en un solo paso: (n, K) @ (K, K).
+#
+# Sin estado previo (arranque, modelo recargado) o si la marca guardada quedó
+# fuera de la cola 1h disponible: α_0 ∝ startprob_ * b(x_0) y se filtra la cola
+# entera. El posterior del último paso es el mismo que da predict_proba() de
+# hmmlearn para esa secuencia (forward-backward, último instante).
+#
+# Una hora con alguna feature no finita (volumen 0 -> Vol_Chg = log(0) = -inf)
+# es observación faltante: ese paso solo aplica transmat_ y la marca avanza igual
+# (si se descartara, el par pediría esa hora en cada ciclo y quedaría sin cluster).
+
+
+def _covarianzas(modelo, K, D):
+    """Covarianzas completas (K, D, D). Con 'spherical' hmmlearn 0.3 devuelve K*D matrices en covars_: se arman."""
+    if getattr(modelo, 'covariance_type', 'full') == 'spherical':
+        var = np.asarray(modelo._covars_, dtype=np.float64).reshape(K, -1)[:, 0]
+        return var[:, None, None] * np.eye(D)
+    return np.asarray(modelo.covars_, dtype=np.float64)
+
+
+class FiltroHMM:
+    """Parámetros de un GaussianHMM entrenado (cualquier covariance_type) y el paso forward en lote."""
+
+    def __init__(self, modelo):
+        self.start = np.asarray(modelo.startprob_, dtype=np.float64)
+        self.transmat = np.asarray(modelo.transmat_, dtype=np.float64)
+        self.medias = np.asarray(modelo.means_, dtype=np.float64)          # (K, D)
+        self.K, self.D = self.medias.shape
+        L = np.linalg.cholesky(_covarianzas(modelo, self.K, self.D))
+        self.inv_L = np.linalg.inv(L)
+        self.cte = -np.log(np.diagonal(L, axis1=1, axis2=2)).sum(axis=1) - 0.5 * self.D * np.log(2 * np.pi)
+
+    def log_emision(self, X):
+        """log N(x | media_k, cov_k) para cada fila y cluster: (n, D) -> (n, K)."""
+        X = np.asarray(X, dtype=np.float64)
+        falta = ~np.isfinite(X).all(axis=1)
+        dif = np.where(falta[:, None], 0.0, X)[:, None, :] - self.medias[None]
+        z = np.einsum('ked,nkd->nke', self.inv_L, dif)
+        log_b = self.cte - 0.5 * np.einsum('nke,nke->nk', z, z)
+        log_b[falta] = 0.0   # Observación faltante: no informa, solo queda la transición
+        return log_b
+
+    def _normalizar(self, previa, log_b):
+        p = previa * np.exp(log_b - log_b.max(axis=1, keepdims=True))
+        s = p.sum(axis=1, keepdims=True)
+        nula = s[:, 0] <= 0  # Observación imposible bajo la previa: se reparte desde startprob_
+        if nula.any():
+            p[nula] = self.start * np.exp(log_b[nula] - log_b[nula].max(axis=1, keepdims=True))
+            s[nula] = p[nula].sum(axis=1, keepdims=True)
+        return p / s
+
+    def paso(self, alfa, X):
+        """Un paso para n pares a la vez: alfa (n, K) del paso anterior, X (n, D) -> alfa nuevo (n, K)."""
+        return self._normalizar(np.asarray(alfa) @ self.transmat, self.log_emision(X))
+
+    def inicio(self, X):
+        """α_0 de n secuencias que arrancan: (n, D) -> (n, K)."""
+        return self._normalizar(np.broadcast_to(self.start, (len(X), self.K)), self.log_emision(X))
+
+    def filtrar(self, X, alfa=None):
+        """Secuencia (T, D) de un par desde alfa (K,) o desde startprob_ si es None -> alfa final (K,)."""
+        X = np.asarray(X, dtype=np.float64)
+        log_b = self.log_emision(X)
+        a = (self.start if alfa is None else np.asarray(alfa) @ self.transmat)[None]
+        for t in range(len(X)):
+            a = self._normalizar(a, log_b[t:t + 1])
+            if t + 1 < len(X): a = a @ self.transmat
+        return a[0]
+
+
+class SeguidorHMM:
+    """Vector forward por par y la marca (última hora cerrada filtrada). Thread-safe."""
+
+    def __init__(self, modelo):
+        self.filtro = FiltroHMM(modelo)
+        self._estado = {}     # symbol -> (marca, alfa)
+        self._lock = threading.Lock()
+        self.pasos = 0        # Horas filtradas en total
+        self.lotes = 0        # Pasos en lote (varios pares, una hora)
+        self.reinicios = 0    # Filtros arrancados de startprob_
+
+    def posterior(self, symbol, marca):
+        """Posterior de clusters si el filtro del par ya está en 'marca'; None si faltan horas."""
+        with self._lock: guardado = self._estado.get(symbol)
+        return guardado[1] if guardado is not None and marca is not None and guardado[0] == marca else None
+
+    def desde(self, symbol, marcas):
+        """
+        Posición en 'marcas' (horas cerradas con features, en orden) de la primera hora que falta
+        filtrar; None si hay que reiniciar (sin estado o la marca guardada no está en la cola).
+        """
+        with self._lock: guardado = self._estado.get(symbol)
+        if guardado is None: return None
+        pos = marcas.searchsorted(guardado[0])
+        return pos + 1 if pos < len(marcas) and marcas[pos] == guardado[0] else None
+
+    def actualizar(self, pedidos):
+        """
+        pedidos: [(symbol, marca_final, X (k, D), reinicio)]. Los de una hora sin reinicio van en
+        un solo paso en lote; los demás (arranque, horas atrasadas) se filtran fila por fila.
+        Devuelve {symbol: posterior}.
+        """
+        salidas = {}
+        with self._lock: previos = {s: self._estado.get(s) for s, _, _, _ in pedidos}
+        simples = [p for p in pedidos if len(p[2]) == 1 and not p[3] and previos[p[0]] is not None]
+        if simples:
+            alfa = self.filtro.paso(np.stack([previos[s][1] for s, _, _, _ in simples]),
+                                    np.concatenate([X for _, _, X, _ in simples]))
+            for (s, _, _, _), a in zip(simples, alfa): salidas[s] = a
+            self.lotes += 1
+        ya = {p[0] for p in simples}
+        for s, _, X, reinicio in pedidos:
+            if s in ya or len(X) == 0: continue
+            salidas[s] = self.filtro.filtrar(X, None if reinicio or previos[s] is None else previos[s][1])
+            if reinicio or previos[s] is None: self.reinicios += 1
+        with self._lock:
+            for s, marca, X, _ in pedidos:
+                if s in salidas: self._estado[s] = (marca, salidas[s])
+            self.pasos += sum(len(X) for s, _, X, _ in pedidos if s in salidas)
+        return salidas
+
+
+def pedido_hmm(seguidor, symbol, feats, scaler):
+    """
+    Pedido de SeguidorHMM.actualizar() con las horas cerradas 'feats' (DataFrame, columnas en el
+    orden del modelo) que le faltan al par; None si no hay horas nuevas. ±inf cuenta como NaN, se
+    descarta el calentamiento (antes de la primera hora completa) y las horas incompletas que
+    siguen van como observación faltante (NaN, sin pasar por el scaler).
+    """
+    feats = feats.replace([np.inf, -np.inf], np.nan)
+    completas = feats.notna().all(axis=1).to_numpy()
+    if not completas.any(): return None
+    primera = int(np.argmax(completas))
+    feats, completas = feats.iloc[primera:], completas[primera:]
+    desde = seguidor.desde(symbol, feats.index)
+    nuevas, completas = feats.iloc[desde or 0:], completas[desde or 0:]
+    if nuevas.empty: return None
+    X = np.full(nuevas.shape, np.nan)
+    if completas.any(): X[completas] = scaler.transform(nuevas.values[completas])
+    return symbol, nuevas.index[-1], X, desde is None
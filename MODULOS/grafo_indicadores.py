@@ -0,0 +1,294 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from MODULOS import kernels_indicadores as kernels
+
+# ==============================================================================
+# REGISTRO Y GRAFO DE INDICADORES
+# ==============================================================================
+# Cada indicador es un NODO: (nombre, parámetros, temporalidad). Dos estrategias
+# que piden lo mismo (Bollinger 20/2, RSI 14, EMA 50...) apuntan al MISMO nodo y
+# se calcula una sola vez. Un nodo puede leer columnas base (open/high/low/close/
+# volume) u otros nodos (p.ej. z-score sobre media/desvío): eso arma el grafo.
+#
+# Cada estrategia declara:
+#   INDICADORES = {columna: (nodo, salida)}  -> lo que lee
+#   SEÑALES     = (columnas de señal,)        -> lo que escribe
+#   señales(d)  -> {columna: array}           -> lógica, leyendo solo de 'd'
+# y el motor (lote: AlmacenIndicadores, vivo: MotorIndicadores) resuelve el resto.
+#
+# MODO COLA: cada indicador declara su memoria (filas previas de las que depende
+# su valor; en EMA/RMA, las necesarias para que el arranque pese < TOLERANCIA_COLA).
+# calentamiento(nodos) suma la memoria a lo largo de las dependencias y
+# evaluar_cola() calcula solo las filas consumidas + ese calentamiento.
+#
+# NOTA: en señales() cada d[col] es un array NumPy float64 (misma lógica en lote y
+# en vivo, sin el costo fijo de pandas por operación sobre una cola de ~130 filas).
+# Puede mirar como máximo MEMORIA_SEÑALES filas hacia atrás (previa()); en vivo se
+# evalúa solo sobre la cola.
+
+EPSILON = 1e-9
+MEMORIA_SEÑALES = 1
+TOLERANCIA_COLA = 1e-13  # Peso máximo que le queda al arranque de una EMA/RMA recortada
+COLUMNAS_BASE = ('open', 'high', 'low', 'close', 'volume')
+AGG_OHLCV = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+Nodo = namedtuple('Nodo', ['nombre', 'params', 'temporalidad'])
+Indicador = namedtuple('Indicador', ['salidas', 'entradas', 'memoria', 'lote', 'defaults'])
+
+REGISTRO = {}
+
+
+def registrar(nombre, salidas, entradas, memoria, **defaults):
+    """
+    Registra un indicador. 'entradas(p)' devuelve las fuentes que lee (columna base o
+    (nodo, salida)), 'memoria(p)' las filas previas que necesita y 'lote(*series, **p)'
+    calcula todas sus salidas (Series alineadas a las velas).
+    """
+    def decorador(fn):
+        REGISTRO[nombre] = Indicador(tuple(salidas), entradas, memoria, fn, defaults)
+        return fn
+    return decorador
+
+
+def nodo(nombre, temporalidad='5m', **params):
+    """Nodo normalizado (defaults incluidos): misma definición -> misma clave."""
+    ind = REGISTRO[nombre]
+    completos = {**ind.defaults, **params}
+    return Nodo(nombre, tuple(sorted(completos.items())), temporalidad)
+
+
+def dependencias(n):
+    """Fuentes del nodo: columnas base (str) o (nodo, salida)."""
+    return REGISTRO[n.nombre].entradas(dict(n.params))
+
+
+def ordenar(nodos):
+    """Cierre del grafo en orden topológico (dependencias primero), sin repetidos."""
+    orden, vistos = [], set()
+
+    def visitar(n):
+        if n in vistos: return
+        vistos.add(n)
+        for f in dependencias(n):
+            if not isinstance(f, str): visitar(f[0])
+        orden.append(n)
+
+    for n in nodos: visitar(n)
+    return orden
+
+
+def horizonte(alpha):
+    """Filas para que el valor inicial de un EWM(alpha) pese menos que TOLERANCIA_COLA."""
+    return int(math.ceil(math.log(TOLERANCIA_COLA) / math.log(1.0 - alpha)))
+
+
+def calentamiento(nodos):
+    """Filas previas que necesita la última fila de cada nodo (máximo sobre los nodos y sus dependencias)."""
+    memo = {}
+
+    def total(n):
+        if n not in memo:
+            previas = [total(f[0]) for f in dependencias(n) if not isinstance(f, str)]
+            memo[n] = REGISTRO[n.nombre].memoria(dict(n.params)) + max(previas, default=0)
+        return memo[n]
+
+    return max((total(n) for n in nodos), default=0)
+
+
+def previa(x, relleno=np.nan):
+    """x.shift(1) para arrays: la fila anterior (relleno en la primera)."""
+    out = np.empty_like(x)
+    out[0:1] = relleno
+    out[1:] = x[:-1]
+    return out
+
+
+class Columnas:
+    """Lectura para señales(): d[col] -> array float64 de la columna del frame / dict de origen."""
+
+    def __init__(self, *origenes):
+        self._origenes = origenes
+
+    def __getitem__(self, col):
+        for o in self._origenes:
+            if col in o: return np.asarray(o[col], dtype=np.float64)
+        raise KeyError(col)
+
+
+def nodos_de(estrategias, extra=None):
+    """Nodos únicos que piden las estrategias (+ columnas extra {columna: (nodo, salida)})."""
+    pedidos = [n for e in estrategias for n, _ in e.INDICADORES.values()]
+    pedidos += [n for n, _ in (extra or {}).values()]
+    return ordenar(pedidos)
+
+
+# ==============================================================================
+# 1. INDICADORES REGISTRADOS (definición en lote = la de pandas_ta, vía kernels NumPy)
+# ==============================================================================
+_HLC = lambda p: ['high', 'low', 'close']
+
+
+def _series(indice, *valores):
+    """Salidas de un kernel (arrays) como Series alineadas a las velas."""
+    return tuple(pd.Series(v, index=indice) for v in valores)
+
+
+@registrar('ema', ['valor'], lambda p: [p['fuente']], lambda p: p['length'] - 1 + horizonte(2 / (p['length'] + 1)),
+           fuente='close')
+def _ema(x, fuente, length):
+    return _series(x.index, kernels.ema(x, length))
+
+
+@registrar('sma', ['valor'], lambda p: [p['fuente']], lambda p: p['length'] - 1, fuente='close')
+def _sma(x, fuente, length):
+    return _series(x.index, kernels.sma(x, length))
+
+
+@registrar('media_desvio', ['media', 'desvio'], lambda p: [p['fuente']], lambda p: p['length'] - 1, fuente='volume')
+def _media_desvio(x, fuente, length):
+    return _series(x.index, *kernels.media_desvio(x, length))
+
+
+@registrar('zscore', ['valor'],
+           lambda p: [p['fuente'], (nodo('media_desvio', fuente=p['fuente'], length=p['length']), 'media'),
+                      (nodo('media_desvio', fuente=p['fuente'], length=p['length']), 'desvio')],
+           lambda p: 0, fuente='volume')
+def _zscore(x, media, desvio, fuente, length):
+    return _series(x.index, (x.to_numpy(np.float64) - media.to_numpy()) / (desvio.to_numpy() + EPSILON))
+
+
+@registrar('retorno', ['valor'], lambda p: [p['fuente']], lambda p: 1, fuente='close')
+def _retorno(x, fuente):
+    a = x.to_numpy(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _series(x.index, a / previa(a) - 1)   # pct_change()
+
+
+@registrar('distancia', ['valor'], lambda p: [p['fuente'], p['referencia']], lambda p: 0, fuente='close')
+def _distancia(x, ref, fuente, referencia):
+    r = ref.to_numpy(np.float64)
+    return _series(x.index, (x.to_numpy(np.float64) - r) / (r + EPSILON))
+
+
+@registrar('sobreextension', ['valor'], lambda p: ['close', p['referencia']], lambda p: p['length'] - 1)
+def _sobreextension(c, ref, referencia, length):
+    """+1 / -1 si el cierre se aleja de la referencia más que su distancia media (length)."""
+    indice, c, ref = c.index, c.to_numpy(np.float64), ref.to_numpy(np.float64)
+    media_dist = kernels.sma(np.abs(c - ref), length)
+    out = np.zeros(len(c), dtype=np.int64)
+    out[c > (ref + media_dist)] = 1
+    out[c < (ref - media_dist)] = -1
+    return _series(indice, out)
+
+
+@registrar('rsi', ['valor'], lambda p: ['close'], lambda p: 1 + horizonte(1 / p['length']))
+def _rsi(c, length):
+    return _series(c.index, kernels.rsi(c, length))
+
+
+@registrar('adx', ['valor'], _HLC, lambda p: p['length'] + 2 * horizonte(1 / p['length']))  # DM/ATR y luego RMA del DX
+def _adx(h, l, c, length):
+    return _series(c.index, kernels.adx(h, l, c, length))
+
+
+@registrar('atr', ['valor', 'pct'], _HLC, lambda p: p['length'] + horizonte(1 / p['length']))
+def _atr(h, l, c, length):
+    atr = kernels.atr(h, l, c, length)
+    return _series(c.index, atr, atr / c.to_numpy(np.float64))
+
+
+@registrar('bbands', ['lower', 'mid', 'upper', 'width', 'pct'], lambda p: ['close'], lambda p: p['length'] - 1)
+def _bbands(c, length, std):
+    return _series(c.index, *kernels.bbands(c, length, std))  # Lower, Mid, Upper, Bandwidth, Percent
+
+
+@registrar('kc', ['lower', 'basis', 'upper'], _HLC, lambda p: p['length'] + horizonte(2 / (p['length'] + 1)))
+def _kc(h, l, c, length, scalar):
+    return _series(c.index, *kernels.kc(h, l, c, length, scalar))
+
+
+@registrar('slope', ['valor'], lambda p: [p['fuente']], lambda p: p['length'], fuente='close')
+def _slope(x, fuente, length):
+    return _series(x.index, kernels.slope(x, length))
+
+
+# ==============================================================================
+# 2. ALMACÉN COLUMNAR (LOTE)
+# ==============================================================================
+class AlmacenIndicadores:
+    """
+    Velas base por temporalidad + salidas de cada nodo calculado (una vez cada uno).
+    Si falta la base de una temporalidad y hay 5m, se resamplea (velas en curso incluidas).
+    """
+
+    def __init__(self, bases):
+        self._bases = dict(bases) if isinstance(bases, dict) else {'5m': bases}
+        self._valores = {}
+        self.calculados = 0
+
+    def base(self, temporalidad='5m'):
+        if temporalidad not in self._bases:
+            self._bases[temporalidad] = self._bases['5m'].resample(temporalidad).agg(AGG_OHLCV).dropna()
+        return self._bases[temporalidad]
+
+    def _fuente(self, f, temporalidad):
+        return self.base(temporalidad)[f] if isinstance(f, str) else self.valor(*f)
+
+    def valor(self, n, salida=None):
+        """Serie de una salida del nodo (la primera si no se indica)."""
+        if n not in self._valores:
+            ind = REGISTRO[n.nombre]
+            entradas = [self._fuente(f, n.temporalidad) for f in dependencias(n)]
+            self._valores[n] = dict(zip(ind.salidas, ind.lote(*entradas, **dict(n.params))))
+            self.calculados += 1
+        salidas = self._valores[n]
+        return salidas[salida] if salida is not None else salidas[REGISTRO[n.nombre].salidas[0]]
+
+    def columnas(self, mapa):
+        """{columna: serie} para un mapa {columna: (nodo, salida)}."""
+        return {col: self.valor(n, s) for col, (n, s) in mapa.items()}
+
+
+def aplicar_estrategias(df, estrategias, extra=None, almacen=None):
+    """
+    Lote: indicadores + señales de todas las estrategias sobre df (5m), cada nodo una
+    vez, y UNA sola copia del frame al final. El resultado no depende del orden.
+    """
+    almacen = almacen or AlmacenIndicadores(df)
+    nuevas = {}
+    for e in estrategias: nuevas.update(almacen.columnas(e.INDICADORES))
+    nuevas.update(almacen.columnas(extra or {}))
+    lectura = Columnas(nuevas, df)
+    for e in estrategias: nuevas.update(e.señales(lectura))
+    previas = [c for c in nuevas if c in df.columns]
+    base = df.drop(columns=previas) if previas else df
+    return pd.concat([base, _frame_nuevas(nuevas, df.index)], axis=1)
+
+
+def _frame_nuevas(nuevas, indice):
+    """
+    Columnas nuevas como DataFrame: las float64 se copian a UN bloque (n_cols, n) y el resto se
+    inserta en su lugar. pd.DataFrame(dict) copiaba cada columna y la volvía a copiar al consolidar.
+    """
+    arrays = {c: np.asarray(v) for c, v in nuevas.items()}
+    flotantes = [c for c, a in arrays.items() if a.dtype == np.float64]
+    bloque = np.empty((len(flotantes), len(indice)))
+    for i, c in enumerate(flotantes): bloque[i] = arrays[c]
+    frame = pd.DataFrame(bloque.T, index=indice, columns=flotantes, copy=False)
+    for i, (c, a) in enumerate(arrays.items()):
+        if a.dtype != np.float64: frame.insert(i, c, a)
+    return frame
+
+
+def evaluar_cola(df, estrategias, filas, extra=None):
+    """
+    Modo cola: lo mismo que aplicar_estrategias(df, ...).iloc[-filas:] pero calculando solo
+    sobre filas + calentamiento (+ memoria de señales). Ventanas finitas: idéntico;
+    EMA/RMA: diferencia relativa < TOLERANCIA_COLA.
+    """
+    necesarias = filas + calentamiento(nodos_de(estrategias, extra)) + MEMORIA_SEÑALES
+    return aplicar_estrategias(df.iloc[-necesarias:], estrategias, extra).iloc[-filas:]
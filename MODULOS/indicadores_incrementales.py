@@ -0,0 +1,501 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from MODULOS import grafo_indicadores as grafo
+from ESTRATEGIAS import frpv, mean_reversion, breakout, simple_trend
+
+# ==============================================================================
+# MOTOR DE INDICADORES INCREMENTAL (O(1) POR VELA CERRADA)
+# ==============================================================================
+# En vivo solo llega UNA vela nueva por ciclo y la IA solo lee la fila -2 y una
+# ventana de 60 filas. Recalcular pandas_ta sobre ~86k filas por par y por ciclo
+# es tirar CPU. Cada indicador guarda su estado y avanza vela a vela con la
+# MISMA definición que pandas_ta (semilla SMA en EMA/ATR, RMA de Wilder sin
+# ajuste, desvío muestral en Bollinger, TR sin NaN inicial salvo en el ADX...).
+#
+# MotorIndicadores (uno por par) avanza los nodos del grafo de indicadores
+# (grafo_indicadores) que piden frpv / mean_reversion / breakout / simple_trend
+# + ATR/ATR_Pct/RSI del main: cada nodo una vez aunque lo pidan varias. Las
+# señales Real_Price_* las calcula cada estrategia sobre la cola al leer.
+
+NAN = float('nan')
+EPSILON = 1e-9
+
+HISTORIA_FILAS = 256  # Filas de salida que se guardan (ventana IA de 60 + margen)
+
+
+# ==============================================================================
+# 1. PRIMITIVAS
+# ==============================================================================
+class _EWM:
+    """Series.ewm(alpha, adjust=False).mean() valor a valor (mismo trato de NaN que pandas)."""
+    __slots__ = ('alpha', 'valor', '_peso')
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.valor = NAN
+        self._peso = 1.0
+
+    def actualizar(self, x):
+        if self.valor != self.valor:
+            if x == x: self.valor = x
+            return self.valor
+        self._peso *= (1.0 - self.alpha)
+        if x == x:
+            if self.valor != x:
+                self.valor = (self._peso * self.valor + self.alpha * x) / (self._peso + self.alpha)
+            self._peso = 1.0
+        return self.valor
+
+
+class _ConSemilla:
+    """EWM cuyo primer valor (posición length-1) es la media de las primeras 'length' entradas."""
+
+    def __init__(self, length, alpha):
+        self.length = length
+        self._ewm = _EWM(alpha)
+        self._semilla = []
+        self.valor = NAN
+
+    def actualizar(self, x):
+        if self._semilla is not None:
+            self._semilla.append(x)
+            if len(self._semilla) < self.length: return NAN
+            v = np.array(self._semilla)
+            v = v[~np.isnan(v)]
+            x = v.sum() / len(v) if len(v) else NAN
+            self._semilla = None
+        self.valor = self._ewm.actualizar(x)
+        return self.valor
+
+
+class EMA(_ConSemilla):
+    """ta.ema(close, length) (presma=True)."""
+
+    def __init__(self, length):
+        super().__init__(length, 2.0 / (length + 1))
+
+
+class RMA(_EWM):
+    """ta.rma(close, length): Wilder, alpha = 1/length, sin ajuste."""
+
+    def __init__(self, length):
+        super().__init__(1.0 / length)
+
+
+class SMA:
+    """Media móvil simple (NaN si falta algún valor en la ventana). Suma recalculada en cada vuelta."""
+
+    def __init__(self, length):
+        self.length = length
+        self._ring = [NAN] * length
+        self._i = 0
+        self._n = 0
+        self._suma = 0.0
+        self._nans = 0
+        self.valor = NAN
+
+    def actualizar(self, x):
+        if self._n == self.length:
+            viejo = self._ring[self._i]
+            if viejo != viejo: self._nans -= 1
+            else: self._suma -= viejo
+        else:
+            self._n += 1
+        self._ring[self._i] = x
+        if x != x: self._nans += 1
+        else: self._suma += x
+        self._i += 1
+        if self._i == self.length:
+            # Una vez por vuelta: sin deriva numérica acumulada (O(1) amortizado)
+            self._i = 0
+            self._suma = math.fsum(v for v in self._ring if v == v)
+        self.valor = self._suma / self.length if self._n == self.length and self._nans == 0 else NAN
+        return self.valor
+
+
+class DesvioMovil:
+    """rolling(length).mean() / .std(ddof) de pandas: Welford con alta/baja de la ventana."""
+
+    def __init__(self, length, ddof=1):
+        self.length = length
+        self.ddof = ddof
+        self._ring = deque()
+        self._media = 0.0
+        self._m2 = 0.0
+        self._validos = 0
+        self._vueltas = 0
+        self.media = NAN
+        self.desvio = NAN
+
+    def _alta(self, x):
+        self._validos += 1
+        d = x - self._media
+        self._media += d / self._validos
+        self._m2 += d * (x - self._media)
+
+    def _baja(self, x):
+        self._validos -= 1
+        if self._validos == 0:
+            self._media = 0.0; self._m2 = 0.0
+            return
+        d = x - self._media
+        self._media -= d / self._validos
+        self._m2 -= d * (x - self._media)
+
+    def actualizar(self, x):
+        self._ring.append(x)
+        if x == x: self._alta(x)
+        if len(self._ring) > self.length:
+            viejo = self._ring.popleft()
+            if viejo == viejo: self._baja(viejo)
+        self._vueltas += 1
+        if self._vueltas == self.length:
+            self._vueltas = 0
+            v = np.array([y for y in self._ring if y == y])
+            if len(v):
+                self._media = v.mean(); self._m2 = float(((v - self._media) ** 2).sum())
+
+        if self._validos < self.length:
+            self.media = self.desvio = NAN
+        else:
+            self.media = self._media
+            self.desvio = math.sqrt(max(self._m2, 0.0) / (self._validos - self.ddof))
+        return self.media, self.desvio
+
+
+class MaximoMovil:
+    """rolling(length).max() con deque monótona (O(1) amortizado)."""
+    _mejor = staticmethod(lambda nuevo, viejo: nuevo >= viejo)
+
+    def __init__(self, length):
+        self.length = length
+        self._cola = deque()  # (posición, valor) con valores monótonos
+        self._pos = 0
+        self._nans = deque()
+        self.valor = NAN
+
+    def actualizar(self, x):
+        p = self._pos; self._pos += 1
+        while self._nans and self._nans[0] <= p - self.length: self._nans.popleft()
+        while self._cola and self._cola[0][0] <= p - self.length: self._cola.popleft()
+        if x != x: self._nans.append(p)
+        else:
+            while self._cola and self._mejor(x, self._cola[-1][1]): self._cola.pop()
+            self._cola.append((p, x))
+        lleno = self._pos >= self.length and not self._nans
+        self.valor = self._cola[0][1] if lleno and self._cola else NAN
+        return self.valor
+
+
+class MinimoMovil(MaximoMovil):
+    """rolling(length).min()."""
+    _mejor = staticmethod(lambda nuevo, viejo: nuevo <= viejo)
+
+
+class _RangoVerdadero:
+    """ta.true_range: max(|h-l|, |h-c_ant|, |c_ant-l|). prenan=True deja NaN la primera vela."""
+
+    def __init__(self, prenan=False):
+        self.prenan = prenan
+        self._cierre_ant = NAN
+
+    def actualizar(self, h, l, c):
+        pc = self._cierre_ant
+        self._cierre_ant = c
+        if pc != pc: return NAN if self.prenan else abs(h - l)
+        return max(abs(h - l), abs(h - pc), abs(pc - l))
+
+
+class ATR:
+    """ta.atr(high, low, close, length): RMA del TR con semilla SMA."""
+
+    def __init__(self, length=14, prenan=False):
+        self._tr = _RangoVerdadero(prenan)
+        self._rma = _ConSemilla(length, 1.0 / length)
+        self.valor = NAN
+
+    def actualizar(self, h, l, c):
+        self.valor = self._rma.actualizar(self._tr.actualizar(h, l, c))
+        return self.valor
+
+
+class RSI:
+    """ta.rsi(close, length)."""
+
+    def __init__(self, length=14):
+        self._ant = NAN
+        self._sube = RMA(length)
+        self._baja = RMA(length)
+        self.valor = NAN
+
+    def actualizar(self, c):
+        d = c - self._ant
+        self._ant = c
+        if d == d: arriba, abajo = max(d, 0.0), min(d, 0.0)
+        else: arriba = abajo = NAN
+        a = self._sube.actualizar(arriba)
+        b = abs(self._baja.actualizar(abajo))
+        den = a + b
+        self.valor = 100.0 * a / den if den == den and den != 0 else NAN
+        return self.valor
+
+
+class ADX:
+    """ta.adx(high, low, close, length)['ADX_<length>']."""
+
+    def __init__(self, length=14):
+        self._atr = ATR(length, prenan=True)
+        self._pos = RMA(length)
+        self._neg = RMA(length)
+        self._dx = RMA(length)
+        self._h_ant = NAN
+        self._l_ant = NAN
+        self.valor = NAN
+
+    def actualizar(self, h, l, c):
+        atr = self._atr.actualizar(h, l, c)
+        up = h - self._h_ant
+        dn = self._l_ant - l
+        self._h_ant, self._l_ant = h, l
+        if up == up and dn == dn:
+            pos = up if (up > dn and up > 0) else 0.0
+            neg = dn if (dn > up and dn > 0) else 0.0
+            if abs(pos) < 2.220446049250313e-16: pos = 0.0
+            if abs(neg) < 2.220446049250313e-16: neg = 0.0
+        else:
+            pos = neg = NAN
+        k = 100.0 / atr if atr == atr and atr != 0 else NAN
+        dmp = k * self._pos.actualizar(pos)
+        dmn = k * self._neg.actualizar(neg)
+        den = dmp + dmn
+        dx = 100.0 * abs(dmp - dmn) / den if den == den and den != 0 else NAN
+        self.valor = self._dx.actualizar(dx)
+        return self.valor
+
+
+class Bollinger:
+    """ta.bbands(close, length, std) -> (lower, mid, upper, bandwidth, percent)."""
+
+    def __init__(self, length=20, std=2.0):
+        self.std = std
+        self._media = SMA(length)
+        self._desvio = DesvioMovil(length, ddof=1)
+
+    def actualizar(self, c):
+        mid = self._media.actualizar(c)
+        _, sd = self._desvio.actualizar(c)
+        lower = mid - self.std * sd
+        upper = mid + self.std * sd
+        ancho = upper - lower
+        bandwidth = 100.0 * ancho / mid if mid == mid and mid != 0 else NAN
+        percent = (c - lower) / ancho if ancho == ancho and ancho != 0 else NAN
+        return lower, mid, upper, bandwidth, percent
+
+
+class Keltner:
+    """ta.kc(high, low, close, length, scalar) -> (lower, basis, upper). EMA del cierre y del TR."""
+
+    def __init__(self, length=20, scalar=2.0):
+        self.scalar = scalar
+        self._tr = _RangoVerdadero()
+        self._base = EMA(length)
+        self._banda = EMA(length)
+
+    def actualizar(self, h, l, c):
+        base = self._base.actualizar(c)
+        banda = self._banda.actualizar(self._tr.actualizar(h, l, c))
+        return base - self.scalar * banda, base, base + self.scalar * banda
+
+
+class Retorno:
+    """pct_change() vela a vela."""
+
+    def __init__(self):
+        self._ant = NAN
+
+    def actualizar(self, x):
+        r = x / self._ant - 1.0 if self._ant == self._ant else NAN
+        self._ant = x
+        return r
+
+
+class Sobreextension:
+    """+1 / -1 si el cierre supera referencia ± media móvil (length) de |cierre - referencia|."""
+
+    def __init__(self, length):
+        self._media = SMA(length)
+
+    def actualizar(self, c, ref):
+        media = self._media.actualizar(abs(c - ref))
+        return 1.0 if c > ref + media else (-1.0 if c < ref - media else 0.0)
+
+
+class ATRPct:
+    """ATR y ATR / cierre (salidas del nodo 'atr')."""
+
+    def __init__(self, length=14):
+        self._atr = ATR(length)
+
+    def actualizar(self, h, l, c):
+        atr = self._atr.actualizar(h, l, c)
+        return atr, atr / c
+
+
+# Paso incremental de cada indicador del registro: params -> función(*entradas) -> salida(s)
+INCREMENTALES = {
+    'ema': lambda p: EMA(p['length']).actualizar,
+    'sma': lambda p: SMA(p['length']).actualizar,
+    'media_desvio': lambda p: DesvioMovil(p['length']).actualizar,
+    'zscore': lambda p: (lambda x, media, desvio: (x - media) / (desvio + EPSILON)),
+    'retorno': lambda p: Retorno().actualizar,
+    'distancia': lambda p: (lambda x, ref: (x - ref) / (ref + EPSILON)),
+    'sobreextension': lambda p: Sobreextension(p['length']).actualizar,
+    'rsi': lambda p: RSI(p['length']).actualizar,
+    'adx': lambda p: ADX(p['length']).actualizar,
+    'atr': lambda p: ATRPct(p['length']).actualizar,
+    'bbands': lambda p: Bollinger(p['length'], p['std']).actualizar,
+    'kc': lambda p: Keltner(p['length'], p['scalar']).actualizar,
+}
+
+
+# ==============================================================================
+# 2. MOTOR POR PAR
+# ==============================================================================
+ESTRATEGIAS_VIVO = (frpv, mean_reversion, breakout, simple_trend)
+_ATR_14 = grafo.nodo('atr', length=14)
+EXTRA_MAIN = {'ATR': (_ATR_14, 'valor'), 'ATR_Pct': (_ATR_14, 'pct'), 'RSI': (grafo.nodo('rsi', length=14), 'valor')}
+
+# Velas previas que necesitan los nodos del motor (EMA 200: (1 - 2/201)^k < 1e-13 -> ~3000):
+# arrancar ahí da el mismo valor que toda la historia
+CALENTAMIENTO_VELAS = grafo.calentamiento(grafo.nodos_de(ESTRATEGIAS_VIVO, EXTRA_MAIN))
+
+COLUMNAS_MOTOR = list({**{c: 0 for e in ESTRATEGIAS_VIVO for c in e.INDICADORES}, **EXTRA_MAIN}) + \
+                 [s for e in ESTRATEGIAS_VIVO for s in e.SEÑALES]
+
+
+class MotorIndicadores:
+    """
+    Nodos 5m de las estrategias en orden topológico, una vela cerrada por vez. Guarda
+    las columnas de indicadores + OHLCV (las señales leen close/volume) de las últimas
+    historia + MEMORIA_SEÑALES velas.
+    """
+
+    def __init__(self, historia=HISTORIA_FILAS, estrategias=ESTRATEGIAS_VIVO, extra=EXTRA_MAIN):
+        self.historia = historia
+        self.estrategias = tuple(estrategias)
+        mapa = {}
+        for e in self.estrategias: mapa.update(e.INDICADORES)
+        mapa.update(extra or {})
+        self._mapa = mapa
+        self.nodos = grafo.nodos_de(self.estrategias, extra)
+        self.calentamiento = grafo.calentamiento(self.nodos)
+        self.columnas = list(mapa) + [s for e in self.estrategias for s in e.SEÑALES]
+
+        # Ranura de cada valor: 0..4 = OHLCV, luego una por salida de nodo
+        self._ranura = {c: k for k, c in enumerate(grafo.COLUMNAS_BASE)}
+        for n in self.nodos:
+            for s in grafo.REGISTRO[n.nombre].salidas: self._ranura[(n, s)] = len(self._ranura)
+        self._guardadas = list(grafo.COLUMNAS_BASE) + list(mapa)
+        self._ranuras_guardadas = [self._ranura[c] for c in grafo.COLUMNAS_BASE] + [self._ranura[ref] for ref in mapa.values()]
+
+        # Doble escritura espejada (como BufferVelas): las últimas filas siempre contiguas
+        self._cap = historia + grafo.MEMORIA_SEÑALES
+        self._filas = np.full((2 * self._cap, len(self._guardadas)), np.nan)
+        self._t = np.zeros(2 * self._cap, dtype=np.int64)
+        self._n = 0
+        self._escritas = 0
+        self.ultimo_t = None
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        # Plan: (paso, ranuras de entrada, ranuras de salida) por nodo, dependencias primero
+        self._plan = []
+        for n in self.nodos:
+            if n.temporalidad != '5m' or n.nombre not in INCREMENTALES:
+                raise ValueError(f"Nodo sin versión incremental 5m: {n}")
+            entradas = tuple(self._ranura[f] for f in grafo.dependencias(n))
+            salidas = tuple(self._ranura[(n, s)] for s in grafo.REGISTRO[n.nombre].salidas)
+            self._plan.append((INCREMENTALES[n.nombre](dict(n.params)), entradas, salidas))
+        self._valores = [NAN] * len(self._ranura)
+
+    def reiniciar(self):
+        self._reiniciar_estado()
+        self._n = 0; self._escritas = 0
+        self.ultimo_t = None
+
+    # --------------------------------------------------------------------------
+    # AVANCE
+    # --------------------------------------------------------------------------
+    def avanzar(self, t, o, h, l, c, v):
+        """Procesa UNA vela cerrada y devuelve la fila guardada (OHLCV + indicadores)."""
+        val = self._valores
+        val[0], val[1], val[2], val[3], val[4] = o, h, l, c, v
+        for paso, entradas, salidas in self._plan:
+            r = paso(*[val[k] for k in entradas])
+            if len(salidas) == 1: val[salidas[0]] = r
+            else:
+                for k, x in zip(salidas, r): val[k] = x
+        fila = [val[k] for k in self._ranuras_guardadas]
+        self._guardar(t, fila)
+        return fila
+
+    def _guardar(self, t, fila):
+        i = self._escritas % self._cap
+        self._filas[i] = self._filas[i + self._cap] = fila
+        self._t[i] = self._t[i + self._cap] = t
+        self._escritas += 1
+        self._n = min(self._n + 1, self._cap)
+        self.ultimo_t = int(t)
+
+    # --------------------------------------------------------------------------
+    # SINCRONIZACIÓN CON EL BUFFER DE VELAS
+    # --------------------------------------------------------------------------
+    def inicio_pendiente(self, tiempos):
+        """
+        Posición (en 'tiempos') de la primera vela que falta procesar. Si el motor
+        no reconoce la historia (buffer recargado) se reinicia y arranca con calentamiento.
+        """
+        n = len(tiempos)
+        if self.ultimo_t is not None:
+            i = int(np.searchsorted(tiempos, self.ultimo_t))
+            if i < n and tiempos[i] == self.ultimo_t: return i + 1
+            self.reiniciar()
+        return max(0, n - self.calentamiento)
+
+    def sincronizar(self, tiempos, matriz):
+        """Avanza con velas CERRADAS (tiempos int64 ms, matriz (5, n) open/high/low/close/volume)."""
+        o, h, l, c, v = (matriz[k].tolist() for k in range(5))
+        for i, t in enumerate(tiempos.tolist()):
+            if self.ultimo_t is not None and t <= self.ultimo_t: continue
+            self.avanzar(t, o[i], h[i], l[i], c[i], v[i])
+        return len(tiempos)
+
+    # --------------------------------------------------------------------------
+    # LECTURA
+    # --------------------------------------------------------------------------
+    def tabla(self, n=None):
+        """
+        DataFrame con las últimas n filas (índice UTC igual al de BufferVelas): indicadores
+        + señales de cada estrategia, evaluadas sobre la cola (n + MEMORIA_SEÑALES filas).
+        """
+        n = min(self.historia, self._n) if n is None else min(n, self.historia, self._n)
+        m = min(n + grafo.MEMORIA_SEÑALES, self._n)
+        if self._escritas < self._cap: fin = self._escritas
+        else: fin = (self._escritas - 1) % self._cap + 1 + self._cap
+        ini = fin - m
+        bloque = self._filas[ini:fin]
+        cola = {c: bloque[:, j] for j, c in enumerate(self._guardadas)}
+        lectura = grafo.Columnas(cola)
+        columnas = [cola[c] for c in self._mapa]
+        for e in self.estrategias: columnas.extend(e.señales(lectura).values())
+        indice = pd.to_datetime(self._t[ini + m - n:fin], unit='ms', utc=True)
+        return pd.DataFrame(np.column_stack(columnas)[m - n:], index=indice, columns=self.columnas)
+
+    def ultima(self):
+        """Última fila como dict (vela cerrada más reciente)."""
+        if not self._n: return None
+        return self.tabla(1).iloc[-1].to_dict()
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# ÍNDICE DE MERCADO TOP 20 (PONDERADO POR VOLUMEN, INCREMENTAL)
+# ==============================================================================
+# Mismo cálculo que market_context.construir_indice_mercado y que el main:
+#   ret_s  = pct_change del cierre de cada par (sobre su propia serie)
+#   R, V   = retornos / volúmenes alineados en la unión de tiempos, ffill(limit) y 0
+#   indice = sum_s(R_s * V_s) / (sum_s(V_s) + 1e-9)
+# pero guardando las columnas alineadas en un ring preasignado (misma idea que
+# BufferVelas: cada fila se escribe dos veces y la ventana es un tramo contiguo).
+# Una vela nueva cuesta O(pares); no se rearman DataFrames de toda la historia.
+#
+# NOTA: serie() / precio() son vistas de la memoria del ring. Son válidas hasta
+# la próxima escritura (sincronizar / agregar).
+
+EPSILON = 1e-9
+MAX_FILAS_INCREMENTAL = 288  # Más velas pendientes que esto (1 día de 5m) -> recarga en lote
+
+
+class IndiceMercado:
+
+    def __init__(self, simbolos, capacidad, limite_ffill=None):
+        self.simbolos = list(simbolos)
+        self._col = {s: j for j, s in enumerate(self.simbolos)}
+        self.capacidad = int(capacidad)
+        self.limite_ffill = limite_ffill
+        k = len(self.simbolos)
+
+        self._t = np.zeros(2 * self.capacidad, dtype=np.int64)
+        self._r = np.zeros((2 * self.capacidad, k))
+        self._v = np.zeros((2 * self.capacidad, k))
+        self._idx = np.zeros(2 * self.capacidad)
+        self._precio = np.zeros(2 * self.capacidad)
+        self._n = 0
+        self._total = 0
+        self._indice = None
+
+        # Estado por par: última vela real, su fila absoluta y los dos últimos cierres
+        self._ultimo_t = np.full(k, -1, dtype=np.int64)
+        self._fila_real = np.full(k, -1, dtype=np.int64)
+        self._cierre = np.full(k, np.nan)
+        self._cierre_previo = np.full(k, np.nan)
+
+    @classmethod
+    def desde_series(cls, cierres, volumenes, limite_ffill=None, capacidad=None):
+        """Índice en lote desde dicts {nombre: Series de cierres / volúmenes} (uso offline)."""
+        idx = pd.DatetimeIndex([])
+        for s in cierres.values(): idx = idx.union(s.index)
+        indice = cls(list(cierres.keys()), capacidad or max(len(idx), 1), limite_ffill)
+        indice.cargar(cierres, volumenes)
+        return indice
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def vacio(self):
+        return self._n == 0
+
+    # --------------------------------------------------------------------------
+    # CARGA EN LOTE (arranque / recarga)
+    # --------------------------------------------------------------------------
+    def cargar(self, cierres, volumenes):
+        """Reemplaza todo con el cálculo vectorizado sobre las series completas."""
+        nombres = [s for s in self.simbolos if s in cierres]
+        if not nombres: return
+        rets = pd.DataFrame({s: cierres[s].pct_change() for s in nombres}).reindex(columns=self.simbolos)
+        vols = pd.DataFrame({s: volumenes[s] for s in nombres}).reindex(index=rets.index, columns=self.simbolos)
+        rets = rets.ffill(limit=self.limite_ffill).fillna(0).iloc[-self.capacidad:]
+        vols = vols.ffill(limit=self.limite_ffill).fillna(0).iloc[-self.capacidad:]
+
+        r, v = rets.to_numpy(dtype=np.float64), vols.to_numpy(dtype=np.float64)
+        indice = (r * v).sum(axis=1) / (v.sum(axis=1) + EPSILON)
+        n, cap = len(rets), self.capacidad
+        t = rets.index.as_unit('ms').asi8
+        for arr, val in ((self._t, t), (self._r, r), (self._v, v), (self._idx, indice), (self._precio, np.cumprod(1 + indice))):
+            arr[:n] = arr[cap:cap + n] = val
+        self._n = self._total = n
+        self._indice = None
+
+        # Estado por par (fila absoluta de su última vela real)
+        self._ultimo_t[:] = -1; self._fila_real[:] = -1
+        self._cierre[:] = np.nan; self._cierre_previo[:] = np.nan
+        for s in nombres:
+            j, c = self._col[s], cierres[s].dropna()
+            if c.empty: continue
+            ts = int(c.index[-1:].as_unit('ms').asi8[0])
+            self._ultimo_t[j] = ts
+            self._fila_real[j] = int(np.searchsorted(t, ts)) if ts >= t[0] else -1
+            self._cierre[j] = c.iloc[-1]
+            if len(c) > 1: self._cierre_previo[j] = c.iloc[-2]
+
+    # --------------------------------------------------------------------------
+    # INCREMENTAL
+    # --------------------------------------------------------------------------
+    def _p(self, a):
+        """Posición en el ring de la fila absoluta a."""
+        return a % self.capacidad
+
+    def _escribir(self, arr, a, valor):
+        p = self._p(a)
+        arr[p] = arr[p + self.capacidad] = valor
+
+    def _recalcular(self, desde):
+        """Índice y precio acumulado de las filas absolutas [desde, total)."""
+        previo = self._precio[self._p(desde - 1)] if desde > self._total - self._n else 1.0
+        for a in range(desde, self._total):
+            p = self._p(a)
+            r, v = self._r[p], self._v[p]
+            valor = float(np.dot(r, v) / (v.sum() + EPSILON))
+            previo = previo * (1 + valor)
+            self._escribir(self._idx, a, valor)
+            self._escribir(self._precio, a, previo)
+
+    def _nueva_fila(self, t):
+        """Fila nueva: cada par arrastra su último valor (ffill dentro del límite) o 0."""
+        a = self._total
+        if self._n:
+            previa = self._p(a - 1)
+            arrastra = self._fila_real >= 0
+            if self.limite_ffill is not None: arrastra &= (a - self._fila_real) <= self.limite_ffill
+            r = np.where(arrastra, self._r[previa], 0.0)
+            v = np.where(arrastra, self._v[previa], 0.0)
+        else:
+            r = v = np.zeros(len(self.simbolos))
+        self._escribir(self._t, a, t)
+        self._escribir(self._r, a, r)
+        self._escribir(self._v, a, v)
+        self._total += 1
+        if self._n < self.capacidad: self._n += 1
+        self._indice = None
+
+    def agregar(self, simbolo, t, cierre, volumen):
+        """
+        Upsert de la vela (t ms, cierre, volumen) de un par. Devuelve la fila absoluta
+        desde la que cambió el índice (None si no cambió nada).
+        - Misma marca que la última del par -> vela en curso: se pisa.
+        - Marca posterior -> vela nueva del par; si es posterior a todo, fila nueva.
+        """
+        j = self._col[simbolo]
+        if t < self._ultimo_t[j]: return None
+        if t > self._ultimo_t[j]:
+            self._cierre_previo[j] = self._cierre[j]
+            self._ultimo_t[j] = t
+        self._cierre[j] = cierre
+        previo = self._cierre_previo[j]
+        r = cierre / previo - 1 if np.isfinite(previo) else 0.0
+
+        if self._n == 0 or t > self._t[self._p(self._total - 1)]: self._nueva_fila(t)
+        tiempos = self.tiempos()
+        i = int(np.searchsorted(tiempos, t))
+        if i >= self._n or tiempos[i] != t: return None  # Sin fila para esa marca (hueco interno)
+
+        a = self._total - self._n + i
+        self._fila_real[j] = a
+        for b in range(a, self._total):  # La vela y el ffill de las filas que ya la seguían
+            arrastra = self.limite_ffill is None or b - a <= self.limite_ffill
+            self._escribir(self._r[:, j], b, r if arrastra else 0.0)
+            self._escribir(self._v[:, j], b, volumen if arrastra else 0.0)
+        return a
+
+    def sincronizar(self, buffers):
+        """
+        Pasa al índice las velas nuevas de cada BufferVelas {nombre: buffer} (y re-pisa la
+        vela en curso). Devuelve False si hace falta cargar en lote: índice vacío, par nuevo
+        con historia o demasiadas velas pendientes.
+        """
+        if self.vacio: return False
+        pendientes = {}
+        for s, buf in buffers.items():
+            if s not in self._col or buf.vacio: continue
+            tiempos = buf.tiempos()
+            j = self._col[s]
+            if self._ultimo_t[j] < 0 and len(buf) > 1: return False
+            ini = int(np.searchsorted(tiempos, self._ultimo_t[j]))
+            if len(tiempos) - ini > MAX_FILAS_INCREMENTAL: return False
+            pendientes[s] = (tiempos[ini:], buf.columna('close')[ini:], buf.columna('volume')[ini:])
+
+        desde = None
+        for s, (tiempos, cierres, volumenes) in pendientes.items():
+            for t, c, v in zip(tiempos.tolist(), cierres.tolist(), volumenes.tolist()):
+                a = self.agregar(s, t, c, v)
+                if a is not None: desde = a if desde is None else min(desde, a)
+        if desde is not None: self._recalcular(max(desde, self._total - self._n))
+        return True
+
+    # --------------------------------------------------------------------------
+    # LECTURA (VISTAS SIN COPIA)
+    # --------------------------------------------------------------------------
+    def _vista(self, arr):
+        ini = (self._total - self._n) % self.capacidad
+        v = arr[ini:ini + self._n]
+        v.flags.writeable = False
+        return v
+
+    def tiempos(self):
+        return self._vista(self._t)
+
+    def indice(self):
+        if self._indice is None:
+            self._indice = pd.DatetimeIndex(self.tiempos().view('M8[ms]'), name='time').tz_localize('UTC')
+        return self._indice
+
+    def serie(self):
+        """Retorno del índice por vela (lo que el main llamaba mkt_idx)."""
+        return pd.Series(self._vista(self._idx), index=self.indice(), copy=False)
+
+    def precio(self):
+        """Índice de precio acumulado: (1 + serie()).cumprod() mantenido vela a vela."""
+        return pd.Series(self._vista(self._precio), index=self.indice(), name='precio', copy=False)
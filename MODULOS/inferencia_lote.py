@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+
+# ==============================================================================
+# INFERENCIA EN LOTE (UNA PASADA POR MODELO Y POR CICLO)
+# ==============================================================================
+# Cada predict() de Keras paga un costo fijo (armado del dataset, callbacks,
+# despacho de la función) de decenas de ms. Con batch 1 por par y por modelo el
+# ciclo pagaba ese costo ~100 veces. El ciclo se parte en fases:
+#   1) cada par arma sus ventanas y las deja en el lote bajo una clave
+#      (agregar(modelo, clave, *entradas));
+#   2) correr() apila las ventanas de todos los pares y hace UNA pasada por
+#      modelo (batch = pares que lo pidieron);
+#   3) cada par recupera su fila con salida(modelo, clave).
+# Mismo resultado que el predict por par: el batch no mezcla filas (BatchNorm
+# en inferencia usa las medias móviles, no las del lote).
+
+
+class LoteInferencia:
+    """Ventanas pendientes por modelo -> una pasada por modelo -> salida por clave."""
+
+    def __init__(self, lock=None):
+        self._lock = lock or threading.Lock()  # Keras no es reentrante: el mismo lock que el resto del bot
+        self._pedidos = {}    # modelo -> [(clave, (entrada_0, entrada_1...))]
+        self._salidas = {}    # (modelo, clave) -> fila de salida
+        self.pasadas = 0      # Llamadas a predict() hechas
+        self.filas = 0        # Ventanas inferidas
+
+    def agregar(self, modelo, clave, *entradas):
+        """Entradas de un par para 'modelo', cada una con batch 1: (1, pasos, features)."""
+        self._pedidos.setdefault(modelo, []).append((clave, entradas))
+
+    def pendientes(self, modelo=None):
+        if modelo is not None: return len(self._pedidos.get(modelo, ()))
+        return sum(len(p) for p in self._pedidos.values())
+
+    def correr(self, modelos):
+        """Una pasada por modelo con todo lo pendiente. Si un modelo falla, sus claves quedan sin salida."""
+        for nombre, pedidos in self._pedidos.items():
+            claves = [c for c, _ in pedidos]
+            X = [np.concatenate(partes, axis=0) for partes in zip(*(e for _, e in pedidos))]
+            try:
+                with self._lock:
+                    salida = modelos[nombre].predict(X[0] if len(X) == 1 else X, batch_size=len(claves), verbose=0)
+            except Exception as e:
+                print(f"⚠️ Error en inferencia en lote ({nombre}, {len(claves)} ventanas): {e}")
+                continue
+            self.pasadas += 1
+            self.filas += len(claves)
+            for clave, fila in zip(claves, salida): self._salidas[(nombre, clave)] = fila
+        self._pedidos = {}
+
+    def salida(self, modelo, clave):
+        """Fila de salida del par (None si no se pidió o el modelo falló)."""
+        return self._salidas.get((modelo, clave))
@@ -0,0 +1,285 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# ==============================================================================
+# KERNELS DE INDICADORES EN NUMPY (1 PAR O VARIOS PARES A LA VEZ)
+# ==============================================================================
+# Misma definición que pandas_ta 0.4 (sin TA-Lib) sobre arrays contiguos, sin
+# Series intermedias: x de forma (n,) -> un par; (n, k) -> k pares alineados en
+# el tiempo (eje 0), todo en una pasada. Devuelven arrays de la misma forma.
+#
+# - EWM (ema / rma) como filtro IIR y_t = b*y_{t-1} + z_t con scipy.signal.lfilter
+#   (una pasada en C; scipy ya llega con scikit-learn / hmmlearn). Admite NaN
+#   iniciales (cada par arranca en su primer valor válido), NO NaN intermedios
+#   (OHLCV no los tiene).
+# - Sumas móviles con cumsum reiniciada por bloque y centrada: el error no crece
+#   con el largo de la serie (5 años de 5m) ni se cancela en la varianza.
+# - Se replican las rarezas de pandas_ta: semilla SMA en ema/atr, TR sin NaN
+#   inicial (salvo prenan), non_zero_range (+eps a TODO si alguna resta da 0),
+#   zero() en los DM del ADX y varianza 0 exacta en ventanas constantes.
+
+EPS = np.finfo(np.float64).eps
+BLOQUE_SUMA = 256         # Filas mínimas por bloque de las sumas móviles (bloques cortos: referencia cercana)
+
+
+# ==============================================================================
+# 1. UTILIDADES
+# ==============================================================================
+def _a2d(x):
+    """(array float64 (n, k), era_1d)."""
+    a = np.asarray(x, dtype=np.float64)
+    if a.ndim == 1: return a.reshape(-1, 1), True
+    return a, False
+
+
+def _salida(a, era_1d):
+    return a[:, 0] if era_1d else a
+
+
+def _previo(a, k=1):
+    """a desplazado k filas hacia abajo (NaN arriba), como shift(k)."""
+    out = np.full_like(a, np.nan)
+    if k < len(a): out[k:] = a[:len(a) - k]
+    return out
+
+
+def _primer_valido(a):
+    """Índice del primer valor no NaN de cada columna (n si no hay)."""
+    validos = ~np.isnan(a)
+    return np.where(validos.any(axis=0), validos.argmax(axis=0), len(a))
+
+
+def _media_inicial(a, length):
+    """Media (sin NaN) de las primeras 'length' filas de cada columna: semilla presma de pandas_ta."""
+    v = a[:length]
+    validos = ~np.isnan(v)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(validos, v, 0.0).sum(axis=0) / validos.sum(axis=0)
+
+
+def _no_cero(d):
+    """non_zero_range de pandas_ta: si alguna resta de la columna es 0, suma eps a toda la columna."""
+    return d + np.where((d == 0).any(axis=0), EPS, 0.0)
+
+
+def _ewm(a, alpha):
+    """Series.ewm(alpha, adjust=False).mean() por columnas, arrancando en el primer valor válido."""
+    n, k = a.shape
+    ini = _primer_valido(a)
+    columnas = np.flatnonzero(ini < n)
+    z = np.ascontiguousarray(np.where(np.isnan(a), 0.0, a).T) * alpha  # (k, n): una fila contigua por par
+    z[columnas, ini[columnas]] = a[ini[columnas], columnas]  # y_s = x_s
+    # y_t = (1 - alpha) * y_{t-1} + z_t: un filtro IIR de primer orden, una pasada en C por par
+    y = lfilter([1.0], [1.0, alpha - 1.0], z, axis=1)
+    for j in np.flatnonzero(ini > 0): y[j, :ini[j]] = np.nan  # z = 0 antes del arranque
+    return y.T
+
+
+def _sumas_moviles(a, length):
+    """
+    Sumas móviles de (a - ref) y (a - ref)^2 por ventana de 'length' filas (NaN cuentan 0).
+    ref = un valor por bloque de filas (constante en la ventana: la varianza no cambia y
+    las sumas no acumulan el nivel del precio). Devuelve (s1, s2, ref por fila).
+    """
+    n, k = a.shape
+    largo = max(4 * length, BLOQUE_SUMA)
+    m = max(1, -(-n // largo))
+    pad = np.zeros((k, m * largo + length - 1))
+    datos = pad[:, length - 1:length - 1 + n]
+    datos[...] = a.T
+    datos[np.isnan(datos)] = 0.0
+    tramos = sliding_window_view(pad, largo + length - 1, axis=1)[:, ::largo]  # (k, m, largo + length - 1), sin copiar
+    ref = tramos[:, :, length - 1:length].copy()
+    d = tramos - ref
+    sumas = []
+    for p in (1, 2):
+        c = np.cumsum(d if p == 1 else np.square(d, out=d), axis=2)
+        s = np.empty((k, m, largo))
+        s[:, :, 0] = c[:, :, length - 1]
+        np.subtract(c[:, :, length:], c[:, :, :largo - 1], out=s[:, :, 1:])
+        sumas.append(s.reshape(k, m * largo)[:, :n].T)
+    ref_filas = np.repeat(ref[:, :, 0], largo, axis=1)[:, :n].T
+    return sumas[0], sumas[1], ref_filas
+
+
+def _incompletas(a, length):
+    """Filas cuya ventana de 'length' valores está incompleta o tiene algún NaN."""
+    falta = np.zeros(a.shape, dtype=bool)
+    falta[:length - 1] = True
+    for j, filas in _por_columna(np.isnan(a)):  # Cada NaN invalida las 'length' ventanas que lo contienen
+        marca = np.zeros(len(a) + 1, dtype=np.int32)
+        np.add.at(marca, filas, 1)
+        np.add.at(marca, np.minimum(filas + length, len(a)), -1)
+        falta[:, j] |= np.cumsum(marca[:-1]) > 0
+    return falta
+
+
+def _constantes(a, length):
+    """Filas cuya ventana de 'length' valores son todos iguales (rachas de iguales de largo >= length)."""
+    n = len(a)
+    constante = np.zeros(a.shape, dtype=bool)
+    if length < 2:
+        constante[...] = True
+        return constante
+    for j, filas in _por_columna(a[1:] == a[:-1]):  # filas + 1: vela igual a la anterior
+        if len(filas) < length - 1: continue
+        cortes = np.flatnonzero(np.diff(filas) != 1) + 1
+        desde, hasta = filas[np.r_[0, cortes]] + 1, filas[np.r_[cortes - 1, len(filas) - 1]] + 1
+        largas = hasta - desde + 2 >= length  # Racha: velas desde-1 .. hasta
+        if not largas.any(): continue
+        marca = np.zeros(n + 1, dtype=np.int32)
+        np.add.at(marca, desde[largas] + length - 2, 1)
+        np.add.at(marca, hasta[largas] + 1, -1)
+        constante[:, j] = np.cumsum(marca[:-1]) > 0
+    return constante
+
+
+def _por_columna(mascara):
+    """(columna, filas True) de las columnas de la máscara que tienen algún True."""
+    for j in np.flatnonzero(mascara.any(axis=0)):
+        yield j, np.flatnonzero(mascara[:, j])
+
+
+# ==============================================================================
+# 2. MEDIAS
+# ==============================================================================
+def sma(x, length):
+    """ta.sma: media simple; NaN si la ventana tiene algún NaN o está incompleta."""
+    a, uno = _a2d(x)
+    s, _, ref = _sumas_moviles(a, length)
+    media = ref + s / length
+    constante = _constantes(a, length)
+    media[constante] = a[constante]
+    media[_incompletas(a, length)] = np.nan
+    return _salida(media, uno)
+
+
+def ema(x, length, presma=True):
+    """ta.ema: semilla = media de las primeras 'length' filas (sin NaN), luego ewm(span) sin ajuste."""
+    a, uno = _a2d(x)
+    if presma and len(a) >= length:
+        a = a.copy()
+        semilla = _media_inicial(a, length)
+        a[:length - 1] = np.nan
+        a[length - 1] = semilla
+    return _salida(_ewm(a, 2.0 / (length + 1)), uno)
+
+
+def rma(x, length):
+    """ta.rma: Wilder, ewm(alpha=1/length) sin ajuste."""
+    a, uno = _a2d(x)
+    return _salida(_ewm(a, 1.0 / length), uno)
+
+
+def desvio(x, length, ddof=1):
+    """ta.stdev / rolling(length).std(ddof): desvío móvil (0 exacto si la ventana es constante)."""
+    a, uno = _a2d(x)
+    return _salida(_media_desvio(a, length, ddof)[1], uno)
+
+
+def media_desvio(x, length, ddof=1):
+    """(rolling(length).mean(), rolling(length).std(ddof)) en una pasada."""
+    a, uno = _a2d(x)
+    media, sd = _media_desvio(a, length, ddof)
+    return _salida(media, uno), _salida(sd, uno)
+
+
+def _media_desvio(a, length, ddof):
+    s1, s2, ref = _sumas_moviles(a, length)
+    media = ref + s1 / length
+    var = np.maximum((s2 - s1 * s1 / length) / (length - ddof), 0.0)
+    # Como pandas: ventana de valores todos iguales -> media = ese valor y varianza 0 exactas
+    constante = _constantes(a, length)
+    media[constante] = a[constante]
+    var[constante] = 0.0
+    falta = _incompletas(a, length)
+    media[falta] = np.nan
+    var[falta] = np.nan
+    return media, np.sqrt(var)
+
+
+# ==============================================================================
+# 3. VOLATILIDAD / MOMENTUM / TENDENCIA
+# ==============================================================================
+def _rango_verdadero(h, l, c, prenan=False):
+    pc = _previo(c)
+    tr = np.fmax(np.fmax(np.abs(_no_cero(h - l)), np.abs(h - pc)), np.abs(pc - l))  # max ignorando NaN
+    if prenan: tr[:1] = np.nan
+    return tr
+
+
+def rango_verdadero(high, low, close, prenan=False):
+    """ta.true_range: max(|h-l|, |h-c_ant|, |c_ant-l|)."""
+    (h, uno), (l, _), (c, _) = _a2d(high), _a2d(low), _a2d(close)
+    return _salida(_rango_verdadero(h, l, c, prenan), uno)
+
+
+def _atr(h, l, c, length, prenan=False):
+    tr = _rango_verdadero(h, l, c, prenan)
+    if len(tr) >= length:
+        semilla = _media_inicial(tr, length)
+        tr[:length - 1] = np.nan
+        tr[length - 1] = semilla
+    return _ewm(tr, 1.0 / length)
+
+
+def atr(high, low, close, length=14, prenan=False):
+    """ta.atr: RMA del TR con semilla SMA."""
+    (h, uno), (l, _), (c, _) = _a2d(high), _a2d(low), _a2d(close)
+    return _salida(_atr(h, l, c, length, prenan), uno)
+
+
+def rsi(close, length=14):
+    """ta.rsi (RMA de subas / bajas)."""
+    c, uno = _a2d(close)
+    d = c - _previo(c)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sube = _ewm(np.where(d < 0, 0.0, d), 1.0 / length)
+        baja = np.abs(_ewm(np.where(d > 0, 0.0, d), 1.0 / length))
+        return _salida(100.0 * sube / (sube + baja), uno)
+
+
+def adx(high, low, close, length=14):
+    """ta.adx(...)['ADX_<length>']."""
+    (h, uno), (l, _), (c, _) = _a2d(high), _a2d(low), _a2d(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        k = 100.0 / _atr(h, l, c, length, prenan=True)
+        up = h - _previo(h)
+        dn = _previo(l) - l
+        pos = ((up > dn) & (up > 0)) * up
+        neg = ((dn > up) & (dn > 0)) * dn
+        pos[np.abs(pos) < EPS] = 0.0
+        neg[np.abs(neg) < EPS] = 0.0
+        dmp = k * _ewm(pos, 1.0 / length)
+        dmn = k * _ewm(neg, 1.0 / length)
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+        return _salida(_ewm(dx, 1.0 / length), uno)
+
+
+def bbands(close, length=20, std=2.0, ddof=1):
+    """ta.bbands -> (lower, mid, upper, bandwidth, percent)."""
+    c, uno = _a2d(close)
+    mid, sd = _media_desvio(c, length, ddof)
+    # ta.bbands usa la SMA de convolución para mid; la media centrada da el mismo valor
+    lower = mid - std * sd
+    upper = mid + std * sd
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ancho = _no_cero(upper - lower)
+        bandwidth = 100.0 * ancho / mid
+        percent = _no_cero(c - lower) / ancho
+    return tuple(_salida(v, uno) for v in (lower, mid, upper, bandwidth, percent))
+
+
+def kc(high, low, close, length=20, scalar=2.0):
+    """ta.kc (EMA del cierre y del TR) -> (lower, basis, upper)."""
+    (h, uno), (l, _), (c, _) = _a2d(high), _a2d(low), _a2d(close)
+    base = _a2d(ema(c, length))[0]
+    banda = _a2d(ema(_rango_verdadero(h, l, c), length))[0]
+    return tuple(_salida(v, uno) for v in (base - scalar * banda, base, base + scalar * banda))
+
+
+def slope(close, length=1):
+    """ta.slope: (x_t - x_{t-length}) / length."""
+    c, uno = _a2d(close)
+    return _salida((c - _previo(c, length)) / length, uno)
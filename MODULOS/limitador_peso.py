@@ -0,0 +1,111 @@
+import threading
+import time
+
+# ==============================================================================
+# LIMITADOR DE PESO (TOKEN BUCKET SOBRE EL "REQUEST WEIGHT" DE BINANCE)
+# ==============================================================================
+# Binance no limita peticiones sino PESO por minuto e IP:
+#   - Futuros USDⓈ-M: 2400 / min   - Spot: 6000 / min
+# El bucket se recarga de forma continua (capacidad / 60 por segundo) y se
+# corrige con el peso real que informa el exchange en X-MBX-USED-WEIGHT-1M.
+
+PESO_MINUTO_FUTUROS = 2400
+PESO_MINUTO_SPOT = 6000
+
+MARGEN_SEGURIDAD = 0.85  # Dejamos aire para el resto del bot (órdenes, Telegram, etc.)
+
+
+def peso_klines(limit, mercado='future'):
+    """Peso de GET klines según el límite pedido (tabla oficial de Binance)."""
+    if mercado != 'future': return 2
+    if limit < 100: return 1
+    if limit < 500: return 2
+    if limit <= 1000: return 5
+    return 10
+
+
+def peso_usado_de_headers(headers):
+    """Lee X-MBX-USED-WEIGHT-1M de las cabeceras de la última respuesta (None si no está)."""
+    if not headers: return None
+    for k, v in headers.items():
+        if k.lower() == 'x-mbx-used-weight-1m':
+            try: return int(v)
+            except (TypeError, ValueError): return None
+    return None
+
+
+class LimitadorPeso:
+
+    def __init__(self, peso_por_minuto, margen=MARGEN_SEGURIDAD):
+        self.limite = peso_por_minuto
+        self.capacidad = peso_por_minuto * margen
+        self.recarga_seg = self.capacidad / 60.0
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._cond = threading.Condition()
+
+        # Métricas
+        self.peso_consumido = 0
+        self.peticiones = 0
+        self.espera_total = 0.0
+        self.ultimo_peso_exchange = None
+
+    def _recargar(self):
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.recarga_seg)
+        self._ultimo = ahora
+
+    def consumir(self, peso=1):
+        """Bloquea hasta que haya peso disponible y lo descuenta."""
+        inicio = time.monotonic()
+        with self._cond:
+            while True:
+                self._recargar()
+                ahora = time.monotonic()
+                if ahora < self._pausa_hasta:
+                    self._cond.wait(self._pausa_hasta - ahora)
+                    continue
+                if self._tokens >= peso:
+                    self._tokens -= peso
+                    break
+                self._cond.wait((peso - self._tokens) / self.recarga_seg)
+            self.peso_consumido += peso
+            self.peticiones += 1
+            self.espera_total += time.monotonic() - inicio
+
+    def intentar(self, peso=1):
+        """
+        Versión no bloqueante (para quien maneja su propia cola): si hay peso lo
+        descuenta y devuelve 0.0; si no, devuelve los segundos que faltan.
+        """
+        with self._cond:
+            self._recargar()
+            ahora = time.monotonic()
+            if ahora < self._pausa_hasta: return self._pausa_hasta - ahora
+            if self._tokens >= peso:
+                self._tokens -= peso
+                self.peso_consumido += peso
+                self.peticiones += 1
+                return 0.0
+            return (peso - self._tokens) / self.recarga_seg
+
+    def sincronizar(self, peso_usado):
+        """Ajusta el bucket al peso que el exchange dice que ya usamos en este minuto."""
+        if peso_usado is None: return
+        with self._cond:
+            self._recargar()
+            self.ultimo_peso_exchange = peso_usado
+            self._tokens = min(self._tokens, max(0.0, self.capacidad - peso_usado))
+
+    def pausar(self, segundos):
+        """Tras un 429/418: nadie consume hasta que pase el Retry-After."""
+        with self._cond:
+            self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + segundos)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def disponible(self):
+        with self._cond:
+            self._recargar()
+            return self._tokens
@@ -0,0 +1,239 @@
+import io
+import json
+import re
+import zipfile
+
+import numpy as np
+from scipy.special import expit
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# ==============================================================================
+# FORWARD DE LAS REDES DEL ENSEMBLE EN NUMPY (SIN TENSORFLOW)
+# ==============================================================================
+# Las redes de train_ensemble son chicas: LSTM(128)/LSTM(64) -> BatchNorm ->
+# Dense(64) -> Dense(32) -> salida (estrategias) y LSTM apiladas (CONTEXTO,
+# TACTICO). Este módulo lee el .keras (config.json + model.weights.h5, es un
+# zip) y corre el forward con NumPy:
+#   - LSTM: la proyección de la entrada de TODOS los pasos es una sola matmul
+#     (T*n, f) @ (f, 4u), en orden temporal; en el bucle de pasos queda h @ U
+#     sobre buffers reusados. Las columnas de las compuertas i/f/o se escalan
+#     por 0.5 al cargar: sigmoid(x) = 0.5 * tanh(x/2) + 0.5, así UN tanh por
+#     paso cubre las cuatro compuertas (la función elemento a elemento, no la
+#     matmul, es lo que domina con lotes grandes).
+#   - BatchNorm (inferencia = afín) se pliega al cargar en la capa lineal que
+#     le sigue (Dense o kernel de entrada de la LSTM), atravesando Dropout y
+#     Concatenate: en el forward no existe.
+#   - Dropout: identidad.
+# Misma interfaz que Keras: predict(X, batch_size=None, verbose=0) -> np.ndarray.
+# Sirve para main.py (MOTOR_IA='NUMPY'), backtest_engine y minero_datos_masivo.
+
+BLOQUE = 256  # Filas por pasada: acota la proyección (n, T, 4u) de la LSTM en memoria
+
+ACTIVACIONES = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': expit,
+    'tanh': np.tanh,
+    'softmax': lambda x: _softmax(x),
+}
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _nombre_h5(clase):
+    """Nombre del grupo de pesos en model.weights.h5: la clase en snake_case (LSTM -> lstm)."""
+    if clase == 'LSTM': return 'lstm'
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', clase).lower()
+
+
+def leer_keras(path):
+    """(.keras) -> (config del modelo, {nombre de capa: [pesos...]}) sin Keras."""
+    if h5py is None: raise ImportError("lstm_numpy necesita h5py para leer los pesos del .keras")
+    with zipfile.ZipFile(path) as z:
+        config = json.loads(z.read('config.json'))
+        h5 = z.read('model.weights.h5')
+
+    capas = [c for c in config['config']['layers'] if c['class_name'] != 'InputLayer']
+    pesos, cuenta = {}, {}
+    with h5py.File(io.BytesIO(h5), 'r') as f:
+        for capa in capas:
+            # Keras 3 guarda cada capa como <clase>, <clase>_1, ... en el orden del modelo
+            base = _nombre_h5(capa['class_name'])
+            i = cuenta.get(base, 0); cuenta[base] = i + 1
+            grupo = f"layers/{base}" + (f"_{i}" if i else "")
+            if grupo not in f: continue
+            vars_ = f[grupo + '/cell/vars'] if 'cell' in f[grupo] else f[grupo + '/vars']
+            pesos[capa['config']['name']] = [np.asarray(vars_[str(k)], dtype=np.float32) for k in range(len(vars_))]
+    return config, pesos
+
+
+class _Op:
+    __slots__ = ('nombre', 'tipo', 'entradas', 'p')
+
+    def __init__(self, nombre, tipo, entradas, **p):
+        self.nombre, self.tipo, self.entradas, self.p = nombre, tipo, entradas, p
+
+
+class RedNumpy:
+    """Red del ensemble (Functional o Sequential) cargada del .keras, forward en NumPy."""
+
+    def __init__(self, config, pesos, nombre=None):
+        cfg = config['config']
+        self.nombre = nombre or cfg.get('name')
+        self._ops, self._entradas, self._salida = self._armar(config['class_name'], cfg, pesos)
+        self.plegadas = self._plegar_batchnorm()  # BatchNorm absorbidas por la capa lineal siguiente
+        for op in self._ops:
+            if op.tipo == 'lstm': self._escalar_compuertas(op)
+
+    # ------------------------------------------------------------------ armado
+    @staticmethod
+    def _origenes(capa, anterior):
+        nodos = capa.get('inbound_nodes')
+        if not nodos: return [anterior] if anterior else []  # Sequential: la capa anterior
+        args = nodos[0]['args']
+        tensores = args[0] if isinstance(args[0], list) else args
+        return [t['config']['keras_history'][0] for t in tensores]
+
+    def _armar(self, clase, cfg, pesos):
+        ops, alias, anterior, entradas = [], {}, None, []
+        for capa in cfg['layers']:
+            c, nombre, conf = capa['class_name'], capa['config']['name'], capa['config']
+            origen = [alias.get(o, o) for o in self._origenes(capa, anterior)]
+            if c == 'InputLayer':
+                entradas.append(nombre)
+            elif c == 'Dropout':
+                alias[nombre] = origen[0]
+            elif c == 'LSTM':
+                if conf.get('activation', 'tanh') != 'tanh' or conf.get('recurrent_activation', 'sigmoid') != 'sigmoid' \
+                        or conf.get('go_backwards') or conf.get('stateful'):
+                    raise ValueError(f"LSTM '{nombre}' con configuración no soportada")
+                W, U, *b = pesos[nombre]
+                ops.append(_Op(nombre, 'lstm', origen, W=W, U=U, b=b[0] if b else np.zeros(W.shape[1], np.float32),
+                               unidades=U.shape[0], secuencias=conf.get('return_sequences', False)))
+            elif c == 'BatchNormalization':
+                w = list(pesos[nombre])
+                gamma = w.pop(0) if conf.get('scale', True) else None
+                beta = w.pop(0) if conf.get('center', True) else None
+                media, var = w
+                s = 1.0 / np.sqrt(var + conf.get('epsilon', 1e-3))
+                if gamma is not None: s = s * gamma
+                t = -media * s + (beta if beta is not None else 0.0)
+                ops.append(_Op(nombre, 'afin', origen, s=s.astype(np.float32), t=t.astype(np.float32)))
+            elif c == 'Dense':
+                act = conf.get('activation', 'linear')
+                if act not in ACTIVACIONES: raise ValueError(f"Activación '{act}' no soportada en '{nombre}'")
+                W, *b = pesos[nombre]
+                ops.append(_Op(nombre, 'dense', origen, W=W, b=b[0] if b else np.zeros(W.shape[1], np.float32), act=act))
+            elif c == 'LeakyReLU':
+                ops.append(_Op(nombre, 'leaky', origen, pendiente=conf.get('negative_slope', conf.get('alpha', 0.3))))
+            elif c == 'Concatenate':
+                ops.append(_Op(nombre, 'concat', origen))
+            else:
+                raise ValueError(f"Capa '{c}' ({nombre}) no soportada por lstm_numpy")
+            anterior = alias.get(nombre, nombre)
+
+        if clase == 'Sequential':
+            if not entradas: entradas = ['entrada']; ops[0].entradas = ['entrada']
+            return ops, entradas, anterior
+        entradas = [e[0] for e in cfg['input_layers']] if isinstance(cfg['input_layers'][0], list) else [cfg['input_layers'][0]]
+        salida = cfg['output_layers'][0] if isinstance(cfg['output_layers'][0], list) else cfg['output_layers']
+        return ops, entradas, alias.get(salida[0], salida[0])
+
+    def _plegar_batchnorm(self):
+        """BatchNorm -> (Concatenate) -> Dense/LSTM: la afín entra en el kernel y el bias de la capa lineal."""
+        por_nombre = {op.nombre: op for op in self._ops}
+        usos = {}
+        for op in self._ops:
+            for e in op.entradas: usos[e] = usos.get(e, 0) + 1
+
+        def piezas_afines(op):
+            """[(offset, ancho, afín)] de la entrada de la capa: una BatchNorm o un Concatenate de BatchNorm."""
+            fuente = por_nombre.get(op.entradas[0])
+            if fuente is None: return []
+            piezas = [fuente]
+            if fuente.tipo == 'concat' and usos[fuente.nombre] == 1: piezas = [por_nombre.get(e) for e in fuente.entradas]
+            if not all(p is not None and p.tipo == 'afin' and usos[p.nombre] == 1 for p in piezas): return []
+            offsets = np.cumsum([0] + [len(p.p['s']) for p in piezas])
+            return [(offsets[k], len(p.p['s']), p) for k, p in enumerate(piezas)]
+
+        plegadas = set()
+        for op in self._ops:
+            if op.tipo not in ('dense', 'lstm'): continue
+            piezas = piezas_afines(op)
+            if not piezas: continue
+            W, b = op.p['W'].copy(), op.p['b'].copy()
+            for offset, ancho, afin in piezas:
+                filas = W[offset:offset + ancho]
+                b += afin.p['t'] @ filas
+                W[offset:offset + ancho] = afin.p['s'][:, None] * filas
+                plegadas.add(afin.nombre)
+            op.p['W'], op.p['b'] = W, b
+            fuente = por_nombre[op.entradas[0]]
+            if fuente.tipo == 'concat': fuente.entradas = [afin.entradas[0] for _, _, afin in piezas]
+            else: op.entradas = [fuente.entradas[0]]
+        self._ops = [op for op in self._ops if op.nombre not in plegadas]
+        return len(plegadas)
+
+    @staticmethod
+    def _escalar_compuertas(op):
+        """Columnas i, f, o (orden Keras: i, f, c, o) por 0.5: tanh de eso da 2*sigmoid - 1."""
+        u = op.p['unidades']
+        escala = np.full(4 * u, 0.5, dtype=np.float32); escala[2 * u:3 * u] = 1.0
+        op.p['W'], op.p['U'], op.p['b'] = op.p['W'] * escala, op.p['U'] * escala, op.p['b'] * escala
+
+    # ----------------------------------------------------------------- forward
+    @staticmethod
+    def _lstm(x, W, U, b, unidades, secuencias):
+        n, pasos, _ = x.shape
+        u = unidades
+        Z = (np.ascontiguousarray(x.transpose(1, 0, 2)).reshape(pasos * n, -1) @ W).reshape(pasos, n, 4 * u)
+        Z += b
+        h = np.zeros((n, u), dtype=np.float32); c = np.zeros_like(h); tmp = np.empty_like(h)
+        z = np.empty((n, 4 * u), dtype=np.float32)
+        salida = np.empty((pasos, n, u), dtype=np.float32) if secuencias else None
+        i, f, g, o = (slice(k * u, (k + 1) * u) for k in range(4))
+        for t in range(pasos):
+            np.matmul(h, U, out=z); z += Z[t]
+            np.tanh(z, out=z)
+            z[:, i] += 1; z[:, f] += 1; z[:, o] += 1           # i, f, o = 2 * sigmoid
+            c *= z[:, f]; np.multiply(z[:, i], z[:, g], out=tmp); c += tmp; c *= 0.5
+            np.tanh(c, out=h); h *= z[:, o]; h *= 0.5
+            if secuencias: salida[t] = h
+        return salida.transpose(1, 0, 2) if secuencias else h
+
+    def _forward(self, entradas):
+        v = dict(zip(self._entradas, entradas))
+        for op in self._ops:
+            x = [v[e] for e in op.entradas]
+            if op.tipo == 'lstm': y = self._lstm(x[0], **op.p)
+            elif op.tipo == 'dense': y = ACTIVACIONES[op.p['act']](x[0] @ op.p['W'] + op.p['b'])
+            elif op.tipo == 'afin': y = x[0] * op.p['s'] + op.p['t']
+            elif op.tipo == 'leaky': y = np.where(x[0] > 0, x[0], x[0] * np.float32(op.p['pendiente']))
+            else: y = np.concatenate(x, axis=-1)
+            v[op.nombre] = y
+        return v[self._salida]
+
+    def predict(self, X, batch_size=None, verbose=0):
+        """Como keras predict (batch_size/verbose se ignoran: se procesa en bloques de BLOQUE filas)."""
+        X = [np.asarray(x, dtype=np.float32) for x in (X if isinstance(X, (list, tuple)) else [X])]
+        n = len(X[0])
+        if n <= BLOQUE: return self._forward(X)
+        return np.concatenate([self._forward([x[i:i + BLOQUE] for x in X]) for i in range(0, n, BLOQUE)])
+
+    def calentar(self):
+        return self  # Sin grafo que trazar: misma interfaz que ModeloCompilado / ModeloTFLite
+
+    __call__ = predict
+
+
+def cargar_numpy(path, nombre=None):
+    """Carga un .keras del ensemble como RedNumpy (sin importar TensorFlow)."""
+    config, pesos = leer_keras(path)
+    return RedNumpy(config, pesos, nombre)
@@ -3,6 +3,9 @@ import numpy as np
 import pandas_ta as ta
 import glob
 import os
+import threading
+
+from MODULOS.indice_mercado import IndiceMercado
 
 # ==============================================================================
 # 1. CONSTRUCTOR DEL INDICE (BASKET RETURN) + BTC
@@ -12,7 +15,7 @@ def construir_indice_mercado(carpeta_top20):
     archivos = glob.glob(os.path.join(carpeta_top20, "*.csv"))
     if not archivos: return None, None
 
-    dict_returns = {}
+    dict_closes = {}
     dict_volumes = {}
     btc_series = None
 
@@ -28,10 +31,9 @@ def construir_indice_mercado(carpeta_top20):
             df.set_index('time', inplace=True)
             df = df[~df.index.duplicated(keep='last')].sort_index()
 
-            ret = df['close'].pct_change()
             name = os.path.basename(f)
             
-            dict_returns[name] = ret
+            dict_closes[name] = df['close']
             dict_volumes[name] = df['volume']
             
             # --- BTC ---
@@ -42,35 +44,78 @@ def construir_indice_mercado(carpeta_top20):
                 
         except: pass
 
-    # Construir Índice Ponderado
-    df_rets = pd.DataFrame(dict_returns).ffill(limit=5)
-    df_vols = pd.DataFrame(dict_volumes).ffill(limit=5).fillna(0)
-
-    numerator = (df_rets * df_vols).sum(axis=1)
-    denominator = df_vols.sum(axis=1)
-    market_index = numerator / (denominator + 1e-9)
+    # Construir Índice Ponderado (mismo componente que usa el main en vivo)
+    if not dict_closes: return None, btc_series
+    market_index = IndiceMercado.desde_series(dict_closes, dict_volumes, limite_ffill=5).serie()
     
     # Retornamos AMBOS: el índice general y la serie de BTC
     return market_index, btc_series
 
+# ==============================================================================
+# 1b. Z-SCORE PONDERADO MÓVIL (FORMA CERRADA)
+# ==============================================================================
+def zscore_ponderado_movil(x, largo=50, inicio_peso=20, peso=2.0):
+    """
+    Z-Score de la última observación de cada ventana de 'largo' filas, con pesos
+    1 en las primeras (largo - inicio_peso) y 'peso' en las últimas inicio_peso.
+    Igual a rolling(largo).apply(np.average ponderado) pero con sumas acumuladas
+    de x y x² por tramo: O(n), sin callbacks. Acepta Series o array (n,) / (n, pares).
+    """
+    serie = x if isinstance(x, pd.Series) else None
+    a = np.asarray(x, dtype=np.float64)
+    n = a.shape[0]
+    res = np.full(a.shape, np.nan)
+    if n < largo: return pd.Series(res, index=serie.index, name=serie.name) if serie is not None else res
+
+    # Centrado en el primer valor válido: la varianza no cambia con un corrimiento, las sumas
+    # no pierden precisión y (a diferencia de la media global) filas nuevas no tocan el pasado
+    validos = ~np.isnan(a)
+    primero = np.argmax(validos, axis=0)
+    centro = np.nan_to_num(np.take_along_axis(a, np.expand_dims(primero, 0), axis=0)[0])
+    c = np.where(validos, a - centro, 0.0)
+    cero = np.zeros((1,) + a.shape[1:])
+    s1 = np.concatenate([cero, np.cumsum(c, axis=0)])
+    s2 = np.concatenate([cero, np.cumsum(c * c, axis=0)])
+    nn = np.concatenate([cero, np.cumsum(~validos, axis=0)])
+
+    fin = np.arange(largo, n + 1)          # Ventana [fin - largo, fin)
+    ini, medio = fin - largo, fin - inicio_peso
+    suma = (s1[fin] - s1[ini]) + (peso - 1.0) * (s1[fin] - s1[medio])
+    suma2 = (s2[fin] - s2[ini]) + (peso - 1.0) * (s2[fin] - s2[medio])
+    w_total = (largo - inicio_peso) + peso * inicio_peso
+
+    w_mean = suma / w_total
+    variance = np.maximum(suma2 / w_total - w_mean ** 2, 0.0)
+    w_std = np.maximum(np.sqrt(variance), 1e-12)
+    z = (c[largo - 1:] - w_mean) / w_std
+    z[(nn[fin] - nn[ini]) > 0] = np.nan    # Como rolling: ventana con NaN -> NaN
+    res[largo - 1:] = z
+    return pd.Series(res, index=serie.index, name=serie.name) if serie is not None else res
+
 # ==============================================================================
 # 2. INDICADORES DE CONTEXTO (RAW / PURO / DIARIO)
 # ==============================================================================
-def agregar_indicadores_contexto(df, market_series_5m, btc_series_5m=None):
-    
-    # --- RESAMPLE DIARIO (Cierre 00:00 UTC) ---
-    df_daily = df.resample('D').agg({
-        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
-    })
-    
-    # Indice Mercado Diario
+def cierres_diarios_mercado(market_series_5m, btc_series_5m=None):
+    """Cierre diario del índice de mercado (retornos 5m acumulados) y de BTC (None si no hay)."""
     market_price_index = (1 + market_series_5m).cumprod()
     market_daily_close = market_price_index.resample('D').last()
+    btc_daily_close = btc_series_5m.resample('D').last() if btc_series_5m is not None else None
+    return market_daily_close, btc_daily_close
+
+def contexto_diario(df, market_daily_close, btc_daily_close=None, df_daily=None):
+    """
+    Indicadores diarios del par ya desplazados un día (fila D = datos cerrados hasta D-1).
+    df_daily: velas diarias ya agregadas (ResampleVelas); si no viene se resamplea df.
+    """
+
+    # --- RESAMPLE DIARIO (Cierre 00:00 UTC) ---
+    if df_daily is None:
+        df_daily = df.resample('D').agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        })
     
     # BTC Diario (Si existe)
-    if btc_series_5m is not None:
-        btc_daily_close = btc_series_5m.resample('D').last()
-    else:
+    if btc_daily_close is None:
         # Si no hay BTC, llenamos con ceros para no romper el código
         btc_daily_close = pd.Series(0, index=df_daily.index)
     
@@ -105,19 +150,9 @@ def agregar_indicadores_contexto(df, market_series_5m, btc_series_5m=None):
     avg_perf_diff = ta.sma(perf_diff, length=LOOKBACK)
     df_daily['Promedio Últimos N'] = avg_perf_diff
     
-    # Sesgo Ponderado
-    weights = np.concatenate([np.ones(BIAS_LEN - BIAS_WEIGHT_START), np.full(BIAS_WEIGHT_START, 2.0)])
-    
-    def weighted_zscore_calc(x):
-        if len(x) != BIAS_LEN: return np.nan
-        w_mean = np.average(x, weights=weights)
-        variance = np.average((x - w_mean)**2, weights=weights)
-        w_std = np.sqrt(variance)
-        if w_std < 1e-12: w_std = 1e-12
-        return (x[-1] - w_mean) / w_std
-
+    # Sesgo Ponderado (pesos 1 x30 + 2 x20, forma cerrada)
     # VALOR PURO
-    df_daily['Z-Score Sesgo Ponderado'] = avg_perf_diff.rolling(window=BIAS_LEN).apply(weighted_zscore_calc, raw=True)
+    df_daily['Z-Score Sesgo Ponderado'] = zscore_ponderado_movil(avg_perf_diff, BIAS_LEN, BIAS_WEIGHT_START, 2.0)
     
     # 4. Correlación
     df_daily['Correlación'] = asset_ret_smooth.rolling(CORREL_WINDOW).corr(market_ret_smooth)
@@ -150,10 +185,73 @@ def agregar_indicadores_contexto(df, market_series_5m, btc_series_5m=None):
         'BTC_Trend_Score', 'BTC_Daily_Ret'
     ]
     
-    df_context_shifted = df_daily[cols_to_merge].shift(1)
-    
+    return df_daily[cols_to_merge].shift(1)
+
+def difundir_contexto(df, df_context_shifted):
+    """Cada vela de 5m recibe la fila diaria de su día (ffill sobre el índice diario)."""
     # --- MERGE ---
     df_context_final = df_context_shifted.reindex(df.index, method='ffill')
-    df = df.join(df_context_final)
-    
-    return df
\ No newline at end of file
+    return df.join(df_context_final)
+
+def agregar_indicadores_contexto(df, market_series_5m, btc_series_5m=None):
+    market_daily_close, btc_daily_close = cierres_diarios_mercado(market_series_5m, btc_series_5m)
+    return difundir_contexto(df, contexto_diario(df, market_daily_close, btc_daily_close))
+
+# ==============================================================================
+# 3. CACHE DIARIA DEL CONTEXTO (EN VIVO)
+# ==============================================================================
+# Con el shift(1) la fila del día D solo usa días cerrados: no cambia hasta las
+# 00:00 UTC. Se recalcula una vez por día y par; en cada ciclo solo se difunde.
+class CacheContextoDiario:
+
+    def __init__(self):
+        self._por_par = {}       # symbol -> (día en curso, contexto diario desplazado)
+        self._mercado = None     # (día en curso, cierre diario mercado, cierre diario BTC)
+        self._lock = threading.Lock()
+        self.recalculos = 0
+        self.aciertos = 0
+
+    @staticmethod
+    def dia_en_curso(index):
+        """00:00 UTC del día de la última vela (el último día cerrado es el anterior)."""
+        return index[-1].floor('D') if len(index) else None
+
+    def _cierres_mercado(self, market_series_5m, btc_series_5m):
+        dia = self.dia_en_curso(market_series_5m.index)
+        with self._lock:
+            if self._mercado is not None and self._mercado[0] == dia:
+                return self._mercado[1], self._mercado[2]
+        market_daily_close, btc_daily_close = cierres_diarios_mercado(market_series_5m, btc_series_5m)
+        with self._lock: self._mercado = (dia, market_daily_close, btc_daily_close)
+        return market_daily_close, btc_daily_close
+
+    def contexto(self, symbol, df, market_series_5m, btc_series_5m=None, df_daily=None):
+        """Contexto diario desplazado del par; se recalcula solo al cambiar el día UTC."""
+        dia = self.dia_en_curso(df.index)
+        with self._lock:
+            guardado = self._por_par.get(symbol)
+            if guardado is not None and guardado[0] == dia:
+                self.aciertos += 1
+                return guardado[1]
+        market_daily_close, btc_daily_close = self._cierres_mercado(market_series_5m, btc_series_5m)
+        df_context_shifted = contexto_diario(df, market_daily_close, btc_daily_close, df_daily)
+        with self._lock:
+            self.recalculos += 1
+            # Si el mercado todavía no llegó al día del par, no se fija: se reintenta el próximo ciclo
+            if len(df_context_shifted) and df_context_shifted.index[-1] == dia:
+                self._por_par[symbol] = (dia, df_context_shifted)
+        return df_context_shifted
+
+    def agregar(self, symbol, df, market_series_5m, btc_series_5m=None, filas=None, df_daily=None):
+        """
+        Igual que agregar_indicadores_contexto, pero con el contexto del día ya calculado.
+        Con 'filas' solo se difunde sobre la cola (lo que lee la IA), no sobre todo el buffer.
+        Con 'df_daily' (velas diarias del resample compartido) df solo necesita la cola.
+        """
+        df_context_shifted = self.contexto(symbol, df, market_series_5m, btc_series_5m, df_daily)
+        return difundir_contexto(df if filas is None else df.iloc[-filas:], df_context_shifted)
+
+    def invalidar(self, symbol=None):
+        with self._lock:
+            if symbol is None: self._por_par.clear(); self._mercado = None
+            else: self._por_par.pop(symbol, None)
\ No newline at end of file
@@ -0,0 +1,66 @@
+import threading
+
+# ==============================================================================
+# MEMO DE REGÍMENES (CONTEXTO / TACTICO) POR BARRA CERRADA
+# ==============================================================================
+# CONTEXTO lee features diarias (cambian una vez por día UTC); TACTICO lee velas
+# 1h cerradas (cambian una vez por hora). Recalcularlos en cada ciclo de 5m
+# repite la misma inferencia ~12 veces por hora y ~288 por día. (El HMM lleva su
+# propio estado por hora cerrada: MODULOS/filtro_hmm.py.)
+#
+# Clave: (modelo, par) -> (marca, salida), donde 'marca' es el timestamp de la
+# última barra cerrada que entra en la ventana del modelo. Mientras la marca no
+# avance se devuelve la salida guardada (probabilidades del régimen).
+# Se guarda solo la última marca por (modelo, par): memoria acotada.
+#
+# Al recargar modelos en caliente hay que invalidar: la salida guardada es del
+# modelo anterior aunque la barra sea la misma.
+
+
+def marca_ventana_diaria(index):
+    """
+    Marca de una ventana de velas 5m con features diarias difundidas: el día UTC si la
+    ventana cae entera en un día (valores fijos); si cruza la medianoche, (día, última vela)
+    (mezcla de días: cambia en cada vela hasta que la ventana quede en el día nuevo). La
+    tupla no choca con la marca del día aunque la última vela sea justo las 00:00.
+    """
+    if len(index) == 0: return None
+    dia_ini, dia_fin = index[0].floor('D'), index[-1].floor('D')
+    return dia_fin if dia_ini == dia_fin else (dia_fin, index[-1])
+
+
+class MemoRegimen:
+    """Salidas de los modelos de régimen por (modelo, par), válidas mientras no avance la barra."""
+
+    def __init__(self):
+        self._memo = {}          # (modelo, symbol) -> (marca, salida)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, modelo, symbol, marca):
+        """Salida guardada si la marca es la misma (acierto); None si hay que inferir (fallo)."""
+        if marca is None: return None
+        with self._lock:
+            guardado = self._memo.get((modelo, symbol))
+            if guardado is not None and guardado[0] == marca:
+                self.aciertos += 1
+                return guardado[1]
+            self.fallos += 1
+            return None
+
+    def guardar(self, modelo, symbol, marca, salida):
+        if marca is None or salida is None: return
+        with self._lock: self._memo[(modelo, symbol)] = (marca, salida)
+
+    def invalidar(self, modelo=None, symbol=None):
+        """Todo (recarga de modelos), un modelo o un par."""
+        def borrar(clave): return (modelo is None or clave[0] == modelo) and (symbol is None or clave[1] == symbol)
+        with self._lock:
+            self._memo = {k: v for k, v in self._memo.items() if not borrar(k)}
+            self.invalidaciones += 1
+
+    def resumen(self):
+        total = self.aciertos + self.fallos
+        return f"{self.aciertos}/{total} aciertos ({self.aciertos / total:.0%})" if total else "sin consultas"
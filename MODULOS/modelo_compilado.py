@@ -0,0 +1,57 @@
+import numpy as np
+import tensorflow as tf
+
+# ==============================================================================
+# MODELOS KERAS COMPILADOS PARA INFERENCIA (tf.function CON FIRMA FIJA)
+# ==============================================================================
+# model.predict() arma en cada llamada un pipeline tf.data, un iterador y los
+# callbacks: para 1..50 ventanas ese armado cuesta más que la red. Acá cada
+# modelo cargado se envuelve en UNA tf.function con la firma de sus entradas
+# (batch libre, resto fijo, float32): se traza una sola vez al arrancar
+# (calentar) y después cada llamada va directo al grafo, sin retrazar aunque
+# cambie la cantidad de pares del lote.
+#
+# Misma interfaz que Keras: predict(X, batch_size=None, verbose=0) -> np.ndarray,
+# así LoteInferencia y el resto del bot no cambian.
+
+
+class ModeloCompilado:
+    """Modelo Keras + tf.function(training=False) con input_signature fija."""
+
+    def __init__(self, modelo, nombre=None):
+        self.modelo = modelo
+        self.nombre = nombre or modelo.name
+        self.firmas = [tf.TensorSpec((None,) + tuple(t.shape[1:]), tf.float32, name=f"entrada_{i}")
+                       for i, t in enumerate(modelo.inputs)]
+        self._varias = len(self.firmas) > 1
+        if self._varias:
+            self._fn = tf.function(lambda *x: modelo(list(x), training=False), input_signature=self.firmas)
+        else:
+            self._fn = tf.function(lambda x: modelo(x, training=False), input_signature=self.firmas)
+
+    @property
+    def trazas(self):
+        """Veces que se trazó el grafo (1 tras calentar; si sube, algo cambió la firma)."""
+        return self._fn.experimental_get_tracing_count()
+
+    def calentar(self):
+        """Traza el grafo y reserva buffers con una ventana de ceros (al arrancar, no en el primer ciclo)."""
+        ceros = [np.zeros((1,) + tuple(f.shape[1:]), dtype=np.float32) for f in self.firmas]
+        self.predict(ceros if self._varias else ceros[0])
+        return self
+
+    def predict(self, X, batch_size=None, verbose=0):
+        """Como keras predict (batch_size/verbose se ignoran: una sola pasada con todo X)."""
+        entradas = X if self._varias else [X]
+        salida = self._fn(*[tf.convert_to_tensor(np.asarray(x, dtype=np.float32)) for x in entradas])
+        return salida.numpy()
+
+    __call__ = predict
+
+
+def compilar_modelos(modelos, nombres=None):
+    """Envuelve y calienta los modelos Keras del dict (los que no son Keras, p.ej. el HMM, quedan igual)."""
+    for nombre, modelo in modelos.items():
+        if isinstance(modelo, tf.keras.Model) and (nombres is None or nombre in nombres):
+            modelos[nombre] = ModeloCompilado(modelo, nombre).calentar()
+    return modelos
@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import ccxt.async_support as ccxt_async
+
+from MODULOS.planificador_exchange import ExchangeProgramadoAsync
+
+# ==============================================================================
+# NÚCLEO ASYNC DEL CICLO
+# ==============================================================================
+# Un solo event loop (hilo 'nucleo_async') para todo lo que es espera de red:
+#   - Lecturas del ciclo en paralelo con ccxt.async_support (puntas, posiciones,
+#     relleno de huecos), pasando por el mismo planificador de peso/prioridad.
+#   - Fan-out de trabajo bloqueante en pools ACOTADOS:
+#       cpu        -> features + inferencia por par
+#       io         -> salidas, órdenes, movimientos de SL, tareas cortas
+#       vigilantes -> monitores de órdenes Limit (viven minutos/horas)
+#       telegram   -> envíos en orden, un solo hilo
+# Ya no se crea un threading.Thread por mensaje / orden / movimiento de SL.
+
+
+class NucleoAsync:
+
+    def __init__(self, workers_cpu=4, workers_io=8, workers_vigilantes=6):
+        self.pool_cpu = ThreadPoolExecutor(workers_cpu, thread_name_prefix='cpu')
+        self.pool_io = ThreadPoolExecutor(workers_io, thread_name_prefix='io')
+        self.pool_vigilantes = ThreadPoolExecutor(workers_vigilantes, thread_name_prefix='vigilante')
+        self.pool_telegram = ThreadPoolExecutor(1, thread_name_prefix='telegram')
+        self.workers_vigilantes = workers_vigilantes
+
+        self.loop = None
+        self._hilo = None
+        self._vigilantes_activos = 0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # CICLO DE VIDA
+    # --------------------------------------------------------------------------
+    def iniciar(self):
+        if self.loop is not None: return
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.pool_io)
+        listo = threading.Event()
+
+        def correr():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(listo.set)
+            self.loop.run_forever()
+
+        self._hilo = threading.Thread(target=correr, name="nucleo_async", daemon=True)
+        self._hilo.start()
+        listo.wait()
+
+    def detener(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._hilo.join(timeout=5)
+        for pool in (self.pool_cpu, self.pool_io, self.pool_vigilantes, self.pool_telegram):
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # --------------------------------------------------------------------------
+    # PUENTE SYNC -> ASYNC
+    # --------------------------------------------------------------------------
+    def ejecutar(self, coro, timeout=None):
+        """Corre una corrutina en el loop del núcleo y espera su resultado (desde código sync)."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def en_cpu(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool_cpu, functools.partial(fn, *args))
+
+    async def en_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool_io, functools.partial(fn, *args))
+
+    def en_paralelo(self, fn, lista_args, cpu=False):
+        """
+        fn(*args) para cada args de la lista, todos a la vez en el pool (cpu o io).
+        Devuelve los resultados en el mismo orden; si uno falla se loguea y queda None.
+        """
+        if not lista_args: return []
+        correr = self.en_cpu if cpu else self.en_io
+
+        async def _todos():
+            return await asyncio.gather(*[correr(fn, *args) for args in lista_args], return_exceptions=True)
+
+        resultados = self.ejecutar(_todos())
+        for i, r in enumerate(resultados):
+            if isinstance(r, BaseException):
+                print(f"⚠️ Error en tarea paralela {getattr(fn, '__name__', fn)}: {r}")
+                traceback.print_exception(type(r), r, r.__traceback__)
+                resultados[i] = None
+        return resultados
+
+    # --------------------------------------------------------------------------
+    # TAREAS EN SEGUNDO PLANO (reemplazan threading.Thread(...).start())
+    # --------------------------------------------------------------------------
+    def _reportar(self, nombre):
+        def callback(futuro):
+            e = futuro.exception() if not futuro.cancelled() else None
+            if e is not None:
+                print(f"⚠️ Error en tarea de fondo {nombre}: {e}")
+        return callback
+
+    def lanzar(self, fn, *args):
+        """Tarea corta (mover SL, escaneos puntuales...)."""
+        futuro = self.pool_io.submit(fn, *args)
+        futuro.add_done_callback(self._reportar(getattr(fn, '__name__', 'tarea')))
+        return futuro
+
+    def lanzar_vigilante(self, fn, *args):
+        """Tarea larga (monitor de Limit). Si el pool está lleno queda en espera."""
+        with self._lock:
+            if self._vigilantes_activos >= self.workers_vigilantes:
+                print(f"⚠️ {self._vigilantes_activos} vigilantes activos: el nuevo espera turno.")
+            self._vigilantes_activos += 1
+
+        def envoltura():
+            try: return fn(*args)
+            finally:
+                with self._lock: self._vigilantes_activos -= 1
+
+        futuro = self.pool_vigilantes.submit(envoltura)
+        futuro.add_done_callback(self._reportar(getattr(fn, '__name__', 'vigilante')))
+        return futuro
+
+    def lanzar_telegram(self, fn, *args):
+        """Envíos a Telegram: un solo hilo, en orden de llegada."""
+        futuro = self.pool_telegram.submit(fn, *args)
+        futuro.add_done_callback(self._reportar('telegram'))
+        return futuro
+
+    # --------------------------------------------------------------------------
+    # EXCHANGE ASYNC
+    # --------------------------------------------------------------------------
+    def crear_exchange_async(self, config, planificador, markets=None, currencies=None):
+        """Binance (ccxt.async_support) detrás del planificador. Reusa los mercados ya cargados."""
+        async def _crear():
+            ex = ccxt_async.binance(config)
+            if markets: ex.set_markets(markets, currencies)
+            return ExchangeProgramadoAsync(ex, planificador)
+        return self.ejecutar(_crear())
+
+    def cerrar_exchange_async(self, exchange_async):
+        try: self.ejecutar(exchange_async.close(), timeout=10)
+        except Exception as e: print(f"⚠️ Error cerrando exchange async: {e}")
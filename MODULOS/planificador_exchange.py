@@ -0,0 +1,389 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from MODULOS.limitador_peso import peso_usado_de_headers
+
+# ==============================================================================
+# PLANIFICADOR DE PETICIONES AL EXCHANGE
+# ==============================================================================
+# Todos los hilos (main loop, Telegram, vigilantes de Limit, movimientos de SL)
+# comparten el mismo objeto ccxt. Este planificador se pone delante:
+#   - Cola por prioridad: SALIDA > ENTRADA > CONCILIACION > TELEGRAM.
+#   - Presupuesto de peso compartido (LimitadorPeso + X-MBX-USED-WEIGHT-1M).
+#   - Lecturas idénticas en vuelo se unen: la segunda espera el resultado de la primera
+#     (solo si la primera no tiene peor prioridad y ninguna escritura sobre su símbolo
+#     fue admitida desde entonces: create/cancel/edit invalidan las lecturas en vuelo).
+#   - El peso real sale de las cabeceras de CADA respuesta (on_rest_response de ccxt),
+#     no de last_response_headers, que comparten hasta max_en_vuelo peticiones.
+#   - Métricas de cola (profundidad, espera media/máxima) para /status.
+#
+# La prioridad se toma del hilo que llama: por defecto ENTRADA, fijada por hilo
+# (fijar_prioridad_hilo) o por función (@planificador.con_prioridad(...)).
+# En el núcleo async (varias corrutinas en un mismo hilo) se guarda en un
+# ContextVar, así cada tarea conserva la suya.
+
+PRIORIDAD_SALIDA = 0        # TP/SL, cierres, mover SL, pánico
+PRIORIDAD_ENTRADA = 1       # Escaneo, órdenes de entrada, vigilantes de Limit
+PRIORIDAD_CONCILIACION = 2  # Auditoría / sincronización de cartera
+PRIORIDAD_TELEGRAM = 3      # Consultas de comandos
+
+NOMBRES_PRIORIDAD = {PRIORIDAD_SALIDA: 'SALIDA', PRIORIDAD_ENTRADA: 'ENTRADA',
+                     PRIORIDAD_CONCILIACION: 'CONCILIACION', PRIORIDAD_TELEGRAM: 'TELEGRAM'}
+
+# Métodos que van a la red (el resto: precisiones, markets, fechas... pasan directo)
+PREFIJOS_RED = ('fetch', 'create', 'cancel', 'edit', 'load_markets', 'set_leverage',
+                'set_margin_mode', 'set_position_mode', 'transfer', 'fapi', 'sapi', 'public', 'private')
+
+# Métodos que cambian órdenes / posiciones: invalidan las lecturas en vuelo de su símbolo
+PREFIJOS_ESCRITURA = ('create', 'cancel', 'edit')
+# Métodos ccxt con el símbolo en segundo lugar (id, symbol, ...)
+SIMBOLO_SEGUNDO = ('cancel_order', 'cancel_orders', 'edit_order', 'fetch_order')
+
+# Peso aproximado en Binance Futuros (IP weight). Lo no listado cuenta 1.
+PESOS_METODO = {
+    'fetch_ohlcv': 5, 'fetch_tickers': 40, 'fetch_bids_asks': 5, 'fetch_positions': 5,
+    'fetch_balance': 5, 'fetch_my_trades': 5, 'fetch_closed_orders': 5, 'fetch_orders': 5,
+    'fetch_order_book': 5, 'load_markets': 1, 'fetch_funding_rate': 1,
+}
+
+
+def peso_metodo(nombre, args, kwargs):
+    if nombre == 'fetch_open_orders':
+        # Sin símbolo Binance cobra 40
+        return 1 if (args and args[0]) or kwargs.get('symbol') else 40
+    return PESOS_METODO.get(nombre, 1)
+
+
+def simbolos_llamada(nombre, args, kwargs):
+    """Símbolos que toca una llamada ccxt; None = sin símbolo (toda la cuenta / el mercado)."""
+    i = 1 if nombre in SIMBOLO_SEGUNDO else 0
+    s = args[i] if len(args) > i else kwargs.get('symbol', kwargs.get('symbols'))
+    if not s: return None
+    return (s,) if isinstance(s, str) else tuple(s)
+
+
+_PRIORIDAD_TAREA = contextvars.ContextVar('prioridad_exchange', default=None)
+_CABECERAS = contextvars.ContextVar('cabeceras_exchange', default=None)
+
+
+def capturar_cabeceras(exchange):
+    """
+    ccxt llama on_rest_response() desde el hilo / la tarea que hizo la petición: ahí se
+    guardan las cabeceras en un ContextVar, propio de cada hilo y de cada tarea async.
+    """
+    original = getattr(exchange, 'on_rest_response', None)
+    if original is None or getattr(original, 'captura_cabeceras', False): return
+
+    def on_rest_response(code, reason, url, method, response_headers, *resto):
+        _CABECERAS.set(response_headers)
+        return original(code, reason, url, method, response_headers, *resto)
+    on_rest_response.captura_cabeceras = True
+    exchange.on_rest_response = on_rest_response
+ESPERA_SONDEO_ASYNC = 0.05  # Las corrutinas en cola re-evalúan su turno cada 50 ms
+
+
+class PlanificadorExchange:
+
+    def __init__(self, limitador, max_en_vuelo=8):
+        self.limitador = limitador
+        self.max_en_vuelo = max_en_vuelo
+
+        self._cond = threading.Condition()
+        self._cola = []                 # heap de (prioridad, secuencia)
+        self._seq = itertools.count()
+        self._en_vuelo = 0
+        self._lecturas = {}             # clave -> (Future, prioridad, símbolos) de lecturas en vuelo
+        self._local = threading.local()
+
+        # Métricas por prioridad
+        self._metricas = {p: {'peticiones': 0, 'espera_total': 0.0, 'espera_max': 0.0, 'unidas': 0, 'errores': 0}
+                          for p in NOMBRES_PRIORIDAD}
+
+    # --------------------------------------------------------------------------
+    # PRIORIDAD DEL HILO
+    # --------------------------------------------------------------------------
+    def prioridad_actual(self):
+        tarea = _PRIORIDAD_TAREA.get()
+        if tarea is not None: return tarea
+        pila = getattr(self._local, 'pila', None)
+        if pila: return pila[-1]
+        return getattr(self._local, 'base', PRIORIDAD_ENTRADA)
+
+    def fijar_prioridad_hilo(self, prioridad):
+        self._local.base = prioridad
+
+    def con_prioridad(self, prioridad):
+        """Decorador: todo lo que la función pida al exchange va con esta prioridad."""
+        def decorador(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def envoltura_async(*args, **kwargs):
+                    token = _PRIORIDAD_TAREA.set(prioridad)
+                    try: return await fn(*args, **kwargs)
+                    finally: _PRIORIDAD_TAREA.reset(token)
+                return envoltura_async
+
+            @functools.wraps(fn)
+            def envoltura(*args, **kwargs):
+                pila = getattr(self._local, 'pila', None)
+                if pila is None: pila = self._local.pila = []
+                pila.append(prioridad)
+                try: return fn(*args, **kwargs)
+                finally: pila.pop()
+            return envoltura
+        return decorador
+
+    # --------------------------------------------------------------------------
+    # ADMISIÓN
+    # --------------------------------------------------------------------------
+    def _admitir(self, prioridad, peso):
+        """Espera turno: primero de la cola, hueco libre y peso disponible."""
+        yo = (prioridad, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._cola, yo)
+            try:
+                while True:
+                    espera = None
+                    if self._cola[0] == yo and self._en_vuelo < self.max_en_vuelo:
+                        espera = self.limitador.intentar(peso)
+                        if espera == 0.0:
+                            heapq.heappop(self._cola)
+                            self._en_vuelo += 1
+                            self._cond.notify_all()  # El siguiente de la cola re-evalúa
+                            return
+                    self._cond.wait(timeout=min(espera, 1.0) if espera else 1.0)
+            except BaseException:
+                if yo in self._cola:
+                    self._cola.remove(yo); heapq.heapify(self._cola)
+                    self._cond.notify_all()
+                raise
+
+    async def _admitir_async(self, prioridad, peso):
+        """Igual que _admitir pero sin bloquear el event loop (sondeo corto)."""
+        yo = (prioridad, next(self._seq))
+        with self._cond: heapq.heappush(self._cola, yo)
+        try:
+            while True:
+                espera = ESPERA_SONDEO_ASYNC
+                with self._cond:
+                    if self._cola[0] == yo and self._en_vuelo < self.max_en_vuelo:
+                        pendiente = self.limitador.intentar(peso)
+                        if pendiente == 0.0:
+                            heapq.heappop(self._cola)
+                            self._en_vuelo += 1
+                            self._cond.notify_all()
+                            return
+                        espera = min(pendiente, 1.0)
+                await asyncio.sleep(espera)
+        except BaseException:
+            with self._cond:
+                if yo in self._cola:
+                    self._cola.remove(yo); heapq.heapify(self._cola)
+                    self._cond.notify_all()
+            raise
+
+    def _liberar(self):
+        with self._cond:
+            self._en_vuelo -= 1
+            self._cond.notify_all()
+
+    # --------------------------------------------------------------------------
+    # EJECUCIÓN
+    # --------------------------------------------------------------------------
+    def _unirse(self, clave, prioridad, simbolos, m):
+        """
+        (futuro, propio). Se une a la lectura igual en vuelo si su prioridad no es peor que
+        la propia; si no (o no hay), esta llamada pasa a atender a las siguientes.
+        """
+        with self._cond:
+            lider = self._lecturas.get(clave)
+            if lider is not None and lider[1] <= prioridad:
+                m['unidas'] += 1
+                return lider[0], False
+            futuro = Future()
+            self._lecturas[clave] = (futuro, prioridad, simbolos)
+            return futuro, True
+
+    def _invalidar_lecturas(self, simbolos):
+        """Escritura admitida: las lecturas en vuelo de sus símbolos (o de todos) no suman más unidos."""
+        with self._cond:
+            for clave, (_, _, leidos) in list(self._lecturas.items()):
+                if simbolos is None or leidos is None or not set(simbolos).isdisjoint(leidos):
+                    del self._lecturas[clave]
+
+    def ejecutar(self, fn, peso=1, clave=None, prioridad=None, headers=None, simbolos=None, escritura=False):
+        """
+        Ejecuta fn() respetando cola y peso. Si 'clave' coincide con una lectura
+        en vuelo, no se repite: se espera y se devuelve el mismo resultado.
+        'headers' devuelve las cabeceras de esta respuesta (para el peso real).
+        'escritura': al ser admitida invalida las lecturas en vuelo de 'simbolos'.
+        """
+        if prioridad is None: prioridad = self.prioridad_actual()
+        m = self._metricas[prioridad]
+
+        if clave is not None:
+            futuro, propio = self._unirse(clave, prioridad, simbolos, m)
+            if not propio: return futuro.result()
+
+        inicio = time.monotonic()
+        try:
+            self._admitir(prioridad, peso)
+        except BaseException as e:
+            if clave is not None: self._resolver(clave, futuro, error=e)
+            raise
+        if escritura: self._invalidar_lecturas(simbolos)
+        espera = time.monotonic() - inicio
+        with self._cond:
+            m['peticiones'] += 1
+            m['espera_total'] += espera
+            m['espera_max'] = max(m['espera_max'], espera)
+
+        try:
+            resultado = fn()
+        except BaseException as e:
+            with self._cond: m['errores'] += 1
+            if clave is not None: self._resolver(clave, futuro, error=e)
+            raise
+        finally:
+            if headers is not None: self.limitador.sincronizar(peso_usado_de_headers(headers()))
+            self._liberar()
+
+        if clave is not None: self._resolver(clave, futuro, resultado=resultado)
+        return resultado
+
+    async def ejecutar_async(self, fn, peso=1, clave=None, prioridad=None, headers=None, simbolos=None,
+                             escritura=False):
+        """ejecutar() para corrutinas: fn() devuelve un awaitable. Misma cola, peso y uniones."""
+        if prioridad is None: prioridad = self.prioridad_actual()
+        m = self._metricas[prioridad]
+
+        if clave is not None:
+            futuro, propio = self._unirse(clave, prioridad, simbolos, m)
+            if not propio: return await asyncio.wrap_future(futuro)
+
+        inicio = time.monotonic()
+        try:
+            await self._admitir_async(prioridad, peso)
+        except BaseException as e:
+            if clave is not None: self._resolver(clave, futuro, error=e)
+            raise
+        if escritura: self._invalidar_lecturas(simbolos)
+        espera = time.monotonic() - inicio
+        with self._cond:
+            m['peticiones'] += 1
+            m['espera_total'] += espera
+            m['espera_max'] = max(m['espera_max'], espera)
+
+        try:
+            resultado = await fn()
+        except BaseException as e:
+            with self._cond: m['errores'] += 1
+            if clave is not None: self._resolver(clave, futuro, error=e)
+            raise
+        finally:
+            if headers is not None: self.limitador.sincronizar(peso_usado_de_headers(headers()))
+            self._liberar()
+
+        if clave is not None: self._resolver(clave, futuro, resultado=resultado)
+        return resultado
+
+    def _resolver(self, clave, futuro, resultado=None, error=None):
+        with self._cond:
+            # Puede que ya no sea la lectura registrada (invalidada o reemplazada por una más prioritaria)
+            if self._lecturas.get(clave, (None,))[0] is futuro: del self._lecturas[clave]
+        if error is not None: futuro.set_exception(error)
+        else: futuro.set_result(resultado)
+
+    # --------------------------------------------------------------------------
+    # MÉTRICAS
+    # --------------------------------------------------------------------------
+    def metricas(self):
+        with self._cond:
+            profundidad = {n: 0 for n in NOMBRES_PRIORIDAD.values()}
+            for p, _ in self._cola: profundidad[NOMBRES_PRIORIDAD[p]] += 1
+            por_prioridad = {}
+            for p, m in self._metricas.items():
+                por_prioridad[NOMBRES_PRIORIDAD[p]] = {
+                    **m, 'espera_media': m['espera_total'] / m['peticiones'] if m['peticiones'] else 0.0,
+                    'en_cola': profundidad[NOMBRES_PRIORIDAD[p]]}
+            return {'en_cola': len(self._cola), 'en_vuelo': self._en_vuelo,
+                    'peso_disponible': self.limitador.disponible(),
+                    'peso_exchange': self.limitador.ultimo_peso_exchange,
+                    'prioridades': por_prioridad}
+
+    def resumen(self):
+        """Texto corto para /status."""
+        m = self.metricas()
+        lineas = [f"🚦 Cola API: {m['en_cola']} | En vuelo: {m['en_vuelo']} | Peso usado (1m): {m['peso_exchange'] or '?'}"]
+        for nombre, d in m['prioridades'].items():
+            if not d['peticiones'] and not d['unidas']: continue
+            lineas.append(f"   {nombre}: {d['peticiones']} req (+{d['unidas']} unidas) | "
+                          f"espera {d['espera_media']*1000:.0f}/{d['espera_max']*1000:.0f} ms")
+        return "\n".join(lineas)
+
+
+class ExchangeProgramado:
+    """
+    Proxy del exchange ccxt: los métodos de red pasan por el planificador;
+    todo lo demás (markets, *_to_precision, milliseconds, options...) va directo.
+    """
+
+    def __init__(self, exchange, planificador):
+        object.__setattr__(self, '_exchange', exchange)
+        object.__setattr__(self, '_planificador', planificador)
+        capturar_cabeceras(exchange)
+
+    @staticmethod
+    def _pedido(attr, nombre, args, kwargs):
+        """(fn, opciones de ejecutar) de una llamada de red."""
+        def fn():
+            _CABECERAS.set(None)  # Sin respuesta (error de red) no quedan las de una petición anterior
+            return attr(*args, **kwargs)
+        clave = (nombre, repr(args), repr(sorted(kwargs.items()))) if nombre.startswith('fetch') else None
+        return fn, {'peso': peso_metodo(nombre, args, kwargs), 'clave': clave, 'headers': _CABECERAS.get,
+                    'simbolos': simbolos_llamada(nombre, args, kwargs),
+                    'escritura': nombre.startswith(PREFIJOS_ESCRITURA)}
+
+    def __getattr__(self, nombre):
+        attr = getattr(self._exchange, nombre)
+        if not callable(attr) or not nombre.startswith(PREFIJOS_RED): return attr
+
+        planificador = self._planificador
+
+        @functools.wraps(attr)
+        def llamada(*args, **kwargs):
+            fn, opciones = self._pedido(attr, nombre, args, kwargs)
+            return planificador.ejecutar(fn, **opciones)
+        return llamada
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._exchange, nombre, valor)
+
+
+class ExchangeProgramadoAsync(ExchangeProgramado):
+    """
+    Lo mismo sobre un exchange de ccxt.async_support: los métodos de red son
+    corrutinas y esperan turno sin bloquear el event loop. Comparte cola, peso
+    y lecturas en vuelo con la versión sync (mismo planificador).
+    """
+
+    def __getattr__(self, nombre):
+        attr = getattr(self._exchange, nombre)
+        if not callable(attr) or not nombre.startswith(PREFIJOS_RED): return attr
+
+        planificador = self._planificador
+
+        @functools.wraps(attr)
+        async def llamada(*args, **kwargs):
+            fn, opciones = self._pedido(attr, nombre, args, kwargs)
+            return await planificador.ejecutar_async(fn, **opciones)
+        return llamada
+
+    async def close(self):
+        await self._exchange.close()
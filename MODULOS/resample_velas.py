@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from MODULOS.buffer_velas import BufferVelas, COLUMNAS
+
+# ==============================================================================
+# RESAMPLE MULTI-TEMPORALIDAD INCREMENTAL (5m -> 1h / 4h / 1D)
+# ==============================================================================
+# Un objeto por par. Cada temporalidad es un BufferVelas de velas agregadas
+# (open first, high max, low min, close last, volume sum; igual que
+# df.resample(tf).agg(...).dropna()). La última vela de cada buffer es la que
+# contiene la vela 5m más nueva: es la vela EN CURSO y se re-agrega en cada
+# sincronización. Las anteriores están CERRADAS y se agregan una sola vez.
+#
+# Quien llama pasa solo las filas 5m desde inicio_pendiente() (la vela en curso
+# de la temporalidad más larga en adelante), como con MotorIndicadores.
+#
+# NOTA: con el ring 5m lleno, la vela más vieja del resample de pandas queda
+# parcial (le faltan las 5m que ya salieron); aquí se conserva completa.
+
+PERIODOS_MS = {'1h': 3_600_000, '4h': 14_400_000, '1D': 86_400_000}
+TEMPORALIDADES = ('1h', '4h', '1D')
+PERIODO_BASE_MS = 300_000  # 5m
+
+
+def agregar_velas(tiempos, matriz, periodo_ms):
+    """Agrega filas 5m (tiempos ms, matriz (5, n)) en velas del periodo. Devuelve (t, (5, k))."""
+    cubetas = tiempos // periodo_ms * periodo_ms
+    ini = np.r_[0, np.flatnonzero(np.diff(cubetas)) + 1]
+    fin = np.r_[ini[1:], len(tiempos)] - 1
+    o, h, l, c, v = matriz
+    velas = np.vstack([o[ini], np.maximum.reduceat(h, ini), np.minimum.reduceat(l, ini), c[fin], np.add.reduceat(v, ini)])
+    return cubetas[ini], velas
+
+
+class ResampleVelas:
+
+    def __init__(self, capacidad_5m, temporalidades=TEMPORALIDADES):
+        self.temporalidades = tuple(temporalidades)
+        self._buffers = {tf: BufferVelas(capacidad_5m * PERIODO_BASE_MS // PERIODOS_MS[tf] + 2)
+                         for tf in self.temporalidades}
+        self.ultimo_t = None  # Última fila 5m vista (la vela 5m en curso)
+
+    def reiniciar(self):
+        for tf, buf in self._buffers.items(): self._buffers[tf] = BufferVelas(buf.capacidad)
+        self.ultimo_t = None
+
+    def inicio_pendiente(self, tiempos):
+        """Índice de la primera fila 5m a pasar: inicio de la vela en curso más larga."""
+        if self.ultimo_t is None or len(tiempos) == 0: return 0
+        if tiempos[-1] < self.ultimo_t: self.reiniciar(); return 0  # El buffer retrocedió (recarga)
+        desde = min(self.ultimo_t // PERIODOS_MS[tf] * PERIODOS_MS[tf] for tf in self.temporalidades)
+        return int(np.searchsorted(tiempos, desde))
+
+    def sincronizar(self, tiempos, matriz):
+        """Re-agrega las velas en curso y agrega las nuevas (upsert sobre cada temporalidad)."""
+        if len(tiempos) == 0: return
+        for tf, buf in self._buffers.items():
+            periodo = PERIODOS_MS[tf]
+            if self.ultimo_t is not None:  # Solo las filas de la vela en curso de esta temporalidad
+                i = int(np.searchsorted(tiempos, self.ultimo_t // periodo * periodo))
+                t_tf, velas = agregar_velas(tiempos[i:], matriz[:, i:], periodo)
+            else:
+                t_tf, velas = agregar_velas(tiempos, matriz, periodo)
+            if buf.vacio:
+                buf.cargar(pd.DataFrame(velas.T, index=t_tf, columns=COLUMNAS))
+            else:
+                buf.agregar(np.column_stack([t_tf, velas.T]).tolist())
+        self.ultimo_t = int(tiempos[-1])
+
+    # --------------------------------------------------------------------------
+    # LECTURA
+    # --------------------------------------------------------------------------
+    def velas(self, tf, en_curso=True):
+        """
+        DataFrame OHLCV de la temporalidad (vista del buffer, válida hasta la próxima
+        sincronización). en_curso=False -> solo velas cerradas (sin la última).
+        """
+        df = self._buffers[tf].df()
+        return df if en_curso else df.iloc[:-1]
+
+    def en_curso(self, tf):
+        """Vela en curso de la temporalidad (Series) o None."""
+        buf = self._buffers[tf]
+        return None if buf.vacio else buf.df().iloc[-1]
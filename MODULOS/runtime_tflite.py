@@ -0,0 +1,76 @@
+import numpy as np
+
+# Intérprete liviano: LiteRT (ai-edge-litert) o el viejo tflite_runtime. Si no
+# hay ninguno se usa el de TensorFlow (funciona igual, pero carga todo TF).
+try:
+    from ai_edge_litert.interpreter import Interpreter
+    MOTOR = 'litert'
+except ImportError:
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        MOTOR = 'tflite_runtime'
+    except ImportError:
+        Interpreter = None
+        MOTOR = 'tensorflow'
+
+# ==============================================================================
+# RUNTIME TFLITE (INFERENCIA SIN TENSORFLOW)
+# ==============================================================================
+# Importar TensorFlow y cargar seis .keras se lleva la mayor parte del arranque
+# y de la RAM del bot. training/exportar_tflite.py deja al lado de cada .keras un
+# .tflite (LSTM desenrolladas, pesos congelados, solo ops builtin, batch libre)
+# y acá se cargan con el intérprete liviano.
+#
+# Misma interfaz que Keras: predict(X, batch_size=None, verbose=0) -> np.ndarray,
+# así LoteInferencia y el resto del bot no cambian. El intérprete no es
+# reentrante: las llamadas van bajo el mismo lock de inferencia de siempre.
+
+
+def _interprete(ruta, hilos=None):
+    if Interpreter is not None: return Interpreter(model_path=ruta, num_threads=hilos)
+    import tensorflow as tf
+    return tf.lite.Interpreter(model_path=ruta, num_threads=hilos)
+
+
+class ModeloTFLite:
+    """Flatbuffer .tflite con la interfaz predict() de un modelo Keras."""
+
+    def __init__(self, ruta, nombre=None, hilos=None):
+        self.ruta = ruta
+        self.nombre = nombre or ruta
+        self._interp = _interprete(ruta, hilos)
+        # El exportador nombra las entradas entrada_0, entrada_1... en el orden de Keras
+        self._entradas = sorted(self._interp.get_input_details(), key=lambda d: d['name'])
+        self._salida = self._interp.get_output_details()[0]['index']
+        self.formas = [tuple(int(v) for v in d['shape_signature'][1:]) for d in self._entradas]
+        self._varias = len(self._entradas) > 1
+        self._batch = None
+
+    def _redimensionar(self, n):
+        """El batch del lote cambia entre ciclos: se reasignan los tensores solo cuando cambia."""
+        if n == self._batch: return
+        for d, forma in zip(self._entradas, self.formas):
+            self._interp.resize_tensor_input(d['index'], (n,) + forma)
+        self._interp.allocate_tensors()
+        self._batch = n
+
+    def calentar(self):
+        """Reserva tensores con una ventana de ceros (al arrancar, no en el primer ciclo)."""
+        ceros = [np.zeros((1,) + f, dtype=np.float32) for f in self.formas]
+        self.predict(ceros if self._varias else ceros[0])
+        return self
+
+    def predict(self, X, batch_size=None, verbose=0):
+        """Como keras predict (batch_size/verbose se ignoran: una sola pasada con todo X)."""
+        entradas = [np.ascontiguousarray(x, dtype=np.float32) for x in (X if self._varias else [X])]
+        self._redimensionar(len(entradas[0]))
+        for d, x in zip(self._entradas, entradas): self._interp.set_tensor(d['index'], x)
+        self._interp.invoke()
+        return self._interp.get_tensor(self._salida).copy()
+
+    __call__ = predict
+
+
+def cargar_tflite(ruta, nombre=None, hilos=None):
+    """Carga y calienta un .tflite exportado."""
+    return ModeloTFLite(ruta, nombre, hilos).calentar()
@@ -0,0 +1,89 @@
+from collections import Counter
+
+import numpy as np
+
+# ==============================================================================
+# SELECCIÓN FINAL: GERENTE V2 EN LOTE + LÍMITES CON CONTADORES
+# ==============================================================================
+# Antes, por cada candidato: tres recorridos de active_trades / final_ops para
+# conflictos y límites, y para los que pasaban un array 1x13 y un predict_proba
+# del XGBoost (armado de DMatrix + llamada, ~0.5 ms). Ahora la etapa se parte en dos:
+#   1) seleccionar_candidatos(): conflictos de par y límites global / estrategia
+#      / lado contra contadores armados una vez; cada candidato es O(1). Sigue
+#      siendo un recorrido en orden de prob (aceptar uno cambia los cupos del
+#      siguiente) y acepta lo mismo que el bucle anterior.
+#   2) puntuar_candidatos(): UNA matriz (n, 13) y UNA llamada al booster
+#      (inplace_predict, sin DMatrix); umbrales veto/agresivo y apalancamiento
+#      sugerido como operaciones de arrays. El Gerente no decide qué se abre,
+#      solo el apalancamiento: el bot puntúa solo los elegidos (<= MAX_TRADES_GLOBAL).
+
+# Orden de entrenamiento (training/entrenar_gerente.py) tras strategy_id y side_id
+COLUMNAS_GERENTE = ('prob_ia', 'raw_hmm', 'raw_ctx', 'raw_ctx_prob', 'raw_tac', 'raw_tac_prob',
+                    'atr_pct', 'rsi', 'btc_trend', 'hour', 'day')
+UMBRALES_DEFECTO = {"veto": 0.30, "agresivo": 0.99}
+LEV_DEFENSA = 1      # Zona roja: forzamos x1
+LEV_SNIPER = 12      # Zona verde: sugerimos x12
+LEV_RACHA = 0        # Zona amarilla: sin sugerencia (respeta racha)
+
+
+def matriz_gerente(candidatos, strat_map_inv):
+    """Features del Gerente de todos los candidatos: (n, 13)."""
+    return np.array([[strat_map_inv.get(c['strat'], -1), 1 if c['side'] == 'BUY' else 0,
+                      *(c[k] for k in COLUMNAS_GERENTE)] for c in candidatos], dtype=np.float64).reshape(-1, 2 + len(COLUMNAS_GERENTE))
+
+
+def probabilidades_gerente(gerente, X):
+    """P(éxito) de todas las filas en una llamada: inplace_predict si es XGBoost, si no predict_proba."""
+    if len(X) == 0: return np.empty(0)
+    if hasattr(gerente, 'get_booster'):
+        return np.asarray(gerente.get_booster().inplace_predict(X), dtype=np.float64).reshape(-1)
+    return gerente.predict_proba(X)[:, 1]
+
+
+def umbrales_candidatos(candidatos, umbrales_pro):
+    """(veto, agresivo) por fila según estrategia y lado (config_umbrales_pro.json)."""
+    por_clave = {}
+    for c in candidatos:
+        clave = (c['strat'], c['side'])
+        if clave not in por_clave:
+            cfg = umbrales_pro.get(c['strat'], {}).get(c['side'], UMBRALES_DEFECTO)
+            por_clave[clave] = (cfg['veto'], cfg['agresivo'])
+    u = np.array([por_clave[(c['strat'], c['side'])] for c in candidatos], dtype=np.float64).reshape(-1, 2)
+    return u[:, 0], u[:, 1]
+
+
+def puntuar_candidatos(gerente, candidatos, strat_map_inv, umbrales_pro):
+    """Probabilidad del Gerente y apalancamiento sugerido (LEV_DEFENSA / LEV_SNIPER / LEV_RACHA) por candidato."""
+    prob = probabilidades_gerente(gerente, matriz_gerente(candidatos, strat_map_inv))
+    veto, agresivo = umbrales_candidatos(candidatos, umbrales_pro)
+    lev = np.where(prob < veto, LEV_DEFENSA, np.where(prob >= agresivo, LEV_SNIPER, LEV_RACHA))
+    return prob, lev
+
+
+def seleccionar_candidatos(candidatos, activos, max_global, max_strat, max_side):
+    """
+    Índices aceptados (candidatos ya ordenados por prob) y conflictos [(índice, lado abierto)].
+    Reglas del bucle anterior: un par por ciclo; si el par ya tiene posición, solo el mismo lado;
+    cupos global, por estrategia (claves de active_trades que contienen la estrategia) y por lado.
+    """
+    lado_par = {}
+    for v in activos.values(): lado_par.setdefault(v['symbol'], v['side'])
+    por_lado = Counter(v['side'] for v in activos.values())
+    por_strat = {s: sum(1 for k in activos if s in k) for s in {c['strat'] for c in candidatos}}
+    espacio = max_global - len(activos)
+
+    vistos, elegidos, conflictos = set(), [], []
+    for i, c in enumerate(candidatos):
+        if espacio <= 0: break
+        if c['symbol'] in vistos: continue
+        lado = lado_par.get(c['symbol'])
+        if lado is not None and lado != c['side']:
+            conflictos.append((i, lado))
+            continue
+        if por_strat[c['strat']] >= max_strat or por_lado[c['side']] >= max_side: continue
+        elegidos.append(i)
+        vistos.add(c['symbol'])
+        por_strat[c['strat']] += 1
+        por_lado[c['side']] += 1
+        espacio -= 1
+    return elegidos, conflictos
@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime
+
+# ==============================================================================
+# SNAPSHOTS POR CICLO (UNA LLAMADA MASIVA EN LUGAR DE UNA POR PAR / TRADE)
+# ==============================================================================
+# - SnapshotPuntas: bid/ask de todos los pares con fetch_bids_asks (bookTicker).
+# - SnapshotPosiciones: todas las posiciones con un solo fetch_positions().
+# Se refrescan una vez por ciclo desde el main loop. Si alguien lee una foto más
+# vieja que 'max_edad_seg' se vuelve a pedir (una sola llamada para todos).
+# Si el exchange falla, la foto queda vieja y las lecturas devuelven None:
+# quien consume decide qué hacer sin datos (nunca se usa un precio viejo).
+
+
+ESPERA_REINTENTO_SEG = 2
+
+
+def simbolo_limpio(symbol):
+    """'BTC/USDT:USDT' -> 'BTC/USDT'"""
+    return symbol.split(':')[0]
+
+
+class _Snapshot:
+    """pedir(exchange): la llamada masiva (con un exchange async devuelve la corrutina)."""
+
+    def __init__(self, max_edad_seg, pedir):
+        self.max_edad_seg = max_edad_seg
+        self._pedir = pedir
+        self._lock = threading.Lock()
+        self._ts = 0.0                # time.time() de la última foto buena
+        self.momento = None           # datetime.now() de la última foto buena
+        self._intento = 0.0           # time.time() del último pedido (bueno o malo)
+        self.refrescos = 0
+        self.errores = 0
+
+    def refrescar(self, exchange):
+        """Una llamada masiva. True si la foto quedó al día."""
+        self._intento = time.time()
+        try:
+            datos = self._pedir(exchange)
+        except Exception as e:
+            self.errores += 1
+            print(f"⚠️ Error refrescando {self.__class__.__name__}: {e}")
+            return False
+        with self._lock:
+            self._guardar(datos)
+            self._ts = time.time()
+            self.momento = datetime.now()
+            self.refrescos += 1
+        return True
+
+    async def refrescar_async(self, exchange_async):
+        """refrescar() con un exchange de ccxt.async_support (desde el núcleo async)."""
+        self._intento = time.time()
+        try:
+            datos = await self._pedir(exchange_async)
+        except Exception as e:
+            self.errores += 1
+            print(f"⚠️ Error refrescando {self.__class__.__name__}: {e}")
+            return False
+        with self._lock:
+            self._guardar(datos)
+            self._ts = time.time()
+            self.momento = datetime.now()
+            self.refrescos += 1
+        return True
+
+    def edad(self):
+        return time.time() - self._ts
+
+    def vigente(self):
+        return self.edad() <= self.max_edad_seg
+
+    def _asegurar(self, exchange):
+        # Si el exchange está fallando no lo martillamos par por par
+        if not self.vigente() and exchange is not None and time.time() - self._intento >= ESPERA_REINTENTO_SEG:
+            self.refrescar(exchange)
+        return self.vigente()
+
+
+class SnapshotPuntas(_Snapshot):
+
+    def __init__(self, max_edad_seg=15):
+        super().__init__(max_edad_seg, pedir=lambda ex: ex.fetch_bids_asks())
+        self._puntas = {}
+
+    def _guardar(self, tickers):
+        self._puntas = {simbolo_limpio(t.get('symbol', k)): (t.get('bid'), t.get('ask'))
+                        for k, t in tickers.items()}
+
+    def puntas(self, symbol, exchange=None):
+        """(bid, ask) vigentes o None."""
+        if not self._asegurar(exchange): return None
+        with self._lock:
+            bid, ask = self._puntas.get(simbolo_limpio(symbol), (None, None))
+        return (bid, ask) if bid and ask else None
+
+    def spread(self, symbol, exchange=None):
+        p = self.puntas(symbol, exchange)
+        return (p[1] - p[0]) / p[1] if p else None
+
+    def precio_salida(self, symbol, side, exchange=None):
+        """Precio al que se cerraría hoy: bid para un BUY, ask para un SELL."""
+        p = self.puntas(symbol, exchange)
+        if not p: return None
+        return p[0] if side == 'BUY' else p[1]
+
+
+class SnapshotPosiciones(_Snapshot):
+
+    def __init__(self, max_edad_seg=15):
+        super().__init__(max_edad_seg, pedir=lambda ex: ex.fetch_positions())
+        self._crudas = []
+        self._contratos = {}
+
+    def _guardar(self, posiciones):
+        self._crudas = posiciones
+        self._contratos = {}
+        for p in posiciones:
+            c = float(p.get('contracts') or 0)
+            if c > 0: self._contratos[simbolo_limpio(p['symbol'])] = c
+
+    def posiciones(self, exchange=None):
+        """Lista cruda de ccxt (como fetch_positions). Lanza si no hay foto vigente."""
+        if not self._asegurar(exchange): raise RuntimeError("Sin foto vigente de posiciones")
+        with self._lock:
+            return list(self._crudas)
+
+    def contratos(self, symbol, exchange=None, desde=None):
+        """
+        Contratos abiertos del par (0.0 si no hay posición) o None si no se sabe:
+        foto vieja, o foto tomada antes de 'desde' (un trade abierto después no aparece).
+        """
+        if not self._asegurar(exchange): return None
+        with self._lock:
+            if desde is not None and self.momento is not None and self.momento < desde: return None
+            return self._contratos.get(simbolo_limpio(symbol), 0.0)
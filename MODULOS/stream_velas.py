@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+
+from websockets.sync.client import connect
+
+# ==============================================================================
+# STREAM DE VELAS (WEBSOCKET MULTIPLEXADO DE BINANCE FUTUROS)
+# ==============================================================================
+# Una sola conexión con todos los pares: "<par>@kline_<tf>" unidos con "/".
+# Binance empuja la vela en curso (~250ms) y la cerrada (k.x = True).
+
+URL_STREAM_FUTUROS = "wss://fstream.binance.com/stream"
+
+GRACIA_CIERRE_SEG = 1.5   # Margen para que todos los pares roten a la vela nueva
+ESPERA_MAX_RECONEXION = 60
+
+
+def nombre_stream(symbol, timeframe):
+    """'BTC/USDT' -> 'btcusdt@kline_5m'"""
+    return f"{symbol.split(':')[0].replace('/', '').lower()}@kline_{timeframe}"
+
+
+def parsear_kline(k):
+    """Payload 'k' de Binance -> [time_ms, open, high, low, close, volume] (formato ccxt)."""
+    return [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+
+
+class StreamVelas:
+    """
+    Suscriptor de velas en vivo.
+    - al_recibir(symbol, vela, cerrada): se llama por cada actualización (vela en curso y cerrada).
+    - esperar_cierre(): bloquea hasta que los pares abren vela nueva (= la anterior cerró).
+    - consumir_reconexion(): una vez por cada (re)conexión, {symbol: apertura_ms} de la última
+      vela vista antes del corte -> rellenar huecos por REST desde ahí; None si no hubo.
+    - aperturas: última vela ya cargada por par (arranque), para que la primera conexión
+      también sepa desde dónde rellenar.
+    """
+
+    def __init__(self, simbolos, timeframe='5m', al_recibir=None, url_base=URL_STREAM_FUTUROS, aperturas=None):
+        self.simbolos = list(simbolos)
+        self.timeframe = timeframe
+        self.al_recibir = al_recibir
+        self.url_base = url_base
+
+        # 'BTCUSDT' -> 'BTC/USDT'
+        self._mapa = {s.split(':')[0].replace('/', '').upper(): s for s in self.simbolos}
+        self._ultima_apertura = dict(aperturas or {})
+
+        self._evento_cierre = threading.Event()
+        self._lock = threading.Lock()
+        self._desde_reconexion = None  # {symbol: apertura_ms} pendiente de rellenar
+
+        self._activo = False
+        self._hilo = None
+        self._ws = None
+
+        self.conectado = False
+        self.conexiones = 0
+        self.mensajes = 0
+        self.ultimo_mensaje = 0.0
+
+    def url(self):
+        streams = "/".join(nombre_stream(s, self.timeframe) for s in self.simbolos)
+        return f"{self.url_base}?streams={streams}"
+
+    # --------------------------------------------------------------------------
+    # CICLO DE VIDA
+    # --------------------------------------------------------------------------
+    def iniciar(self):
+        if self._activo: return
+        self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, name="stream_velas", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._activo = False
+        try:
+            if self._ws is not None: self._ws.close()
+        except: pass
+        if self._hilo is not None: self._hilo.join(timeout=5)
+
+    def _bucle(self):
+        espera = 1
+        while self._activo:
+            try:
+                with connect(self.url(), open_timeout=10, close_timeout=2, max_size=None) as ws:
+                    self._ws = ws
+                    self.conectado = True
+                    self.conexiones += 1
+                    espera = 1
+                    # Toda conexión nueva puede venir con un hueco (arranque o caída). El relleno
+                    # sale de la última vela vista ANTES de que el stream empuje la vela actual;
+                    # si quedó otro relleno sin consumir, manda la marca más vieja.
+                    with self._lock:
+                        self._desde_reconexion = {**self._ultima_apertura, **(self._desde_reconexion or {})}
+                    print(f"📡 Stream de velas conectado ({len(self.simbolos)} pares, conexión #{self.conexiones}).")
+
+                    for raw in ws:
+                        if not self._activo: break
+                        self._procesar(raw)
+
+            except Exception as e:
+                if self._activo: print(f"⚠️ Stream de velas caído: {e}")
+            finally:
+                self.conectado = False
+                self._ws = None
+
+            if not self._activo: break
+            print(f"🔌 Reconectando stream en {espera}s...")
+            time.sleep(espera)
+            espera = min(espera * 2, ESPERA_MAX_RECONEXION)
+
+    def _procesar(self, raw):
+        try:
+            msg = json.loads(raw)
+            data = msg.get('data', msg)
+            if data.get('e') != 'kline': return
+
+            k = data['k']
+            symbol = self._mapa.get(k['s'])
+            if symbol is None: return
+
+            vela = parsear_kline(k)
+            self.mensajes += 1
+            self.ultimo_mensaje = time.time()
+
+            # Vela nueva abierta -> la anterior está cerrada
+            apertura_previa = self._ultima_apertura.get(symbol)
+            self._ultima_apertura[symbol] = vela[0]
+
+            if self.al_recibir is not None:
+                self.al_recibir(symbol, vela, bool(k['x']))
+
+            if apertura_previa is not None and vela[0] > apertura_previa:
+                self._evento_cierre.set()
+
+        except Exception as e:
+            print(f"⚠️ Mensaje de stream inválido: {e}")
+
+    # --------------------------------------------------------------------------
+    # CONSUMO DESDE EL MAIN LOOP
+    # --------------------------------------------------------------------------
+    def esperar_cierre(self, timeout, seguir=None):
+        """True si cerró una vela dentro del timeout. 'seguir' permite cortar la espera."""
+        limite = time.time() + timeout
+        while time.time() < limite:
+            if seguir is not None and not seguir(): return False
+            if self._evento_cierre.wait(timeout=min(1.0, max(0.0, limite - time.time()))):
+                time.sleep(GRACIA_CIERRE_SEG)
+                self._evento_cierre.clear()
+                return True
+        return False
+
+    def consumir_reconexion(self):
+        with self._lock:
+            desde = self._desde_reconexion
+            self._desde_reconexion = None
+        return desde
@@ -2,7 +2,6 @@ import pandas as pd
 import numpy as np
 import pandas_ta as ta
 import joblib
-import tensorflow as tf
 import os
 import glob
 import matplotlib.pyplot as plt
@@ -22,16 +21,19 @@ CAPITAL_INICIAL = 1000.0
 CAPITAL_MAXIMO_OP = 50.0 
 COSTO_COMISION = 0.0005 
 LEVERAGE_BASE = 3
+MOTOR_IA = 'NUMPY'  # 'NUMPY' (CPU, sin TensorFlow) | 'KERAS' (GPU si hay)
 
 # INTENTO DE GPU
-try:
-    gpus = tf.config.experimental.list_physical_devices('GPU')
-    if gpus:
-        for gpu in gpus: tf.config.experimental.set_memory_growth(gpu, True)
-        print(f"✅ GPU NVIDIA DETECTADA: {len(gpus)} dispositivo(s).")
-    else:
-        print("⚠️ GPU NO DETECTADA. Usando CPU.")
-except: pass
+if MOTOR_IA == 'KERAS':
+    import tensorflow as tf
+    try:
+        gpus = tf.config.experimental.list_physical_devices('GPU')
+        if gpus:
+            for gpu in gpus: tf.config.experimental.set_memory_growth(gpu, True)
+            print(f"✅ GPU NVIDIA DETECTADA: {len(gpus)} dispositivo(s).")
+        else:
+            print("⚠️ GPU NO DETECTADA. Usando CPU.")
+    except: pass
 
 # FILTROS
 MAX_TRADES_GLOBAL = 8
@@ -115,10 +117,15 @@ def obtener_umbrales_ajustados_local(historial_local, lado):
 def cargar_cerebro():
     print("🧠 Cargando Modelos IA...")
     try:
+        if MOTOR_IA == 'NUMPY':
+            sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            from MODULOS.lstm_numpy import cargar_numpy as cargar_red
+        else:
+            cargar_red = tf.keras.models.load_model
         modelos = {}
-        for k in CONFIG_STRAT: modelos[k] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, f'model_IA_{k}.keras'))
-        modelos['CONTEXTO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_CONTEXTO.keras'))
-        modelos['TACTICO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_TACTICO_1H.keras'))
+        for k in CONFIG_STRAT: modelos[k] = cargar_red(os.path.join(DIR_MODELOS, f'model_IA_{k}.keras'))
+        modelos['CONTEXTO'] = cargar_red(os.path.join(DIR_MODELOS, 'model_IA_CONTEXTO.keras'))
+        modelos['TACTICO'] = cargar_red(os.path.join(DIR_MODELOS, 'model_IA_TACTICO_1H.keras'))
         modelos['HMM'] = joblib.load(os.path.join(DIR_MODELOS, 'model_hmm_unsupervised.pkl'))
         
         scalers = {}
@@ -1,8 +1,7 @@
-import ccxt
 import pandas as pd
 import os
-import time
-from datetime import datetime
+
+from MODULOS.backfill import MotorBackfill, DestinoCSV
 
 # ==============================================================================
 # CONFIGURACIÓN
@@ -20,7 +19,7 @@ if not os.path.exists(DIR_DESTINO):
 # ==============================================================================
 # LISTA MAESTRA DE ACTIVOS (100 MONEDAS TOTALES)
 # ==============================================================================
-# El script saltará automáticamente las que ya descargaste.
+# El script retoma automáticamente las que ya descargaste (solo baja lo que falta).
 
 COINS_TO_DOWNLOAD = [
     # --- GRUPO 1: LA ÉLITE (Top 20) ---
@@ -57,50 +56,6 @@ COINS_TO_DOWNLOAD = [
     'CVX/USDT', 'FXS/USDT', 'HIGH/USDT', 'PEOPLE/USDT', 'ANT/USDT'
 ]
 
-# ==============================================================================
-# FUNCIÓN DE DESCARGA (CON REINTENTOS)
-# ==============================================================================
-def descargar_historial(symbol, start_date_str):
-    exchange = ccxt.binance({
-        'enableRateLimit': True,
-        'options': {'adjustForTimeDifference': True}
-    })
-    
-    since = exchange.parse8601(start_date_str)
-    all_ohlcv = []
-    limit = 1000 
-    
-    print(f"   ⬇️  Iniciando descarga: {symbol} ...", end="", flush=True)
-    
-    while True:
-        try:
-            ohlcv = exchange.fetch_ohlcv(symbol, timeframe=TIMEFRAME, since=since, limit=limit)
-            if not ohlcv: break
-            
-            all_ohlcv.extend(ohlcv)
-            last_timestamp = ohlcv[-1][0]
-            since = last_timestamp + 1 
-            
-            print(f"\r   ⬇️  Descargando {symbol}: {len(all_ohlcv)} velas...", end="", flush=True)
-            
-            if len(ohlcv) < limit: break
-            if last_timestamp >= exchange.milliseconds() - 60000: break
-            
-        except Exception as e:
-            # Si falla, esperamos un poco y seguimos (reintento simple)
-            time.sleep(2)
-            continue
-
-    if not all_ohlcv: 
-        print(f"\n   ❌ No se encontraron datos o par no existe.")
-        return None
-        
-    df = pd.DataFrame(all_ohlcv, columns=['time', 'open', 'high', 'low', 'close', 'volume'])
-    df = df[~df.index.duplicated(keep='last')]
-    
-    print(f" ✅ Completado.")
-    return df
-
 # ==============================================================================
 # MAIN LOOP
 # ==============================================================================
@@ -109,38 +64,17 @@ def main():
     print(f"🚀 GESTOR DE DESCARGAS MASIVO ({len(COINS_TO_DOWNLOAD)} Activos)")
     print(f"📁 Destino: {DIR_DESTINO}")
     print("=========================================================\n")
-    
-    contador_nuevos = 0
-    
-    for symbol in COINS_TO_DOWNLOAD:
-        nombre_limpio = symbol.replace('/', '') 
-        filename = f"{nombre_limpio}.csv"
-        path_completo = os.path.join(DIR_DESTINO, filename)
-        
-        # 1. Verificar existencia (SALTAR SI YA ESTÁ)
-        if os.path.exists(path_completo):
-            # Check rápido: si el archivo es muy chico (<1MB), quizás falló antes, lo bajamos de nuevo.
-            if os.path.getsize(path_completo) > 1000: 
-                print(f"⏩ {symbol}: Ya existe. Saltando.")
-                continue
-            
-        # 2. Descargar
-        try:
-            df = descargar_historial(symbol, FECHA_INICIO)
-            
-            if df is not None and not df.empty:
-                df.to_csv(path_completo, index=False)
-                print(f"   💾 Guardado: {filename} ({len(df)} registros)")
-                contador_nuevos += 1
-            else:
-                print(f"   ⚠️ {symbol}: Data vacía.")
-                
-        except Exception as e:
-            print(f"   ❌ Error en {symbol}: {e}")
 
+    # Todos los pares en paralelo. El CSV es el checkpoint: si ya existe,
+    # se continúa desde su última vela (lo completo solo trae el delta).
+    motor = MotorBackfill(mercado='spot', timeframe=TIMEFRAME)
+    desde_ms = int(pd.Timestamp(FECHA_INICIO, tz='UTC').timestamp() * 1000)
+    resultados = motor.ejecutar(COINS_TO_DOWNLOAD, DestinoCSV(DIR_DESTINO), desde_ms)
+
+    contador_nuevos = sum(1 for n in resultados.values() if n > 0)
     print("\n" + "="*60)
-    print(f"🎉 PROCESO FINALIZADO. Se agregaron {contador_nuevos} nuevos activos.")
+    print(f"🎉 PROCESO FINALIZADO. {contador_nuevos} activos con velas nuevas.")
     print("="*60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
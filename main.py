@@ -1,14 +1,13 @@
 import ccxt
 import pandas as pd
 import numpy as np
-import tensorflow as tf
 import joblib
 import os
 import time
 import json
-import pandas_ta as ta
 from datetime import datetime, timedelta
 import threading
+import asyncio
 import sys
 import traceback
 import warnings
@@ -62,7 +61,24 @@ sys.excepthook = reportar_crash_telegram
 # ==============================================================================
 try:
     from MODULOS import market_context
-    from ESTRATEGIAS import frpv, mean_reversion, breakout, simple_trend
+    from MODULOS.stream_velas import StreamVelas
+    from MODULOS.buffer_velas import BufferVelas
+    from MODULOS.almacen_velas import AlmacenVelas
+    from MODULOS.backfill import MotorBackfill
+    from MODULOS.limitador_peso import LimitadorPeso, PESO_MINUTO_FUTUROS
+    from MODULOS.snapshot_mercado import SnapshotPuntas, SnapshotPosiciones
+    from MODULOS.nucleo_async import NucleoAsync
+    from MODULOS.planificador_exchange import (PlanificadorExchange, ExchangeProgramado, PRIORIDAD_SALIDA,
+                                               PRIORIDAD_ENTRADA, PRIORIDAD_CONCILIACION, PRIORIDAD_TELEGRAM)
+    from MODULOS.indicadores_incrementales import MotorIndicadores
+    from MODULOS.indice_mercado import IndiceMercado
+    from MODULOS.resample_velas import ResampleVelas
+    from MODULOS.grafo_indicadores import AlmacenIndicadores, nodo, calentamiento
+    from MODULOS.inferencia_lote import LoteInferencia
+    from MODULOS.memo_regimen import MemoRegimen, marca_ventana_diaria
+    from MODULOS.cascada_senales import CascadaSenales, senales_crudas
+    from MODULOS.filtro_hmm import SeguidorHMM, pedido_hmm
+    from MODULOS.seleccion_gerente import puntuar_candidatos, seleccionar_candidatos, LEV_DEFENSA, LEV_SNIPER
 except ImportError as e:
     print(f"❌ Error importando: {e}"); sys.exit()
 
@@ -209,8 +225,10 @@ REGLAS_HMM = {
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DIR_MODELOS = os.path.join(BASE_DIR, 'MODELOS_ENTRENADOS')
 DIR_SCALERS = os.path.join(BASE_DIR, 'DATOS_PARA_ENTRENAR_NPZ')
+MOTOR_IA = 'TFLITE'  # 'TFLITE': .tflite exportados | 'NUMPY': .keras con forward NumPy (ambos sin TensorFlow) | 'KERAS': .keras + tf.function
 LOG_FILE = os.path.join(BASE_DIR, 'live_trades_log.txt')
 STATE_FILE = os.path.join(BASE_DIR, 'bot_state_v2.json') 
+DIR_VELAS = os.path.join(BASE_DIR, 'DATOS_VELAS_LIVE')  # Almacén local de velas cerradas
 
 CONFIG_STRAT = {
     'FRPV':     {'tp': 14.0, 'sl': 2.0, 'buy': 'Real Price Buy', 'sell': 'Real Price Sell', 'umbral': 0.50},
@@ -230,7 +248,31 @@ bot_state = {"active_trades": {}, "strategy_state": {}}
 lock_estado = threading.Lock() 
 
 # Para la memoria RAM
-memory_lock = threading.Lock() 
+memory_lock = threading.Lock()
+
+# Cache de velas (escribe el hilo del stream, lee el main loop)
+cache_lock = threading.Lock()
+
+# Peso de API de Binance Futuros (compartido por todo el proceso)
+limitador_futuros = LimitadorPeso(PESO_MINUTO_FUTUROS)
+
+# Cola única de peticiones al exchange (prioridades: salidas > entradas > auditoría > Telegram)
+planificador = PlanificadorExchange(limitador_futuros)
+
+# Bid/Ask de todos los pares (una llamada por ciclo, no un fetch_ticker por par)
+MAX_EDAD_PUNTAS_SEG = 15
+puntas_mercado = SnapshotPuntas(MAX_EDAD_PUNTAS_SEG)
+
+# Posiciones reales (un solo fetch_positions por ciclo para salidas y auditoría)
+MAX_EDAD_POSICIONES_SEG = 15
+posiciones_reales = SnapshotPosiciones(MAX_EDAD_POSICIONES_SEG)
+
+# Núcleo async: lecturas en paralelo + pools acotados (sin un hilo nuevo por tarea)
+nucleo = NucleoAsync(workers_cpu=4, workers_io=8)
+
+# Los modelos Keras no se llaman a la vez desde varios hilos
+inferencia_lock = threading.Lock()
+
 # -------------------------------------------------
 
 # ==============================================================================
@@ -411,83 +453,91 @@ def actualizar_gestion_capital(key, res, strategy_name=None):
     if "MANUAL" in strategy_name or "LIMIT" in strategy_name or "LIMIT_SNIPER" in strategy_name:
         return 
 
-    inicializar_stats_globales(strategy_name)
-
+    # Bajo memory_lock: las salidas de varios pares corren a la vez y guardar_estado()
+    # serializa bot_state (guardar_estado toma el lock, se llama afuera)
     if res == 'NEUTRAL': 
-        inicializar_estado_estrategia(key)
-        st = bot_state["strategy_state"][key]
-        cooldown_tactico = datetime.now() + timedelta(minutes=15)
-        st["cooldown_until"] = str(cooldown_tactico)
-        bot_state["strategy_state"][key] = st
+        with memory_lock:
+            inicializar_stats_globales(strategy_name)
+            inicializar_estado_estrategia(key)
+            st = bot_state["strategy_state"][key]
+            cooldown_tactico = datetime.now() + timedelta(minutes=15)
+            st["cooldown_until"] = str(cooldown_tactico)
+            bot_state["strategy_state"][key] = st
         guardar_estado()
         print(f"❄️ COOLDOWN TÁCTICO: {key} pausada 15m por Break Even.")
         return
     
-    st = bot_state["strategy_state"][key]
-    lev_actual = st["leverage"]
-    status = st.get("status", "NORMAL")
+    with memory_lock:
+        inicializar_stats_globales(strategy_name)
+        st = bot_state["strategy_state"][key]
+        lev_actual = st["leverage"]
+        status = st.get("status", "NORMAL")
     
-    try: idx_actual = LEVERAGE_STEPS.index(lev_actual)
-    except ValueError: idx_actual = 1 
+        try: idx_actual = LEVERAGE_STEPS.index(lev_actual)
+        except ValueError: idx_actual = 1 
     
-    if res == 'WIN':
-        st["consecutive_losses"] = 0
-        st["vip_until"] = str(datetime.now() + timedelta(minutes=5*VIP_WINDOW_CANDLES))
-        bot_state["global_strat_perf"][strategy_name]["fails"] = 0
-
-        if status == "PENALTY":
-            st["recovery_wins"] += 1
-            if st["recovery_wins"] >= 2:
-                st["leverage"] = LEVERAGE_BASE 
-                st["status"] = "NORMAL"
-                st["recovery_wins"] = 0
-        elif status == "RECOVERING":
-            st["recovery_wins"] += 1
-            if st["recovery_wins"] >= 1:
-                st["status"] = "NORMAL"
-                st["recovery_wins"] = 0
-        elif status == "NORMAL":
-            new_idx = min(idx_actual + 1, len(LEVERAGE_STEPS) - 1)
-            st["leverage"] = LEVERAGE_STEPS[new_idx]
-
-    else: # LOSS
-        st["consecutive_losses"] += 1
-        st["recovery_wins"] = 0
-        st["cooldown_until"] = str(datetime.now() + timedelta(minutes=5*COOLDOWN_CANDLES))
+        if res == 'WIN':
+            st["consecutive_losses"] = 0
+            st["vip_until"] = str(datetime.now() + timedelta(minutes=5*VIP_WINDOW_CANDLES))
+            bot_state["global_strat_perf"][strategy_name]["fails"] = 0
+
+            if status == "PENALTY":
+                st["recovery_wins"] += 1
+                if st["recovery_wins"] >= 2:
+                    st["leverage"] = LEVERAGE_BASE 
+                    st["status"] = "NORMAL"
+                    st["recovery_wins"] = 0
+            elif status == "RECOVERING":
+                st["recovery_wins"] += 1
+                if st["recovery_wins"] >= 1:
+                    st["status"] = "NORMAL"
+                    st["recovery_wins"] = 0
+            elif status == "NORMAL":
+                new_idx = min(idx_actual + 1, len(LEVERAGE_STEPS) - 1)
+                st["leverage"] = LEVERAGE_STEPS[new_idx]
+
+        else: # LOSS
+            st["consecutive_losses"] += 1
+            st["recovery_wins"] = 0
+            st["cooldown_until"] = str(datetime.now() + timedelta(minutes=5*COOLDOWN_CANDLES))
         
-        bot_state["global_strat_perf"][strategy_name]["fails"] += 1
-        if bot_state["global_strat_perf"][strategy_name]["fails"] >= MAX_FAILURES_STRAT:
-            tiempo_cool = str(datetime.now() + timedelta(minutes=5*COOLDOWN_GLOBAL_CANDLES))
-            bot_state["global_strat_perf"][strategy_name]["cooldown_until"] = tiempo_cool
-            print(f"🛑 GLOBAL COOL-DOWN: {strategy_name} pausada.")
+            bot_state["global_strat_perf"][strategy_name]["fails"] += 1
+            if bot_state["global_strat_perf"][strategy_name]["fails"] >= MAX_FAILURES_STRAT:
+                tiempo_cool = str(datetime.now() + timedelta(minutes=5*COOLDOWN_GLOBAL_CANDLES))
+                bot_state["global_strat_perf"][strategy_name]["cooldown_until"] = tiempo_cool
+                print(f"🛑 GLOBAL COOL-DOWN: {strategy_name} pausada.")
         
-        if st["consecutive_losses"] >= 2:
-            st["leverage"] = 1 
-            st["status"] = "PENALTY"
-        else:
-            new_idx = max(idx_actual - 1, 0)
-            st["leverage"] = LEVERAGE_STEPS[new_idx]
-            st["status"] = "RECOVERING"
+            if st["consecutive_losses"] >= 2:
+                st["leverage"] = 1 
+                st["status"] = "PENALTY"
+            else:
+                new_idx = max(idx_actual - 1, 0)
+                st["leverage"] = LEVERAGE_STEPS[new_idx]
+                st["status"] = "RECOVERING"
 
-    bot_state["strategy_state"][key] = st
+        bot_state["strategy_state"][key] = st
     guardar_estado()
     
 def check_cooldown(key):
     inicializar_estado_estrategia(key); until = bot_state["strategy_state"][key]["cooldown_until"]
     return True if until and datetime.now() < datetime.fromisoformat(until) else False
 
-def inicializar_exchange():
+def config_exchange():
     # Punto 1: Futuros
-    return ccxt.binance({
+    # El rate-limit lo maneja el planificador (peso real de Binance), no ccxt.
+    return {
         'apiKey': API_KEY, 
         'secret': API_SECRET, 
-        'enableRateLimit': True, 
+        'enableRateLimit': False, 
         'options': {
             'defaultType': 'future', 
             'adjustForTimeDifference': True,
             'warnOnFetchOpenOrdersWithoutSymbol': False 
         }
-    })
+    }
+
+def inicializar_exchange():
+    return ExchangeProgramado(ccxt.binance(config_exchange()), planificador)
 
 def enviar_telegram(mensaje):
     """Envía notificaciones a Telegram sin bloquear el bot"""
@@ -501,9 +551,10 @@ def enviar_telegram(mensaje):
         except Exception as e:
             print(f"⚠️ Error Telegram: {e}")
 
-    # En un hilo separado
-    threading.Thread(target=_send).start()
+    # Un solo hilo de envío (en orden), no uno por mensaje
+    nucleo.lanzar_telegram(_send)
 
+@planificador.con_prioridad(PRIORIDAD_TELEGRAM)
 def escuchar_telegram(exchange):
     """Escucha comandos desde Telegram"""
 
@@ -591,7 +642,8 @@ def escuchar_telegram(exchange):
                                         f"💰 Cap Max: ${CAPITAL_MAXIMO:.2f}\n"
                                         f"🌱 Cap Base: ${base_usd:.2f} ({int(PORCENTAJE_BASE*100)}%)\n" 
                                         f"━━━━━━━━━━━━━━━━\n"
-                                        f"{info_recursos}"
+                                        f"{info_recursos}\n"
+                                        f"{planificador.resumen()}"
                                     )
                                     enviar_telegram(msg_status)
                                 
@@ -1562,9 +1614,7 @@ def escuchar_telegram(exchange):
                                         enviar_telegram(msg)
                                         
                                         # VIGILANTE
-                                        t_vig = threading.Thread(target=monitor_limit_order, args=(exchange, symbol, order_id, side, lev, margin, tp, sl))
-                                        t_vig.daemon = True 
-                                        t_vig.start()
+                                        nucleo.lanzar_vigilante(monitor_limit_order, exchange, symbol, order_id, side, lev, margin, tp, sl)
                                         
                                     except Exception as e:
                                         enviar_telegram(f"❌ Error Binance: {e}")
@@ -2647,7 +2697,7 @@ def escuchar_telegram(exchange):
                                             enviar_telegram(msg)
 
                                         # Lanzamos el escáner en un hilo aparte para no trabar al bot
-                                        threading.Thread(target=scan_trades_global).start()
+                                        nucleo.lanzar(scan_trades_global)
 
                                 except Exception as e:
                                     enviar_telegram(f"❌ Error Fill: {e}")
@@ -2780,38 +2830,87 @@ def escuchar_telegram(exchange):
 # ==============================================================================
 # DESCARGA Y FEATURES (Punto 8: Manejo Errores)
 # ==============================================================================
-def descargar_historial_profundo(exchange, symbol, tf=TIMEFRAME, silent=False):
-    if tf == '1d': dias = DAYS_HISTORY + 50
-    else: dias = DAYS_HISTORY 
-    start_since = exchange.milliseconds() - (dias * 24 * 60 * 60 * 1000)
-    for attempt in range(3):
-        all_ohlcv = []; since = start_since; limit = 1000; failed = False
-        if not silent: print(f"\n   ⬇️  {symbol} [{attempt+1}/3]: ...", end="", flush=True)
-        while True:
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe=tf, since=since, limit=limit)
-                if not ohlcv: break
-                all_ohlcv.extend(ohlcv)
-                if not silent: print(f"\r   ⬇️  {symbol}: {len(all_ohlcv)} velas...", end="", flush=True)
-                since = ohlcv[-1][0] + 1
-                if len(ohlcv) < limit or since >= exchange.milliseconds() - 60000: break
-                time.sleep(0.1)
-            except Exception as e: 
-                print(f" ❌ ERROR REAL: {e}") 
-                failed = True; break
-        if not failed and len(all_ohlcv) > 0:
-            df = pd.DataFrame(all_ohlcv, columns=['time','open','high','low','close','volume'])
-            df['time'] = pd.to_datetime(df['time'], unit='ms', utc=True)
-            df.set_index('time', inplace=True)
-            if not silent: print(" ✅")
-            return df.sort_index()
-        time.sleep(5)
-    return None
-
-def verificar_seguridad_horaria(symbol, df_5m):
+MAX_VELAS_CACHE = 86000
+MS_VELA = ccxt.Exchange.parse_timeframe(TIMEFRAME) * 1000
+
+def guardar_velas_cerradas(almacen, symbol, velas):
+    """Persiste solo velas cerradas (la vela en curso se sigue pisando en memoria)."""
+    corte = int(time.time() * 1000) - MS_VELA
+    if isinstance(velas, pd.DataFrame):
+        velas = velas[velas.index <= pd.Timestamp(corte, unit='ms', tz='UTC')]
+    else:
+        velas = [v for v in velas if v[0] <= corte]
+    return almacen.agregar(symbol, velas)
+
+def actualizar_cache_velas(data_cache, symbol, velas):
+    """
+    Upsert de velas [time_ms, o, h, l, c, v] en el ring buffer del par.
+    La vela en curso se pisa en el lugar; las nuevas se agregan al final (sin realocar).
+    """
+    if not velas: return
+    with cache_lock:
+        buf = data_cache.get(symbol)
+        if buf is None:
+            buf = data_cache[symbol] = BufferVelas(MAX_VELAS_CACHE)
+        buf.agregar(velas)
+
+async def rellenar_huecos(exchange_async, data_cache, simbolos, almacen=None, desde=None):
+    """
+    REST solo tras (re)conexión del stream: trae lo que falta desde 'desde' (última vela vista
+    por el stream antes del corte) o, sin marca, desde la última vela en cache. La última del
+    cache no sirve tras un corte: el stream ya empujó la vela actual y el hueco queda detrás.
+    """
+    async def hueco(sym):
+        try:
+            with cache_lock:
+                buf = data_cache.get(sym)
+                since = buf.ultimo_timestamp() if buf is not None else None
+            if desde and sym in desde: since = desde[sym]
+            if since is None: return 0
+            faltan = 0
+            while True:
+                new = await exchange_async.fetch_ohlcv(sym, TIMEFRAME, since=since, limit=1000)
+                if not new: break
+                actualizar_cache_velas(data_cache, sym, new)
+                if almacen is not None: guardar_velas_cerradas(almacen, sym, new)
+                faltan += len(new)
+                if len(new) < 1000: break
+                since = new[-1][0] + 1
+            return faltan
+        except Exception as e:
+            print(f"⚠️ Error rellenando hueco {sym}: {e}")
+            return 0
+
+    # Todos los pares a la vez; el planificador limita el peso (418/429 de Binance)
+    total = sum(await asyncio.gather(*[hueco(s) for s in simbolos]))
+    print(f"🩹 Huecos rellenados por REST: {total} velas en {len(simbolos)} pares.")
+
+async def leer_mercado(exchange_async, data_cache, almacen, reconexion, con_posiciones):
+    """Lecturas del ciclo en paralelo: puntas, posiciones y (si hubo reconexión) huecos.
+    reconexion: {symbol: apertura_ms} de StreamVelas.consumir_reconexion() o None."""
+    tareas = [puntas_mercado.refrescar_async(exchange_async)]
+    if con_posiciones: tareas.append(posiciones_reales.refrescar_async(exchange_async))
+    if reconexion is not None:
+        tareas.append(rellenar_huecos(exchange_async, data_cache, list(data_cache.keys()), almacen, reconexion))
+    await asyncio.gather(*tareas)
+
+# Indicadores 1H compartidos por seguridad / táctico / HMM: un nodo = un cálculo por par y ciclo.
+# Se calculan sobre las velas 1h CON la vela en curso; como son causales, la fila -2 (y todo
+# lo anterior) es idéntica a calcular solo sobre las velas cerradas.
+ATR_1H = nodo('atr', '1h', length=14)
+RSI_1H = nodo('rsi', '1h', length=14)
+ADX_1H = nodo('adx', '1h', length=14)
+SMA50_1H = nodo('sma', '1h', length=50)
+SLOPE_1H = nodo('slope', '1h', length=5)
+# Modo cola: solo se calculan las filas que se leen (48 del táctico, +1 por los shift de
+# Log_Ret / Vol_Chg) más el calentamiento que piden los nodos (RMA 14 del ADX: ~800 velas)
+FILAS_1H = 48 + 1 + calentamiento([ATR_1H, RSI_1H, ADX_1H, SMA50_1H, SLOPE_1H])
+
+def verificar_seguridad_horaria(symbol, ind_1h):
     """
     Replica el filtro de entrenamiento: 
     Si Volatilidad > 20% o Cambio Brusco > 20% en 1H -> KILL SWITCH + 4 Horas Cooldown
+    ind_1h: AlmacenIndicadores del ciclo sobre las velas 1H (la última es la vela en curso).
     """
     # 1. Chequear si ya está bloqueada por un evento anterior
     if "volatility_blocklist" not in bot_state: bot_state["volatility_blocklist"] = {}
@@ -2825,31 +2924,18 @@ def verificar_seguridad_horaria(symbol, df_5m):
             del bot_state["volatility_blocklist"][symbol]
             guardar_estado()
 
-    # 2. Resample a 1H (Igual que HMM, ignorando vela actual incompleta)
+    # 2. Velas 1H cerradas (Igual que HMM, la vela actual incompleta se excluye: fila -2)
     try:
-        df_1h = df_5m.resample('1h').agg({
-            'open':'first', 'high':'max', 'low':'min', 'close':'last'
-        }).dropna()
-        
-        # Eliminamos la última vela incompleta
-        if len(df_1h) > 1:
-            df_1h = df_1h.iloc[:-1]
-            
-        if len(df_1h) < 24: return True, "" # Poca data, dejamos pasar por las dudas
+        velas = ind_1h.base('1h')
+        if len(velas) - 1 < 24: return True, "" # Poca data, dejamos pasar por las dudas
 
-        # 3. Calcular Indicadores de Volatilidad
-        # ATR %
-        df_1h['ATR'] = ta.atr(df_1h['high'], df_1h['low'], df_1h['close'], length=14)
-        df_1h['ATR_Pct'] = df_1h['ATR'] / df_1h['close']
+        # 3. Indicadores de Volatilidad de la última vela cerrada
+        # ATR % (nodo compartido con táctico / HMM)
+        atr_pct = ind_1h.valor(ATR_1H, 'pct').iloc[-2]
         
         # Log Return
-        df_1h['Log_Ret'] = np.log(df_1h['close'] / df_1h['close'].shift(1))
-        
-        # Miramos la última vela cerrada
-        last_row = df_1h.iloc[-1]
-        
-        atr_pct = last_row['ATR_Pct']
-        log_ret = abs(last_row['Log_Ret'])
+        cierres = velas['close']
+        log_ret = abs(np.log(cierres.iloc[-2] / cierres.iloc[-3]))
 
         # 4. ¿> 20%?
         LIMIT_VOL = 0.20 # 20%
@@ -2903,48 +2989,50 @@ def verificar_fusible_diario():
         print(f"⚠️ Error fusible: {e}")
         return True, 0.0, 0.0
 
-def preparar_input_tactico(df_5m, scaler):
+def preparar_input_tactico(ind_1h, scaler):
+    """48 velas de 1H cerradas (sin la vela en curso), como las ventanas vals[i-48:i] del entrenamiento."""
     try:
-        df_1h = df_5m.resample('1h').agg({'open':'first','high':'max','low':'min','close':'last','volume':'sum'}).dropna()
-        if len(df_1h) < 100: return None
-        df_1h['RSI'] = ta.rsi(df_1h['close'], length=14)
-        df_1h['ADX'] = ta.adx(df_1h['high'], df_1h['low'], df_1h['close'], length=14)['ADX_14']
-        df_1h['ATR'] = ta.atr(df_1h['high'], df_1h['low'], df_1h['close'], length=14)
-        df_1h['ATR_Norm'] = df_1h['ATR'] / df_1h['close']
-        df_1h['SMA_50'] = ta.sma(df_1h['close'], length=50)
-        df_1h['Dist_SMA'] = (df_1h['close'] - df_1h['SMA_50']) / df_1h['SMA_50']
-        df_1h['Slope'] = ta.slope(df_1h['close'], length=5)
-        df_1h.dropna(inplace=True)
-        cols = ['RSI', 'ADX', 'ATR_Norm', 'Dist_SMA', 'Slope']
-        last = df_1h[cols].iloc[-48:].values
+        velas = ind_1h.base('1h')
+        if len(velas) - 1 < 100: return None
+        sma50 = ind_1h.valor(SMA50_1H)
+        df_1h = pd.DataFrame({
+            'RSI': ind_1h.valor(RSI_1H),
+            'ADX': ind_1h.valor(ADX_1H),
+            'ATR_Norm': ind_1h.valor(ATR_1H, 'pct'),
+            'Dist_SMA': (velas['close'] - sma50) / sma50,
+            'Slope': ind_1h.valor(SLOPE_1H),
+        }).iloc[:-1].dropna()
+        last = df_1h.iloc[-48:].values
         if last.shape != (48, 5): return None
         return scaler.transform(last).reshape(1, 48, 5)
     except: return None
 
-def preparar_input_hmm(df_5m, scaler):
-    """1 Hora + Volumen + 6 Indicadores."""
+def preparar_input_hmm(ind_1h, scaler, seguidor, symbol):
+    """
+    1 Hora + Volumen + 6 Indicadores. Solo velas de 1H cerradas (sin la vela en curso).
+    Devuelve el pedido del filtro HMM del par, (symbol, última hora, X escaladas, reinicio), con
+    las horas que le faltan (normalmente 1); reinicio: todas las horas con features, desde startprob_.
+    """
     try:
-        # 1. Resample 1H
-        df_1h = df_5m.resample('1h').agg({'open':'first', 'high':'max', 'low':'min', 'close':'last', 'volume':'sum'}).dropna()
-        if len(df_1h) > 1: df_1h = df_1h.iloc[:-1] # Ignorar vela incompleta
-        if len(df_1h) < 60: return None 
-
-        # 2. Features
-        atr = ta.atr(df_1h['high'], df_1h['low'], df_1h['close'], length=14)
-        df_1h['ATR_Pct'] = atr / df_1h['close']
-        df_1h['Log_Ret'] = np.log(df_1h['close'] / df_1h['close'].shift(1))
-        sma50 = ta.sma(df_1h['close'], length=50)
-        df_1h['Dist_SMA'] = (df_1h['close'] - sma50) / sma50
-        df_1h['RSI'] = ta.rsi(df_1h['close'], length=14)
-        df_1h['ADX'] = ta.adx(df_1h['high'], df_1h['low'], df_1h['close'], length=14)['ADX_14']
-        df_1h['Vol_Chg'] = np.log(df_1h['volume'] / (df_1h['volume'].shift(1) + 1)) 
-
-        df_1h.dropna(inplace=True)
-        if df_1h.empty: return None
-
-        # 3. Seleccionar última
+        # 1. Velas 1H cerradas
+        velas = ind_1h.base('1h')
+        if len(velas) - 1 < 60: return None 
+
+        # 2. Features (nodos compartidos; se descarta la vela en curso)
+        sma50 = ind_1h.valor(SMA50_1H)
+        df_1h = pd.DataFrame({
+            'Log_Ret': np.log(velas['close'] / velas['close'].shift(1)),
+            'ATR_Pct': ind_1h.valor(ATR_1H, 'pct'),
+            'RSI': ind_1h.valor(RSI_1H),
+            'ADX': ind_1h.valor(ADX_1H),
+            'Dist_SMA': (velas['close'] - sma50) / sma50,
+            'Vol_Chg': np.log(velas['volume'] / (velas['volume'].shift(1) + 1)),
+        }).iloc[:-1]
+
+        # 3. Horas que le faltan al filtro del par (desde su marca) o la cola entera si reinicia.
+        #    Horas con features no finitas (volumen 0) van como observación faltante: no traban el filtro.
         cols_modelo = ['Log_Ret', 'ATR_Pct', 'RSI', 'ADX', 'Dist_SMA', 'Vol_Chg']
-        return scaler.transform(df_1h[cols_modelo].iloc[-1:].values)
+        return pedido_hmm(seguidor, symbol, df_1h[cols_modelo], scaler)
 
     except Exception as e:
         print(f"⚠️ Error HMM Input: {e}")
@@ -3081,6 +3169,7 @@ def calcular_sesgo_estrategia(strat, side):
 
     return ajuste
 
+@planificador.con_prioridad(PRIORIDAD_ENTRADA)
 def monitor_limit_order(exchange, symbol, order_id, side, lev, margin, tp, sl):
     """
     "VIGILANTE": 
@@ -3157,15 +3246,16 @@ def monitor_limit_order(exchange, symbol, order_id, side, lev, margin, tp, sl):
             print(f"Error Vigilante: {e}")
             time.sleep(30)
 
+@planificador.con_prioridad(PRIORIDAD_ENTRADA)
 def ejecutar_orden(exchange, symbol, estrategia, side, precio, tp, sl, meta_info="", atr_pct=None, leverage_manual=None):
     trade_id = f"{symbol}_{estrategia}"
 
-    # Lectura segura al inicio
+    # Lectura segura al inicio (las órdenes finales corren en paralelo y guardar_estado serializa bot_state
+    # bajo memory_lock: el alta en strategy_state también va bajo el lock)
     with memory_lock:
         if trade_id in bot_state["active_trades"]: return
-    
-    inicializar_estado_estrategia(trade_id)
-    lev_racha_actual = bot_state["strategy_state"][trade_id]["leverage"]
+        inicializar_estado_estrategia(trade_id)
+        lev_racha_actual = bot_state["strategy_state"][trade_id]["leverage"]
     
     lev_final = lev_racha_actual # Por defecto, respetamos la racha
     
@@ -3188,7 +3278,7 @@ def ejecutar_orden(exchange, symbol, estrategia, side, precio, tp, sl, meta_info
                 print(f"💎 RACHA RESPETA: Manteniendo x{lev_final} (Mayor que la sugerencia IA).")
 
     # 3. Guardamos el apalancamiento
-    bot_state["strategy_state"][trade_id]["leverage"] = lev_final
+    with memory_lock: bot_state["strategy_state"][trade_id]["leverage"] = lev_final
     lev = lev_final
 
     # ==============================================================================
@@ -3381,20 +3471,20 @@ def ejecutar_orden(exchange, symbol, estrategia, side, precio, tp, sl, meta_info
             if "-2021" in error_str or "immediately trigger" in error_str:
                 enviar_telegram(f"⚠️ <b>RECHAZO BINANCE (-2021)</b>\nVolatilidad extrema en {symbol}.")
                 cooldown_time = datetime.now() + timedelta(minutes=30)
-                bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
+                with memory_lock: bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
                 guardar_estado()
 
             elif "-4164" in error_str or "notional" in error_str.lower():
                 enviar_telegram(f"⚠️ <b>CAPITAL INSUFICIENTE (-4164)</b>\n{symbol} pide más dinero. Pausada 1h.")
                 cooldown_time = datetime.now() + timedelta(minutes=60)
-                bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
+                with memory_lock: bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
                 guardar_estado()
 
             # --- ERROR -2019: SIN MARGEN SUFICIENTE (Cooldown 1h) ---
             elif "-2019" in error_str or "margin is insufficient" in error_str.lower():
                 enviar_telegram(f"💸 <b>SALDO INSUFICIENTE (-2019)</b>\nFalta liquidez para {symbol}.\nPausada 1h para evitar spam.")
                 cooldown_time = datetime.now() + timedelta(minutes=60)
-                bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
+                with memory_lock: bot_state["strategy_state"][trade_id]["cooldown_until"] = str(cooldown_time)
                 guardar_estado()
                 print(f"❄️ Aplicando Cooldown de 60m a {trade_id} (Sin Saldo).")
 
@@ -3440,6 +3530,7 @@ def ejecutar_orden(exchange, symbol, estrategia, side, precio, tp, sl, meta_info
             }
         guardar_estado()
 
+@planificador.con_prioridad(PRIORIDAD_SALIDA)
 def verificar_salidas(exchange, df, symbol):
     """
     Monitoriza TP, SL y Mueve a Break Even.
@@ -3477,9 +3568,10 @@ def verificar_salidas(exchange, df, symbol):
         cerrado_externamente = False
         if is_real_trade:
             try:
-                # Preguntamos a Binance si la posición sigue viva
-                pos = exchange.fetch_positions([d['symbol']])
-                size_binance = float(pos[0]['contracts']) if pos else 0.0
+                # ¿La posición sigue viva? (foto del ciclo; None = no se sabe -> no se cierra)
+                try: entrada = datetime.fromisoformat(d['entry_time'])
+                except: entrada = None
+                size_binance = posiciones_reales.contratos(d['symbol'], exchange, desde=entrada)
                 if size_binance == 0:
                     cerrado_externamente = True
             except: pass 
@@ -3595,7 +3687,7 @@ def verificar_salidas(exchange, df, symbol):
                 guardar_estado()
 
                 if is_real_trade:
-                    threading.Thread(target=mover_sl_binance_seguro, args=(exchange, d, k, nuevo_sl)).start()
+                    nucleo.lanzar(mover_sl_binance_seguro, exchange, d, k, nuevo_sl)
                 else:
                     enviar_telegram(f"🛡️ <b>BE ACTIVADO (Simulado)</b>: {k}\nSL Virtual movido a {nuevo_sl:.4f}")
 
@@ -3607,6 +3699,7 @@ def verificar_salidas(exchange, df, symbol):
                     del bot_state["active_trades"][k]
         guardar_estado()
 
+@planificador.con_prioridad(PRIORIDAD_SALIDA)
 def mover_sl_binance_seguro(exchange, trade_data, trade_id, nuevo_sl_precio):
     """
     Mueve el SL de forma segura: Primero pone el nuevo, luego borra los viejos.
@@ -3683,6 +3776,7 @@ def mover_sl_binance_seguro(exchange, trade_data, trade_id, nuevo_sl_precio):
 # ==============================================================================
 bot_running = True
 
+@planificador.con_prioridad(PRIORIDAD_SALIDA)
 def cerrar_todas_posiciones(exchange):
     """
     "PANIC BUTTON":
@@ -3807,6 +3901,7 @@ def escuchar_teclado(exchange):
         except EOFError:
             break
 
+@planificador.con_prioridad(PRIORIDAD_CONCILIACION)
 def sincronizar_cartera_real(exchange):
     """
     AUDITORÍA:
@@ -3829,8 +3924,8 @@ def sincronizar_cartera_real(exchange):
             try: tiempos_entrada[raw] = datetime.fromisoformat(v['entry_time'])
             except: tiempos_entrada[raw] = datetime.now()
 
-        # --- 1: TRAER POSICIONES REALES ---
-        raw_positions = exchange.fetch_positions()
+        # --- 1: TRAER POSICIONES REALES (foto del ciclo; se re-pide si está vieja) ---
+        raw_positions = posiciones_reales.posiciones(exchange)
         simbolos_reales_activos = set() 
 
         # --- 2: AUDITORÍA DE LO QUE EXISTE EN BINANCE ---
@@ -3986,6 +4081,542 @@ def sincronizar_cartera_real(exchange):
 # ==============================================================================
 # MAIN LOOP
 # ==============================================================================
+def revisar_salidas(exchange, data_cache, simbolos):
+    """verificar_salidas de todos los pares a la vez (pool I/O del núcleo)."""
+    args = []
+    for sym in simbolos:
+        if sym in COINS_TO_TRADE and sym in data_cache:
+            with cache_lock: df_sym = data_cache[sym].df().iloc[-1:].copy()
+            args.append((exchange, df_sym, sym))
+    nucleo.en_paralelo(verificar_salidas, args)
+
+# Motor de indicadores por par (lo avanza solo la tarea de análisis de ese par)
+motores_indicadores = {}
+# Contexto diario por par: se recalcula al cambiar el día UTC, no en cada ciclo
+contexto_diario = market_context.CacheContextoDiario()
+# Índice Top 20 ponderado por volumen (mismo cálculo que construir_indice_mercado, sin límite de ffill)
+indice_mercado = IndiceMercado([s.replace('/','') for s in TOP20_SYMBOLS], MAX_VELAS_CACHE)
+# Velas 1h / 4h / 1D por par: cada vela cerrada se agrega una sola vez
+resamples_velas = {}
+# Salidas de CONTEXTO / TACTICO / HMM por par hasta que avance su barra (día UTC / hora cerrada)
+memo_regimen = MemoRegimen()
+REFRESCO_VISTAS_IA_MIN = 180  # Pares sin señal: regímenes solo para refrescar ai_views (/info) cada N min
+cascada = CascadaSenales(REFRESCO_VISTAS_IA_MIN * 60)
+FILAS_IA = 128  # Cola que necesita la IA: fila -2 + ventana micro de 60
+
+def indicadores_al_dia(symbol, data_cache):
+    """Avanza el motor del par con las velas cerradas nuevas del buffer (la última está en curso)."""
+    motor = motores_indicadores.get(symbol)
+    if motor is None: motor = motores_indicadores[symbol] = MotorIndicadores()
+    with cache_lock:
+        buf = data_cache[symbol]
+        tiempos = buf.tiempos()
+        ini = motor.inicio_pendiente(tiempos)
+        t_nuevas = tiempos[ini:-1].copy(); m_nuevas = buf.matriz()[:, ini:-1].copy()
+    motor.sincronizar(t_nuevas, m_nuevas)
+    return motor
+
+def velas_al_dia(symbol, data_cache):
+    """Avanza el resample 1h/4h/1D del par (las velas en curso incluyen la vela 5m en curso)."""
+    rs = resamples_velas.get(symbol)
+    if rs is None: rs = resamples_velas[symbol] = ResampleVelas(MAX_VELAS_CACHE)
+    with cache_lock:
+        buf = data_cache[symbol]
+        tiempos = buf.tiempos()
+        ini = rs.inicio_pendiente(tiempos)
+        t_nuevas = tiempos[ini:].copy(); m_nuevas = buf.matriz()[:, ini:].copy()
+    rs.sincronizar(t_nuevas, m_nuevas)
+    return rs
+
+def preparar_simbolo(symbol, ctx):
+    """
+    Fase 1 del análisis (pool CPU del núcleo, un par por tarea): seguridad, spread, features,
+    señal cruda y ventanas de la IA. Devuelve (estado del par, None) o (None, línea de log o None)
+    si se descarta. Sin señal cruda el par no sigue (salvo refresco de ai_views): ni ventanas ni
+    regímenes. La inferencia Keras NO corre acá: va en lote para todos los pares (LoteInferencia).
+    """
+    data_cache, exchange = ctx['data_cache'], ctx['exchange']
+    mkt_idx, btc_series = ctx['mkt_idx'], ctx['btc_series']
+    modelos, scalers = ctx['modelos'], ctx['scalers']
+
+    if symbol not in data_cache: return None, None
+
+    # Temporalidades altas del par (incremental) + foto de la cola 5m que lee la IA
+    velas_tf = velas_al_dia(symbol, data_cache)
+    with cache_lock: df_foto = data_cache[symbol].df().iloc[-FILAS_IA:].copy()
+
+    # Indicadores 1h del ciclo (seguridad, táctico y HMM leen los mismos nodos, solo sobre la cola)
+    ind_1h = AlmacenIndicadores({'1h': velas_tf.velas('1h').iloc[-FILAS_1H:]})
+
+    # --- ANÁLISIS DE SEGURIDAD (VOLATILIDAD 1H) ---
+    # Usamos las velas de 1h cerradas
+    es_seguro, motivo_seguridad = verificar_seguridad_horaria(symbol, ind_1h)
+
+    if not es_seguro:
+
+        return None, f"{symbol:<10} | {motivo_seguridad}"
+
+    # FILTRO DE SPREAD
+    try:
+        # Puntas de precio (snapshot del ciclo; se re-pide si pasó MAX_EDAD_PUNTAS_SEG)
+        if symbol in data_cache:
+
+            spread_pct = puntas_mercado.spread(symbol, exchange)
+
+            if spread_pct is not None:
+                if spread_pct > MAX_SPREAD_ALLOWED:
+                    # Solo imprime si es muy alto
+                    return None, f"{symbol:<10} | ⛔ Spread Alto ({spread_pct*100:.2f}% > {MAX_SPREAD_ALLOWED*100:.2f}%)"
+    except Exception as e_spread:
+        pass 
+
+    df = df_foto
+
+    try:
+        # Contexto diario: cacheado por día UTC (velas 1D del resample), se difunde sobre la cola de la IA.
+        # Estrategias (frpv, mean_reversion, breakout, simple_trend) + ATR/RSI: motor incremental,
+        # solo procesa la vela que cerró. La IA lee la fila -2 y ventanas cortas: basta la cola.
+        motor = indicadores_al_dia(symbol, data_cache)
+        df_ia = contexto_diario.agregar(symbol, df, mkt_idx, btc_series, filas=FILAS_IA,
+                                        df_daily=velas_tf.velas('1D')).join(motor.tabla(FILAS_IA))
+
+        curr_idx = -2; row = df_ia.iloc[curr_idx]
+
+        # 0. Cascada: sin señal cruda en la fila -2 ninguna estrategia puede dar candidato.
+        #    Los regímenes se calculan igual si toca refrescar la vista del par en /info.
+        senales = senales_crudas(row, CONFIG_STRAT)
+        if senales: cascada.contar('con_senal')
+        elif cascada.pide_vista(symbol): cascada.contar('refresco_vistas')
+        else:
+            cascada.contar('sin_senal')
+            return None, None
+
+        # 1. Ventana Contexto (Macro). La usan también las estrategias: se arma siempre;
+        #    la salida de CONTEXTO sale de la memo mientras la ventana siga en el mismo día.
+        v_mac = df_ia.iloc[curr_idx-13:curr_idx+1]
+        w_mac_s = scalers['macro'].transform(v_mac[COLS_MACRO].values).reshape(1,14,len(COLS_MACRO))
+        marca_mac = marca_ventana_diaria(v_mac.index)
+        p_mac = memo_regimen.obtener('CONTEXTO', symbol, marca_mac)
+
+        # 2. Ventana Táctico (NN 1H): velas cerradas, solo si avanzó la hora
+        velas_1h = ind_1h.base('1h')
+        marca_1h = velas_1h.index[-2] if len(velas_1h) > 1 else None
+        p_tac = memo_regimen.obtener('TACTICO', symbol, marca_1h)
+        X_tac = preparar_input_tactico(ind_1h, scalers['tactico']) if p_tac is None else None
+
+        # 3. HMM (Cluster): filtro forward del par, se actualiza en lote con las horas cerradas nuevas
+        post_hmm = modelos['HMM_FILTRO'].posterior(symbol, marca_1h)
+        pedido_hmm = None
+        if post_hmm is None: pedido_hmm = preparar_input_hmm(ind_1h, scalers['hmm'], modelos['HMM_FILTRO'], symbol)
+
+        # Captura de datos crudos finales para STELLARIUM:
+        btc_trend_score_val = float(row.get('BTC_Trend_Score', 0.0))
+        atr_pct_val = float(row.get('ATR_Pct', 0.0))
+        rsi_val = float(row.get('RSI', 50.0))
+
+    except: return None, None
+
+    # 4. Ventana Micro (la misma para todas las estrategias; el lado se agrega al pedir). Sin señal no se usa.
+    w_mic_s = None
+    if senales:
+        try:
+            w_mic = df_ia.iloc[curr_idx-59:curr_idx+1][COLS_MICRO].values
+            w_mic_s = scalers['micro'].transform(w_mic).reshape(1,60,6)
+        except: w_mic_s = None
+
+    return {
+        'symbol': symbol, 'row': row, 'w_mac_s': w_mac_s, 'X_tac': X_tac, 'w_mic_s': w_mic_s,
+        'p_mac': p_mac, 'p_tac': p_tac, 'marca_mac': marca_mac, 'marca_1h': marca_1h,
+        'hay_tac': X_tac is not None or p_tac is not None,
+        'post_hmm': post_hmm, 'pedido_hmm': pedido_hmm,
+        'btc_trend': btc_trend_score_val, 'atr_pct': atr_pct_val, 'rsi': rsi_val,
+    }, None
+
+
+def decidir_simbolo(estado, p_mac, p_tac, ctx):
+    """
+    Fase 2 (con las salidas del lote macro/táctico): regímenes, reglas y filtros por estrategia.
+    Devuelve (pendientes, línea de log o None); cada pendiente es un (estrategia, lado) que
+    necesita la predicción de su modelo (pedida en lote en la fase siguiente). pendientes=None:
+    el par termina acá.
+    """
+    symbol, row = estado['symbol'], estado['row']
+    ctx_long, ctx_short = ctx['ctx_long'], ctx['ctx_short']
+    tac_long, tac_short = ctx['tac_long'], ctx['tac_short']
+    clust, str_hmm = estado['clust'], estado['str_hmm']
+    pendientes = []
+    str_stat = ""
+    reg_tac, conf_tac = 0, 0.0
+
+    if p_mac is None: return None, None  # Falló la inferencia macro del lote (como antes: sin log)
+    reg_mac = np.argmax(p_mac); conf_mac = p_mac[reg_mac]
+    str_mac = f"{['RAN','BULL','BEAR','CAOS'][reg_mac]} ({conf_mac:.2f})"
+
+    if estado['hay_tac']:
+        if p_tac is None: return None, None
+        reg_tac = np.argmax(p_tac); conf_tac = p_tac[reg_tac]
+        str_tac = f"{['RAN','BULL','BEAR','CAOS'][reg_tac]} ({conf_tac:.2f})"
+    else: str_tac = "Falta Data"
+
+    estado.update({'reg_mac': reg_mac, 'conf_mac': conf_mac, 'str_mac': str_mac,
+                   'reg_tac': reg_tac, 'conf_tac': conf_tac, 'str_tac': str_tac})
+
+
+    # En Telegram mostramos lo que piensan las IAs
+    with memory_lock:
+        if "ai_views" not in bot_state: bot_state["ai_views"] = {}
+
+        bot_state["ai_views"][symbol] = {
+            "MACRO": str_mac,  
+            "TACTICO": str_tac,
+            "UPDATE": datetime.now().strftime('%H:%M')
+        }
+    cascada.vista_al_dia(symbol)
+
+
+    # --- DETERMINAR ESTRATEGIAS (UMBRALES DINÁMICOS) ---
+    allow_std = []; side_allow_std = 'BOTH'
+    macro_bloqueado = False
+
+    # 1. SELECCIÓN DE VARA DE MEDIR (MACRO)
+    # Si el Macro dice BULL (1), usamos la vara ajustada de Longs.
+    # Si dice BEAR (2), la de Shorts. Si es Rango/Caos, la Estándar.
+    if reg_mac == 1: ref_umbral_ctx = ctx_long
+    elif reg_mac == 2: ref_umbral_ctx = ctx_short
+    else: ref_umbral_ctx = UMBRAL_CONTEXTO
+
+    # 2. BLOQUEO MACRO
+    if conf_mac < ref_umbral_ctx: macro_bloqueado = True; str_stat="⛔ Duda Mac"
+    elif reg_mac == 3: macro_bloqueado = True; str_stat="⛔ Caos Mac"
+
+    # 3. REGLAS ESTÁNDAR (Tácticos Dinámicos)
+    if not macro_bloqueado and reg_tac is not None:
+
+        # Selección de vara de medir (TÁCTICO)
+        # Si Táctico es Bull (1) -> Usamos ajuste Long. Bear (2) -> Ajuste Short.
+        if reg_tac == 1: ref_dic_tac = tac_long
+        elif reg_tac == 2: ref_dic_tac = tac_short
+        else: ref_dic_tac = UMBRALES_TACTICOS # 0 y 3 usan el base
+
+
+        if conf_tac >= ref_dic_tac.get(reg_tac, 0.5):
+
+            if reg_tac == 0: # Rango
+                allow_std = ['RANGO']
+                if reg_mac != 0: allow_std.append('FRPV') 
+            elif reg_tac == 1: # Bull
+                allow_std = ['FRPV', 'TREND', 'BREAKOUT', 'RANGO']
+                side_allow_std = 'BUY'
+                if reg_mac == 2: allow_std = [] 
+            elif reg_tac == 2: # Bear
+                allow_std = ['FRPV', 'TREND', 'BREAKOUT', 'RANGO']
+                side_allow_std = 'SELL'
+                if reg_mac == 1: allow_std = [] 
+            elif reg_tac == 3: # Caos
+                allow_std = ['BREAKOUT', 'FRPV']
+                if reg_mac == 1: side_allow_std = 'BUY'
+                elif reg_mac == 2: side_allow_std = 'SELL'
+                elif reg_mac == 0: allow_std = ['FRPV']
+
+    # Reglas VIP HMM (mismo cluster de arriba: misma vela 1h cerrada, no se recalcula)
+    allow_vip = []
+    if estado['hay_hmm'] and clust in REGLAS_HMM and REGLAS_HMM[clust]:
+        allow_vip = REGLAS_HMM[clust]
+
+    # Unificamos reglas crudas
+    raw_rules = list(set(allow_std + allow_vip))
+
+    # Si no hay reglas
+    if not raw_rules:
+        if not "⛔" in str_stat: str_stat = "💤 Esperando"
+        return None, f"{symbol:<10} | {str_mac:<15} | {str_tac:<15} | {str_hmm:<10} | {str_stat}"
+
+    # --- EVALUACIÓN (LONG/SHORT) ---
+    # Iteramos sobre las estrategias base
+    for base_strat in CONFIG_STRAT.keys():
+
+        # 1. INTERPRETACIÓN DE PERMISOS
+        # Permiso Total: Si la regla es 'FRPV' -> Habilita ambos lados
+        permiso_total = base_strat in raw_rules
+        # Permiso Específico: Si la regla es 'FRPV_LONG' -> Solo Long
+        permiso_long = permiso_total or (f"{base_strat}_LONG" in raw_rules)
+        permiso_short = permiso_total or (f"{base_strat}_SHORT" in raw_rules)
+
+        # Si no tiene permiso ni de long ni de short
+        if not (permiso_long or permiso_short): continue
+
+        # 2. Check GLOBAL Cooldown (Punto 7)
+        if base_strat in bot_state.get("global_strat_perf", {}):
+            cool_until = bot_state["global_strat_perf"][base_strat]["cooldown_until"]
+            if cool_until and datetime.now() < datetime.fromisoformat(cool_until):
+                continue # Estrategia castigada globalmente
+
+        # 3. Límite por Estrategia (Punto 4)
+        count_strat = sum(1 for k in bot_state["active_trades"] if base_strat in k)
+        if count_strat >= MAX_TRADES_STRAT: continue
+
+        # 4. Check Cooldown Individual
+        key_strat = f"{symbol}_{base_strat}"
+        if check_cooldown(key_strat): continue
+        if key_strat in bot_state["active_trades"]: continue
+
+        # 5. OBTENCIÓN DE SEÑALES CRUDAS Y FILTRADO DIRECCIONAL
+        cfg = CONFIG_STRAT[base_strat]
+
+
+        # Solo leemos la señal de compra si tenemos permiso_long = True
+        is_buy = (not pd.isna(row.get(cfg['buy']))) and permiso_long
+        # Solo leemos la señal de venta si tenemos permiso_short = True
+        is_sell = (not pd.isna(row.get(cfg['sell']))) and permiso_short
+
+        if not (is_buy or is_sell): continue
+
+
+        # Ajustamos nombre variable
+        strat = base_strat 
+
+        # FILTROS MACRO
+        # Si la estrategia entró por una regla VIP
+        es_vip_long = f"{base_strat}_LONG" in allow_vip or base_strat in allow_vip
+        es_vip_short = f"{base_strat}_SHORT" in allow_vip or base_strat in allow_vip
+
+        if is_buy and not es_vip_long:
+            if macro_bloqueado: continue
+            if side_allow_std == 'SELL': continue
+            if reg_mac == 2: continue 
+
+        if is_sell and not es_vip_short:
+            if macro_bloqueado: continue
+            if side_allow_std == 'BUY': continue
+            if reg_mac == 1: continue 
+
+        side = 'BUY' if is_buy else 'SELL'; direct = 1.0 if is_buy else -1.0
+
+        # Predicción IA: se pide en lote (micro del par + lado, macro del par)
+        if estado['w_mic_s'] is None: continue
+        pendientes.append({'strat': strat, 'side': side, 'direct': direct, 'is_buy': is_buy, 'is_sell': is_sell,
+                           'es_vip_long': es_vip_long, 'es_vip_short': es_vip_short, 'key_strat': key_strat})
+
+    return pendientes, None
+
+
+def pedir_micro(lote, estado, pendiente):
+    """Entrada del modelo de la estrategia: ventana micro + columna de lado, y la ventana macro del par."""
+    d_t = np.full((1,60,1), pendiente['direct'])
+    X_mic = np.concatenate([estado['w_mic_s'], d_t], axis=2)
+    lote.agregar(pendiente['strat'], (estado['symbol'], pendiente['side']), X_mic, estado['w_mac_s'])
+
+
+def cerrar_simbolo(estado, pendientes, lote):
+    """
+    Fase 3 (con las salidas del lote de estrategias): umbral final por (estrategia, lado) y candidatos.
+    Devuelve (candidatos, línea de log o None).
+    """
+    symbol, row = estado['symbol'], estado['row']
+    str_mac, str_tac, str_hmm = estado['str_mac'], estado['str_tac'], estado['str_hmm']
+    candidatos = []
+    str_stat = ""
+
+    for p in pendientes:
+        strat, side, key_strat = p['strat'], p['side'], p['key_strat']
+        is_buy, is_sell = p['is_buy'], p['is_sell']
+        es_vip_long, es_vip_short = p['es_vip_long'], p['es_vip_short']
+        cfg = CONFIG_STRAT[strat]
+
+        salida = lote.salida(strat, (symbol, side))
+        if salida is None: continue
+        prob = salida[0]
+
+        # ----------------------------------------------------------
+        # UMBRAL FINAL (Dinámico + VIP + Sesgo Strat)
+        # ----------------------------------------------------------
+        umbral_real = cfg['umbral']
+
+        # Ajuste por Sesgo de Estrategia (PnL Reciente)
+        sesgo_strat = calcular_sesgo_estrategia(strat, side)
+        umbral_real += sesgo_strat
+
+        # Ajuste VIP (Racha o HMM)
+        es_vip_active = (is_buy and es_vip_long) or (is_sell and es_vip_short)
+        vip_until_date = bot_state["strategy_state"][key_strat].get("vip_until")
+        es_vip_racha = vip_until_date and datetime.now() < datetime.fromisoformat(vip_until_date)
+
+        if es_vip_active or es_vip_racha: 
+            umbral_real -= VIP_UMBRAL_DISCOUNT
+
+
+        prefix = "🔥" if (es_vip_active or es_vip_racha) else "⚡"
+        if sesgo_strat < 0: prefix += "🟢" # Icono si tiene bonus por ganar
+        elif sesgo_strat > 0: prefix += "🛡️" # Icono si tiene castigo por perder
+
+        pasa_umbral = prob >= umbral_real
+        estado_icon = "✅" if pasa_umbral else "❌"
+
+        # Mostramos el umbral real exigido en el log
+        str_stat += f"{prefix}{strat[:2]} {side}({prob:.2f}/{umbral_real:.2f}){estado_icon} "
+
+        if pasa_umbral:
+            entry = float(row['close']); atr = float(row['ATR'])
+            mtp = cfg['tp']
+            if side=='BUY': tp=entry+(atr*mtp); sl=entry-(atr*cfg['sl'])
+            else: tp=entry-(atr*mtp); sl=entry+(atr*cfg['sl'])
+
+            if abs(entry-sl)/entry > 0.05: # Filtro volatilidad extrema
+                str_stat = str_stat.replace("✅", "⚠️Vol"); continue
+
+            # --- GUARDAMOS CANDIDATO ---
+            str_stat += "🚀 "
+            meta = f"M:{str_mac.split('(')[0]} T:{str_tac.split('(')[0]} H:{str_hmm} P:{prob:.2f} VIP:{es_vip_active}"
+
+            candidatos.append({
+                'prob': prob,
+                'symbol': symbol,
+                'strat': strat,
+                'side': side,
+                'entry': entry, 'tp': tp, 'sl': sl,
+                'meta': meta,
+                # --- PARA IA STELLARIUM ---
+                'prob_ia': prob,
+                'raw_hmm': int(estado['clust']),
+                'raw_ctx': estado['reg_mac'],
+                'raw_ctx_prob': estado['conf_mac'],
+                'raw_tac': estado['reg_tac'],
+                'raw_tac_prob': estado['conf_tac'],
+                'atr_pct': estado['atr_pct'],
+                'rsi': estado['rsi'],
+                'btc_trend': estado['btc_trend'],
+                'hour': datetime.now().hour,
+                'day': datetime.now().weekday() 
+                # -----------------------------------------------
+            })
+
+    if not candidatos and "✅" not in str_stat: 
+          return candidatos, f"{symbol:<10} | {str_mac:<15} | {str_tac:<15} | {str_hmm:<10} | {str_stat}"
+    return candidatos, None
+
+
+def analizar_mercado(simbolos, ctx):
+    """
+    Análisis de entradas del ciclo en fases, con UNA pasada por modelo Keras para todos los pares:
+      1) pool CPU: features + señal cruda; ventanas solo si hay señal o toca refrescar /info (preparar_simbolo)
+         + filtro HMM: un paso forward en lote con las horas cerradas nuevas
+      2) lote CONTEXTO + TACTICO (solo pares sin salida en la memo) -> reglas y filtros (decidir_simbolo)
+      3) lote por modelo de estrategia -> umbrales y candidatos (cerrar_simbolo)
+    Devuelve (candidatos, líneas de log en el orden de 'simbolos', pasadas de modelo).
+    """
+    lineas, estados = {}, []
+    cascada.nuevo_ciclo(); cascada.contar('pares', len(simbolos))
+    for symbol, resultado in zip(simbolos, nucleo.en_paralelo(preparar_simbolo, [(s, ctx) for s in simbolos], cpu=True)):
+        if resultado is None: continue
+        estado, linea = resultado
+        if estado is not None: estados.append(estado)
+        if linea: lineas[symbol] = linea
+
+    # HMM: un paso forward en lote para los pares que cerraron una hora (arranques y atrasos, fila por fila)
+    posteriores = ctx['modelos']['HMM_FILTRO'].actualizar([e['pedido_hmm'] for e in estados if e['pedido_hmm'] is not None])
+    for e in estados:
+        post = e['post_hmm'] if e['post_hmm'] is not None else posteriores.get(e['symbol'])
+        e['hay_hmm'] = post is not None
+        e['clust'] = int(np.argmax(post)) if post is not None else 2
+        e['str_hmm'] = f"C{e['clust']}"
+        if post is not None: bot_state["market_cluster"] = e['clust']
+
+    # Regímenes: solo los pares cuya barra avanzó (el resto sale de la memo)
+    lote = LoteInferencia(inferencia_lock)
+    for e in estados:
+        if e['p_mac'] is None: lote.agregar('CONTEXTO', e['symbol'], e['w_mac_s'])
+        if e['X_tac'] is not None: lote.agregar('TACTICO', e['symbol'], e['X_tac'])
+    lote.correr(ctx['modelos'])
+
+    def regimen(e, modelo, clave, marca):
+        if e[clave] is not None: return e[clave]
+        p = lote.salida(modelo, e['symbol'])
+        memo_regimen.guardar(modelo, e['symbol'], e[marca], p)
+        return p
+
+    por_cerrar = []
+    for e in estados:
+        p_mac = regimen(e, 'CONTEXTO', 'p_mac', 'marca_mac')
+        p_tac = regimen(e, 'TACTICO', 'p_tac', 'marca_1h')
+        pendientes, linea = decidir_simbolo(e, p_mac, p_tac, ctx)
+        if linea: lineas[e['symbol']] = linea
+        if pendientes is None: continue
+        cascada.contar('estrategias', len(pendientes))
+        for p in pendientes: pedir_micro(lote, e, p)
+        por_cerrar.append((e, pendientes))
+    lote.correr(ctx['modelos'])
+
+    candidatos = []
+    for e, pendientes in por_cerrar:
+        cands_par, linea = cerrar_simbolo(e, pendientes, lote)
+        candidatos.extend(cands_par)
+        cascada.contar('candidatos', len(cands_par))
+        if linea: lineas[e['symbol']] = linea
+
+    return candidatos, [lineas[s] for s in simbolos if s in lineas], lote.pasadas
+
+
+def firma_modelos():
+    """Archivos de modelos y scalers con su mtime: si cambia (reentrenamiento/exportación), se recarga."""
+    firma = []
+    for carpeta, prefijo in ((DIR_MODELOS, 'model_'), (DIR_SCALERS, 'scaler_')):
+        if not os.path.isdir(carpeta): continue
+        for f in sorted(os.listdir(carpeta)):
+            if f.startswith(prefijo): firma.append((f, os.path.getmtime(os.path.join(carpeta, f))))
+    return tuple(firma)
+
+
+def tflite_al_dia(archivo):
+    """El .tflite existe y no es más viejo que su .keras (si no, es de otro entrenamiento)."""
+    path, path_keras = (os.path.join(DIR_MODELOS, f'{archivo}{ext}') for ext in ('.tflite', '.keras'))
+    if not os.path.exists(path): return False
+    return not os.path.exists(path_keras) or os.path.getmtime(path) >= os.path.getmtime(path_keras)
+
+
+def cargar_modelos():
+    """Redes (TFLite, NumPy o Keras), HMM y scalers. Devuelve (modelos, scalers); si algo falta, lanza la excepción."""
+    modelos = {}; scalers = {}
+    # Carga de redes: .tflite (sin TensorFlow) por modelo si está al día con su .keras, si no el .keras con forward NumPy
+    redes = {**{k: f'model_IA_{k}' for k in CONFIG_STRAT.keys()},
+             'CONTEXTO': 'model_IA_CONTEXTO', 'TACTICO': 'model_IA_TACTICO_1H', 'DIARIO': 'model_IA_DIARIO'}
+    t0 = time.time()
+    if MOTOR_IA == 'TFLITE':
+        from MODULOS.runtime_tflite import cargar_tflite, MOTOR
+        from MODULOS.lstm_numpy import cargar_numpy
+        sin_tflite = []
+        for k, archivo in redes.items():
+            path_keras = os.path.join(DIR_MODELOS, f'{archivo}.keras')
+            if tflite_al_dia(archivo): modelos[k] = cargar_tflite(os.path.join(DIR_MODELOS, f'{archivo}.tflite'), k)
+            elif k != 'DIARIO' or os.path.exists(path_keras):
+                modelos[k] = cargar_numpy(path_keras, k)
+                sin_tflite.append(k)
+        print(f"⚡ Modelos TFLite ({MOTOR}) cargados y calentados en {time.time() - t0:.1f}s")
+        if sin_tflite: print(f"⚠️ .tflite ausente o más viejo que su .keras (correr training/exportar_tflite.py): "
+                             f"{', '.join(sin_tflite)} con forward NumPy.")
+    elif MOTOR_IA == 'NUMPY':
+        from MODULOS.lstm_numpy import cargar_numpy
+        for k, archivo in redes.items():
+            path = os.path.join(DIR_MODELOS, f'{archivo}.keras')
+            if k != 'DIARIO' or os.path.exists(path): modelos[k] = cargar_numpy(path, k)
+        print(f"⚡ Modelos NumPy (BatchNorm plegadas) cargados en {time.time() - t0:.1f}s")
+    else:
+        import tensorflow as tf
+        from MODULOS.modelo_compilado import compilar_modelos
+        for k, archivo in redes.items():
+            path = os.path.join(DIR_MODELOS, f'{archivo}.keras')
+            if k != 'DIARIO' or os.path.exists(path): modelos[k] = tf.keras.models.load_model(path)
+        # Estrategias, CONTEXTO y TACTICO: tf.function con firma fija, trazada ahora (no en el primer ciclo)
+        compilar_modelos(modelos, list(CONFIG_STRAT.keys()) + ['CONTEXTO', 'TACTICO'])
+        print(f"⚡ Modelos Keras compilados y calentados en {time.time() - t0:.1f}s")
+    modelos['HMM'] = joblib.load(os.path.join(DIR_MODELOS, 'model_hmm_unsupervised.pkl'))
+    modelos['HMM_FILTRO'] = SeguidorHMM(modelos['HMM'])  # Vector forward por par: arranca de cero con cada carga
+    scalers['micro'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_micro_global.pkl'))
+    scalers['macro'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_macro_global.pkl'))
+    if os.path.exists(os.path.join(DIR_SCALERS, 'scaler_tactico_1h.pkl')): scalers['tactico'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_tactico_1h.pkl'))
+    scalers['hmm'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_hmm.pkl'))
+    return modelos, scalers
+
+
 def main_loop():
     # --- INICIALIZACIÓN ---
     exchange = inicializar_exchange()
@@ -3993,18 +4624,8 @@ def main_loop():
     if not PAPER_TRADING: print("\n⚠️ MODO REAL ACTIVADO ⚠️"); time.sleep(3)
 
     print("🧠 Cargando Modelos...")
-    modelos = {}; scalers = {}
-    try:
-        # Carga de modelos
-        for k in CONFIG_STRAT.keys(): modelos[k] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, f'model_IA_{k}.keras'))
-        modelos['CONTEXTO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_CONTEXTO.keras'))
-        modelos['TACTICO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_TACTICO_1H.keras'))
-        modelos['HMM'] = joblib.load(os.path.join(DIR_MODELOS, 'model_hmm_unsupervised.pkl'))
-        if os.path.exists(os.path.join(DIR_MODELOS, 'model_IA_DIARIO.keras')): modelos['DIARIO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_DIARIO.keras'))
-        scalers['micro'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_micro_global.pkl'))
-        scalers['macro'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_macro_global.pkl'))
-        if os.path.exists(os.path.join(DIR_SCALERS, 'scaler_tactico_1h.pkl')): scalers['tactico'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_tactico_1h.pkl'))
-        scalers['hmm'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_hmm.pkl'))
+    firma_cargada = firma_modelos()
+    try: modelos, scalers = cargar_modelos()
     except Exception as e: print(f"❌ Error carga: {e}"); return
 
     # --- BLOQUE IA STELLARIUM ---
@@ -4035,12 +4656,6 @@ def main_loop():
         print(f"❌ Error al cargar el Gerente: {e}")
         gerente = None
 
-    data_cache = {}
-    print("📥 Sincronizando datos...")
-    for sym in set(TOP20_SYMBOLS + COINS_TO_TRADE):
-        df = descargar_historial_profundo(exchange, sym, '5m')
-        if df is not None: data_cache[sym] = df
-
     # Carga de Mercados
 
     print("📥 Cargando información de mercados (Precisiones y Límites)...")
@@ -4050,6 +4665,36 @@ def main_loop():
     except Exception as e:
         print(f"⚠️ Error cargando mercados: {e}")
 
+    # --- NÚCLEO ASYNC (ccxt async con los mismos mercados, misma cola de peso) ---
+    nucleo.iniciar()
+    exchange_async = nucleo.crear_exchange_async(config_exchange(), planificador,
+                                                 markets=exchange.markets, currencies=exchange.currencies)
+
+    # --- DATOS: ALMACÉN LOCAL + DELTA (Solo se baja lo que no está en disco) ---
+    almacen = AlmacenVelas(DIR_VELAS, TIMEFRAME)
+    desde_ms = exchange.milliseconds() - (DAYS_HISTORY * 24 * 60 * 60 * 1000)
+    simbolos_datos = sorted(set(TOP20_SYMBOLS + COINS_TO_TRADE))
+    print("📥 Sincronizando datos (almacén local + delta en paralelo)...")
+    motor = MotorBackfill(mercado='future', timeframe=TIMEFRAME, limitador=limitador_futuros)
+    try: motor.ejecutar(simbolos_datos, almacen, desde_ms)
+    except Exception as e: print(f"⚠️ Error en backfill: {e}")
+
+    data_cache = {}
+    for sym in simbolos_datos:
+        df = almacen.cargar(sym, desde_ms)
+        if df is not None: data_cache[sym] = BufferVelas.desde_dataframe(df, MAX_VELAS_CACHE)
+    # Vela en curso (no se guarda en disco)
+    nucleo.ejecutar(rellenar_huecos(exchange_async, data_cache, list(data_cache.keys()), almacen))
+
+    # --- STREAM DE VELAS (Reemplaza el polling REST por ciclo) ---
+    def al_recibir_vela(sym, vela, cerrada):
+        actualizar_cache_velas(data_cache, sym, [vela])
+        if cerrada: almacen.agregar(sym, [vela])
+
+    # Última vela cargada por par: si el socket tarda en conectar, el relleno arranca desde ahí
+    aperturas = {sym: buf.ultimo_timestamp() for sym, buf in data_cache.items()}
+    stream = StreamVelas(list(data_cache.keys()), TIMEFRAME, al_recibir=al_recibir_vela, aperturas=aperturas)
+    stream.iniciar()
 
     print(f"\n🤖 BOT ONLINE | Modo: {'PAPER' if PAPER_TRADING else 'REAL'}")
     log_to_file(f"=== BOT INICIADO: {datetime.now()} ===")
@@ -4078,8 +4723,21 @@ def main_loop():
         except: pass
     # Contador para el while
     ciclos = 0
+    tiempo_espera = 0     # Primer ciclo inmediato
+    vela_cerrada = True   # Primer ciclo evalúa entradas
+
+    while bot_running:
+        # --- ESPERA ---
+        # Despertamos al cierre de vela (entradas) o cada 20s/60s (gestión de salidas).
+        if tiempo_espera:
+            print(f"   ⏳ Ciclo terminado. Esperando cierre de vela (máx {tiempo_espera}s)...")
+            vela_cerrada = stream.esperar_cierre(tiempo_espera, seguir=lambda: bot_running)
+            if not bot_running: break
+
+        # Si hay operaciones abiertas, chequeamos más rápido (cada 20s) para gestionar salidas
+        # Si no hay nada, chequeamos cada 60s para ahorrar API y CPU.
+        tiempo_espera = 20 if bot_state["active_trades"] else 60
 
-    while bot_running:  
         print(f"\n⏱️  {datetime.now().strftime('%H:%M:%S')} | Activos: {len(bot_state['active_trades'])}")
         # --- UMBRALES DINÁMICOS ---
         
@@ -4091,20 +4749,29 @@ def main_loop():
 
         
         # --- DASHBOARD Y GESTIÓN DE SALIDAS ---
-        
-        # 1: Copia segura de la memoria (foto)
+
+        # 0: Copia segura de la memoria (foto)
         with memory_lock:
             trades_snapshot = bot_state["active_trades"].copy()
 
+        # 1: Lecturas del ciclo en paralelo (una sola espera de red):
+        #    puntas de todo el mercado, posiciones reales y huecos tras reconexión del stream
+        con_posiciones = not PAPER_TRADING or any(t.get('mode') == 'REAL' for t in trades_snapshot.values())
+        reconexion = stream.consumir_reconexion()
+        try: nucleo.ejecutar(leer_mercado(exchange_async, data_cache, almacen, reconexion, con_posiciones))
+        except Exception as e: print(f"⚠️ Error en lecturas del ciclo: {e}")
+
         # 2: Usamos la foto para imprimir
         if trades_snapshot:
             print(f"🔰 --- CARTERA ACTIVA ---")
             for tid, tdata in trades_snapshot.items(): # <--- COPIA
                 curr_price = tdata['price'] 
                 
-                # (lectura rápida)
-                if tdata['symbol'] in data_cache:
-                    curr_price = data_cache[tdata['symbol']]['close'].iloc[-1]
+                # (lectura rápida) Bid/Ask vigente; si no hay, último close del stream
+                precio_puntas = puntas_mercado.precio_salida(tdata['symbol'], tdata['side'])
+                if precio_puntas: curr_price = precio_puntas
+                elif tdata['symbol'] in data_cache:
+                    with cache_lock: curr_price = data_cache[tdata['symbol']].ultima('close')
                 
                 side_mult = 1 if tdata['side'] == 'BUY' else -1
                 pnl_pct = ((curr_price - tdata['price']) / tdata['price']) * side_mult * tdata['leverage'] * 100
@@ -4114,43 +4781,18 @@ def main_loop():
                 print(f"      🧠 {tdata.get('meta_info', 'No Info')}")
             print("-" * 60)
         
-        # --- 2. DESCARGA DE DATOS ---
+        # --- 2. DATOS (STREAM) ---
         try:
             mkt_idx, btc_series = None, None
             symbols_to_sync = list(data_cache.keys())
 
-            def worker_download(sym):
-                try:
-                    
-                    time.sleep(np.random.uniform(0.05, 0.2)) 
-                    new = exchange.fetch_ohlcv(sym, TIMEFRAME, limit=30)
-                    if new:
-                        df_n = pd.DataFrame(new, columns=['time','open','high','low','close','volume'])
-                        df_n['time'] = pd.to_datetime(df_n['time'], unit='ms', utc=True)
-                        df_n.set_index('time', inplace=True); df_n.dropna(inplace=True)
-                        
-                        # thread-safe
-                        if sym not in data_cache:
-                            data_cache[sym] = df_n
-                        else:
-                            data_cache[sym] = pd.concat([data_cache[sym], df_n])
-                            data_cache[sym] = data_cache[sym][~data_cache[sym].index.duplicated(keep='last')]
-
-                        if len(data_cache[sym]) > 86000:
-                            data_cache[sym] = data_cache[sym].iloc[-86000:]
-                except Exception: 
-                    pass 
-
-            # (Max 5 workers)
-            # Esto evita el error 418/429 de Binance
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                executor.map(worker_download, symbols_to_sync)
+            # El stream mantiene data_cache al día. REST solo rellenó el hueco de una (re)conexión (paso 1).
+            if reconexion is None and not stream.conectado:
+                print("   📡 Stream desconectado. Operando con la última vela conocida...")
 
             # 3. VERIFICACIÓN DE SALIDAS
-            # Se ejecuta después de descargar
-            for sym in symbols_to_sync:
-                if sym in COINS_TO_TRADE and sym in data_cache:
-                    verificar_salidas(exchange, data_cache[sym], sym)
+            # Se ejecuta después de descargar (todos los pares a la vez en el pool I/O)
+            revisar_salidas(exchange, data_cache, symbols_to_sync)
             
 
             # AUTO-SYNC
@@ -4178,29 +4820,32 @@ def main_loop():
 
             # Calculo Mercado
             try: 
-                dr = {s.replace('/',''): data_cache[s]['close'].pct_change() for s in TOP20_SYMBOLS if s in data_cache}
-                dv = {s.replace('/',''): data_cache[s]['volume'] for s in TOP20_SYMBOLS if s in data_cache}
-                if dr:
-                    mkt_idx = (pd.DataFrame(dr).ffill().fillna(0) * pd.DataFrame(dv).ffill().fillna(0)).sum(axis=1) / (pd.DataFrame(dv).ffill().fillna(0).sum(axis=1) + 1e-9)
-                    if 'BTC/USDT' in data_cache: btc_series = data_cache['BTC/USDT']['close']
+                # Índice incremental: solo entran las velas nuevas de cada Top 20 (O(pares) por vela)
+                with cache_lock:
+                    buffers_top = {s.replace('/',''): data_cache[s] for s in TOP20_SYMBOLS if s in data_cache}
+                    if buffers_top and not indice_mercado.sincronizar(buffers_top):
+                        indice_mercado.cargar({k: b.serie('close') for k, b in buffers_top.items()},
+                                              {k: b.serie('volume') for k, b in buffers_top.items()})
+                    if 'BTC/USDT' in data_cache: btc_series = data_cache['BTC/USDT'].serie('close').copy()
+                if not indice_mercado.vacio: mkt_idx = indice_mercado.serie()
             except: pass
 
-            if mkt_idx is None: print("   ⏳ Esperando datos..."); time.sleep(10); continue
+            if mkt_idx is None: print("   ⏳ Esperando datos..."); tiempo_espera = 10; continue
 
             # --- (SLEEP) ---
             if bot_paused:
                 print(f"💤 BOT EN PAUSA (SLEEP) - Gestionando salidas, ignorando entradas.")
                 
-                for sym in list(data_cache.keys()):
-                     if sym in COINS_TO_TRADE: verificar_salidas(exchange, data_cache[sym], sym)
+                revisar_salidas(exchange, data_cache, list(data_cache.keys()))
                 
                 # Esperamos un minuto y volvemos al inicio del bucle
-                
-                for _ in range(60):
-                    if not bot_running: break
-                    time.sleep(1)
+                tiempo_espera = 60
                 continue 
-            
+
+            # --- ENTRADAS SOLO AL CIERRE DE VELA ---
+            if not vela_cerrada:
+                print("   🕯️ Vela en curso: solo gestión de salidas.")
+                continue
 
             # --- RECOLECCIÓN DE CANDIDATOS ---
 	        
@@ -4209,421 +4854,90 @@ def main_loop():
             if not sistema_ok:
                 print(f"🛑 FUSIBLE DETONADO: Pérdida ${pnl_hoy:.2f} supera límite de ${limit_usd:.2f} ({int(MAX_DAILY_LOSS_PCT*100)}%).")
                 print("   💤 Durmiendo 5 minutos...")
-                time.sleep(300)
+                tiempo_espera = 300
                 continue 
             
-            candidatos = [] 
 
-            for symbol in COINS_TO_TRADE:
-                if symbol not in data_cache: continue
-                str_mac, str_tac, str_hmm, str_stat = "...", "...", "...", ""
-                
-                # --- ANÁLISIS DE SEGURIDAD (VOLATILIDAD 1H) ---
-                # Usamos el dataframe de 5m
-                es_seguro, motivo_seguridad = verificar_seguridad_horaria(symbol, data_cache[symbol])
-                
-                if not es_seguro:
-                    
-                    print(f"{symbol:<10} | {motivo_seguridad}"); continue
-
-	        # FILTRO DE SPREAD
+            # Recarga en caliente si se reentrenaron/exportaron modelos: la memo de regímenes es del modelo viejo
+            firma = firma_modelos()
+            if firma != firma_cargada:
                 try:
-                    # Puntas de precio
-                    if symbol in data_cache:
-                        
-                        tick = exchange.fetch_ticker(symbol)
-                        ask = tick['ask']
-                        bid = tick['bid']
-                        
-                        if ask and bid:
-                            spread_pct = (ask - bid) / ask
-                            if spread_pct > MAX_SPREAD_ALLOWED:
-                                # Solo imprime si es muy alto
-                                print(f"{symbol:<10} | ⛔ Spread Alto ({spread_pct*100:.2f}% > {MAX_SPREAD_ALLOWED*100:.2f}%)")
-                                continue 
-                except Exception as e_spread:
-                    pass 
-
-                df = data_cache[symbol].copy()
-                # --- VARIABLES INICIALES (Para que no falle si hay error) ---
-                btc_trend_score_val = 0.0
-                reg_tac, conf_tac = 0, 0.0 
-                reg_mac, conf_mac = 0, 0.0
-                clust, str_hmm = 2, "C2"
-
-                try:
-                    df = market_context.agregar_indicadores_contexto(df, mkt_idx, btc_series)
-                    for mod in [frpv, mean_reversion, breakout, simple_trend]: df = mod.aplicar_estrategia(df)
-                    df['ATR'] = ta.atr(df['high'], df['low'], df['close'], length=14)
-                    df['ATR_Pct'] = df['ATR'] / df['close']
-                    df['RSI'] = ta.rsi(df['close'], length=14)
-                    
-                    curr_idx = -2; row = df.iloc[curr_idx]
-                    
-                    # 1. Inferencia Contexto (Macro)
-                    w_mac = df.iloc[curr_idx-13:curr_idx+1][COLS_MACRO].values
-                    w_mac_s = scalers['macro'].transform(w_mac).reshape(1,14,len(COLS_MACRO))
-                    p_mac = modelos['CONTEXTO'].predict(w_mac_s, verbose=0)[0]
-                    reg_mac = np.argmax(p_mac); conf_mac = p_mac[reg_mac]
-                    str_mac = f"{['RAN','BULL','BEAR','CAOS'][reg_mac]} ({conf_mac:.2f})"
-
-                    # 2. Inferencia Táctico (NN 1H)
-                    X_tac = preparar_input_tactico(df, scalers['tactico'])
-                    if X_tac is not None:
-                        p_tac = modelos['TACTICO'].predict(X_tac, verbose=0)[0]
-                        reg_tac = np.argmax(p_tac); conf_tac = p_tac[reg_tac]
-                        str_tac = f"{['RAN','BULL','BEAR','CAOS'][reg_tac]} ({conf_tac:.2f})"
-                    else: str_tac = "Falta Data"
-
-                    # 3. Inferencia HMM (Cluster)
-                    X_hmm = preparar_input_hmm(df, scalers['hmm'])
-                    if X_hmm is not None:
-                        clust = modelos['HMM'].predict(X_hmm)[0]
-                        str_hmm = f"C{clust}"
-                        bot_state["market_cluster"] = int(clust)
-                    
-                    # Captura de datos crudos finales para STELLARIUM:
-                    btc_trend_score_val = float(row.get('BTC_Trend_Score', 0.0))
-                    atr_pct_val = float(row.get('ATR_Pct', 0.0))
-                    rsi_val = float(row.get('RSI', 50.0))
-
-                except: str_mac="Err"; str_tac="Err"; str_hmm="Err"; continue
-                
-                
-                # En Telegram mostramos lo que piensan las IAs
-                if "ai_views" not in bot_state: bot_state["ai_views"] = {}
-                
-                bot_state["ai_views"][symbol] = {
-                    "MACRO": str_mac,  
-                    "TACTICO": str_tac,
-                    "UPDATE": datetime.now().strftime('%H:%M')
-                }
-                
-
-                # --- DETERMINAR ESTRATEGIAS (UMBRALES DINÁMICOS) ---
-                allow_std = []; side_allow_std = 'BOTH'
-                macro_bloqueado = False
-                
-                # 1. SELECCIÓN DE VARA DE MEDIR (MACRO)
-                # Si el Macro dice BULL (1), usamos la vara ajustada de Longs.
-                # Si dice BEAR (2), la de Shorts. Si es Rango/Caos, la Estándar.
-                if reg_mac == 1: ref_umbral_ctx = ctx_long
-                elif reg_mac == 2: ref_umbral_ctx = ctx_short
-                else: ref_umbral_ctx = UMBRAL_CONTEXTO
-
-                # 2. BLOQUEO MACRO
-                if conf_mac < ref_umbral_ctx: macro_bloqueado = True; str_stat="⛔ Duda Mac"
-                elif reg_mac == 3: macro_bloqueado = True; str_stat="⛔ Caos Mac"
-                
-                # 3. REGLAS ESTÁNDAR (Tácticos Dinámicos)
-                if not macro_bloqueado and reg_tac is not None:
-                    
-                    # Selección de vara de medir (TÁCTICO)
-                    # Si Táctico es Bull (1) -> Usamos ajuste Long. Bear (2) -> Ajuste Short.
-                    if reg_tac == 1: ref_dic_tac = tac_long
-                    elif reg_tac == 2: ref_dic_tac = tac_short
-                    else: ref_dic_tac = UMBRALES_TACTICOS # 0 y 3 usan el base
-
-                    
-                    if conf_tac >= ref_dic_tac.get(reg_tac, 0.5):
-                        
-                        if reg_tac == 0: # Rango
-                            allow_std = ['RANGO']
-                            if reg_mac != 0: allow_std.append('FRPV') 
-                        elif reg_tac == 1: # Bull
-                            allow_std = ['FRPV', 'TREND', 'BREAKOUT', 'RANGO']
-                            side_allow_std = 'BUY'
-                            if reg_mac == 2: allow_std = [] 
-                        elif reg_tac == 2: # Bear
-                            allow_std = ['FRPV', 'TREND', 'BREAKOUT', 'RANGO']
-                            side_allow_std = 'SELL'
-                            if reg_mac == 1: allow_std = [] 
-                        elif reg_tac == 3: # Caos
-                            allow_std = ['BREAKOUT', 'FRPV']
-                            if reg_mac == 1: side_allow_std = 'BUY'
-                            elif reg_mac == 2: side_allow_std = 'SELL'
-                            elif reg_mac == 0: allow_std = ['FRPV']
-
-                # Reglas VIP HMM
-                allow_vip = []
-                try:
-                    X_hmm = preparar_input_hmm(df, scalers['hmm'])
-                    if X_hmm is not None:
-                        clust = modelos['HMM'].predict(X_hmm)[0]
-                        str_hmm = f"C{clust}"
-                        bot_state["market_cluster"] = int(clust)
-                        if clust in REGLAS_HMM and REGLAS_HMM[clust]:
-                            allow_vip = REGLAS_HMM[clust]
-                except: str_hmm="Err"
-
-                # Unificamos reglas crudas
-                raw_rules = list(set(allow_std + allow_vip))
-                
-                # Si no hay reglas
-                if not raw_rules:
-                    if not "⛔" in str_stat: str_stat = "💤 Esperando"
-                    print(f"{symbol:<10} | {str_mac:<15} | {str_tac:<15} | {str_hmm:<10} | {str_stat}"); continue
-                
-                str_stat = "" 
-
-                # --- EVALUACIÓN (LONG/SHORT) ---
-                # Iteramos sobre las estrategias base
-                for base_strat in CONFIG_STRAT.keys():
-                    
-                    # 1. INTERPRETACIÓN DE PERMISOS
-                    # Permiso Total: Si la regla es 'FRPV' -> Habilita ambos lados
-                    permiso_total = base_strat in raw_rules
-                    # Permiso Específico: Si la regla es 'FRPV_LONG' -> Solo Long
-                    permiso_long = permiso_total or (f"{base_strat}_LONG" in raw_rules)
-                    permiso_short = permiso_total or (f"{base_strat}_SHORT" in raw_rules)
-                    
-                    # Si no tiene permiso ni de long ni de short
-                    if not (permiso_long or permiso_short): continue
-
-                    # 2. Check GLOBAL Cooldown (Punto 7)
-                    if base_strat in bot_state.get("global_strat_perf", {}):
-                        cool_until = bot_state["global_strat_perf"][base_strat]["cooldown_until"]
-                        if cool_until and datetime.now() < datetime.fromisoformat(cool_until):
-                            continue # Estrategia castigada globalmente
-
-                    # 3. Límite por Estrategia (Punto 4)
-                    count_strat = sum(1 for k in bot_state["active_trades"] if base_strat in k)
-                    if count_strat >= MAX_TRADES_STRAT: continue
-
-                    # 4. Check Cooldown Individual
-                    key_strat = f"{symbol}_{base_strat}"
-                    if check_cooldown(key_strat): continue
-                    if key_strat in bot_state["active_trades"]: continue
-
-                    # 5. OBTENCIÓN DE SEÑALES CRUDAS Y FILTRADO DIRECCIONAL
-                    cfg = CONFIG_STRAT[base_strat]
-                    
-                    
-                    # Solo leemos la señal de compra si tenemos permiso_long = True
-                    is_buy = (not pd.isna(row.get(cfg['buy']))) and permiso_long
-                    # Solo leemos la señal de venta si tenemos permiso_short = True
-                    is_sell = (not pd.isna(row.get(cfg['sell']))) and permiso_short
-                    
-                    if not (is_buy or is_sell): continue
-                    
-                    
-                    # Ajustamos nombre variable
-                    strat = base_strat 
-                    
-                    # FILTROS MACRO
-                    # Si la estrategia entró por una regla VIP
-                    es_vip_long = f"{base_strat}_LONG" in allow_vip or base_strat in allow_vip
-                    es_vip_short = f"{base_strat}_SHORT" in allow_vip or base_strat in allow_vip
-                    
-                    if is_buy and not es_vip_long:
-                        if macro_bloqueado: continue
-                        if side_allow_std == 'SELL': continue
-                        if reg_mac == 2: continue 
-                    
-                    if is_sell and not es_vip_short:
-                        if macro_bloqueado: continue
-                        if side_allow_std == 'BUY': continue
-                        if reg_mac == 1: continue 
-
-                    side = 'BUY' if is_buy else 'SELL'; direct = 1.0 if is_buy else -1.0
-
-                    # Predicción IA
-                    try:
-                        w_mic = df.iloc[curr_idx-59:curr_idx+1][COLS_MICRO].values
-                        w_mic_s = scalers['micro'].transform(w_mic).reshape(1,60,6)
-                        d_t = np.full((1,60,1), direct)
-                        X_mic = np.concatenate([w_mic_s, d_t], axis=2)
-
-                        prob = modelos[strat].predict([X_mic, w_mac_s], verbose=0)[0][0]
-                    except: continue
-                    
-                    # ----------------------------------------------------------
-                    # UMBRAL FINAL (Dinámico + VIP + Sesgo Strat)
-                    # ----------------------------------------------------------
-                    umbral_real = cfg['umbral']
-                    
-                    # Ajuste por Sesgo de Estrategia (PnL Reciente)
-                    sesgo_strat = calcular_sesgo_estrategia(strat, side)
-                    umbral_real += sesgo_strat
-                    
-                    # Ajuste VIP (Racha o HMM)
-                    es_vip_active = (is_buy and es_vip_long) or (is_sell and es_vip_short)
-                    vip_until_date = bot_state["strategy_state"][key_strat].get("vip_until")
-                    es_vip_racha = vip_until_date and datetime.now() < datetime.fromisoformat(vip_until_date)
-                    
-                    if es_vip_active or es_vip_racha: 
-                        umbral_real -= VIP_UMBRAL_DISCOUNT
-                    
-                    
-                    prefix = "🔥" if (es_vip_active or es_vip_racha) else "⚡"
-                    if sesgo_strat < 0: prefix += "🟢" # Icono si tiene bonus por ganar
-                    elif sesgo_strat > 0: prefix += "🛡️" # Icono si tiene castigo por perder
-                    
-                    pasa_umbral = prob >= umbral_real
-                    estado_icon = "✅" if pasa_umbral else "❌"
-                    
-                    # Mostramos el umbral real exigido en el log
-                    str_stat += f"{prefix}{strat[:2]} {side}({prob:.2f}/{umbral_real:.2f}){estado_icon} "
-                    
-                    if pasa_umbral:
-                        entry = float(row['close']); atr = float(row['ATR'])
-                        mtp = cfg['tp']
-                        if side=='BUY': tp=entry+(atr*mtp); sl=entry-(atr*cfg['sl'])
-                        else: tp=entry-(atr*mtp); sl=entry+(atr*cfg['sl'])
-                        
-                        if abs(entry-sl)/entry > 0.05: # Filtro volatilidad extrema
-                            str_stat = str_stat.replace("✅", "⚠️Vol"); continue
-
-                        # --- GUARDAMOS CANDIDATO ---
-                        str_stat += "🚀 "
-                        meta = f"M:{str_mac.split('(')[0]} T:{str_tac.split('(')[0]} H:{str_hmm} P:{prob:.2f} VIP:{es_vip_active}"
-                        
-                        candidatos.append({
-                            'prob': prob,
-                            'symbol': symbol,
-                            'strat': strat,
-                            'side': side,
-                            'entry': entry, 'tp': tp, 'sl': sl,
-                            'meta': meta,
-                            # --- PARA IA STELLARIUM ---
-                            'prob_ia': prob,
-                            'raw_hmm': int(clust),
-                            'raw_ctx': reg_mac,
-                            'raw_ctx_prob': conf_mac,
-                            'raw_tac': reg_tac,
-                            'raw_tac_prob': conf_tac,
-                            'atr_pct': atr_pct_val,
-                            'rsi': rsi_val,
-                            'btc_trend': btc_trend_score_val,
-                            'hour': datetime.now().hour,
-                            'day': datetime.now().weekday() 
-                            # -----------------------------------------------
-                        })
-                
-                if not candidatos and "✅" not in str_stat: 
-                      print(f"{symbol:<10} | {str_mac:<15} | {str_tac:<15} | {str_hmm:<10} | {str_stat}")
+                    modelos, scalers = cargar_modelos()
+                    firma_cargada = firma
+                    memo_regimen.invalidar()
+                    print("♻️ Modelos recargados en caliente (memo de regímenes invalidada)")
+                except Exception as e: print(f"⚠️ Recarga de modelos fallida, sigo con los cargados: {e}")
+
+            ctx_analisis = {'data_cache': data_cache, 'exchange': exchange, 'mkt_idx': mkt_idx, 'btc_series': btc_series,
+                            'modelos': modelos, 'scalers': scalers, 'ctx_long': ctx_long, 'ctx_short': ctx_short,
+                            'tac_long': tac_long, 'tac_short': tac_short}
+
+            # Features por par en el pool CPU + inferencia en lote; el log sale en el orden de COINS_TO_TRADE
+            candidatos, lineas, pasadas = analizar_mercado(COINS_TO_TRADE, ctx_analisis)
+            for linea in lineas: print(linea)
+            print(f"   🧠 IA en lote: {pasadas} pasadas de modelo para {len(COINS_TO_TRADE)} pares | "
+                  f"memo regímenes: {memo_regimen.resumen()}")
+            print(f"   🪜 Cascada: {cascada.resumen()}")
 
             # --- EJECUCIÓN FINAL ---
             candidatos.sort(key=lambda x: x['prob'], reverse=True)
             
-            seen_symbols = set()
-            final_ops = []
-            
-
-            total_open = len(bot_state["active_trades"])
-            espacio_disponible = MAX_TRADES_GLOBAL - total_open
-            
             if candidatos:
                 print(f"\n🔎 Analizando {len(candidatos)} candidatos con Gerente V2...")
 
-            for c in candidatos:
-                if c['symbol'] in seen_symbols or espacio_disponible <= 0: continue
-
-                # --- EVITAR CONFLICTO EN MISMO PAR ---
-                # Verificación de si ya existe alguna posición abierta en par, sin importar la estrategia
-                existe_posicion_par = False
-                direccion_existente = None
-                
-                for k, v in bot_state["active_trades"].items():
-                    if v['symbol'] == c['symbol']:
-                        existe_posicion_par = True
-                        direccion_existente = v['side']
-                        break
-                
-                # Si ya hay posición en el par:
-                if existe_posicion_par:
-                    # A: Bloquear
-                    # continue 
-                    
-                    # B: Permitir solo si es la misma dirección
-                    if direccion_existente != c['side']:
-                        print(f"⚠️ {c['symbol']} descartado: Conflicto de dirección (Ya hay {direccion_existente})")
-                        continue
-
-                # --- LIMITES ESTRATEGIA ---
-                active_strat = sum(1 for k in bot_state["active_trades"] if c['strat'] in k)
-                pending_strat = sum(1 for op in final_ops if op['strat'] == c['strat'])
-                
-                if (active_strat + pending_strat) >= MAX_TRADES_STRAT: continue
+            # --- CONFLICTO EN MISMO PAR + LÍMITES GLOBAL / ESTRATEGIA / DIRECCIÓN ---
+            # Contadores de active_trades armados una vez; solo el mismo lado si el par ya tiene posición
+            elegidos, conflictos = seleccionar_candidatos(candidatos, bot_state["active_trades"],
+                                                          MAX_TRADES_GLOBAL, MAX_TRADES_STRAT, MAX_TRADES_SIDE)
+            for i, direccion_existente in conflictos:
+                print(f"⚠️ {candidatos[i]['symbol']} descartado: Conflicto de dirección (Ya hay {direccion_existente})")
+            final_ops = [candidatos[i] for i in elegidos]
+
+            # --- GERENTE V2 (STELLARIUM) EN LOTE ---
+            # No cambia qué se abre, solo el apalancamiento: una matriz y una llamada al booster con los elegidos
+            prob_gerente = lev_gerente = None
+            if gerente is not None and final_ops:
+                try:
+                    prob_gerente, lev_gerente = puntuar_candidatos(gerente, final_ops, strat_map_inv, umbrales_pro)
+                except Exception as e:
+                    print(f"⚠️ Error Gerente ({len(final_ops)} operaciones): {e}. Operando normal.")
 
-                # --- LIMITES DIRECCIONALES ---
-                # Cuántas hay abiertas de este lado (BUY o SELL)
-                active_side = sum(1 for v in bot_state["active_trades"].values() if v['side'] == c['side'])
-                
-                # Cuántas vamos a abrir ahora de este lado
-                pending_side = sum(1 for op in final_ops if op['side'] == c['side'])
-                
-                # Si sumamos más de 6, se descarta
-                if (active_side + pending_side) >= MAX_TRADES_SIDE:
-                    continue
-                
+            for i, c in enumerate(final_ops):
                 # Por defecto: No sugerimos nada(racha)
                 lev_sugerido = None 
 
-                # A) Si el STELLARIUM existe:
-                if gerente is not None:
-                    try:
-                        # 1. IDs
-                        strat_id = strat_map_inv.get(c['strat'], -1)
-                        side_id = 1 if c['side'] == 'BUY' else 0
-                        
-                        # 2. Vector de Features
-                        features_gerente = np.array([[
-                            strat_id, side_id,
-                            c['prob_ia'], c['raw_hmm'], c['raw_ctx'], c['raw_ctx_prob'], 
-                            c['raw_tac'], c['raw_tac_prob'], c['atr_pct'], c['rsi'], 
-                            c['btc_trend'], c['hour'], c['day']
-                        ]])
-                        
-                        # 3. Predicción
-                        prob_exito = gerente.predict_proba(features_gerente)[:, 1][0]
-                        
-                        # 4. Umbrales
-                        cfg_strat = umbrales_pro.get(c['strat'], {})
-                        cfg_side = cfg_strat.get(c['side'], {"veto": 0.30, "agresivo": 0.99})
-                        u_veto = cfg_side['veto']
-                        u_agg = cfg_side['agresivo']
-
-                        # 5. SEMÁFORO DE APALANCAMIENTO
-                        
-                        if prob_exito < u_veto:
-                            # ZONA ROJA: DEFENSIVO (Forzamos x1)
-                            lev_sugerido = 1
-                            print(f"🛡️ GERENTE: {c['symbol']} {c['strat']} Riesgoso ({prob_exito:.2f}). Sugiere x1.")
-                            c['meta'] += f" [DEFENSA x1]"
-                        
-                        elif prob_exito >= u_agg:
-                            # ZONA VERDE: SNIPER (Sugerimos x12)
-                            lev_sugerido = 12
-                            print(f"🔥 GERENTE: {c['symbol']} {c['strat']} ALTA CERTEZA ({prob_exito:.2f}). Sugiere x12!")
-                            c['meta'] += f" [SNIPER x12]"
-                            
-                        else:
-                            # ZONA AMARILLA: NORMAL (No tocamos nada)
-                            lev_sugerido = None 
-                            print(f"⚖️ GERENTE: {c['symbol']} {c['strat']} Normal ({prob_exito:.2f}). Respeta Racha.")
-
-                    except Exception as e:
-                        print(f"⚠️ Error Gerente {c['symbol']}: {e}. Operando normal.")
-                        lev_sugerido = None
+                # SEMÁFORO DE APALANCAMIENTO
+                if lev_gerente is not None:
+                    prob_exito = prob_gerente[i]
+                    if lev_gerente[i] == LEV_DEFENSA:
+                        # ZONA ROJA: DEFENSIVO (Forzamos x1)
+                        lev_sugerido = LEV_DEFENSA
+                        print(f"🛡️ GERENTE: {c['symbol']} {c['strat']} Riesgoso ({prob_exito:.2f}). Sugiere x1.")
+                        c['meta'] += f" [DEFENSA x1]"
+                    elif lev_gerente[i] == LEV_SNIPER:
+                        # ZONA VERDE: SNIPER (Sugerimos x12)
+                        lev_sugerido = LEV_SNIPER
+                        print(f"🔥 GERENTE: {c['symbol']} {c['strat']} ALTA CERTEZA ({prob_exito:.2f}). Sugiere x12!")
+                        c['meta'] += f" [SNIPER x12]"
+                    else:
+                        # ZONA AMARILLA: NORMAL (No tocamos nada)
+                        print(f"⚖️ GERENTE: {c['symbol']} {c['strat']} Normal ({prob_exito:.2f}). Respeta Racha.")
 
                 # Guardamos la sugerencia para ejecutar_orden
                 c['leverage_manual'] = lev_sugerido
-                
-                final_ops.append(c)
-                seen_symbols.add(c['symbol'])
-                espacio_disponible -= 1
+
+            espacio_disponible = MAX_TRADES_GLOBAL - len(bot_state["active_trades"]) - len(final_ops)
             
             # --- EJECUCIÓN ---
             if final_ops:
                 print(f"🚀 Ejecutando {len(final_ops)} operaciones...")
-                for op in final_ops:
-                     ejecutar_orden(
+                # Un par por operación (seleccionar_candidatos): se envían todas a la vez
+                nucleo.en_paralelo(lambda op: ejecutar_orden(
                          exchange, op['symbol'], op['strat'], op['side'], 
                          op['entry'], op['tp'], op['sl'], op['meta'], 
                          atr_pct=op.get('atr_pct'),
                          leverage_manual=op['leverage_manual'] # <--- SUGERENCIA
-                     )
+                     ), [(op,) for op in final_ops])
                 
                 if len(final_ops) > espacio_disponible:
                     print(f"⚠️ Límite Global ({MAX_TRADES_GLOBAL}) alcanzado. Se descartaron {len(final_ops) - espacio_disponible} operaciones.")
@@ -4634,18 +4948,10 @@ def main_loop():
             
             # Avisar a Telegram (el bot sigue corriendo)
             enviar_telegram(error_msg)
-        # --- ESPERA ---
-        # Si hay operaciones abiertas, chequeamos más rápido (cada 10s) para gestionar salidas
-        # Si no hay nada, chequeamos cada 60s para ahorrar API y CPU.
-        tiempo_espera = 20 if bot_state["active_trades"] else 60
-        
-        print(f"   ⏳ Ciclo terminado. Esperando {tiempo_espera}s...")
-        
-        # Bucle de espera
-        for _ in range(tiempo_espera):
-            if not bot_running: break
-            time.sleep(1)
-            
+
+    stream.detener()
+    nucleo.cerrar_exchange_async(exchange_async)
+    nucleo.detener()
     print("👋 BOT DETENIDO CORRECTAMENTE.")
 
 if __name__ == "__main__":
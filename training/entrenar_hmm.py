@@ -0,0 +1,261 @@
+import glob
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from hmmlearn.hmm import GaussianHMM
+from scipy.optimize import linear_sum_assignment
+from sklearn.preprocessing import RobustScaler
+from threadpoolctl import threadpool_limits
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS import kernels_indicadores as kernels
+
+# ==============================================================================
+# ENTRENAMIENTO HMM (REGÍMENES 1H) EN PARALELO CON REINICIOS MÚLTIPLES
+# ==============================================================================
+# 1) Features 1h de cada CSV de DATOS_PROCESADOS en un pool de procesos: resample
+#    5m -> 1h (sin la hora en curso) y las 6 features de preparar_input_hmm() de
+#    main.py con los kernels NumPy (misma definición que pandas_ta).
+# 2) Por par: el último FRACCION_VALIDACION de las horas queda fuera (validación);
+#    RobustScaler ajustado solo con las horas de entrenamiento.
+# 3) N_REINICIOS GaussianHMM por covariance_type con semillas distintas en un pool
+#    de procesos: EM cae en óptimos locales y un solo fit es una lotería. Las
+#    matrices van a .npy temporales que cada worker abre con mmap (no se copian
+#    por tarea) y cada fit corre con BLAS a 1 hilo (un proceso por núcleo).
+# 4) Selección: log-verosimilitud por hora en validación ('val') o BIC ('bic').
+# 5) Clusters ordenados como REGLAS_HMM (0 bajista, 1 alcista, 2 rango calmo,
+#    3 volatilidad): contra el modelo anterior si existe (asignación húngara sobre
+#    la coincidencia de posteriores en las horas de validación), si no por
+#    heurística sobre las medias en escala real.
+# Escritura atómica (.tmp + os.replace) del modelo y de scaler_hmm.pkl.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIR_PROCESADOS = os.path.join(BASE_DIR, 'DATOS_PROCESADOS')
+PATH_MODEL = os.path.join(BASE_DIR, 'MODELOS_ENTRENADOS', 'model_hmm_unsupervised.pkl')
+PATH_SCALER = os.path.join(BASE_DIR, 'DATOS_PARA_ENTRENAR_NPZ', 'scaler_hmm.pkl')
+
+COLS_HMM = ['Log_Ret', 'ATR_Pct', 'RSI', 'ADX', 'Dist_SMA', 'Vol_Chg']
+N_CLUSTERS = 4                       # Claves de REGLAS_HMM en main.py
+TIPOS_COVARIANZA = ('full', 'diag')
+N_REINICIOS = 24                     # Por covariance_type
+N_ITER = 200
+TOL = 1e-3
+FRACCION_VALIDACION = 0.2
+MIN_HORAS = 300                      # Pares con menos horas con features no entran
+CRITERIO = 'val'                     # 'val': LL por hora en validación | 'bic': BIC de entrenamiento
+WORKERS = os.cpu_count() or 1
+
+
+# ==============================================================================
+# 1. FEATURES 1H
+# ==============================================================================
+def features_hmm(df):
+    """Velas 5m (índice de tiempo UTC) -> DataFrame 1h con COLS_HMM, solo horas cerradas y sin NaN."""
+    velas = df.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).dropna()
+    velas = velas.iloc[:-1]  # Hora en curso (incompleta)
+    h, l, c, v = (velas[k].to_numpy(np.float64) for k in ('high', 'low', 'close', 'volume'))
+    sma50 = kernels.sma(c, 50)
+    c_ant, v_ant = np.r_[np.nan, c[:-1]], np.r_[np.nan, v[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        feats = pd.DataFrame({
+            'Log_Ret': np.log(c / c_ant),
+            'ATR_Pct': kernels.atr(h, l, c, 14) / c,
+            'RSI': kernels.rsi(c, 14),
+            'ADX': kernels.adx(h, l, c, 14),
+            'Dist_SMA': (c - sma50) / sma50,
+            'Vol_Chg': np.log(v / (v_ant + 1)),   # Como main.py (sin +1 arriba)
+        }, index=velas.index)
+    return feats.replace([np.inf, -np.inf], np.nan).dropna()
+
+
+def leer_features(path):
+    """(symbol, matriz (n, 6) float64 o None si no alcanza / falla)."""
+    symbol = os.path.basename(path).replace('.csv', '')
+    try:
+        df = pd.read_csv(path, usecols=['time', 'open', 'high', 'low', 'close', 'volume'])
+        df['time'] = pd.to_datetime(df['time'], utc=True)
+        df = df.set_index('time').sort_index()
+        X = features_hmm(df)[COLS_HMM].to_numpy(np.float64)
+        return symbol, (X if len(X) >= MIN_HORAS else None)
+    except Exception as e:
+        print(f"   ⚠️ {symbol}: {e}")
+        return symbol, None
+
+
+def partir(matrices, fraccion=FRACCION_VALIDACION):
+    """Corte temporal por par: (X_train, largos_train, X_val, largos_val)."""
+    tr, val = [], []
+    for X in matrices:
+        corte = int(len(X) * (1 - fraccion))
+        tr.append(X[:corte]); val.append(X[corte:])
+    return (np.concatenate(tr), np.array([len(x) for x in tr]),
+            np.concatenate(val), np.array([len(x) for x in val]))
+
+
+# ==============================================================================
+# 2. REINICIOS EN EL POOL
+# ==============================================================================
+_DATOS = {}
+
+
+def _iniciar_worker(dir_datos):
+    for k in ('X_tr', 'L_tr', 'X_val', 'L_val'):
+        _DATOS[k] = np.load(os.path.join(dir_datos, f'{k}.npy'), mmap_mode='r')
+
+
+def parametros_libres(K, D, tipo):
+    """Parámetros libres de un GaussianHMM (para el BIC)."""
+    cov = {'full': K * D * (D + 1) / 2, 'diag': K * D, 'spherical': K, 'tied': D * (D + 1) / 2}[tipo]
+    return (K - 1) + K * (K - 1) + K * D + cov
+
+
+def entrenar_reinicio(tarea):
+    """(covariance_type, semilla) -> resultado del fit con el modelo (o el error)."""
+    tipo, semilla = tarea
+    X_tr, L_tr = np.asarray(_DATOS['X_tr']), np.asarray(_DATOS['L_tr'])
+    X_val, L_val = np.asarray(_DATOS['X_val']), np.asarray(_DATOS['L_val'])
+    res = {'tipo': tipo, 'semilla': semilla, 'll_val': -np.inf, 'll_tr': -np.inf, 'bic': np.inf, 'modelo': None}
+    t = time.perf_counter()
+    try:
+        with threadpool_limits(1):
+            modelo = GaussianHMM(n_components=N_CLUSTERS, covariance_type=tipo, n_iter=N_ITER, tol=TOL,
+                                 random_state=semilla).fit(X_tr, L_tr)
+            ll_tr = modelo.score(X_tr, L_tr)
+            res['ll_val'] = modelo.score(X_val, L_val) / len(X_val)
+        res['ll_tr'] = ll_tr / len(X_tr)
+        res['bic'] = -2 * ll_tr + parametros_libres(N_CLUSTERS, X_tr.shape[1], tipo) * np.log(len(X_tr))
+        res['iter'], res['convergio'] = modelo.monitor_.iter, modelo.monitor_.converged
+        res['modelo'] = modelo
+    except Exception as e:  # Covarianza no definida positiva, etc.: el reinicio queda descartado
+        res['error'] = str(e)
+    res['seg'] = time.perf_counter() - t
+    return res
+
+
+def reiniciar_en_pool(partes, tareas, workers):
+    """Corre todas las tareas (tipo, semilla) sobre los datos partidos; devuelve resultados en orden."""
+    if workers <= 1:
+        _DATOS.update(zip(('X_tr', 'L_tr', 'X_val', 'L_val'), partes))
+        return [entrenar_reinicio(t) for t in tareas]
+    with tempfile.TemporaryDirectory() as dir_datos:
+        for k, arr in zip(('X_tr', 'L_tr', 'X_val', 'L_val'), partes): np.save(os.path.join(dir_datos, f'{k}.npy'), arr)
+        with ProcessPoolExecutor(workers, initializer=_iniciar_worker, initargs=(dir_datos,)) as pool:
+            return list(pool.map(entrenar_reinicio, tareas))
+
+
+def elegir(resultados, criterio=CRITERIO):
+    validos = [r for r in resultados if r['modelo'] is not None]
+    if not validos: return None
+    return max(validos, key=lambda r: r['ll_val']) if criterio == 'val' else min(validos, key=lambda r: r['bic'])
+
+
+# ==============================================================================
+# 3. ORDEN DE CLUSTERS (REGLAS_HMM)
+# ==============================================================================
+def orden_heuristico(medias_reales):
+    """Medias en escala real (K, 6) -> orden[nuevo id] = id del fit. 3: más ATR_Pct; 0 / 1: menor / mayor Dist_SMA."""
+    atr, dist = COLS_HMM.index('ATR_Pct'), COLS_HMM.index('Dist_SMA')
+    volatil = int(np.argmax(medias_reales[:, atr]))
+    resto = sorted((k for k in range(len(medias_reales)) if k != volatil), key=lambda k: medias_reales[k, dist])
+    return np.array([resto[0], resto[-1], *resto[1:-1], volatil])
+
+
+def orden_contra_previo(modelo, scaler, previo, scaler_previo, X, largos):
+    """
+    Asignación húngara: cada cluster del modelo anterior recibe el cluster del fit con el que más
+    coincide (suma de P_previo(i) * P_fit(j) sobre las horas X en escala real).
+    """
+    coincide = previo.predict_proba(scaler_previo.transform(X), largos).T @ modelo.predict_proba(scaler.transform(X), largos)
+    _, orden = linear_sum_assignment(-coincide)
+    return orden
+
+
+def permutar(modelo, orden):
+    """Reordena los clusters del modelo (in place): el cluster i nuevo es el orden[i] del fit."""
+    orden = np.asarray(orden)
+    modelo.startprob_ = modelo.startprob_[orden]
+    modelo.transmat_ = modelo.transmat_[np.ix_(orden, orden)]
+    modelo.means_ = modelo.means_[orden]
+    if modelo.covariance_type != 'tied': modelo._covars_ = modelo._covars_[orden]
+    return modelo
+
+
+def alinear_clusters(modelo, scaler, X, largos, path_modelo, path_scaler):
+    """Ordena los clusters del modelo elegido (X: horas de validación en escala real); devuelve el criterio usado."""
+    if N_CLUSTERS != 4: return 'sin alinear'
+    if os.path.exists(path_modelo) and os.path.exists(path_scaler):
+        try:
+            previo, scaler_previo = joblib.load(path_modelo), joblib.load(path_scaler)
+            if previo.means_.shape == modelo.means_.shape:
+                permutar(modelo, orden_contra_previo(modelo, scaler, previo, scaler_previo, X, largos))
+                return 'modelo anterior'
+        except Exception as e:
+            print(f"   ⚠️ Modelo anterior ilegible ({e}): orden heurístico")
+    permutar(modelo, orden_heuristico(scaler.inverse_transform(modelo.means_)))
+    return 'heurístico'
+
+
+def guardar(obj, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(obj, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+# ==============================================================================
+# 4. ETAPA COMPLETA
+# ==============================================================================
+def entrenar_hmm(dir_procesados=DIR_PROCESADOS, path_modelo=PATH_MODEL, path_scaler=PATH_SCALER,
+                 tipos=TIPOS_COVARIANZA, n_reinicios=N_REINICIOS, workers=WORKERS, criterio=CRITERIO, semilla_inicial=0):
+    """Features -> reinicios en paralelo -> selección -> alineación -> escritura. Devuelve (modelo, scaler, resultados)."""
+    print(f"🧬 ENTRENAMIENTO HMM ({N_CLUSTERS} clusters, {len(COLS_HMM)} features, {workers} procesos)...")
+    files = sorted(glob.glob(os.path.join(dir_procesados, '*.csv')))
+    if not files: print(f"❌ No hay CSV en {dir_procesados}"); return None, None, []
+
+    t = time.perf_counter()
+    if workers <= 1: leidos = [leer_features(f) for f in files]
+    else:
+        with ProcessPoolExecutor(workers) as pool: leidos = list(pool.map(leer_features, files, chunksize=4))
+    matrices = [X for _, X in leidos if X is not None]
+    print(f"   📂 {len(matrices)}/{len(files)} pares con >= {MIN_HORAS} horas | features en {time.perf_counter() - t:.1f}s")
+    if not matrices: print("❌ Sin datos suficientes."); return None, None, []
+
+    X_tr, L_tr, X_val, L_val = partir(matrices)
+    scaler = RobustScaler().fit(X_tr)
+    partes = (scaler.transform(X_tr), L_tr, scaler.transform(X_val), L_val)
+    print(f"   📊 Horas: {len(X_tr)} entrenamiento | {len(X_val)} validación")
+
+    t = time.perf_counter()
+    tareas = [(tipo, s) for tipo in tipos for s in range(semilla_inicial, semilla_inicial + n_reinicios)]
+    resultados = reiniciar_en_pool(partes, tareas, workers)
+    print(f"   ⏱️ {len(tareas)} reinicios en {time.perf_counter() - t:.1f}s")
+
+    mejor = elegir(resultados, criterio)
+    if mejor is None: print("❌ Ningún reinicio convergió a un modelo válido."); return None, None, resultados
+    clave = (lambda r: -r['ll_val']) if criterio == 'val' else (lambda r: r['bic'])
+    print(f"   {'tipo':<6} {'semilla':>7} {'LL val/h':>9} {'LL tr/h':>9} {'BIC':>12} {'iter':>5}")
+    for r in sorted(resultados, key=clave)[:8]:
+        if r['modelo'] is None: continue
+        marca = " 👈" if r is mejor else ""
+        print(f"   {r['tipo']:<6} {r['semilla']:>7} {r['ll_val']:>9.4f} {r['ll_tr']:>9.4f} {r['bic']:>12.0f} {r['iter']:>5}{marca}")
+    fallidos = sum(r['modelo'] is None for r in resultados)
+    if fallidos: print(f"   ⚠️ {fallidos} reinicios descartados")
+
+    modelo = mejor['modelo']
+    print(f"   🧭 Orden de clusters: {alinear_clusters(modelo, scaler, X_val, L_val, path_modelo, path_scaler)}")
+    medias = scaler.inverse_transform(modelo.means_)
+    for k, m in enumerate(medias):
+        print("      C{}: ".format(k) + " | ".join(f"{c} {v:.4g}" for c, v in zip(COLS_HMM, m)))
+
+    guardar(scaler, path_scaler)
+    guardar(modelo, path_modelo)
+    print(f"✅ Guardados {os.path.basename(path_modelo)} y {os.path.basename(path_scaler)}")
+    return modelo, scaler, resultados
+
+
+if __name__ == "__main__":
+    entrenar_hmm()
@@ -0,0 +1,130 @@
+import numpy as np
+import tensorflow as tf
+import keras
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from MODULOS.runtime_tflite import ModeloTFLite
+
+# ==============================================================================
+# EXPORTACIÓN A TFLITE (DESPUÉS DE train_ensemble.py)
+# ==============================================================================
+# Cada model_{nombre}.keras se convierte a model_{nombre}.tflite para que el bot
+# en vivo infiera sin importar TensorFlow (MODULOS/runtime_tflite.py):
+#   1) LSTM desenrolladas (unroll=True) con los mismos pesos: sin bucles
+#      while / TensorList, que el conversor no baja a ops builtin con batch libre.
+#   2) tf.function con firma (None, pasos, features) y variables congeladas.
+#   3) Solo TFLITE_BUILTINS: sin Flex (que volvería a traer TF), sin cuantizar.
+# Después se compara contra Keras en las muestras de validación del .npz (el 20%
+# final que train_ensemble no usa para entrenar). Si no da, no se escribe y se
+# borra el .tflite anterior (sería de otro entrenamiento).
+DIR_BASE = os.path.dirname(os.path.abspath(__file__))
+DIR_NPZ = os.path.join(DIR_BASE, 'DATOS_PARA_ENTRENAR_NPZ')
+DIR_MODELS = os.path.join(DIR_BASE, 'MODELOS_ENTRENADOS')
+
+MODELOS_EXPORTAR = ['IA_FRPV', 'IA_RANGO', 'IA_BREAKOUT', 'IA_TREND', 'IA_CONTEXTO', 'IA_TACTICO_1H']
+MUESTRAS_PARIDAD = 2048
+ATOL_PARIDAD = 1e-4  # Probabilidades: el orden de las sumas cambia los últimos bits de float32
+
+
+def desenrollar(modelo):
+    """Clon del modelo con las LSTM desenrolladas y los mismos pesos."""
+    def clonar_capa(capa):
+        cfg = capa.get_config()
+        if isinstance(capa, keras.layers.LSTM): cfg['unroll'] = True
+        return capa.__class__.from_config(cfg)
+
+    clon = keras.models.clone_model(modelo, clone_function=clonar_capa)
+    clon.set_weights(modelo.get_weights())
+    return clon
+
+
+def convertir_tflite(modelo):
+    """Modelo Keras -> bytes del flatbuffer (entradas entrada_0, entrada_1... en el orden de Keras)."""
+    clon = desenrollar(modelo)
+    firmas = [tf.TensorSpec((None,) + tuple(t.shape[1:]), tf.float32, name=f"entrada_{i}")
+              for i, t in enumerate(modelo.inputs)]
+    if len(firmas) > 1:
+        fn = tf.function(lambda *x: clon(list(x), training=False), input_signature=firmas)
+    else:
+        fn = tf.function(lambda x: clon(x, training=False), input_signature=firmas)
+    congelada = convert_variables_to_constants_v2(fn.get_concrete_function())
+
+    conversor = tf.lite.TFLiteConverter.from_concrete_functions([congelada])
+    conversor.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    return conversor.convert()
+
+
+def muestras_validacion(nombre, n=MUESTRAS_PARIDAD):
+    """Hasta n muestras repartidas en el 20% final del dataset (None si no está el .npz)."""
+    path = os.path.join(DIR_NPZ, f"dataset_{nombre}.npz")
+    if not os.path.exists(path): return None
+    data = np.load(path, mmap_mode='r')
+    claves = ['X_micro', 'X_macro'] if 'X_micro' in data.files else ['X']
+    total = len(data[claves[0]])
+    split = int(total * 0.8)
+    idx = np.unique(np.linspace(split, total - 1, min(n, total - split)).astype(int))
+    X = [np.asarray(data[c][idx], dtype=np.float32) for c in claves]
+    return X if len(X) > 1 else X[0]
+
+
+def diferencia_maxima(modelo, modelo_tflite, X):
+    return float(np.max(np.abs(modelo.predict(X, batch_size=512, verbose=0) - modelo_tflite.predict(X))))
+
+
+def descartar(path_tflite):
+    """Borra el .tmp y el .tflite anterior: un .tflite de otro entrenamiento no debe quedar servible."""
+    for path in (path_tflite + '.tmp', path_tflite):
+        if os.path.exists(path): os.remove(path)
+
+
+def exportar_modelo(path_keras, X_val=None):
+    """
+    Exporta un .keras a .tflite al lado y verifica paridad. Devuelve (path_tflite o None, dif máx).
+    Si no da la paridad o falla, no queda ningún .tflite (el bot usa el .keras con forward NumPy).
+    """
+    path_tflite = path_keras.replace('.keras', '.tflite')
+    path_tmp = path_tflite + '.tmp'
+    try:
+        modelo = tf.keras.models.load_model(path_keras, compile=False)
+        with open(path_tmp, 'wb') as f: f.write(convertir_tflite(modelo))
+
+        if X_val is None:  # Sin dataset: ventanas al azar con la forma del modelo
+            rng = np.random.default_rng(0)
+            X_val = [rng.normal(size=(256,) + tuple(t.shape[1:])).astype(np.float32) for t in modelo.inputs]
+            if len(X_val) == 1: X_val = X_val[0]
+        dif = diferencia_maxima(modelo, ModeloTFLite(path_tmp), X_val)
+    except Exception:
+        descartar(path_tflite)
+        raise
+    if dif > ATOL_PARIDAD:
+        descartar(path_tflite)
+        return None, dif
+    os.replace(path_tmp, path_tflite)
+    return path_tflite, dif
+
+
+def exportar_todos():
+    print("📦 EXPORTANDO MODELOS A TFLITE...")
+    for nombre in MODELOS_EXPORTAR:
+        path_keras = os.path.join(DIR_MODELS, f"model_{nombre}.keras")
+        if not os.path.exists(path_keras): print(f"   ⚠️ {nombre}: no hay {os.path.basename(path_keras)}"); continue
+        try:
+            X_val = muestras_validacion(nombre)
+            path_tflite, dif = exportar_modelo(path_keras, X_val)
+            if X_val is None: origen = "ventanas al azar"
+            else: origen = f"{len(X_val[0] if isinstance(X_val, list) else X_val)} muestras de validación"
+            if path_tflite is None:
+                print(f"   ❌ {nombre}: dif máx {dif:.1e} vs Keras ({origen}) > {ATOL_PARIDAD:.0e}. No se exporta (sin .tflite).")
+            else:
+                kb = os.path.getsize(path_tflite) / 1024
+                print(f"   ✅ {nombre}: {os.path.basename(path_tflite)} ({kb:.0f} KB), dif máx {dif:.1e} vs Keras ({origen})")
+        except Exception as e:
+            print(f"   ❌ Error exportando {nombre} (sin .tflite): {e}")
+    print("🏁 EXPORTACIÓN FINALIZADA.")
+
+
+if __name__ == "__main__":
+    exportar_todos()
@@ -2,7 +2,6 @@ import pandas as pd
 import numpy as np
 import pandas_ta as ta
 import joblib
-import tensorflow as tf
 import os
 import glob
 import gc
@@ -28,6 +27,7 @@ FECHA_INICIO_MINERIA = "2020-01-01"
 
 CHUNK_SIZE = 25000   # Valores intermedios, ajustados para balancear velocidad y memoria. Se pueden aumentar si se dispone de GPU potente.
 BATCH_SIZE = 4096    # Valores intermedios, ajustados para balancear velocidad y memoria. Se pueden aumentar si se dispone de GPU potente.
+MOTOR_IA = 'NUMPY'   # 'NUMPY' (CPU, sin TensorFlow) | 'KERAS' (GPU si hay)
 
 os.environ["TF_FORCE_GPU_ALLOW_GROWTH"] = "true"
 
@@ -39,11 +39,13 @@ COLS_MACRO = ['Retorno Diario Activo', 'Retorno Top20', 'Diferencia vs Mercado',
 # Columnas Tácticas
 COLS_TACTICO = ['RSI', 'ADX', 'ATR_Norm', 'Dist_SMA', 'Slope']
 
-try:
-    gpus = tf.config.experimental.list_physical_devices('GPU')
-    for gpu in gpus: tf.config.experimental.set_memory_growth(gpu, True)
-    print(f"🔥 GPU Lista: {len(gpus)}")
-except: pass
+if MOTOR_IA == 'KERAS':
+    import tensorflow as tf
+    try:
+        gpus = tf.config.experimental.list_physical_devices('GPU')
+        for gpu in gpus: tf.config.experimental.set_memory_growth(gpu, True)
+        print(f"🔥 GPU Lista: {len(gpus)}")
+    except: pass
 
 # ==============================================================================
 # CARGA DE CEREBRO (FULL)
@@ -51,20 +53,25 @@ except: pass
 
 def cargar_cerebro():
     print("🧠 Cargando TODO el equipo (Estrategias, HMM, Contexto y Táctica)...")
+    if MOTOR_IA == 'NUMPY':
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from MODULOS.lstm_numpy import cargar_numpy as cargar_red
+    else:
+        cargar_red = tf.keras.models.load_model
     modelos = {}
     
     # 1. Estrategias 
     for k in CONFIG_STRAT: 
-        modelos[k] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, f'model_IA_{k}.keras'))
+        modelos[k] = cargar_red(os.path.join(DIR_MODELOS, f'model_IA_{k}.keras'))
     
     # 2. HMM unsupervised (Estados de Mercado)  
     modelos['HMM'] = joblib.load(os.path.join(DIR_MODELOS, 'model_hmm_unsupervised.pkl'))
     
     # 3. CONTEXTO (MACRO) 
-    modelos['CONTEXTO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_CONTEXTO.keras'))
+    modelos['CONTEXTO'] = cargar_red(os.path.join(DIR_MODELOS, 'model_IA_CONTEXTO.keras'))
 
     # 4. TACTICO (RED NEURONAL 1H)
-    modelos['TACTICO'] = tf.keras.models.load_model(os.path.join(DIR_MODELOS, 'model_IA_TACTICO_1H.keras'))
+    modelos['TACTICO'] = cargar_red(os.path.join(DIR_MODELOS, 'model_IA_TACTICO_1H.keras'))
     
     scalers = {}
     scalers['micro'] = joblib.load(os.path.join(DIR_SCALERS, 'scaler_micro_global.pkl'))
@@ -230,4 +230,8 @@ def entrenar_todos():
     print("\n🏁 PROCESO FINALIZADO.")
 
 if __name__ == "__main__":
-    entrenar_todos()
\ No newline at end of file
+    entrenar_todos()
+
+    # Paso siguiente: .tflite para el runtime sin TensorFlow del bot en vivo
+    from exportar_tflite import exportar_todos
+    exportar_todos()
\ No newline at end of file